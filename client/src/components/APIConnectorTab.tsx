@@ -160,6 +160,7 @@ export function APIConnectorTab({ projectId, onComplete }: APIConnectorTabProps)
         projectId: projectId!,
         config,
         label,
+        persist: true,
       });
 
       if (result.success) {
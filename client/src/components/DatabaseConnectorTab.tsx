@@ -143,6 +143,7 @@ export function DatabaseConnectorTab({ projectId, onComplete }: DatabaseConnecto
         projectId: projectId!,
         config,
         label,
+        persist: true,
       });
 
       if (result.success) {
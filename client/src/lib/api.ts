@@ -529,6 +529,7 @@ export class APIClient {
     projectId: string;
     config: Record<string, any>;
     label?: string;
+    persist?: boolean; // link the dataset to the project (imports); tests/previews leave it unset
   }): Promise<any> {
     return this.post('/api/data-ingestion/ingest', params);
   }
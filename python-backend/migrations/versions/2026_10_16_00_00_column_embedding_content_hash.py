@@ -0,0 +1,39 @@
+"""Add content hash to column embeddings
+
+Revision ID: 2026_10_16_00_00_embedding_hash
+Revises: 2026_03_07_00_00_initial
+Create Date: 2026-10-16 00:00
+
+Stores a hash of the embedded text and model with each column embedding so
+unchanged columns are reused instead of re-embedded.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '2026_10_16_00_00_embedding_hash'
+down_revision: Union[str, None] = '2026_03_07_00_00_initial'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade database to this revision."""
+    op.add_column('column_embeddings', sa.Column('content_hash', sa.String(64)))
+    op.create_index(
+        'ix_column_embeddings_model_content_hash',
+        'column_embeddings',
+        ['embedding_model', 'content_hash'],
+    )
+    # Rows are now inserted in bulk without client-generated IDs
+    op.execute("ALTER TABLE column_embeddings ALTER COLUMN id SET DEFAULT gen_random_uuid()::text")
+
+
+def downgrade() -> None:
+    """Downgrade database from this revision."""
+    op.execute("ALTER TABLE column_embeddings ALTER COLUMN id DROP DEFAULT")
+    op.drop_index('ix_column_embeddings_model_content_hash', table_name='column_embeddings')
+    op.drop_column('column_embeddings', 'content_hash')
@@ -0,0 +1,49 @@
+"""Add pgvector column and HNSW index to column embeddings
+
+Revision ID: 2026_10_16_01_00_embedding_vector
+Revises: 2026_10_16_00_00_embedding_hash
+Create Date: 2026-10-16 01:00
+
+Adds `embedding_vector vector(1536)` next to the JSON embedding so column
+similarity search can use an HNSW index with `<=>` ordering. Skipped when
+the pgvector extension is not installed; search then runs in-process.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '2026_10_16_01_00_embedding_vector'
+down_revision: Union[str, None] = '2026_10_16_00_00_embedding_hash'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade database to this revision."""
+    op.execute("""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'vector') THEN
+                ALTER TABLE column_embeddings ADD COLUMN IF NOT EXISTS embedding_vector vector(1536);
+
+                UPDATE column_embeddings
+                SET embedding_vector = CAST(embedding::text AS vector)
+                WHERE embedding_vector IS NULL
+                  AND embedding IS NOT NULL
+                  AND json_array_length(embedding::json) = 1536;
+
+                CREATE INDEX IF NOT EXISTS ix_column_embeddings_vector_hnsw
+                ON column_embeddings
+                USING hnsw (embedding_vector vector_cosine_ops)
+                WITH (m = 16, ef_construction = 128);
+            END IF;
+        END $$;
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade database from this revision."""
+    op.execute("DROP INDEX IF EXISTS ix_column_embeddings_vector_hnsw")
+    op.execute("ALTER TABLE column_embeddings DROP COLUMN IF EXISTS embedding_vector")
@@ -0,0 +1,58 @@
+"""Add full-text search vector to knowledge nodes
+
+Revision ID: 2026_10_16_02_00_knowledge_search
+Revises: 2026_10_16_01_00_embedding_vector
+Create Date: 2026-10-16 02:00
+
+Adds a generated `search_vector tsvector` column (title weighted above
+content) with a GIN index, so knowledge search can rank with
+`websearch_to_tsquery` / `ts_rank_cd` instead of ILIKE plus rescoring.
+Databases created from the Drizzle schema use label/summary/attributes
+for the same fields.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '2026_10_16_02_00_knowledge_search'
+down_revision: Union[str, None] = '2026_10_16_01_00_embedding_vector'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Upgrade database to this revision."""
+    op.execute("""
+        DO $$
+        DECLARE
+            search_expr text;
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM information_schema.columns
+                WHERE table_name = 'knowledge_nodes' AND column_name = 'title'
+            ) THEN
+                search_expr := 'setweight(to_tsvector(''english'', coalesce(title, '''')), ''A'') || '
+                            || 'setweight(to_tsvector(''english'', coalesce(content::text, '''')), ''B'')';
+            ELSIF EXISTS (
+                SELECT 1 FROM information_schema.columns
+                WHERE table_name = 'knowledge_nodes' AND column_name = 'label'
+            ) THEN
+                search_expr := 'setweight(to_tsvector(''english'', coalesce(label, '''')), ''A'') || '
+                            || 'setweight(to_tsvector(''english'', coalesce(summary, '''')), ''B'') || '
+                            || 'setweight(to_tsvector(''english'', coalesce(attributes::text, '''')), ''C'')';
+            ELSE
+                RETURN;
+            END IF;
+
+            EXECUTE 'ALTER TABLE knowledge_nodes ADD COLUMN IF NOT EXISTS search_vector tsvector '
+                 || 'GENERATED ALWAYS AS (' || search_expr || ') STORED';
+            CREATE INDEX IF NOT EXISTS ix_knowledge_nodes_search_vector
+            ON knowledge_nodes USING gin (search_vector);
+        END $$;
+    """)
+
+def downgrade() -> None:
+    """Downgrade database from this revision."""
+    op.execute("DROP INDEX IF EXISTS ix_knowledge_nodes_search_vector")
+    op.execute("ALTER TABLE knowledge_nodes DROP COLUMN IF EXISTS search_vector")
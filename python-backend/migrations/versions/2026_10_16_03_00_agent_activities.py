@@ -0,0 +1,46 @@
+"""Add agent activity log table
+
+Revision ID: 2026_10_16_03_00_agent_activities
+Revises: 2026_10_16_02_00_knowledge_search
+Create Date: 2026-10-16 03:00
+
+Agent activities were kept in an unbounded per-process dict. They are now
+written behind in batches to `agent_activities` and read a page at a time
+by (project_id, created_at, id).
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '2026_10_16_03_00_agent_activities'
+down_revision: Union[str, None] = '2026_10_16_02_00_knowledge_search'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade database to this revision."""
+    op.create_table(
+        'agent_activities',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('project_id', sa.String(36), nullable=False),
+        sa.Column('agent', sa.String(64), nullable=False),
+        sa.Column('action', sa.String(100), nullable=False),
+        sa.Column('detail', sa.Text()),
+        sa.Column('created_at', sa.DateTime(timezone=False), nullable=False,
+                  server_default=sa.text('CURRENT_TIMESTAMP')),
+    )
+    op.create_index(
+        'ix_agent_activities_project_created',
+        'agent_activities',
+        ['project_id', 'created_at', 'id'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade database from this revision."""
+    op.drop_index('ix_agent_activities_project_created', table_name='agent_activities')
+    op.drop_table('agent_activities')
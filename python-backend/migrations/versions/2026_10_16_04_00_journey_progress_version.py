@@ -0,0 +1,41 @@
+"""Add journey_progress_version to projects
+
+Revision ID: 2026_10_16_04_00_journey_progress_version
+Revises: 2026_10_16_03_00_agent_activities
+Create Date: 2026-10-16 04:00
+
+journey_progress is now patched key by key in SQL instead of being read,
+mutated and rewritten whole. The version counter is bumped by every patch
+and lets read-modify-write updates of a single key detect concurrent
+writers (optimistic concurrency) instead of losing their changes.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '2026_10_16_04_00_journey_progress_version'
+down_revision: Union[str, None] = '2026_10_16_03_00_agent_activities'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade database to this revision."""
+    op.add_column(
+        'projects',
+        sa.Column('journey_progress_version', sa.Integer(), nullable=False, server_default='0'),
+    )
+    # Results were stored twice; analysisResults is the copy every reader uses
+    op.execute(
+        "UPDATE projects SET journey_progress = journey_progress - 'executionResults' "
+        "WHERE jsonb_typeof(journey_progress) = 'object' "
+        "AND journey_progress ? 'executionResults' AND journey_progress ? 'analysisResults'"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade database from this revision."""
+    op.drop_column('projects', 'journey_progress_version')
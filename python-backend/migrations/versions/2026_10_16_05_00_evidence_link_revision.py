@@ -0,0 +1,35 @@
+"""Add revision to evidence_links
+
+Revision ID: 2026_10_16_05_00_evidence_link_revision
+Revises: 2026_10_16_04_00_journey_progress_version
+Create Date: 2026-10-16 05:00
+
+Evidence links are upserted by ID, and an update left both the row count
+and created_at unchanged, so other workers never noticed it. Every upsert
+now bumps the row's revision; the (count, sum of revisions) of a project
+changes with every insert and update and tells workers to reload.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '2026_10_16_05_00_evidence_link_revision'
+down_revision: Union[str, None] = '2026_10_16_04_00_journey_progress_version'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade database to this revision."""
+    op.add_column(
+        'evidence_links',
+        sa.Column('revision', sa.Integer(), nullable=False, server_default='1'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade database from this revision."""
+    op.drop_column('evidence_links', 'revision')
@@ -0,0 +1,98 @@
+"""
+Database Pool Benchmark
+
+Measures per-request database overhead with and without connection pooling
+by issuing short queries through get_db_context() at a fixed concurrency.
+
+Usage:
+    python scripts/benchmark_db_pool.py --requests 500 --concurrency 20
+    python scripts/benchmark_db_pool.py --query "SELECT count(*) FROM projects"
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from sqlalchemy import text  # noqa: E402
+
+from src import db  # noqa: E402
+
+
+async def _run_load(query: str, requests: int, concurrency: int) -> dict:
+    """Issue `requests` queries with at most `concurrency` in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one_request() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            async with db.get_db_context() as session:
+                await session.execute(text(query))
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "throughput_rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "max_ms": latencies[-1],
+        "pool": db.get_pool_metrics(),
+    }
+
+
+async def _benchmark(database_url: str, query: str, requests: int, concurrency: int, use_null_pool: bool) -> dict:
+    db.init_database(database_url, use_null_pool=use_null_pool)
+    try:
+        # Warm-up so pooled runs are measured in steady state
+        await _run_load(query, min(concurrency, requests), concurrency)
+        return await _run_load(query, requests, concurrency)
+    finally:
+        await db.close_database()
+
+
+def _print_result(label: str, result: dict) -> None:
+    pool = result["pool"]
+    print(f"\n{label}")
+    print(f"  throughput : {result['throughput_rps']:.1f} req/s")
+    print(f"  latency    : p50 {result['p50_ms']:.2f} ms, p95 {result['p95_ms']:.2f} ms, max {result['max_ms']:.2f} ms")
+    print(f"  connections: {pool['connects']} opened for {pool['checkouts']} checkouts "
+          f"(avg connect {pool['avg_connect_ms']} ms)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark pooled vs unpooled database access")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--query", default="SELECT 1")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("DATABASE_URL is not set")
+
+    unpooled = asyncio.run(_benchmark(args.database_url, args.query, args.requests, args.concurrency, True))
+    pooled = asyncio.run(_benchmark(args.database_url, args.query, args.requests, args.concurrency, False))
+
+    _print_result("NullPool (before)", unpooled)
+    _print_result("AsyncAdaptedQueuePool (after)", pooled)
+    print(f"\nSpeed-up: {pooled['throughput_rps'] / unpooled['throughput_rps']:.2f}x throughput, "
+          f"p50 {unpooled['p50_ms'] / pooled['p50_ms']:.2f}x lower")
+
+
+if __name__ == "__main__":
+    main()
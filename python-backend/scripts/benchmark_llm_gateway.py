@@ -0,0 +1,67 @@
+"""
+LLM Gateway Benchmark
+
+Drives the LLM gateway with the offline stub provider to measure
+throughput, latency and cache behaviour without network access.
+
+Usage:
+    python scripts/benchmark_llm_gateway.py --requests 500 --distinct 50 --latency-ms 200
+    python scripts/benchmark_llm_gateway.py --no-cache
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services.llm_gateway import LLMGateway, ResponseCache, StubProvider  # noqa: E402
+
+
+async def _run(args: argparse.Namespace) -> None:
+    stub = StubProvider(latency_ms=args.latency_ms)
+    gateway = LLMGateway(
+        providers=[stub],
+        max_concurrency=args.concurrency,
+        provider_concurrency=args.concurrency,
+        cache=ResponseCache(max_entries=0 if args.no_cache else 1024),
+    )
+    prompts = [f"Suggest analysis questions for goal #{i % args.distinct}" for i in range(args.requests)]
+    latencies = []
+
+    async def one_request(prompt: str) -> None:
+        started = time.perf_counter()
+        await gateway.generate(prompt, use_cache=not args.no_cache)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request(prompt) for prompt in prompts))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    stats = gateway.get_stats()
+    print(f"requests      : {args.requests} ({args.distinct} distinct prompts)")
+    print(f"provider calls: {stub.calls}")
+    print(f"throughput    : {args.requests / elapsed:.1f} req/s")
+    print(f"latency       : p50 {statistics.median(latencies):.1f} ms, "
+          f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.1f} ms")
+    print(f"cache         : {stats['cache_hits']} hits, {stats['coalesced']} coalesced, "
+          f"hit rate {stats['cache_hit_rate']:.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the LLM gateway against the stub provider")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--distinct", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--no-cache", action="store_true")
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Vector Index Benchmark
+
+Measures recall@k and query latency of the column similarity backends
+against an exact brute-force scan over the same random vectors:
+
+- legacy: per-record Python loop (the old search_similar_columns)
+- memory: in-process VectorIndex (matmul + argpartition)
+- pgvector: HNSW index with `<=>` ordering (only with --database-url)
+
+Usage:
+    python scripts/benchmark_vector_index.py --vectors 50000 --dim 1536 --queries 100
+    python scripts/benchmark_vector_index.py --database-url postgresql://localhost/chimari
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services.vector_index import VectorIndex, normalize_rows  # noqa: E402
+
+
+def _exact_top_k(matrix: np.ndarray, query: np.ndarray, k: int) -> list:
+    scores = normalize_rows(matrix) @ normalize_rows(query)[0]
+    return list(np.argsort(-scores, kind="stable")[:k])
+
+
+def _legacy_top_k(vectors: list, query: list, k: int) -> list:
+    query_vec = np.array(query)
+    results = []
+    for i, emb in enumerate(vectors):
+        emb_vec = np.array(emb)
+        norm = np.linalg.norm(query_vec) * np.linalg.norm(emb_vec)
+        results.append((float(np.dot(query_vec, emb_vec) / norm) if norm else 0.0, i))
+    results.sort(reverse=True)
+    return [i for _, i in results[:k]]
+
+
+def _report(name: str, latencies: list, recalls: list) -> None:
+    latencies.sort()
+    print(f"{name:<9}: recall@k {statistics.mean(recalls):.3f}, "
+          f"p50 {statistics.median(latencies):.2f} ms, "
+          f"p95 {latencies[max(int(len(latencies) * 0.95) - 1, 0)]:.2f} ms")
+
+
+def _recall(found: list, expected: list) -> float:
+    return len(set(found) & set(expected)) / len(expected) if expected else 1.0
+
+
+async def _bench_pgvector(args, matrix: np.ndarray, queries: np.ndarray, truth: list) -> None:
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = args.database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    engine = create_async_engine(url)
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text(
+                f"CREATE TEMP TABLE bench_vectors (id integer PRIMARY KEY, embedding_vector vector({args.dim}))"
+            ))
+            await conn.execute(
+                text("INSERT INTO bench_vectors VALUES (:id, CAST(CAST(:v AS text) AS vector))"),
+                [{"id": i, "v": json.dumps(row.tolist())} for i, row in enumerate(matrix)],
+            )
+            started = time.perf_counter()
+            await conn.execute(text(
+                "CREATE INDEX ON bench_vectors USING hnsw (embedding_vector vector_cosine_ops) "
+                "WITH (m = 16, ef_construction = 128)"
+            ))
+            print(f"hnsw build: {time.perf_counter() - started:.1f} s")
+            await conn.execute(text(f"SET hnsw.ef_search = {int(args.ef_search)}"))
+
+            latencies, recalls = [], []
+            for query, expected in zip(queries, truth):
+                started = time.perf_counter()
+                result = await conn.execute(
+                    text(
+                        "SELECT id FROM bench_vectors "
+                        "ORDER BY embedding_vector <=> CAST(CAST(:q AS text) AS vector) LIMIT :k"
+                    ),
+                    {"q": json.dumps(query.tolist()), "k": args.k},
+                )
+                found = [row[0] for row in result.fetchall()]
+                latencies.append((time.perf_counter() - started) * 1000)
+                recalls.append(_recall(found, expected))
+            _report("pgvector", latencies, recalls)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark column vector search against brute force")
+    parser.add_argument("--vectors", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--datasets", type=int, default=1, help="Split vectors across this many collections")
+    parser.add_argument("--legacy-queries", type=int, default=3, help="Queries to time with the legacy loop")
+    parser.add_argument("--database-url", default=None, help="Also benchmark pgvector HNSW")
+    parser.add_argument("--ef-search", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    matrix = rng.standard_normal((args.vectors, args.dim)).astype(np.float32)
+    queries = rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+    truth = [_exact_top_k(matrix, query, args.k) for query in queries]
+    print(f"vectors: {args.vectors} x {args.dim}, queries: {args.queries}, k: {args.k}")
+
+    index = VectorIndex()
+    started = time.perf_counter()
+    for part, rows in enumerate(np.array_split(np.arange(args.vectors), args.datasets)):
+        index.replace(f"ds{part}", rows.tolist(), matrix[rows])
+    print(f"memory build: {time.perf_counter() - started:.2f} s ({index.get_stats()['bytes'] / 1e6:.0f} MB)")
+
+    latencies, recalls = [], []
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        found = [hit.id for hit in index.search(query, k=args.k)]
+        latencies.append((time.perf_counter() - started) * 1000)
+        recalls.append(_recall(found, expected))
+    _report("memory", latencies, recalls)
+
+    if args.legacy_queries:
+        vectors = matrix.tolist()
+        latencies, recalls = [], []
+        for query, expected in list(zip(queries, truth))[:args.legacy_queries]:
+            started = time.perf_counter()
+            found = _legacy_top_k(vectors, query.tolist(), args.k)
+            latencies.append((time.perf_counter() - started) * 1000)
+            recalls.append(_recall(found, expected))
+        _report("legacy", latencies, recalls)
+
+    if args.database_url:
+        asyncio.run(_bench_pgvector(args, matrix, queries, truth))
+
+
+if __name__ == "__main__":
+    main()
@@ -24,6 +24,7 @@ setup(
         "openai>=1.10.0",
         "pandas>=2.1.4",
         "numpy>=1.26.0",
+        "pyarrow>=14.0.0",
         "sqlalchemy>=2.0.25",
         "asyncpg>=0.29.0",
         "pgvector>=0.2.4",
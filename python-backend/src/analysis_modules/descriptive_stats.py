@@ -26,7 +26,7 @@ import json
 import sys
 import time
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 
 import pandas as pd
@@ -65,17 +65,19 @@ class AnalysisResult:
 # Main Analysis Function
 # ============================================================================
 
-def main():
+def main(input_config: Optional[Dict[str, Any]] = None):
     """
     Main entry point for descriptive statistics analysis
 
-    Reads configuration from stdin and outputs results to stdout
+    Reads configuration from stdin (or `input_config` when run in-process by
+    the analysis worker pool) and outputs results to stdout
     """
     start_time = time.time()
 
     try:
         # Parse input configuration
-        input_config = json.loads(sys.stdin.read())
+        if input_config is None:
+            input_config = json.loads(sys.stdin.read())
         logger.info(f"Received config: {input_config}")
 
         # Validate required fields
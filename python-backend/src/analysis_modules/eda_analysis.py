@@ -556,17 +556,19 @@ class MissingValueAnalyzer:
 # Main Analysis Function
 # ============================================================================
 
-def main():
+def main(input_config: Optional[Dict[str, Any]] = None):
     """
     Main entry point for EDA
 
-    Reads configuration from stdin and outputs results to stdout
+    Reads configuration from stdin (or `input_config` when run in-process by
+    the analysis worker pool) and outputs results to stdout
     """
     start_time = time.time()
 
     try:
         # Parse input configuration
-        input_config = json.loads(sys.stdin.read())
+        if input_config is None:
+            input_config = json.loads(sys.stdin.read())
         logger.info(f"Received config: {input_config}")
 
         # Validate required fields
@@ -17,6 +17,7 @@ Uses Google Gemini as primary LLM, with OpenAI fallback.
 
 from typing import Optional, List, Dict, Any, Tuple, Set
 from datetime import datetime
+import asyncio
 import json
 import logging
 import os
@@ -24,15 +25,27 @@ import uuid
 import re
 import hashlib
 import difflib
+from collections import OrderedDict
+from functools import lru_cache
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, status
 from fastapi.responses import ORJSONResponse, JSONResponse
 from pydantic import BaseModel, Field, ConfigDict, field_validator
 
 from sqlalchemy import text as sa_text
 
 from ..db import get_db_context
+from ..db.schema_cache import get_schema_cache
 from ..auth.middleware import get_current_user, User as AuthUser
+from ..services.activity_log import (
+    ACTIVITY_LOG_DEFAULT_PAGE_SIZE,
+    ACTIVITY_LOG_MAX_PAGE_SIZE,
+    get_activity_log,
+)
+from ..services.dataset_store import get_dataset_store
+from ..services.dataset_loader import load_project_datasets
+from ..services.llm_gateway import get_llm_gateway
+from ..services.journey_state import patch_journey_progress
 
 logger = logging.getLogger(__name__)
 
@@ -43,62 +56,14 @@ router = APIRouter(tags=["agent-pipeline"])
 # LLM Client
 # ============================================================================
 
-_gemini_model = None
-
-
-def _get_gemini_model():
-    """Lazily initialize and return the Gemini generative model."""
-    global _gemini_model
-    if _gemini_model is not None:
-        return _gemini_model
-    api_key = os.getenv("GOOGLE_AI_API_KEY")
-    if not api_key:
-        return None
-    try:
-        import google.generativeai as genai
-        genai.configure(api_key=api_key)
-        _gemini_model = genai.GenerativeModel("gemini-1.5-flash")
-        logger.info("Gemini LLM client initialized")
-        return _gemini_model
-    except Exception as e:
-        logger.warning(f"Failed to initialize Gemini: {e}")
-        return None
-
-
 async def _llm_generate(prompt: str) -> Optional[str]:
     """
-    Generate text using Gemini (primary) or OpenAI (fallback).
+    Generate text through the shared LLM gateway (Gemini, then OpenAI).
 
-    Returns the generated text, or raises HTTPException on failure.
+    Returns the generated text, or None when no provider is available so
+    callers can provide fallback responses.
     """
-    # Try Gemini first
-    model = _get_gemini_model()
-    if model is not None:
-        try:
-            response = model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            logger.warning(f"Gemini generation failed, trying OpenAI fallback: {e}")
-
-    # Fallback to OpenAI
-    openai_key = os.getenv("OPENAI_API_KEY")
-    if openai_key:
-        try:
-            import openai
-            client = openai.AsyncOpenAI(api_key=openai_key)
-            response = await client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
-                max_tokens=2000,
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            logger.error(f"OpenAI generation also failed: {e}")
-
-    # No LLM available — return None so callers can provide fallback responses
-    logger.warning("No LLM provider available. Set GOOGLE_AI_API_KEY or OPENAI_API_KEY.")
-    return None
+    return await get_llm_gateway().generate(prompt)
 
 
 def _parse_json_from_llm(text: str) -> Any:
@@ -218,41 +183,15 @@ class DataQualityRequest(BaseModel):
 
 # ============================================================================
 # In-memory stores (production would use Redis / DB)
+# Agent activities live in services/activity_log.py
 # ============================================================================
 
 _conversations: Dict[str, Dict[str, Any]] = {}
-_agent_activities: Dict[str, List[Dict[str, Any]]] = {}
-
-AGENT_DISPLAY_NAMES = {
-    "project_manager": "Project Manager",
-    "pm": "Project Manager",
-    "business": "Business Analyst",
-    "business_agent": "Business Analyst",
-    "data_engineer": "Data Engineer",
-    "data_scientist": "Data Scientist",
-    "researcher": "Researcher",
-    "template_research": "Researcher",
-    "customer_support": "Customer Support",
-    "conversation": "Customer Support",
-    "orchestrator": "Project Manager",
-    "technical_ai": "Data Scientist",
-    "technical_ai_agent": "Data Scientist",
-}
 
 
 def _record_activity(project_id: str, agent: str, action: str, detail: str = ""):
-    """Append an activity entry for a project."""
-    if project_id not in _agent_activities:
-        _agent_activities[project_id] = []
-    display_name = AGENT_DISPLAY_NAMES.get(agent, agent.replace("_", " ").title())
-    _agent_activities[project_id].append({
-        "id": str(uuid.uuid4()),
-        "agent": agent,
-        "agentName": display_name,
-        "action": action,
-        "detail": detail,
-        "timestamp": datetime.utcnow().isoformat(),
-    })
+    """Append an activity entry for a project (bounded, written behind to agent_activities)."""
+    get_activity_log().record(project_id, agent, action, detail)
 
 
 def _has_llm_provider() -> bool:
@@ -848,14 +787,15 @@ def _build_term_synonym_map() -> Dict[str, Set[str]]:
 _TERM_SYNONYM_MAP: Dict[str, Set[str]] = _build_term_synonym_map()
 
 
-def _expand_term_variants(term: str, max_variants: int = 24) -> List[str]:
+@lru_cache(maxsize=4096)
+def _expand_term_variants(term: str, max_variants: int = 24) -> Tuple[str, ...]:
     normalized = _normalize_match_text(term)
     if not normalized:
-        return []
+        return ()
 
     tokens = [token for token in normalized.split(" ") if token]
     if not tokens:
-        return [normalized]
+        return (normalized,)
 
     variants: List[str] = [normalized]
     seen: Set[str] = {normalized}
@@ -871,9 +811,9 @@ def _expand_term_variants(term: str, max_variants: int = 24) -> List[str]:
             variants.append(variant)
             seen.add(variant)
             if len(variants) >= max_variants:
-                return variants
+                return tuple(variants)
 
-    return variants
+    return tuple(variants)
 
 
 def _extract_metric_keys_from_text(
@@ -1271,6 +1211,13 @@ def _coerce_json_value(value: Any) -> Any:
     return None
 
 
+# Synonym-expanded variants are scored at this fraction of the direct term
+_VARIANT_SCORE_FACTOR = 0.93
+_COLUMN_MATCH_NGRAM = 3
+_COLUMN_MATCH_INDEX_CACHE_SIZE = 128
+
+
+@lru_cache(maxsize=65536)
 def _score_term_to_column_base(term: str, column: str) -> float:
     term_norm = _normalize_match_text(term)
     col_norm = _normalize_match_text(column)
@@ -1319,12 +1266,187 @@ def _score_term_to_column(term: str, column: str) -> float:
         variant_score = _score_term_to_column_base(variant, column)
         if idx > 0:
             # Synonym-expanded variants are useful but slightly lower confidence than direct terms.
-            variant_score *= 0.93
+            variant_score *= _VARIANT_SCORE_FACTOR
         if variant_score > best_score:
             best_score = variant_score
     return max(0.0, min(1.0, best_score))
 
 
+def _char_ngrams(value: str, n: int = _COLUMN_MATCH_NGRAM) -> Set[str]:
+    return {value[i:i + n] for i in range(len(value) - n + 1)}
+
+
+class _ColumnMatchIndex:
+    """
+    Precomputed match data for one column list.
+
+    Narrows `_best_column_for_terms` to the columns that can reach a
+    containment or token-prefix score (prefix trie over column tokens plus a
+    character n-gram inverted index over compact names). Those score at least
+    0.76 * 0.93, while any other column shares no token with the terms and
+    can only reach 0.38 * SequenceMatcher ratio, so the rest are scored only
+    when there are no candidates at all.
+    """
+
+    def __init__(self, columns: List[str]):
+        self.columns = list(columns)
+        self.compact: List[str] = []
+        # Token trie: node -> (children, columns with a token through here, columns with a token ending here)
+        self._trie: Dict[str, Any] = {"children": {}, "through": set(), "ends": set()}
+        self._ngram_postings: Dict[str, Set[int]] = {}
+        self._ngram_counts: List[int] = []
+        self._short_columns: List[int] = []
+
+        for position, column in enumerate(self.columns):
+            normalized = _normalize_match_text(column)
+            compact = _compact_match_text(normalized)
+            self.compact.append(compact)
+            for token in _tokenize_match_text(normalized):
+                self._insert_token(token, position)
+            grams = _char_ngrams(compact)
+            self._ngram_counts.append(len(grams))
+            if not grams and compact:
+                self._short_columns.append(position)
+            for gram in grams:
+                self._ngram_postings.setdefault(gram, set()).add(position)
+
+    def _insert_token(self, token: str, position: int) -> None:
+        node = self._trie
+        for char in token:
+            node = node["children"].setdefault(char, {"children": {}, "through": set(), "ends": set()})
+            node["through"].add(position)
+        node["ends"].add(position)
+
+    def _prefix_candidates(self, token: str) -> Set[int]:
+        """Columns with a token that starts with `token` or is a prefix of it"""
+        found: Set[int] = set()
+        node = self._trie
+        for char in token:
+            node = node["children"].get(char)
+            if node is None:
+                return found
+            found |= node["ends"]
+        return found | node["through"]
+
+    def _containment_candidates(self, compact: str) -> Set[int]:
+        """Columns whose compact name contains, or is contained in, `compact`"""
+        grams = _char_ngrams(compact)
+        if not grams:
+            return {
+                position for position, col in enumerate(self.compact)
+                if col and (compact in col or col in compact)
+            }
+
+        hits: Dict[int, int] = {}
+        for gram in grams:
+            for position in self._ngram_postings.get(gram, ()):
+                hits[position] = hits.get(position, 0) + 1
+
+        found: Set[int] = set()
+        for position, shared in hits.items():
+            column = self.compact[position]
+            # term in column needs every term n-gram; column in term every column n-gram
+            if shared == len(grams) and compact in column:
+                found.add(position)
+            elif shared == self._ngram_counts[position] and column in compact:
+                found.add(position)
+        found.update(position for position in self._short_columns if self.compact[position] in compact)
+        return found
+
+    def candidates(self, terms: List[str]) -> Set[int]:
+        """Columns where some term variant has a containment or token-prefix match"""
+        found: Set[int] = set()
+        for term in terms:
+            for variant in _expand_term_variants(term):
+                compact = _compact_match_text(variant)
+                if not compact:
+                    continue
+                found |= self._containment_candidates(compact)
+                for token in _tokenize_match_text(variant):
+                    found |= self._prefix_candidates(token)
+        return found
+
+    def best(self, terms: List[str], blocked: Set[str]) -> Tuple[Optional[str], float]:
+        allowed = [
+            position for position, column in enumerate(self.columns)
+            if column not in blocked
+        ]
+        candidate_positions = self.candidates(terms)
+        shortlist = [position for position in allowed if position in candidate_positions]
+        if shortlist:
+            return self._best_of(terms, shortlist)
+        return self._best_by_sequence_similarity(terms, allowed)
+
+    def _best_of(self, terms: List[str], positions: List[int]) -> Tuple[Optional[str], float]:
+        best_column: Optional[str] = None
+        best_score = 0.0
+        for position in positions:
+            column = self.columns[position]
+            column_best = max((_score_term_to_column(term, column) for term in terms), default=0.0)
+            if column_best > best_score:
+                best_score = column_best
+                best_column = column
+        return best_column, best_score
+
+    def _best_by_sequence_similarity(self, terms: List[str], positions: List[int]) -> Tuple[Optional[str], float]:
+        """
+        No column shares a token or substring with any term, so every score is
+        0.38 * ratio. Visit columns by the length bound on ratio and stop once
+        no remaining column can beat (or tie earlier than) the best so far.
+        """
+        lengths = [
+            (len(_compact_match_text(variant)), 1.0 if idx == 0 else _VARIANT_SCORE_FACTOR)
+            for term in terms
+            for idx, variant in enumerate(_expand_term_variants(term))
+        ]
+        lengths = [(length, factor) for length, factor in lengths if length]
+
+        bounded: List[Tuple[float, int]] = []
+        for position in positions:
+            col_length = len(self.compact[position])
+            if not col_length:
+                continue
+            bound = max(
+                (0.38 * factor * 2.0 * min(length, col_length) / (length + col_length) for length, factor in lengths),
+                default=0.0,
+            )
+            bounded.append((bound + 1e-9, position))
+        bounded.sort(key=lambda item: (-item[0], item[1]))
+
+        best_position: Optional[int] = None
+        best_score = 0.0
+        for bound, position in bounded:
+            if bound < best_score:
+                break
+            column = self.columns[position]
+            column_best = max((_score_term_to_column(term, column) for term in terms), default=0.0)
+            if column_best > best_score or (
+                column_best == best_score and best_position is not None and column_best > 0 and position < best_position
+            ):
+                best_score = column_best
+                best_position = position
+        if best_position is None:
+            return None, 0.0
+        return self.columns[best_position], best_score
+
+
+_column_match_indexes: "OrderedDict[Tuple[str, ...], _ColumnMatchIndex]" = OrderedDict()
+
+
+def _get_column_match_index(columns: List[str]) -> _ColumnMatchIndex:
+    """Match index for a column list, built once and kept in a small LRU"""
+    key = tuple(columns)
+    index = _column_match_indexes.get(key)
+    if index is not None:
+        _column_match_indexes.move_to_end(key)
+        return index
+    index = _ColumnMatchIndex(list(key))
+    _column_match_indexes[key] = index
+    while len(_column_match_indexes) > _COLUMN_MATCH_INDEX_CACHE_SIZE:
+        _column_match_indexes.popitem(last=False)
+    return index
+
+
 def _best_column_for_terms(
     terms: List[str],
     available_columns: List[str],
@@ -1332,22 +1454,9 @@ def _best_column_for_terms(
 ) -> Tuple[Optional[str], float]:
     blocked = blocked_columns or set()
     normalized_terms = [term for term in _dedupe_strings(terms) if term]
-    best_column: Optional[str] = None
-    best_score = 0.0
-
-    for column in available_columns:
-        if column in blocked:
-            continue
-        column_best = 0.0
-        for term in normalized_terms:
-            candidate_score = _score_term_to_column(term, column)
-            if candidate_score > column_best:
-                column_best = candidate_score
-        if column_best > best_score:
-            best_score = column_best
-            best_column = column
-
-    return best_column, best_score
+    if not normalized_terms or not available_columns:
+        return None, 0.0
+    return _get_column_match_index(available_columns).best(normalized_terms, blocked)
 
 
 _MIN_METRIC_GROUNDING_SCORE = 0.68
@@ -1540,58 +1649,25 @@ def _register_dataset_column_metric(
 async def _load_project_available_columns(project_id: str) -> List[str]:
     """
     Load available column names from linked project datasets.
-    Pulls from schema first, then preview/transformed rows as fallback.
+    Pulls from schema first, then the columnar store footer, then
+    preview/transformed rows as fallback.
     """
     columns: List[str] = []
+    dataset_store = get_dataset_store()
 
-    async with get_db_context() as session:
-        column_result = await session.execute(
-            sa_text(
-                "SELECT column_name FROM information_schema.columns "
-                "WHERE table_name = 'datasets'"
-            )
-        )
-        dataset_columns = {row[0] for row in column_result.fetchall()}
+    for record in await load_project_datasets(project_id, newest_first=True):
+        if record.schema:
+            columns.extend(str(key) for key in record.schema.keys() if str(key).strip())
 
-        selectable = []
-        for col in ["schema", "preview", "ingestion_metadata", "metadata"]:
-            if col in dataset_columns:
-                selectable.append(f"d.{col} AS {col}")
+        footer_columns = await asyncio.to_thread(dataset_store.columns, record.id)
+        columns.extend(str(col) for col in footer_columns if str(col).strip())
 
-        if not selectable:
-            return []
-
-        result = await session.execute(
-            sa_text(
-                f"SELECT {', '.join(selectable)} "
-                "FROM datasets d "
-                "INNER JOIN project_datasets pd ON pd.dataset_id = d.id "
-                "WHERE pd.project_id = :project_id "
-                "ORDER BY pd.added_at DESC"
-            ),
-            {"project_id": project_id},
-        )
-        rows = result.fetchall()
-        keys = list(result.keys())
-
-    for row in rows:
-        row_dict = dict(zip(keys, row))
-
-        schema_obj = _coerce_json_value(row_dict.get("schema"))
-        if isinstance(schema_obj, dict):
-            columns.extend(str(key) for key in schema_obj.keys() if str(key).strip())
-
-        preview_rows = _coerce_json_value(row_dict.get("preview"))
-        if isinstance(preview_rows, list):
-            for item in preview_rows[:20]:
+        if isinstance(record.preview, list):
+            for item in record.preview[:20]:
                 if isinstance(item, dict):
                     columns.extend(str(key) for key in item.keys() if str(key).strip())
 
-        for meta_key in ["ingestion_metadata", "metadata"]:
-            metadata_obj = _coerce_json_value(row_dict.get(meta_key))
-            if not isinstance(metadata_obj, dict):
-                continue
-            transformed_rows = metadata_obj.get("transformedData")
+        for transformed_rows in record.transformed_payloads():
             if isinstance(transformed_rows, list):
                 for item in transformed_rows[:20]:
                     if isinstance(item, dict):
@@ -3637,33 +3713,21 @@ async def _persist_execution_summary(
 ) -> None:
     """Persist execution summary into journey_progress and analysis_results when available."""
     async with get_db_context() as session:
-        result = await session.execute(
-            sa_text("SELECT journey_progress FROM projects WHERE id = :id"),
-            {"id": project_id},
-        )
-        row = result.first()
-        journey_progress = (row[0] if row else None) or {}
-        journey_progress["executionResults"] = results
-        journey_progress["analysisResults"] = results
-        journey_progress["executionId"] = execution_id
-        journey_progress["executionCompletedAt"] = datetime.utcnow().isoformat()
-        journey_progress["currentStep"] = "results"
-
-        await session.execute(
-            sa_text(
-                "UPDATE projects SET journey_progress = CAST(:jp AS jsonb), "
-                "updated_at = NOW() WHERE id = :id"
-            ),
-            {"jp": json.dumps(journey_progress), "id": project_id},
+        # Patch only the execution keys; results are kept once, under
+        # analysisResults (executionResults is the legacy duplicate)
+        await patch_journey_progress(
+            session,
+            project_id,
+            set_values={
+                "analysisResults": results,
+                "executionId": execution_id,
+                "executionCompletedAt": datetime.utcnow().isoformat(),
+                "currentStep": "results",
+            },
+            remove=["executionResults"],
         )
 
-        column_result = await session.execute(
-            sa_text(
-                "SELECT column_name FROM information_schema.columns "
-                "WHERE table_name = 'analysis_results'"
-            )
-        )
-        analysis_result_columns = {row[0] for row in column_result.fetchall()}
+        analysis_result_columns = await get_schema_cache().get_columns("analysis_results", session)
         uses_legacy_result_columns = {
             "results",
             "config",
@@ -3957,19 +4021,7 @@ async def generate_data_requirements(
 
         # Persist to journey_progress.requirementsDocument with lock metadata
         async with get_db_context() as session:
-            await session.execute(
-                sa_text(
-                    "UPDATE projects "
-                    "SET journey_progress = COALESCE(journey_progress, CAST('{}' AS jsonb)) "
-                    "   || CAST(:merge_payload AS jsonb), "
-                    "    updated_at = NOW() "
-                    "WHERE id = :id"
-                ),
-                {
-                    "id": project_id,
-                    "merge_payload": json.dumps(merge_payload),
-                },
-            )
+            await patch_journey_progress(session, project_id, set_values=merge_payload)
             await session.commit()
 
         return ORJSONResponse(content={
@@ -4645,18 +4697,42 @@ async def get_conversation(
 @router.get("/agents/activities/{project_id}")
 async def get_agent_activities(
     project_id: str,
+    limit: int = Query(
+        ACTIVITY_LOG_DEFAULT_PAGE_SIZE,
+        ge=1,
+        le=ACTIVITY_LOG_MAX_PAGE_SIZE,
+        description="Page size; only the newest `limit` entries are returned without a cursor",
+    ),
+    before: Optional[str] = Query(None, description="nextCursor of the previous page"),
+    since: Optional[datetime] = Query(None),
+    until: Optional[datetime] = Query(None),
     current_user: AuthUser = Depends(get_current_user),
 ):
-    """Return agent activity log for a project."""
+    """
+    Return one page of the agent activity log for a project.
+
+    Without a cursor this is the newest `limit` entries (default 100, at
+    most 500), oldest first. The full history is read by passing
+    `nextCursor` back as `before` while `hasMore` is true.
+    """
     try:
         await _check_project_access(project_id, current_user)
-        activities = _agent_activities.get(project_id, [])
+        try:
+            page = await get_activity_log().query(
+                project_id, limit=limit, before=before, since=since, until=until
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid activity cursor")
+        activities = page["activities"]
 
         return ORJSONResponse(content={
             "success": True,
             "projectId": project_id,
             "activities": activities,
             "count": len(activities),
+            "limit": limit,
+            "nextCursor": page["nextCursor"],
+            "hasMore": page["hasMore"],
         })
 
     except HTTPException:
@@ -4763,6 +4839,7 @@ async def get_analyze_data_results(
 @router.get("/workflow/transparency/{project_id}")
 async def get_workflow_transparency(
     project_id: str,
+    activity_limit: int = Query(100, ge=1, le=500),
     current_user: AuthUser = Depends(get_current_user),
 ):
     """Return workflow decision audit trail for a project."""
@@ -4783,7 +4860,8 @@ async def get_workflow_transparency(
                     "reasoning": step_data.get("reasoning", ""),
                 })
 
-        activities = _agent_activities.get(project_id, [])
+        # Most recent activities; older pages come from /agents/activities
+        activities = (await get_activity_log().query(project_id, limit=activity_limit))["activities"]
 
         return ORJSONResponse(content={
             "success": True,
@@ -5145,13 +5223,8 @@ async def get_evidence_chain(
         try:
             from ..services.rag_evidence_chain import get_evidence_chain_service
             service = get_evidence_chain_service()
-            chain = service.get_chain_for_project(project_id)
-            chain_data = [
-                link.dict() if hasattr(link, "dict") else link
-                for link in chain
-                if (hasattr(link, "source_id") and link.source_id == question_id)
-                or (isinstance(link, dict) and link.get("source_id") == question_id)
-            ]
+            chain = await service.trace_chain(project_id, "question", question_id)
+            chain_data = [link.dict() for link in chain]
         except Exception as svc_err:
             logger.warning(f"Evidence chain service unavailable: {svc_err}")
 
@@ -5175,7 +5248,9 @@ async def get_evidence_chain(
                         row_dict[k] = v.isoformat()
                 db_links.append(row_dict)
 
-        all_links = chain_data + db_links
+        # The service persists its links to evidence_links as well
+        chain_ids = {link.get("id") for link in chain_data}
+        all_links = chain_data + [link for link in db_links if link.get("id") not in chain_ids]
 
         return ORJSONResponse(content={
             "success": True,
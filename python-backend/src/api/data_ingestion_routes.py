@@ -8,22 +8,36 @@ API endpoints for ingesting data from external sources:
 The frontend connector UIs (DatabaseConnectorTab, APIConnectorTab) call
 POST /api/data-ingestion/ingest which the Vite proxy rewrites to
 POST /data-ingestion/ingest on this router.
+
+Each handler is an async generator yielding row batches of at most
+DATASET_INGEST_CHUNK_ROWS (server-side cursors for databases), which are
+streamed into the columnar dataset store without a row cap. Previews pass
+`limit` so the handlers stop reading after the preview rows.
 """
 
+import asyncio
 import json
 import logging
 import uuid
-from typing import Any, Dict, List, Optional
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, ConfigDict, Field
+from sqlalchemy import text as sa_text
+
+from ..auth.middleware import get_current_user, User as AuthUser
+from ..constants import DATASET_INGEST_CHUNK_ROWS
+from ..db import get_db_context
+from ..services.dataset_store import get_dataset_store, COLUMNAR_POINTER_KEY, COLUMNAR_FORMAT
+from ..services.streaming_ingestion import StreamingIngestor, StreamingIngestionResult
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["data-ingestion"])
 
-# Row cap to prevent huge data imports
-DATASET_ROW_CAP = 10_000
+# Rows returned to the connector UI as a preview
+CONNECTOR_PREVIEW_ROWS = 20
 
 # DML keywords to reject for SQL safety (read-only enforcement)
 BLOCKED_SQL_KEYWORDS = {"INSERT", "UPDATE", "DELETE", "DROP", "ALTER", "TRUNCATE", "CREATE", "GRANT", "REVOKE"}
@@ -35,6 +49,10 @@ class IngestRequest(BaseModel):
     projectId: str = Field(..., description="Project to associate the dataset with")
     config: Dict[str, Any] = Field(..., description="Source-specific connection config")
     label: Optional[str] = Field(None, description="Display label for the dataset")
+    persist: bool = Field(
+        False,
+        description="Register the dataset on the project; connection tests and previews leave it unset",
+    )
 
 
 class IngestResponse(BaseModel):
@@ -79,17 +97,25 @@ def _infer_column_types(rows: List[Dict]) -> Dict[str, str]:
     return schema
 
 
-async def _ingest_postgresql(config: Dict[str, Any]) -> List[Dict]:
-    """Ingest data from PostgreSQL using asyncpg"""
+def _chunked(rows: List[Dict], limit: Optional[int] = None) -> List[List[Dict]]:
+    """Split an in-memory response into ingestion-sized batches (first `limit` rows only)"""
+    if limit:
+        rows = rows[:limit]
+    return [rows[i:i + DATASET_INGEST_CHUNK_ROWS] for i in range(0, len(rows), DATASET_INGEST_CHUNK_ROWS)]
+
+
+def _batch_size(remaining: Optional[int]) -> int:
+    """Rows to fetch next: a full chunk, or what is left of a limit"""
+    return DATASET_INGEST_CHUNK_ROWS if remaining is None else min(remaining, DATASET_INGEST_CHUNK_ROWS)
+
+
+async def _ingest_postgresql(config: Dict[str, Any], limit: Optional[int] = None) -> AsyncIterator[List[Dict]]:
+    """Ingest data from PostgreSQL using an asyncpg server-side cursor"""
     import asyncpg
 
     query = config.get("query", "SELECT 1")
     _validate_sql_readonly(query)
 
-    # Add LIMIT if not present
-    if "LIMIT" not in query.upper():
-        query = f"{query} LIMIT {DATASET_ROW_CAP}"
-
     conn = await asyncpg.connect(
         host=config.get("host", "localhost"),
         port=int(config.get("port", 5432)),
@@ -100,22 +126,31 @@ async def _ingest_postgresql(config: Dict[str, Any]) -> List[Dict]:
         timeout=30,
     )
     try:
-        records = await conn.fetch(query)
-        return [dict(r) for r in records[:DATASET_ROW_CAP]]
+        # Cursors require a transaction; read-only doubles as a safety net
+        async with conn.transaction(readonly=True):
+            batch: List[Dict] = []
+            read = 0
+            async for record in conn.cursor(query, prefetch=_batch_size(limit)):
+                batch.append(dict(record))
+                read += 1
+                if len(batch) >= DATASET_INGEST_CHUNK_ROWS or read == limit:
+                    yield batch
+                    batch = []
+                if read == limit:
+                    break
+            if batch:
+                yield batch
     finally:
         await conn.close()
 
 
-async def _ingest_mysql(config: Dict[str, Any]) -> List[Dict]:
-    """Ingest data from MySQL using aiomysql"""
+async def _ingest_mysql(config: Dict[str, Any], limit: Optional[int] = None) -> AsyncIterator[List[Dict]]:
+    """Ingest data from MySQL using an unbuffered (server-side) aiomysql cursor"""
     import aiomysql
 
     query = config.get("query", "SELECT 1")
     _validate_sql_readonly(query)
 
-    if "LIMIT" not in query.upper():
-        query = f"{query} LIMIT {DATASET_ROW_CAP}"
-
     conn = await aiomysql.connect(
         host=config.get("host", "localhost"),
         port=int(config.get("port", 3306)),
@@ -125,23 +160,32 @@ async def _ingest_mysql(config: Dict[str, Any]) -> List[Dict]:
         connect_timeout=30,
     )
     try:
-        async with conn.cursor(aiomysql.DictCursor) as cur:
-            await cur.execute(query)
-            rows = await cur.fetchall()
-            return list(rows[:DATASET_ROW_CAP])
+        cur = await conn.cursor(aiomysql.SSDictCursor)
+        await cur.execute(query)
+        remaining = limit
+        while remaining is None or remaining > 0:
+            rows = await cur.fetchmany(_batch_size(remaining))
+            if not rows:
+                break
+            yield list(rows)
+            if remaining is not None:
+                remaining -= len(rows)
     finally:
+        # Closing the connection (not the cursor) drops an unread
+        # unbuffered result instead of draining it
         conn.close()
 
 
-async def _ingest_mongodb(config: Dict[str, Any]) -> List[Dict]:
-    """Ingest data from MongoDB using motor"""
+async def _ingest_mongodb(config: Dict[str, Any], limit: Optional[int] = None) -> AsyncIterator[List[Dict]]:
+    """Ingest data from MongoDB using a batched motor cursor"""
     import motor.motor_asyncio
 
     connection_string = config.get("connectionString", "mongodb://localhost:27017")
     database_name = config.get("database", "")
     collection_name = config.get("collection", "")
     query_filter = config.get("queryFilter", "{}")
-    limit = min(int(config.get("limit", DATASET_ROW_CAP)), DATASET_ROW_CAP)
+    config_limit = int(config.get("limit") or 0)  # 0 = no limit
+    limit = min(filter(None, (config_limit, limit or 0)), default=0)
 
     if not database_name or not collection_name:
         raise ValueError("Database name and collection name are required for MongoDB")
@@ -156,17 +200,23 @@ async def _ingest_mongodb(config: Dict[str, Any]) -> List[Dict]:
     try:
         db = client[database_name]
         collection = db[collection_name]
-        cursor = collection.find(filter_dict).limit(limit)
-        rows = []
+        cursor = collection.find(filter_dict).batch_size(_batch_size(limit or None))
+        if limit:
+            cursor = cursor.limit(limit)
+        batch: List[Dict] = []
         async for doc in cursor:
             doc["_id"] = str(doc.get("_id", ""))
-            rows.append(doc)
-        return rows
+            batch.append(doc)
+            if len(batch) >= DATASET_INGEST_CHUNK_ROWS:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
     finally:
         client.close()
 
 
-async def _ingest_rest_api(config: Dict[str, Any]) -> List[Dict]:
+async def _ingest_rest_api(config: Dict[str, Any], limit: Optional[int] = None) -> AsyncIterator[List[Dict]]:
     """Ingest data from a REST API using httpx"""
     import httpx
 
@@ -204,19 +254,24 @@ async def _ingest_rest_api(config: Dict[str, Any]) -> List[Dict]:
 
     # Normalize to list of dicts
     if isinstance(data, list):
-        return data[:DATASET_ROW_CAP]
+        rows = data
     elif isinstance(data, dict):
         # Try common response wrappers
         for key in ("data", "results", "items", "records", "rows"):
             if key in data and isinstance(data[key], list):
-                return data[key][:DATASET_ROW_CAP]
-        # Single object — wrap in list
-        return [data]
+                rows = data[key]
+                break
+        else:
+            # Single object — wrap in list
+            rows = [data]
     else:
         raise ValueError(f"Unexpected response type: {type(data).__name__}")
 
+    for batch in _chunked(rows, limit):
+        yield batch
 
-async def _ingest_graphql(config: Dict[str, Any]) -> List[Dict]:
+
+async def _ingest_graphql(config: Dict[str, Any], limit: Optional[int] = None) -> AsyncIterator[List[Dict]]:
     """Ingest data from a GraphQL endpoint using httpx"""
     import httpx
 
@@ -255,17 +310,26 @@ async def _ingest_graphql(config: Dict[str, Any]) -> List[Dict]:
     data = result.get("data", {})
 
     # Find the first list in the data response
+    rows = _first_list(data)
+    if rows is None:
+        # No list found — return single dict
+        rows = [data] if data else []
+
+    for batch in _chunked(rows, limit):
+        yield batch
+
+
+def _first_list(data: Dict[str, Any]) -> Optional[List[Dict]]:
+    """Find the first list in a GraphQL data payload (looking one level deep)"""
     for key, value in data.items():
         if isinstance(value, list):
-            return value[:DATASET_ROW_CAP]
+            return value
         elif isinstance(value, dict):
             # Nested query — look one level deeper
             for subkey, subvalue in value.items():
                 if isinstance(subvalue, list):
-                    return subvalue[:DATASET_ROW_CAP]
-
-    # No list found — return single dict
-    return [data] if data else []
+                    return subvalue
+    return None
 
 
 # Dispatch table
@@ -278,14 +342,168 @@ _INGEST_HANDLERS = {
 }
 
 
+async def _stream_into_store(
+    batches: AsyncIterator[List[Dict]],
+    dataset_id: str,
+) -> StreamingIngestionResult:
+    """Drain a handler's batches into the columnar store (writes run off the event loop)"""
+    ingestor = StreamingIngestor(dataset_id, preview_rows=CONNECTOR_PREVIEW_ROWS)
+    try:
+        async for batch in batches:
+            await asyncio.to_thread(ingestor.add_rows, batch)
+        return await asyncio.to_thread(ingestor.finish)
+    except BaseException:
+        ingestor.abort()
+        raise
+    finally:
+        await batches.aclose()
+
+
+async def _read_preview(batches: AsyncIterator[List[Dict]]) -> List[Dict]:
+    """First CONNECTOR_PREVIEW_ROWS rows of a handler's batches; the rest is never read"""
+    rows: List[Dict] = []
+    try:
+        async for batch in batches:
+            rows.extend(batch[:CONNECTOR_PREVIEW_ROWS - len(rows)])
+            if len(rows) >= CONNECTOR_PREVIEW_ROWS:
+                break
+    finally:
+        await batches.aclose()
+    return rows
+
+
+async def _check_project_access(session, project_id: str, user: AuthUser) -> str:
+    """Verify the caller owns the project (or is admin); returns the owner id. Raises 404 / 403."""
+    result = await session.execute(
+        sa_text("SELECT user_id FROM projects WHERE id = :pid"),
+        {"pid": project_id},
+    )
+    row = result.first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if row[0] != user.id and not user.is_admin:
+        raise HTTPException(status_code=403, detail="Not authorized to access this project")
+    return row[0]
+
+
+async def _persist_connector_dataset(
+    request: IngestRequest,
+    result: StreamingIngestionResult,
+    schema: Dict[str, str],
+    preview: List[Dict],
+    current_user: AuthUser,
+) -> None:
+    """Register an ingested dataset in the datasets / project_datasets tables"""
+    now = datetime.utcnow()
+    label = request.label or f"{request.sourceType} import"
+
+    async with get_db_context() as session:
+        owner_id = await _check_project_access(session, request.projectId, current_user)
+
+        await session.execute(
+            sa_text("""
+                INSERT INTO datasets (
+                    id, user_id, source_type, original_file_name,
+                    mime_type, file_size, storage_uri,
+                    schema, record_count, preview,
+                    ingestion_metadata, status, created_at, updated_at
+                ) VALUES (
+                    :id, :user_id, :source_type, :original_file_name,
+                    :mime_type, :file_size, :storage_uri,
+                    :schema, :record_count, :preview,
+                    :ingestion_metadata, 'ready', :now, :now
+                )
+            """),
+            {
+                "id": result.dataset_id,
+                "user_id": owner_id,
+                "source_type": request.sourceType,
+                "original_file_name": label,
+                "mime_type": f"application/vnd.apache.{COLUMNAR_FORMAT}",
+                "file_size": result.pointer.size_bytes,
+                "storage_uri": result.pointer.path,
+                "schema": json.dumps(schema),
+                "record_count": result.row_count,
+                "preview": json.dumps(preview, default=str),
+                "ingestion_metadata": json.dumps({
+                    "ingestedAt": now.isoformat(),
+                    "sourceType": request.sourceType,
+                    "columnCount": len(result.columns),
+                    "headers": result.columns,
+                    COLUMNAR_POINTER_KEY: result.pointer.to_metadata(),
+                    **result.stats_metadata(),
+                }),
+                "now": now,
+            },
+        )
+        await session.execute(
+            sa_text("""
+                INSERT INTO project_datasets (id, project_id, dataset_id, role, alias, added_at)
+                VALUES (:id, :project_id, :dataset_id, 'primary', :alias, :added_at)
+            """),
+            {
+                "id": str(uuid.uuid4()),
+                "project_id": request.projectId,
+                "dataset_id": result.dataset_id,
+                "alias": request.label,
+                "added_at": now,
+            },
+        )
+        await session.commit()
+
+
+async def _preview_data_source(request: IngestRequest, handler) -> IngestResponse:
+    """Read the first rows of a source for connection tests and previews; nothing is stored"""
+    try:
+        logger.info(f"Previewing {request.sourceType} for project {request.projectId}")
+        preview = await _read_preview(handler(request.config, limit=CONNECTOR_PREVIEW_ROWS))
+        if not preview:
+            return IngestResponse(
+                success=True,
+                message="Query returned no data",
+                recordCount=0,
+                schema={},
+                preview=[],
+            )
+
+        schema = _infer_column_types(preview)
+        return IngestResponse(
+            success=True,
+            message=f"Successfully previewed {len(preview)} records from {request.sourceType}",
+            recordCount=len(preview),
+            schema=schema,
+            preview=preview,
+        )
+
+    except ValueError as e:
+        logger.warning(f"Validation error during preview: {e}")
+        return IngestResponse(success=False, message=str(e), error=str(e))
+    except Exception as e:
+        logger.error(f"Preview failed for {request.sourceType}: {e}", exc_info=True)
+        return IngestResponse(
+            success=False,
+            message=f"Failed to connect to {request.sourceType}: {str(e)}",
+            error=str(e),
+        )
+
+
 @router.post("/data-ingestion/ingest", response_model=IngestResponse)
-async def ingest_data_source(request: IngestRequest):
+async def ingest_data_source(
+    request: IngestRequest,
+    current_user: AuthUser = Depends(get_current_user),
+):
     """
     Ingest data from an external source (database, API, etc.)
 
     Called by frontend DatabaseConnectorTab and APIConnectorTab via
     apiClient.ingestDataSource() → POST /api/data-ingestion/ingest
     (Vite proxy strips /api prefix)
+
+    With `persist` set (the Import buttons) rows are streamed into the
+    columnar dataset store in chunks and the dataset is linked to the
+    project, so the full result set is available for analysis. Connection
+    tests and previews stop reading after CONNECTOR_PREVIEW_ROWS rows and
+    write nothing; their record count is the number of preview rows.
     """
     handler = _INGEST_HANDLERS.get(request.sourceType)
     if not handler:
@@ -295,11 +513,20 @@ async def ingest_data_source(request: IngestRequest):
             detail=f"Unsupported source type: {request.sourceType}. Supported: {supported}"
         )
 
+    async with get_db_context() as session:
+        await _check_project_access(session, request.projectId, current_user)
+
+    if not request.persist:
+        return await _preview_data_source(request, handler)
+
+    dataset_id = str(uuid.uuid4())
+    dataset_store = get_dataset_store()
     try:
         logger.info(f"Ingesting data from {request.sourceType} for project {request.projectId}")
-        rows = await handler(request.config)
+        result = await _stream_into_store(handler(request.config), dataset_id)
 
-        if not rows:
+        if result.row_count == 0:
+            dataset_store.delete(dataset_id)
             return IngestResponse(
                 success=True,
                 message="Query returned no data",
@@ -309,25 +536,30 @@ async def ingest_data_source(request: IngestRequest):
             )
 
         # Infer schema and prepare response
-        schema = _infer_column_types(rows)
-        dataset_id = str(uuid.uuid4())
-        preview = rows[:20]  # First 20 rows for preview
+        schema = _infer_column_types(result.sample_rows)
+        preview = result.preview
+        await _persist_connector_dataset(request, result, schema, preview, current_user)
 
-        logger.info(f"Ingested {len(rows)} rows from {request.sourceType}, schema: {list(schema.keys())}")
+        logger.info(f"Ingested {result.row_count} rows from {request.sourceType}, schema: {list(schema.keys())}")
 
         return IngestResponse(
             success=True,
-            message=f"Successfully ingested {len(rows)} records from {request.sourceType}",
+            message=f"Successfully ingested {result.row_count} records from {request.sourceType}",
             datasetId=dataset_id,
-            recordCount=len(rows),
+            recordCount=result.row_count,
             schema=schema,
             preview=preview,
         )
 
+    except HTTPException:
+        dataset_store.delete(dataset_id)
+        raise
     except ValueError as e:
+        dataset_store.delete(dataset_id)
         logger.warning(f"Validation error during ingestion: {e}")
         return IngestResponse(success=False, message=str(e), error=str(e))
     except Exception as e:
+        dataset_store.delete(dataset_id)
         logger.error(f"Ingestion failed for {request.sourceType}: {e}", exc_info=True)
         return IngestResponse(
             success=False,
@@ -351,7 +583,13 @@ async def test_connection(request: IngestRequest):
         elif request.sourceType == "mongodb":
             test_config["limit"] = 1
 
-        await handler(test_config)
+        batches = handler(test_config, limit=1)
+        try:
+            await batches.__anext__()
+        except StopAsyncIteration:
+            pass
+        finally:
+            await batches.aclose()
         return {"success": True, "message": f"Successfully connected to {request.sourceType}"}
     except Exception as e:
         return {"success": False, "error": str(e)}
@@ -4,7 +4,7 @@ Knowledge Base API Routes
 Endpoints for knowledge graph, analysis patterns, and template feedback.
 """
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, status
 from pydantic import BaseModel, Field
 from typing import List, Optional
 from ..services.knowledge_service import get_knowledge_service
@@ -81,19 +81,31 @@ async def search_knowledge(request: SearchRequest):
 
 
 @router.get("/nodes/{node_id}/related", response_model=dict)
-async def get_related_nodes(node_id: str, max_depth: int = 2):
+async def get_related_nodes(
+    node_id: str,
+    max_depth: int = 2,
+    relationship: Optional[List[str]] = Query(None),
+    min_weight: Optional[float] = None,
+):
     """
     Get nodes related to a given node via the knowledge graph
 
     Args:
         node_id: ID of the starting node
         max_depth: Maximum depth to traverse the graph
+        relationship: Only follow these relationship types (repeatable)
+        min_weight: Only follow edges with at least this weight
 
     Returns:
         Graph of related nodes with relationship information
     """
     try:
-        nodes = await knowledge_service.get_related_nodes(node_id, max_depth)
+        nodes = await knowledge_service.get_related_nodes(
+            node_id,
+            max_depth,
+            relationships=relationship,
+            min_weight=min_weight,
+        )
 
         return {
             "success": True,
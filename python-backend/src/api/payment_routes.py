@@ -41,6 +41,7 @@ from sqlalchemy import text as sa_text
 
 from ..db import get_db_context
 from ..auth.middleware import get_current_user, require_admin, User as AuthUser
+from ..services.journey_state import patch_journey_progress, update_journey_key
 
 logger = logging.getLogger(__name__)
 
@@ -280,32 +281,17 @@ async def _upsert_project_payment(project_id: str, payment_patch: Dict[str, Any]
     Merge payment fields into journey_progress.payment and persist.
     """
     async with get_db_context() as session:
-        result = await session.execute(
-            sa_text("SELECT journey_progress FROM projects WHERE id = :id"),
-            {"id": project_id},
+        patched = await patch_journey_progress(
+            session,
+            project_id,
+            merge={"payment": payment_patch},
+            returning=["payment"],
         )
-        row = result.first()
-        if row is None:
+        if patched is None:
             raise HTTPException(status_code=404, detail="Project not found")
-
-        journey_progress = _coerce_json_dict(row[0])
-        payment_info = journey_progress.get("payment")
-        if not isinstance(payment_info, dict):
-            payment_info = {}
-
-        payment_info.update(payment_patch)
-        journey_progress["payment"] = payment_info
-
-        await session.execute(
-            sa_text(
-                "UPDATE projects SET journey_progress = CAST(:jp AS jsonb), "
-                "updated_at = NOW() WHERE id = :id"
-            ),
-            {"jp": json.dumps(journey_progress), "id": project_id},
-        )
         await session.commit()
 
-        return payment_info
+        return _coerce_json_dict(patched.values["payment"])
 
 
 async def _apply_webhook_payment_update(
@@ -317,21 +303,14 @@ async def _apply_webhook_payment_update(
     """
     Apply webhook payment update with idempotency guard based on event ID.
     Returns True when persisted, False when skipped (duplicate/missing project).
+
+    Only journey_progress.payment is read and written, and the write is
+    conditional on the journey version, so a retried webhook racing the
+    original delivery cannot apply the same event twice.
     """
-    async with get_db_context() as session:
-        result = await session.execute(
-            sa_text("SELECT journey_progress FROM projects WHERE id = :id"),
-            {"id": project_id},
-        )
-        row = result.first()
-        if row is None:
-            logger.warning(f"Webhook payment update skipped: project not found ({project_id})")
-            return False
 
-        journey_progress = _coerce_json_dict(row[0])
-        payment_info = journey_progress.get("payment")
-        if not isinstance(payment_info, dict):
-            payment_info = {}
+    def _apply(current: Any) -> Optional[Dict[str, Any]]:
+        payment_info = _coerce_json_dict(current)
 
         processed_ids = payment_info.get("processedEventIds")
         if not isinstance(processed_ids, list):
@@ -339,7 +318,7 @@ async def _apply_webhook_payment_update(
 
         if event_id and event_id in processed_ids:
             logger.info(f"Webhook event {event_id} already processed for project {project_id}")
-            return False
+            return None
 
         if event_id:
             processed_ids.append(event_id)
@@ -361,15 +340,15 @@ async def _apply_webhook_payment_update(
         )
 
         payment_info.update(payment_patch)
-        journey_progress["payment"] = payment_info
+        return payment_info
 
-        await session.execute(
-            sa_text(
-                "UPDATE projects SET journey_progress = CAST(:jp AS jsonb), "
-                "updated_at = NOW() WHERE id = :id"
-            ),
-            {"jp": json.dumps(journey_progress), "id": project_id},
-        )
+    async with get_db_context() as session:
+        updated = await update_journey_key(session, project_id, "payment", _apply)
+        if updated is None:
+            logger.warning(f"Webhook payment update skipped: project not found ({project_id})")
+            return False
+        if not updated.applied:
+            return False
         await session.commit()
 
         return True
@@ -23,6 +23,11 @@ from sqlalchemy import text as sa_text
 
 from ..db import get_db_context
 from ..auth.middleware import get_current_user, User as AuthUser
+from ..services.journey_state import (
+    JourneyVersionConflict,
+    patch_journey_progress,
+    update_journey_key,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -485,21 +490,14 @@ async def update_progress(
 ):
     """
     Atomic merge into journey_progress using PostgreSQL || operator.
-    Existing keys not in the payload are preserved.
+    Existing keys not in the payload are preserved; the merge bumps
+    journey_progress_version like every other journey write.
     """
     try:
         async with get_db_context() as session:
             await _check_ownership(session, project_id, current_user)
 
-            await session.execute(
-                sa_text(
-                    "UPDATE projects "
-                    "SET journey_progress = COALESCE(journey_progress, CAST('{}' AS jsonb)) || CAST(:new_progress AS jsonb), "
-                    "    updated_at = NOW() "
-                    "WHERE id = :id"
-                ),
-                {"id": project_id, "new_progress": json.dumps(progress)},
-            )
+            await patch_journey_progress(session, project_id, set_values=progress)
             await session.commit()
 
             # Return the merged journey_progress
@@ -644,8 +642,7 @@ async def create_checkpoint(
     """Create a user-visible checkpoint inside journey_progress."""
     try:
         async with get_db_context() as session:
-            project = await _check_ownership(session, project_id, current_user)
-            jp = project.get("journey_progress") or {}
+            await _check_ownership(session, project_id, current_user)
             checkpoint = {
                 "id": payload.get("id") or str(uuid.uuid4()),
                 "projectId": project_id,
@@ -660,15 +657,8 @@ async def create_checkpoint(
                 "userVisible": payload.get("userVisible", True),
                 "timestamp": datetime.utcnow().isoformat(),
             }
-            checkpoints = jp.get("checkpoints", [])
-            checkpoints.append(checkpoint)
-            jp["checkpoints"] = checkpoints
-            await session.execute(
-                sa_text(
-                    "UPDATE projects SET journey_progress = CAST(:jp AS jsonb), "
-                    "updated_at = NOW() WHERE id = :id"
-                ),
-                {"jp": json.dumps(jp), "id": project_id},
+            await patch_journey_progress(
+                session, project_id, append={"checkpoints": [checkpoint]}
             )
             await session.commit()
 
@@ -691,36 +681,37 @@ async def submit_checkpoint_feedback(
     """Record approval/rejection feedback for a checkpoint."""
     try:
         async with get_db_context() as session:
-            project = await _check_ownership(session, project_id, current_user)
-            jp = project.get("journey_progress") or {}
-            checkpoints = jp.get("checkpoints", [])
+            await _check_ownership(session, project_id, current_user)
             matched = None
-            for checkpoint in checkpoints:
-                if checkpoint.get("id") == checkpoint_id:
-                    approved = bool(payload.get("approved"))
-                    checkpoint["status"] = "approved" if approved else "rejected"
-                    checkpoint["userFeedback"] = payload.get("feedback", "")
-                    checkpoint["respondedAt"] = datetime.utcnow().isoformat()
-                    matched = checkpoint
-                    break
 
+            def _record_feedback(checkpoints):
+                # Re-run on a concurrent change, against the fresh list
+                nonlocal matched
+                matched = None
+                for checkpoint in checkpoints if isinstance(checkpoints, list) else []:
+                    if checkpoint.get("id") == checkpoint_id:
+                        approved = bool(payload.get("approved"))
+                        checkpoint["status"] = "approved" if approved else "rejected"
+                        checkpoint["userFeedback"] = payload.get("feedback", "")
+                        checkpoint["respondedAt"] = datetime.utcnow().isoformat()
+                        matched = checkpoint
+                        return checkpoints
+                return None
+
+            await update_journey_key(session, project_id, "checkpoints", _record_feedback)
             if matched is None:
                 raise HTTPException(status_code=404, detail="Checkpoint not found")
-
-            jp["checkpoints"] = checkpoints
-            await session.execute(
-                sa_text(
-                    "UPDATE projects SET journey_progress = CAST(:jp AS jsonb), "
-                    "updated_at = NOW() WHERE id = :id"
-                ),
-                {"jp": json.dumps(jp), "id": project_id},
-            )
             await session.commit()
 
         return ORJSONResponse(content={"success": True, "checkpoint": matched})
 
     except HTTPException:
         raise
+    except JourneyVersionConflict:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Checkpoints were updated concurrently, please retry",
+        )
     except Exception as e:
         logger.error(f"Error submitting checkpoint feedback: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to submit checkpoint feedback: {e}")
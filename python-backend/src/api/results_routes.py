@@ -282,14 +282,10 @@ async def get_project_insights(
 
             # Convert to response format
             for insight_model in insight_models:
-                # Get evidence chain for this insight
-                evidence_chain = evidence_service.get_chain_for_project(project_id)
-
-                # Filter evidence chain to links related to this insight
-                insight_evidence = [
-                    link for link in evidence_chain
-                    if link.source_id == insight_model.id or link.target_id == insight_model.id
-                ]
+                # Evidence links into and out of this insight
+                insight_evidence = await evidence_service.get_links_for_node(
+                    project_id, "insight", insight_model.id
+                )
 
                 insights.append({
                     "id": insight_model.id,
@@ -399,7 +399,7 @@ async def get_project_evidence_chain(project_id: str):
     """Get the complete evidence chain for a project"""
     try:
         service = get_evidence_chain_service()
-        chain = service.get_chain_for_project(project_id)
+        chain = await service.get_chain_for_project(project_id)
 
         return APIResponse(
             success=True,
@@ -22,6 +22,7 @@ from ..services.semantic_matching import (
     SemanticConfig
 )
 from ..db import get_db_context
+from ..services.journey_state import patch_journey_progress
 from ..models.database import QuestionMapping, ColumnEmbedding, Project, Dataset
 from sqlalchemy import select, delete, func
 
@@ -156,16 +157,15 @@ async def map_questions_to_elements(
 
         # Store in journey_progress
         async with get_db_context() as session:
-            project_stmt = select(Project).where(Project.id == request.project_id)
-            project_result = await session.execute(project_stmt)
-            project = project_result.scalar_one_or_none()
-
-            if project:
-                journey_progress = project.journey_progress or {}
-                journey_progress['questionMappings'] = mappings_dict
-                journey_progress['mappingsGeneratedAt'] = datetime.utcnow().isoformat()
-                project.journey_progress = journey_progress
-                await session.commit()
+            await patch_journey_progress(
+                session,
+                request.project_id,
+                set_values={
+                    'questionMappings': mappings_dict,
+                    'mappingsGeneratedAt': datetime.utcnow().isoformat(),
+                },
+            )
+            await session.commit()
 
         return {
             "success": True,
@@ -292,17 +292,16 @@ async def generate_column_embeddings(
 
         # Update journey_progress
         async with get_db_context() as session:
-            project_stmt = select(Project).where(Project.id == request.project_id)
-            project_result = await session.execute(project_stmt)
-            project = project_result.scalar_one_or_none()
-
-            if project:
-                journey_progress = project.journey_progress or {}
-                journey_progress['embeddingsGenerated'] = True
-                journey_progress['embeddingsGeneratedAt'] = datetime.utcnow().isoformat()
-                journey_progress['columnsIndexed'] = len(documents)
-                project.journey_progress = journey_progress
-                await session.commit()
+            await patch_journey_progress(
+                session,
+                request.project_id,
+                set_values={
+                    'embeddingsGenerated': True,
+                    'embeddingsGeneratedAt': datetime.utcnow().isoformat(),
+                    'columnsIndexed': len(documents),
+                },
+            )
+            await session.commit()
 
         return {
             "success": True,
@@ -491,9 +490,9 @@ async def clear_mappings(
             result = await session.execute(delete_stmt)
 
             # Clear from journey_progress
-            journey_progress = project.journey_progress or {}
-            journey_progress['questionMappings'] = []
-            project.journey_progress = journey_progress
+            await patch_journey_progress(
+                session, project_id, set_values={'questionMappings': []}
+            )
 
             await session.commit()
 
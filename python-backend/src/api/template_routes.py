@@ -18,7 +18,6 @@ Endpoints:
 
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-import json
 import logging
 
 from fastapi import APIRouter, HTTPException, Depends, Query, status
@@ -29,6 +28,7 @@ from sqlalchemy import text as sa_text
 
 from ..db import get_db_context
 from ..auth.middleware import get_current_user, User as AuthUser
+from ..services.journey_state import patch_journey_progress
 
 logger = logging.getLogger(__name__)
 
@@ -497,29 +497,20 @@ async def recommend_templates(
 
         # Store recommendation in journey_progress
         async with get_db_context() as session:
-            result = await session.execute(
-                sa_text("SELECT journey_progress FROM projects WHERE id = :id"),
-                {"id": project_id},
-            )
-            row = result.first()
-            journey_progress = (row[0] if row else None) or {}
-
-            journey_progress["researcherRecommendation"] = {
-                "template": template,
-                "confidence": confidence,
-                "marketDemand": market_demand,
-                "implementationComplexity": implementation_complexity,
-                "alternativeTemplates": alternative_templates,
-                "recommendedAt": datetime.utcnow().isoformat(),
-                "searchMethod": "rule_based",
-            }
-
-            await session.execute(
-                sa_text(
-                    "UPDATE projects SET journey_progress = CAST(:jp AS jsonb), "
-                    "updated_at = NOW() WHERE id = :id"
-                ),
-                {"jp": json.dumps(journey_progress), "id": project_id},
+            await patch_journey_progress(
+                session,
+                project_id,
+                set_values={
+                    "researcherRecommendation": {
+                        "template": template,
+                        "confidence": confidence,
+                        "marketDemand": market_demand,
+                        "implementationComplexity": implementation_complexity,
+                        "alternativeTemplates": alternative_templates,
+                        "recommendedAt": datetime.utcnow().isoformat(),
+                        "searchMethod": "rule_based",
+                    },
+                },
             )
             await session.commit()
 
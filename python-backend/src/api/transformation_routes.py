@@ -16,6 +16,7 @@ import json
 
 from ..auth.middleware import get_current_user, User
 from ..services.transformation_engine import get_transformation_executor
+from ..services.journey_state import patch_journey_progress
 from ..db import get_db_context
 from ..models.database import Transformation, Dataset, Project
 from sqlalchemy import select, delete
@@ -288,11 +289,12 @@ async def execute_transformations_compat(
                 "rowCount": len(rows),
                 "columnCount": len(schema),
             }
-            journey_progress["transformations"] = journey_progress.get("transformations", [])
-            journey_progress["transformations"].append(transformation_record)
-            journey_progress["transformedData"] = preview_rows
-            journey_progress["transformedSchema"] = schema
-            project.journey_progress = journey_progress
+            await patch_journey_progress(
+                session,
+                project_id,
+                set_values={"transformedData": preview_rows, "transformedSchema": schema},
+                append={"transformations": [transformation_record]},
+            )
             await session.commit()
 
         return {
@@ -388,15 +390,12 @@ async def compile_transformation_plan(
 
         # Store plan in journey_progress
         async with get_db_context() as session:
-            project_stmt = select(Project).where(Project.id == project_id)
-            project_result = await session.execute(project_stmt)
-            project = project_result.scalar_one_or_none()
-
-            if project:
-                journey_progress = project.journey_progress or {}
-                journey_progress['transformationPlan'] = plan.dict() if hasattr(plan, 'dict') else plan
-                project.journey_progress = journey_progress
-                await session.commit()
+            await patch_journey_progress(
+                session,
+                project_id,
+                set_values={'transformationPlan': plan.dict() if hasattr(plan, 'dict') else plan},
+            )
+            await session.commit()
 
         return {
             "success": True,
@@ -501,23 +500,21 @@ async def execute_transformations(
             transformation.execution_time_ms = execution_time_ms
             transformation.completed_at = end_time
 
-            # Store transformed data in dataset metadata if not preview
+            # The transformed rows are in the columnar store; the result only holds a preview
             if not request.preview_only and result.get("transformed_data"):
-                # Store in ingestionMetadata.transformedData
-                # For now, store as JSON in a metadata field
-                # In production, this should be stored in a separate table or file
-
-                # Update journey_progress with transformation info
-                journey_progress = project.journey_progress or {}
-                journey_progress['transformations'] = journey_progress.get('transformations', [])
-                journey_progress['transformations'].append({
-                    'id': transformation_id,
-                    'datasetId': request.dataset_id,
-                    'operation': request.transformations[0].operation if request.transformations else "unknown",
-                    'executedAt': datetime.utcnow().isoformat(),
-                    'status': 'completed'
-                })
-                project.journey_progress = journey_progress
+                # Append the transformation to journey_progress in SQL
+                await patch_journey_progress(
+                    session,
+                    project_id,
+                    append={"transformations": [{
+                        'id': transformation_id,
+                        'datasetId': request.dataset_id,
+                        'transformedDatasetId': result.get("transformed_dataset_id", request.dataset_id),
+                        'operation': request.transformations[0].operation if request.transformations else "unknown",
+                        'executedAt': datetime.utcnow().isoformat(),
+                        'status': 'completed'
+                    }]},
+                )
 
             await session.commit()
 
@@ -729,22 +726,19 @@ async def join_datasets(
 
         # Store join configuration in journey_progress
         async with get_db_context() as session:
-            project_stmt = select(Project).where(Project.id == project_id)
-            project_result = await session.execute(project_stmt)
-            project = project_result.scalar_one_or_none()
-
-            if project:
-                journey_progress = project.journey_progress or {}
-                journey_progress['joinConfig'] = {
+            await patch_journey_progress(
+                session,
+                project_id,
+                set_values={'joinConfig': {
                     'leftDatasetId': left_dataset_id,
                     'rightDatasetId': right_dataset_id,
                     'joinType': config.join_type,
                     'joinKeys': config.join_keys,
                     'joinedDatasetId': result.get("dataset_id"),
                     'executedAt': datetime.utcnow().isoformat()
-                }
-                project.journey_progress = journey_progress
-                await session.commit()
+                }},
+            )
+            await session.commit()
 
         return {
             "success": True,
@@ -797,10 +791,11 @@ async def clear_transformations(
             result = await session.execute(delete_stmt)
 
             # Clear transformations from journey_progress
-            journey_progress = project.journey_progress or {}
-            journey_progress['transformations'] = []
-            journey_progress['transformationPlan'] = None
-            project.journey_progress = journey_progress
+            await patch_journey_progress(
+                session,
+                project_id,
+                set_values={'transformations': [], 'transformationPlan': None},
+            )
 
             await session.commit()
 
@@ -6,15 +6,14 @@ Handles file uploads, schema detection, PII scanning,
 and persists to the real datasets / project_datasets tables.
 """
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, BinaryIO, Iterator, Tuple
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status
 from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, ConfigDict, Field
 import logging
 from datetime import datetime
+import asyncio
 import json
-import csv
-import io
 import os
 from pathlib import Path
 
@@ -23,12 +22,20 @@ from sqlalchemy import text as sa_text
 from ..auth.middleware import get_current_user, User
 from ..db import get_db_context
 from ..models.database import generate_uuid
+from ..services.dataset_store import get_dataset_store, COLUMNAR_POINTER_KEY
+from ..services.streaming_ingestion import (
+    StreamingIngestor,
+    iter_csv_records,
+    iter_excel_records,
+    iter_json_records,
+)
 from ..constants import (
-    DATASET_DATA_ROW_CAP,
+    DATASET_SCHEMA_SAMPLE_ROWS,
     DATASET_PREVIEW_ROWS,
     DATASET_MINI_PREVIEW_ROWS,
     ALLOWED_UPLOAD_TYPES,
     MAX_UPLOAD_FILE_SIZE_BYTES,
+    UPLOAD_STREAM_CHUNK_BYTES,
 )
 
 logger = logging.getLogger(__name__)
@@ -152,90 +159,77 @@ def _detect_column_type(values: List[Any]) -> str:
     return "text"
 
 
-def _parse_csv_bytes(raw: bytes) -> tuple[List[str], List[Dict[str, Any]]]:
-    """Parse CSV bytes into (headers, rows_as_dicts). Rows capped at DATASET_DATA_ROW_CAP."""
-    # Try to detect encoding; fallback to utf-8
-    try:
-        text = raw.decode("utf-8-sig")
-    except UnicodeDecodeError:
-        text = raw.decode("latin-1")
-
-    reader = csv.DictReader(io.StringIO(text))
-    headers = reader.fieldnames or []
-    rows: List[Dict[str, Any]] = []
-    for i, row in enumerate(reader):
-        if i >= DATASET_DATA_ROW_CAP:
-            break
-        # Convert empty strings to None for consistency
-        cleaned = {}
-        for k, v in row.items():
-            if v is None or v.strip() == "":
-                cleaned[k] = None
-            else:
-                cleaned[k] = v
-        rows.append(cleaned)
-    return list(headers), rows
-
-
-def _parse_json_bytes(raw: bytes) -> tuple[List[str], List[Dict[str, Any]]]:
-    """Parse JSON bytes (array of objects) into (headers, rows_as_dicts)."""
-    data = json.loads(raw)
-    if isinstance(data, dict):
-        # Possibly wrapped: {"data": [...]} or similar
-        for key in ("data", "rows", "records", "items", "results"):
-            if key in data and isinstance(data[key], list):
-                data = data[key]
-                break
-        else:
-            # Single object -> wrap in list
-            data = [data]
-    if not isinstance(data, list):
-        raise ValueError("JSON file must contain an array of objects")
-
-    rows = data[:DATASET_DATA_ROW_CAP]
-    headers = list(rows[0].keys()) if rows else []
-    return headers, rows
-
-
-def _parse_excel_bytes(raw: bytes) -> tuple[List[str], List[Dict[str, Any]]]:
-    """Parse Excel bytes using openpyxl into (headers, rows_as_dicts)."""
+def _parse_csv_stream(stream: BinaryIO) -> Tuple[List[str], Iterator[Dict[str, Any]]]:
+    """Open a CSV file as (headers, lazy row iterator). Rows are not capped."""
+    return iter_csv_records(stream)
+
+
+def _parse_json_stream(stream: BinaryIO) -> Tuple[List[str], Iterator[Dict[str, Any]]]:
+    """Open a JSON file (array of objects or NDJSON) as (headers, lazy row iterator)."""
+    return iter_json_records(stream)
+
+
+def _parse_excel_stream(stream: BinaryIO) -> Tuple[List[str], Iterator[Dict[str, Any]]]:
+    """Open an Excel file using openpyxl as (headers, lazy row iterator)."""
     try:
-        import openpyxl
+        import openpyxl  # noqa: F401
     except ImportError:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Excel parsing requires the openpyxl package. Install with: pip install openpyxl"
         )
 
-    wb = openpyxl.load_workbook(io.BytesIO(raw), read_only=True, data_only=True)
-    ws = wb.active
-    if ws is None:
-        raise ValueError("Excel file has no active sheet")
+    return iter_excel_records(stream)
 
-    row_iter = ws.iter_rows(values_only=True)
-    header_row = next(row_iter, None)
-    if header_row is None:
-        return [], []
 
-    headers = [str(h) if h is not None else f"column_{i}" for i, h in enumerate(header_row)]
-    rows: List[Dict[str, Any]] = []
-    for i, row in enumerate(row_iter):
-        if i >= DATASET_DATA_ROW_CAP:
-            break
-        row_dict = {}
-        for j, val in enumerate(row):
-            col = headers[j] if j < len(headers) else f"column_{j}"
-            row_dict[col] = val
-        rows.append(row_dict)
+def _open_records(stream: BinaryIO, ext: str) -> Tuple[List[str], Iterator[Dict[str, Any]]]:
+    """Dispatch to the incremental parser for a file extension."""
+    if ext == "csv" or ext == "txt":
+        return _parse_csv_stream(stream)
+    elif ext in ("xlsx", "xls"):
+        return _parse_excel_stream(stream)
+    elif ext == "json":
+        return _parse_json_stream(stream)
+    raise ValueError(f"Unsupported extension: {ext}")
 
-    wb.close()
-    return headers, rows
+
+async def _spool_upload(file: UploadFile, destination: Path) -> int:
+    """
+    Copy an upload to disk in UPLOAD_STREAM_CHUNK_BYTES steps.
+
+    Only one chunk is held in memory at a time. The size limit is enforced
+    while copying, and a partial file never appears at `destination`.
+
+    Returns:
+        Number of bytes written
+    """
+    partial_path = destination.with_name(destination.name + ".part")
+    file_size = 0
+    try:
+        with open(partial_path, "wb") as out:
+            while True:
+                chunk = await file.read(UPLOAD_STREAM_CHUNK_BYTES)
+                if not chunk:
+                    break
+                file_size += len(chunk)
+                if file_size > MAX_UPLOAD_FILE_SIZE_BYTES:
+                    max_mb = MAX_UPLOAD_FILE_SIZE_BYTES // (1024 * 1024)
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"File too large (over {MAX_UPLOAD_FILE_SIZE_BYTES} bytes). Maximum allowed: {max_mb} MB",
+                    )
+                await asyncio.to_thread(out.write, chunk)
+        os.replace(partial_path, destination)
+    except BaseException:
+        partial_path.unlink(missing_ok=True)
+        raise
+    return file_size
 
 
 def _build_schema(headers: List[str], rows: List[Dict[str, Any]]) -> Dict[str, str]:
     """Build a column-name -> type mapping by sampling the data."""
     schema: Dict[str, str] = {}
-    sample_size = min(200, len(rows))
+    sample_size = min(DATASET_SCHEMA_SAMPLE_ROWS, len(rows))
     for col in headers:
         sample_vals = [r.get(col) for r in rows[:sample_size]]
         schema[col] = _detect_column_type(sample_vals)
@@ -334,8 +328,10 @@ async def upload_dataset(
     Upload a dataset file to a project.
 
     Accepts CSV, XLSX, JSON, and TXT files (max 100 MB).
-    Parses the file, detects column types, stores file to disk,
+    Spools the upload to disk in chunks, parses it incrementally into the
+    columnar dataset store (detecting column types from a head sample),
     and persists metadata into the datasets and project_datasets tables.
+    Memory use per upload is bounded by the chunk sizes, not the file size.
 
     Returns dataset info with schema, preview, and record count.
     """
@@ -348,19 +344,12 @@ async def upload_dataset(
             detail=f"Unsupported file type '.{ext}'. Allowed: {ALLOWED_UPLOAD_TYPES}",
         )
 
-    # ── read file bytes and validate size ────────────────────────────────
-    raw_bytes = await file.read()
-    file_size = len(raw_bytes)
-    if file_size > MAX_UPLOAD_FILE_SIZE_BYTES:
+    # ── reject declared oversize uploads before touching disk ───────────
+    if file.size is not None and file.size > MAX_UPLOAD_FILE_SIZE_BYTES:
         max_mb = MAX_UPLOAD_FILE_SIZE_BYTES // (1024 * 1024)
         raise HTTPException(
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File too large ({file_size} bytes). Maximum allowed: {max_mb} MB",
-        )
-    if file_size == 0:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Uploaded file is empty",
+            detail=f"File too large ({file.size} bytes). Maximum allowed: {max_mb} MB",
         )
 
     # ── verify project exists and user owns it ───────────────────────────
@@ -375,54 +364,79 @@ async def upload_dataset(
                 detail="Project not found or you do not have access",
             )
 
-    # ── parse file ───────────────────────────────────────────────────────
+    # ── spool file to disk in chunks ─────────────────────────────────────
+    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    dataset_id = generate_uuid()
+    safe_name = f"{project_id}_{dataset_id[:12]}.{ext}"
+    storage_path = UPLOAD_DIR / safe_name
     try:
-        if ext == "csv" or ext == "txt":
-            headers, rows = _parse_csv_bytes(raw_bytes)
-        elif ext in ("xlsx", "xls"):
-            headers, rows = _parse_excel_bytes(raw_bytes)
-        elif ext == "json":
-            headers, rows = _parse_json_bytes(raw_bytes)
-        else:
-            raise ValueError(f"Unsupported extension: {ext}")
+        file_size = await _spool_upload(file, storage_path)
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"File parsing error: {e}", exc_info=True)
+        logger.error(f"Failed to write upload file: {e}", exc_info=True)
         raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail=f"Failed to parse file: {str(e)}",
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to save uploaded file to disk",
         )
+    storage_uri = str(storage_path)
 
-    if not headers:
+    if file_size == 0:
+        storage_path.unlink(missing_ok=True)
         raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail="File has no columns/headers",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Uploaded file is empty",
         )
 
-    # ── build schema & preview ───────────────────────────────────────────
-    schema_map = _build_schema(headers, rows)
-    record_count = len(rows)
-    preview = _make_json_safe(rows[:DATASET_MINI_PREVIEW_ROWS])
-    data_rows = _make_json_safe(rows)  # already capped at DATASET_DATA_ROW_CAP
-
     # ── resolve MIME type ────────────────────────────────────────────────
     mime_type = file.content_type or MIME_TYPE_MAP.get(ext, "application/octet-stream")
 
-    # ── save file to disk ────────────────────────────────────────────────
-    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-    dataset_id = generate_uuid()
-    safe_name = f"{project_id}_{dataset_id[:12]}.{ext}"
-    storage_path = UPLOAD_DIR / safe_name
+    # ── parse the spooled file and stream rows into the columnar store ──
+    # Rows are decoded and written chunk by chunk; schema sample, preview
+    # and column statistics are collected on the way through.
+    dataset_store = get_dataset_store()
     try:
-        storage_path.write_bytes(raw_bytes)
-    except Exception as e:
-        logger.error(f"Failed to write upload file: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to save uploaded file to disk",
-        )
-    storage_uri = str(storage_path)
+        with open(storage_path, "rb") as stream:
+            try:
+                headers, records = await asyncio.to_thread(_open_records, stream, ext)
+            except HTTPException:
+                raise
+            except Exception as e:
+                logger.error(f"File parsing error: {e}", exc_info=True)
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=f"Failed to parse file: {str(e)}",
+                )
+
+            if not headers:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail="File has no columns/headers",
+                )
+
+            ingestor = StreamingIngestor(dataset_id, columns=headers, store=dataset_store)
+            try:
+                ingestion = await asyncio.to_thread(ingestor.consume, records)
+            except (ValueError, UnicodeDecodeError) as e:
+                logger.error(f"File parsing error: {e}", exc_info=True)
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=f"Failed to parse file: {str(e)}",
+                )
+            except Exception as e:
+                logger.error(f"Failed to write columnar dataset: {e}", exc_info=True)
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Failed to store dataset rows",
+                )
+    except BaseException:
+        storage_path.unlink(missing_ok=True)
+        raise
+
+    # ── build schema & preview ───────────────────────────────────────────
+    schema_map = _build_schema(headers, _make_json_safe(ingestion.sample_rows))
+    record_count = ingestion.row_count
+    preview = _make_json_safe(ingestion.preview)
 
     # ── persist to datasets table ────────────────────────────────────────
     now = datetime.utcnow()
@@ -457,13 +471,15 @@ async def upload_dataset(
                     "schema": json.dumps(schema_map),
                     "record_count": record_count,
                     "preview": json.dumps(preview),
-                    "data": json.dumps(data_rows),
+                    "data": None,  # rows live in the columnar store (see ingestion_metadata)
                     "pii_analysis": None,
                     "ingestion_metadata": json.dumps({
                         "uploadedAt": now_iso,
                         "originalExtension": ext,
                         "columnCount": len(headers),
                         "headers": headers,
+                        COLUMNAR_POINTER_KEY: ingestion.pointer.to_metadata(),
+                        **ingestion.stats_metadata(),
                     }),
                     "status": "ready",
                     "created_at": now,
@@ -493,9 +509,10 @@ async def upload_dataset(
         raise
     except Exception as e:
         logger.error(f"Database insert failed for upload: {e}", exc_info=True)
-        # Clean up the file we wrote
+        # Clean up the files we wrote
         try:
             storage_path.unlink(missing_ok=True)
+            dataset_store.delete(dataset_id)
         except Exception:
             pass
         raise HTTPException(
@@ -608,7 +625,7 @@ async def get_dataset(
             sa_text("""
                 SELECT id, user_id, source_type, original_file_name,
                        mime_type, file_size, storage_uri,
-                       schema, record_count, preview, data,
+                       schema, record_count, preview,
                        pii_analysis, ingestion_metadata, status,
                        created_at, updated_at
                 FROM datasets
@@ -724,6 +741,11 @@ async def delete_dataset(
         except Exception as e:
             logger.warning(f"Could not delete file {storage_uri}: {e}")
 
+    try:
+        get_dataset_store().delete(dataset_id)
+    except Exception as e:
+        logger.warning(f"Could not delete columnar data for {dataset_id}: {e}")
+
     return ORJSONResponse(content={
         "success": True,
         "dataset_id": dataset_id,
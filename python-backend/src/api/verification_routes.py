@@ -32,6 +32,9 @@ from sqlalchemy import text as sa_text
 
 from ..db import get_db_context
 from ..auth.middleware import get_current_user, User as AuthUser
+from ..services.dataset_store import get_dataset_store
+from ..services.data_quality import combine_quality, compute_quality, get_dataset_quality
+from ..services.journey_state import patch_journey_progress
 
 logger = logging.getLogger(__name__)
 
@@ -57,11 +60,24 @@ async def _check_ownership(session, project_id: str, user: AuthUser) -> dict:
     return project
 
 
+# Dataset metadata columns. Row data is read through the columnar dataset
+# store rather than selecting the legacy `data` JSON blob.
+_DATASET_META_COLUMNS = (
+    "id", "user_id", "source_type", "original_file_name", "mime_type",
+    "file_size", "storage_uri", "schema", "record_count", "preview",
+    "pii_analysis", "ingestion_metadata", "status", "created_at", "updated_at",
+)
+
+
+def _dataset_select(alias: str = "d") -> str:
+    return ", ".join(f"{alias}.{col}" for col in _DATASET_META_COLUMNS)
+
+
 async def _get_project_datasets(session, project_id: str) -> list:
     """Fetch all datasets linked to a project via the project_datasets junction."""
     result = await session.execute(
         sa_text(
-            "SELECT d.* "
+            f"SELECT {_dataset_select()} "
             "FROM datasets d "
             "INNER JOIN project_datasets pd ON pd.dataset_id = d.id "
             "WHERE pd.project_id = :project_id "
@@ -86,6 +102,41 @@ def _parse_json_col(val):
         return None
 
 
+async def _load_dataset_frame(ds: dict):
+    """
+    Load a dataset as a DataFrame.
+
+    Reads from the columnar dataset store first (which also backfills legacy
+    `data` rows), then falls back to re-parsing the original upload.
+    Returns None if no rows are available.
+    """
+    import os
+    import pandas as pd
+    from ..constants import DATASET_DATA_ROW_CAP
+
+    df = await get_dataset_store().load(ds["id"])
+    if not df.empty:
+        return df
+
+    storage_uri = ds.get("storage_uri") or ds.get("file_path")
+    if not storage_uri or not os.path.exists(storage_uri):
+        return None
+
+    try:
+        source_type = ds.get("source_type", "")
+        if source_type == "csv" or storage_uri.endswith(".csv"):
+            return pd.read_csv(storage_uri, nrows=DATASET_DATA_ROW_CAP)
+        elif source_type in ("xlsx", "xls") or storage_uri.endswith((".xlsx", ".xls")):
+            return pd.read_excel(storage_uri, nrows=DATASET_DATA_ROW_CAP)
+        elif source_type == "json" or storage_uri.endswith(".json"):
+            return pd.read_json(storage_uri, nrows=DATASET_DATA_ROW_CAP)
+        else:
+            return pd.read_csv(storage_uri, nrows=DATASET_DATA_ROW_CAP)
+    except Exception as e:
+        logger.warning(f"Could not load file {storage_uri}: {e}")
+        return None
+
+
 def _build_user_context(user: AuthUser) -> Dict[str, Any]:
     """Build a frontend-compatible user context envelope."""
     return {
@@ -198,6 +249,9 @@ def _compute_data_quality(data_rows: list, schema: Optional[dict] = None) -> dic
     """
     Compute quality metrics from dataset data rows (list of dicts).
 
+    Stored datasets go through get_dataset_quality() instead, which reuses
+    cached reports; this is for rows that only exist in a request.
+
     Returns:
       completeness     -- fraction of non-null values across all cells
       duplicateRows    -- number of duplicate rows
@@ -207,69 +261,10 @@ def _compute_data_quality(data_rows: list, schema: Optional[dict] = None) -> dic
       totalColumns     -- int
       qualityScore     -- weighted average (completeness 60%, uniqueness 40%)
     """
-    if not data_rows:
-        return {
-            "completeness": 0,
-            "duplicateRows": 0,
-            "nullCounts": {},
-            "columnCompleteness": {},
-            "totalRows": 0,
-            "totalColumns": 0,
-            "qualityScore": 0,
-        }
-
-    total_rows = len(data_rows)
-
-    # Determine columns from first row (or schema)
-    if schema and isinstance(schema, dict):
-        columns = list(schema.keys())
-    else:
-        columns = list(data_rows[0].keys()) if data_rows else []
-
-    total_columns = len(columns)
-    total_cells = total_rows * total_columns if total_columns else 1
-
-    # Count nulls per column
-    null_counts: Dict[str, int] = {col: 0 for col in columns}
-    for row in data_rows:
-        for col in columns:
-            val = row.get(col)
-            if val is None or (isinstance(val, str) and val.strip() == ""):
-                null_counts[col] += 1
-
-    total_nulls = sum(null_counts.values())
-    completeness = (total_cells - total_nulls) / total_cells if total_cells > 0 else 0
-
-    # Column-level completeness
-    column_completeness = {}
-    for col in columns:
-        col_total = total_rows if total_rows > 0 else 1
-        column_completeness[col] = round((col_total - null_counts[col]) / col_total, 4)
-
-    # Duplicate rows -- serialise each row to a tuple of values for hashing
-    seen = set()
-    duplicate_count = 0
-    for row in data_rows:
-        key = tuple(str(row.get(c, "")) for c in columns)
-        if key in seen:
-            duplicate_count += 1
-        else:
-            seen.add(key)
-
-    uniqueness = (total_rows - duplicate_count) / total_rows if total_rows > 0 else 1
+    import pandas as pd
 
-    # Weighted quality score: completeness 60%, uniqueness 40%
-    quality_score = round(completeness * 0.6 + uniqueness * 0.4, 4)
-
-    return {
-        "completeness": round(completeness, 4),
-        "duplicateRows": duplicate_count,
-        "nullCounts": null_counts,
-        "columnCompleteness": column_completeness,
-        "totalRows": total_rows,
-        "totalColumns": total_columns,
-        "qualityScore": quality_score,
-    }
+    columns = list(schema.keys()) if schema and isinstance(schema, dict) else None
+    return compute_quality(pd.DataFrame(data_rows or []), columns).to_summary()
 
 
 # ============================================================================
@@ -303,8 +298,8 @@ async def get_data_quality(
     """
     Calculate real quality metrics from dataset data.
 
-    Reads the `data` JSONB column from all project datasets and computes
-    completeness, null counts, duplicate rows, and a weighted quality score.
+    Reads rows for all project datasets from the columnar dataset store and
+    computes completeness, null counts, duplicate rows, and a weighted quality score.
     """
     try:
         user_context = _build_user_context(current_user)
@@ -336,21 +331,25 @@ async def get_data_quality(
             })
 
         per_dataset = []
-        all_rows: list = []
+        reports = []
 
         for ds in datasets:
-            data_rows = _parse_json_col(ds.get("data")) or []
             schema = _parse_json_col(ds.get("schema"))
-            quality = _compute_data_quality(data_rows, schema)
+            report = await get_dataset_quality(
+                ds["id"],
+                columns=list(schema.keys()) if isinstance(schema, dict) and schema else None,
+            )
+            quality = report.to_summary() if report else _compute_data_quality([], schema)
             per_dataset.append({
                 "dataset_id": ds["id"],
                 "name": ds.get("original_file_name") or ds.get("name", ""),
-                "record_count": ds.get("record_count") or len(data_rows),
+                "record_count": ds.get("record_count") or quality["totalRows"],
                 "quality": quality,
             })
-            all_rows.extend(data_rows)
+            if report:
+                reports.append(report)
 
-        overall = _compute_data_quality(all_rows)
+        overall = combine_quality(reports).to_summary() if reports else _compute_data_quality([])
         completeness_pct = round(float(overall.get("completeness", 0)) * 100, 2)
         uniqueness_pct = (
             round(
@@ -579,30 +578,24 @@ async def verify_project_put(
     """
     try:
         async with get_db_context() as session:
-            project = await _check_ownership(session, project_id, current_user)
+            await _check_ownership(session, project_id, current_user)
 
             # Merge into existing journey_progress
-            journey = _parse_json_col(project.get("journey_progress")) or {}
-            journey["verification"] = {
-                "verified": True,
-                "verifiedAt": datetime.utcnow().isoformat(),
-                "verifiedBy": current_user.id,
-            }
-
-            await session.execute(
-                sa_text(
-                    "UPDATE projects "
-                    "SET journey_step = :step, "
-                    "    journey_progress = :jp, "
-                    "    updated_at = NOW() "
-                    "WHERE id = :id"
-                ),
-                {
-                    "step": "verified",
-                    "jp": json.dumps(journey),
-                    "id": project_id,
+            await patch_journey_progress(
+                session,
+                project_id,
+                set_values={
+                    "verification": {
+                        "verified": True,
+                        "verifiedAt": datetime.utcnow().isoformat(),
+                        "verifiedBy": current_user.id,
+                    },
                 },
             )
+            await session.execute(
+                sa_text("UPDATE projects SET journey_step = :step WHERE id = :id"),
+                {"step": "verified", "id": project_id},
+            )
             await session.commit()
 
         return ORJSONResponse(content={
@@ -637,22 +630,19 @@ async def verify_project_post(
     """
     try:
         from ..services.data_verification import get_verification_service
-        import pandas as pd
-        import os
-        from ..constants import DATASET_DATA_ROW_CAP
 
         verification_service = get_verification_service()
         dataset_id = request.dataset_id if request else None
 
         async with get_db_context() as session:
-            project = await _check_ownership(session, project_id, current_user)
+            await _check_ownership(session, project_id, current_user)
 
             if not dataset_id:
                 raise HTTPException(status_code=400, detail="dataset_id is required")
 
             # Fetch dataset
             ds_result = await session.execute(
-                sa_text("SELECT * FROM datasets WHERE id = :id"),
+                sa_text(f"SELECT {_dataset_select()} FROM datasets d WHERE d.id = :id"),
                 {"id": dataset_id},
             )
             ds_row = ds_result.first()
@@ -660,28 +650,11 @@ async def verify_project_post(
                 raise HTTPException(status_code=404, detail=f"Dataset not found: {dataset_id}")
             ds = dict(zip(ds_result.keys(), ds_row))
 
-            # Try to load data: file first, then DB data column, then request body
-            data = None
-            storage_uri = ds.get("storage_uri") or ds.get("file_path")
-            if storage_uri and os.path.exists(storage_uri):
-                try:
-                    source_type = ds.get("source_type", "")
-                    if source_type == "csv" or storage_uri.endswith(".csv"):
-                        data = pd.read_csv(storage_uri, nrows=DATASET_DATA_ROW_CAP)
-                    elif source_type in ("xlsx", "xls") or storage_uri.endswith((".xlsx", ".xls")):
-                        data = pd.read_excel(storage_uri, nrows=DATASET_DATA_ROW_CAP)
-                    elif source_type == "json" or storage_uri.endswith(".json"):
-                        data = pd.read_json(storage_uri, nrows=DATASET_DATA_ROW_CAP)
-                    else:
-                        data = pd.read_csv(storage_uri, nrows=DATASET_DATA_ROW_CAP)
-                except Exception as e:
-                    logger.warning(f"Could not load file {storage_uri}: {e}")
-
-            if data is None:
-                # Fallback to DB data column
-                db_data = _parse_json_col(ds.get("data"))
-                if db_data and isinstance(db_data, list) and len(db_data) > 0:
-                    data = pd.DataFrame(db_data[:DATASET_DATA_ROW_CAP])
+            # Try to load data: columnar store / original file, then request body
+            data = await _load_dataset_frame(ds)
+            quality_report = (
+                await get_dataset_quality(dataset_id, frame=data) if data is not None else None
+            )
 
             if data is None and request and request.data:
                 data = request.data
@@ -696,6 +669,7 @@ async def verify_project_post(
                 dataset_id=dataset_id,
                 data=data,
                 schema=schema_col,
+                quality_report=quality_report,
             )
 
             # Persist PII analysis on dataset
@@ -709,18 +683,16 @@ async def verify_project_post(
             )
 
             # Persist to journey_progress
-            journey = _parse_json_col(project.get("journey_progress")) or {}
-            journey["piiDetection"] = {
-                "detected": result.pii_detected,
-                "fields": pii_list,
-                "verifiedAt": datetime.utcnow().isoformat(),
-            }
-            await session.execute(
-                sa_text(
-                    "UPDATE projects SET journey_progress = :jp, updated_at = NOW() "
-                    "WHERE id = :id"
-                ),
-                {"jp": json.dumps(journey), "id": project_id},
+            await patch_journey_progress(
+                session,
+                project_id,
+                set_values={
+                    "piiDetection": {
+                        "detected": result.pii_detected,
+                        "fields": pii_list,
+                        "verifiedAt": datetime.utcnow().isoformat(),
+                    },
+                },
             )
 
             await session.commit()
@@ -754,7 +726,7 @@ async def record_pii_decision(
             raise HTTPException(status_code=400, detail=f"Invalid decision. Must be one of: {list(valid_decisions)}")
 
         async with get_db_context() as session:
-            project = await _check_ownership(session, project_id, current_user)
+            await _check_ownership(session, project_id, current_user)
 
             # Verify dataset belongs to project
             ds_result = await session.execute(
@@ -783,20 +755,18 @@ async def record_pii_decision(
             )
 
             # Store in journey_progress (SSOT)
-            journey = _parse_json_col(project.get("journey_progress")) or {}
-            journey["piiDecision"] = {
-                "decision": decision.pii_decision,
-                "datasetId": decision.dataset_id,
-                "fields": decision.pii_fields,
-                "decidedAt": pii_dec["decidedAt"],
-                "status": "approved",
-            }
-            await session.execute(
-                sa_text(
-                    "UPDATE projects SET journey_progress = :jp, updated_at = NOW() "
-                    "WHERE id = :id"
-                ),
-                {"jp": json.dumps(journey), "id": project_id},
+            await patch_journey_progress(
+                session,
+                project_id,
+                set_values={
+                    "piiDecision": {
+                        "decision": decision.pii_decision,
+                        "datasetId": decision.dataset_id,
+                        "fields": decision.pii_fields,
+                        "decidedAt": pii_dec["decidedAt"],
+                        "status": "approved",
+                    },
+                },
             )
             await session.commit()
 
@@ -862,16 +832,13 @@ async def profile_dataset(
     """Generate detailed column profile for a dataset."""
     try:
         from ..services.data_verification import get_verification_service
-        import pandas as pd
-        import os
-        from ..constants import DATASET_DATA_ROW_CAP
 
         verification_service = get_verification_service()
 
         async with get_db_context() as session:
             # Fetch dataset
             ds_result = await session.execute(
-                sa_text("SELECT * FROM datasets WHERE id = :id"),
+                sa_text(f"SELECT {_dataset_select()} FROM datasets d WHERE d.id = :id"),
                 {"id": dataset_id},
             )
             ds_row = ds_result.first()
@@ -901,32 +868,13 @@ async def profile_dataset(
                     raise HTTPException(status_code=403, detail="Not authorized")
 
         # Load data
-        df = None
-        storage_uri = ds.get("storage_uri") or ds.get("file_path")
-        if storage_uri and os.path.exists(storage_uri):
-            try:
-                source_type = ds.get("source_type", "")
-                if source_type == "csv" or storage_uri.endswith(".csv"):
-                    df = pd.read_csv(storage_uri, nrows=DATASET_DATA_ROW_CAP)
-                elif source_type in ("xlsx", "xls") or storage_uri.endswith((".xlsx", ".xls")):
-                    df = pd.read_excel(storage_uri, nrows=DATASET_DATA_ROW_CAP)
-                elif source_type == "json" or storage_uri.endswith(".json"):
-                    df = pd.read_json(storage_uri, nrows=DATASET_DATA_ROW_CAP)
-                else:
-                    df = pd.read_csv(storage_uri, nrows=DATASET_DATA_ROW_CAP)
-            except Exception as e:
-                logger.warning(f"Could not load file {storage_uri}: {e}")
-
-        if df is None:
-            # Fallback to DB data column
-            db_data = _parse_json_col(ds.get("data"))
-            if db_data and isinstance(db_data, list) and len(db_data) > 0:
-                df = pd.DataFrame(db_data[:DATASET_DATA_ROW_CAP])
+        df = await _load_dataset_frame(ds)
 
         if df is None:
             raise HTTPException(status_code=500, detail="Could not load dataset for profiling")
 
-        column_profiles = verification_service._profile_columns(df)
+        quality_report = await get_dataset_quality(dataset_id, frame=df)
+        column_profiles = verification_service._profile_columns(df, quality_report)
 
         return ORJSONResponse(content={
             "success": True,
@@ -961,14 +909,11 @@ async def verify_all_datasets(
     """
     try:
         from ..services.data_verification import get_verification_service
-        import pandas as pd
-        import os
-        from ..constants import DATASET_DATA_ROW_CAP
 
         verification_service = get_verification_service()
 
         async with get_db_context() as session:
-            project = await _check_ownership(session, project_id, current_user)
+            await _check_ownership(session, project_id, current_user)
             datasets = await _get_project_datasets(session, project_id)
 
             datasets_verified = 0
@@ -977,26 +922,7 @@ async def verify_all_datasets(
 
             for ds in datasets:
                 # Load data
-                df = None
-                storage_uri = ds.get("storage_uri") or ds.get("file_path")
-                if storage_uri and os.path.exists(storage_uri):
-                    try:
-                        source_type = ds.get("source_type", "")
-                        if source_type == "csv" or storage_uri.endswith(".csv"):
-                            df = pd.read_csv(storage_uri, nrows=DATASET_DATA_ROW_CAP)
-                        elif source_type in ("xlsx", "xls") or storage_uri.endswith((".xlsx", ".xls")):
-                            df = pd.read_excel(storage_uri, nrows=DATASET_DATA_ROW_CAP)
-                        elif source_type == "json" or storage_uri.endswith(".json"):
-                            df = pd.read_json(storage_uri, nrows=DATASET_DATA_ROW_CAP)
-                        else:
-                            df = pd.read_csv(storage_uri, nrows=DATASET_DATA_ROW_CAP)
-                    except Exception as e:
-                        logger.warning(f"Could not load dataset {ds['id']}: {e}")
-
-                if df is None:
-                    db_data = _parse_json_col(ds.get("data"))
-                    if db_data and isinstance(db_data, list) and len(db_data) > 0:
-                        df = pd.DataFrame(db_data[:DATASET_DATA_ROW_CAP])
+                df = await _load_dataset_frame(ds)
 
                 if df is None:
                     continue
@@ -1007,6 +933,7 @@ async def verify_all_datasets(
                     dataset_id=ds["id"],
                     data=df,
                     schema=schema_col,
+                    quality_report=await get_dataset_quality(ds["id"], frame=df),
                 )
 
                 datasets_verified += 1
@@ -1044,18 +971,16 @@ async def verify_all_datasets(
                 avg_completeness = avg_uniqueness = avg_validity = 0.0
 
             # Update journey_progress
-            journey = _parse_json_col(project.get("journey_progress")) or {}
-            journey["bulkVerification"] = {
-                "datasetsVerified": datasets_verified,
-                "piiDetectedIn": pii_detected_in,
-                "verifiedAt": datetime.utcnow().isoformat(),
-            }
-            await session.execute(
-                sa_text(
-                    "UPDATE projects SET journey_progress = :jp, updated_at = NOW() "
-                    "WHERE id = :id"
-                ),
-                {"jp": json.dumps(journey), "id": project_id},
+            await patch_journey_progress(
+                session,
+                project_id,
+                set_values={
+                    "bulkVerification": {
+                        "datasetsVerified": datasets_verified,
+                        "piiDetectedIn": pii_detected_in,
+                        "verifiedAt": datetime.utcnow().isoformat(),
+                    },
+                },
             )
             await session.commit()
 
@@ -11,10 +11,18 @@ Last Updated: March 19, 2026
 # Data Processing Limits
 # ============================================================================
 
-# Maximum rows to store from uploaded files
-# Enforced across upload, verification, and transformation
+# Maximum rows read into memory when re-parsing an original upload file
+# (legacy fallback only -- ingestion itself streams every row to the
+# columnar store without a cap)
 DATASET_DATA_ROW_CAP = 10_000
 
+# Rows per chunk for streaming ingestion (uploads and connector cursors).
+# Bounds peak memory during ingestion regardless of dataset size.
+DATASET_INGEST_CHUNK_ROWS = 10_000
+
+# Rows sampled from the head of a dataset for column type inference
+DATASET_SCHEMA_SAMPLE_ROWS = 200
+
 # Default preview sizes for UI display
 DATASET_PREVIEW_ROWS = 100      # Standard preview for exploration
 DATASET_MINI_PREVIEW_ROWS = 10  # Mini preview for quick verification
@@ -22,6 +30,10 @@ DATASET_MINI_PREVIEW_ROWS = 10  # Mini preview for quick verification
 # Default sample size for PII detection and quality checks
 DATASET_SAMPLE_SIZE = 100
 
+# Rows per Parquet row group in the columnar dataset store.
+# Row-range reads only decode the groups they overlap.
+DATASET_STORE_ROW_GROUP_SIZE = 50_000
+
 # ============================================================================
 # Analysis Limits
 # ============================================================================
@@ -144,6 +156,9 @@ ALLOWED_UPLOAD_TYPES = ["csv", "xlsx", "xls", "json"]
 # Maximum file size (100 MB)
 MAX_UPLOAD_FILE_SIZE_BYTES = 100 * 1024 * 1024
 
+# Bytes copied per step when spooling an upload to disk
+UPLOAD_STREAM_CHUNK_BYTES = 1024 * 1024
+
 # ============================================================================
 # Database
 # ============================================================================
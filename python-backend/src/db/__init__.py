@@ -3,21 +3,33 @@ Database Connection and Session Management
 
 Provides async database connection with SQLAlchemy for FastAPI.
 Includes connection pooling, session dependency injection, and health checks.
+
+Pool configuration (environment):
+- DB_POOL_SIZE: persistent connections kept open (default 5)
+- DB_MAX_OVERFLOW: extra connections allowed under burst load (default 10)
+- DB_POOL_TIMEOUT: seconds to wait for a free connection (default 30)
+- DB_POOL_RECYCLE: seconds before a connection is replaced (default 1800)
+- DB_POOL_PRE_PING: test connections on checkout (default true)
+- DB_USE_NULL_POOL: disable pooling, e.g. behind PgBouncer in
+  transaction mode (default false)
 """
 
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Dict, Optional
 from contextlib import asynccontextmanager
 import logging
+import os
+import time
 
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     create_async_engine,
     async_sessionmaker,
 )
-from sqlalchemy.pool import NullPool, QueuePool
-from sqlalchemy import text
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+from sqlalchemy import event, text
 
 from ..models.database import Base
+from .schema_cache import invalidate_schema_cache
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +41,54 @@ logger = logging.getLogger(__name__)
 _engine = None
 _async_session_maker = None
 
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_USE_NULL_POOL = os.getenv("DB_USE_NULL_POOL", "false").lower() == "true"
+
+
+class _PoolCounters:
+    """Connection lifecycle counters fed by SQLAlchemy pool events"""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.connects = 0          # new physical connections (TCP + TLS + auth)
+        self.connect_time_ms = 0.0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+
+    def attach(self, sync_engine) -> None:
+        @event.listens_for(sync_engine, "do_connect")
+        def _on_do_connect(dialect, conn_rec, cargs, cparams):
+            conn_rec.info["_connect_started"] = time.perf_counter()
+
+        @event.listens_for(sync_engine.pool, "connect")
+        def _on_connect(dbapi_connection, connection_record):
+            self.connects += 1
+            started = connection_record.info.pop("_connect_started", None)
+            if started is not None:
+                self.connect_time_ms += (time.perf_counter() - started) * 1000
+
+        @event.listens_for(sync_engine.pool, "checkout")
+        def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+            self.checkouts += 1
+
+        @event.listens_for(sync_engine.pool, "checkin")
+        def _on_checkin(dbapi_connection, connection_record):
+            self.checkins += 1
+
+        @event.listens_for(sync_engine.pool, "invalidate")
+        def _on_invalidate(dbapi_connection, connection_record, exception):
+            self.invalidations += 1
+
+
+_pool_counters = _PoolCounters()
+
 
 def normalize_async_database_url(database_url: str) -> str:
     """Return a SQLAlchemy async PostgreSQL URL for common DATABASE_URL formats."""
@@ -43,16 +103,29 @@ def normalize_async_database_url(database_url: str) -> str:
     return database_url
 
 
-def init_database(database_url: str, pool_size: int = 5, max_overflow: int = 10) -> None:
+def init_database(
+    database_url: str,
+    pool_size: Optional[int] = None,
+    max_overflow: Optional[int] = None,
+    pool_timeout: Optional[float] = None,
+    pool_recycle: Optional[int] = None,
+    pool_pre_ping: Optional[bool] = None,
+    use_null_pool: Optional[bool] = None,
+) -> None:
     """
     Initialize the database engine and session maker.
 
-    Called during application startup.
+    Called during application startup. Arguments left as None fall back to
+    the DB_* environment settings (see module docstring).
 
     Args:
         database_url: Async PostgreSQL connection string (postgresql+asyncpg://...)
         pool_size: Number of connections to maintain in the pool
         max_overflow: Maximum overflow connections beyond pool_size
+        pool_timeout: Seconds to wait for a connection before failing
+        pool_recycle: Seconds after which a connection is replaced
+        pool_pre_ping: Validate connections on checkout
+        use_null_pool: Open a new connection per session (no pooling)
     """
     global _engine, _async_session_maker
 
@@ -63,21 +136,36 @@ def init_database(database_url: str, pool_size: int = 5, max_overflow: int = 10)
     database_url = normalize_async_database_url(database_url)
 
     # Configure engine with connection pooling
-    engine_kwargs = {
+    engine_kwargs: Dict[str, Any] = {
         "echo": False,  # Set to True for SQL query logging
         "future": True,
     }
 
-    # For async engines, use NullPool (no pooling) or special async pool
-    # The asyncpg driver manages its own connection pool internally
-    if "test" in database_url or "localhost" in database_url:
-        # Development/test: no pooling (asyncpg manages connections)
+    if DB_USE_NULL_POOL if use_null_pool is None else use_null_pool:
+        # Every session opens (and closes) its own connection. Only useful
+        # when an external pooler such as PgBouncer sits in front of Postgres.
         engine_kwargs["poolclass"] = NullPool
+        pool_description = "NullPool"
     else:
-        # Production: let asyncpg manage pooling
-        engine_kwargs["poolclass"] = NullPool
+        # SQLAlchemy does not pool asyncpg connections on its own: without a
+        # queue pool every session pays a full TCP + TLS + auth handshake.
+        engine_kwargs.update({
+            "poolclass": AsyncAdaptedQueuePool,
+            "pool_size": DB_POOL_SIZE if pool_size is None else pool_size,
+            "max_overflow": DB_MAX_OVERFLOW if max_overflow is None else max_overflow,
+            "pool_timeout": DB_POOL_TIMEOUT if pool_timeout is None else pool_timeout,
+            "pool_recycle": DB_POOL_RECYCLE if pool_recycle is None else pool_recycle,
+            "pool_pre_ping": DB_POOL_PRE_PING if pool_pre_ping is None else pool_pre_ping,
+        })
+        pool_description = (
+            f"AsyncAdaptedQueuePool(size={engine_kwargs['pool_size']}, "
+            f"overflow={engine_kwargs['max_overflow']}, recycle={engine_kwargs['pool_recycle']}s, "
+            f"pre_ping={engine_kwargs['pool_pre_ping']})"
+        )
 
     _engine = create_async_engine(database_url, **engine_kwargs)
+    _pool_counters.reset()
+    _pool_counters.attach(_engine.sync_engine)
     _async_session_maker = async_sessionmaker(
         _engine,
         class_=AsyncSession,
@@ -86,7 +174,51 @@ def init_database(database_url: str, pool_size: int = 5, max_overflow: int = 10)
         autoflush=False,
     )
 
-    logger.info(f"Database initialized: {database_url.split('@')[1] if '@' in database_url else 'unknown'}")
+    logger.info(
+        f"Database initialized: {database_url.split('@')[1] if '@' in database_url else 'unknown'} "
+        f"using {pool_description}"
+    )
+
+
+def get_pool_metrics() -> Dict[str, Any]:
+    """
+    Get connection pool metrics.
+
+    Returns:
+        Dict with the pool configuration, current occupancy and lifecycle
+        counters. `reuse_ratio` is the share of checkouts served by an
+        already-open connection; `avg_connect_ms` is the mean cost of a
+        new physical connection.
+    """
+    if _engine is None:
+        return {"initialized": False}
+
+    pool = _engine.pool
+    metrics: Dict[str, Any] = {
+        "initialized": True,
+        "pool_class": type(pool).__name__,
+        "connects": _pool_counters.connects,
+        "checkouts": _pool_counters.checkouts,
+        "checkins": _pool_counters.checkins,
+        "invalidations": _pool_counters.invalidations,
+        "avg_connect_ms": (
+            round(_pool_counters.connect_time_ms / _pool_counters.connects, 2)
+            if _pool_counters.connects else None
+        ),
+        "reuse_ratio": (
+            round(1 - min(_pool_counters.connects, _pool_counters.checkouts) / _pool_counters.checkouts, 4)
+            if _pool_counters.checkouts else None
+        ),
+    }
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        metrics.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "timeout": pool.timeout(),
+        })
+    return metrics
 
 
 async def close_database() -> None:
@@ -103,6 +235,7 @@ async def close_database() -> None:
     await _engine.dispose()
     _engine = None
     _async_session_maker = None
+    invalidate_schema_cache()
     logger.info("Database connections closed")
 
 
@@ -216,7 +349,8 @@ async def check_database_health() -> dict:
         return {
             "status": "healthy",
             "message": "Database connection OK",
-            "latency_ms": round(latency_ms, 2)
+            "latency_ms": round(latency_ms, 2),
+            "pool": get_pool_metrics(),
         }
     except Exception as e:
         logger.error(f"Database health check failed: {e}")
@@ -247,6 +381,7 @@ async def create_tables() -> None:
     async with _engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
+    invalidate_schema_cache()
     logger.info("Database tables created")
 
 
@@ -262,6 +397,7 @@ async def drop_tables() -> None:
     async with _engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
 
+    invalidate_schema_cache()
     logger.warning("All database tables dropped")
 
 
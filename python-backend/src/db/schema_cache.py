@@ -0,0 +1,198 @@
+"""
+Schema Introspection Cache
+
+Caches `information_schema.columns` lookups so request paths that adapt
+their SQL to optional columns do not pay a catalog round trip per call.
+
+Features:
+- Populated at startup for the tables that are probed on hot paths
+- Single-flight refresh: concurrent misses share one catalog query
+- Invalidated explicitly after in-process DDL (create_tables/drop_tables)
+- TTL expiry so migrations applied by another process (alembic, drizzle)
+  are picked up without a restart
+
+Usage:
+    from src.db.schema_cache import get_schema_cache
+
+    columns = await get_schema_cache().get_columns("datasets", session)
+    if "ingestion_metadata" in columns:
+        ...
+
+    # Columns the database fills in itself (serial, identity, DEFAULT ...)
+    generated = await get_schema_cache().get_generated_columns("column_embeddings", session)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
+
+from sqlalchemy import bindparam, text as sa_text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_CACHE_TTL_SECONDS = float(os.getenv("SCHEMA_CACHE_TTL_SECONDS", "600"))
+
+# Tables whose optional columns are probed on request paths
+WARM_TABLES: Tuple[str, ...] = ("datasets", "analysis_results")
+
+_COLUMNS_QUERY = sa_text(
+    "SELECT table_name, column_name FROM information_schema.columns "
+    "WHERE table_schema = ANY(current_schemas(false)) "
+    "AND table_name IN :tables"
+).bindparams(bindparam("tables", expanding=True))
+
+_GENERATED_COLUMNS_QUERY = sa_text(
+    "SELECT column_name FROM information_schema.columns "
+    "WHERE table_schema = ANY(current_schemas(false)) "
+    "AND table_name = :table "
+    "AND (column_default IS NOT NULL OR is_identity = 'YES')"
+)
+
+
+class SchemaCache:
+    """Process-wide cache of table -> column names"""
+
+    def __init__(self, ttl_seconds: float = SCHEMA_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._columns: Dict[str, Tuple[FrozenSet[str], float]] = {}
+        self._generated: Dict[str, Tuple[FrozenSet[str], float]] = {}
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _cached(
+        self,
+        table: str,
+        entries: Optional[Dict[str, Tuple[FrozenSet[str], float]]] = None,
+    ) -> Optional[FrozenSet[str]]:
+        entry = (self._columns if entries is None else entries).get(table)
+        if entry is None:
+            return None
+        columns, loaded_at = entry
+        if self.ttl_seconds > 0 and time.monotonic() - loaded_at > self.ttl_seconds:
+            return None
+        return columns
+
+    async def _load(self, tables: Iterable[str], session: Optional[AsyncSession]) -> None:
+        tables = list(dict.fromkeys(tables))
+        if session is None:
+            from . import get_db_context
+
+            async with get_db_context() as own_session:
+                result = await own_session.execute(_COLUMNS_QUERY, {"tables": tables})
+                rows = result.fetchall()
+        else:
+            result = await session.execute(_COLUMNS_QUERY, {"tables": tables})
+            rows = result.fetchall()
+
+        found: Dict[str, set] = {table: set() for table in tables}
+        for table_name, column_name in rows:
+            found.setdefault(table_name, set()).add(column_name)
+
+        loaded_at = time.monotonic()
+        for table, columns in found.items():
+            self._columns[table] = (frozenset(columns), loaded_at)
+
+    async def get_columns(self, table: str, session: Optional[AsyncSession] = None) -> FrozenSet[str]:
+        """
+        Get the column names of a table.
+
+        Args:
+            table: Table name (current search_path)
+            session: Optional open session to reuse on a cache miss
+
+        Returns:
+            Frozen set of column names (empty if the table does not exist)
+        """
+        columns = self._cached(table)
+        if columns is not None:
+            self.hits += 1
+            return columns
+
+        async with self._lock:
+            # Another coroutine may have refreshed while we waited
+            columns = self._cached(table)
+            if columns is not None:
+                self.hits += 1
+                return columns
+            self.misses += 1
+            await self._load([table], session)
+            return self._columns[table][0]
+
+    async def get_generated_columns(self, table: str, session: Optional[AsyncSession] = None) -> FrozenSet[str]:
+        """
+        Get the columns of a table the database fills in on INSERT.
+
+        These have a column default (serial sequences, DEFAULT expressions)
+        or are identity columns, so inserts may omit them.
+        """
+        columns = self._cached(table, self._generated)
+        if columns is not None:
+            self.hits += 1
+            return columns
+
+        async with self._lock:
+            columns = self._cached(table, self._generated)
+            if columns is not None:
+                self.hits += 1
+                return columns
+            self.misses += 1
+            if session is None:
+                from . import get_db_context
+
+                async with get_db_context() as own_session:
+                    result = await own_session.execute(_GENERATED_COLUMNS_QUERY, {"table": table})
+                    rows = result.fetchall()
+            else:
+                result = await session.execute(_GENERATED_COLUMNS_QUERY, {"table": table})
+                rows = result.fetchall()
+            columns = frozenset(row[0] for row in rows)
+            self._generated[table] = (columns, time.monotonic())
+            return columns
+
+    async def warm(self, tables: Iterable[str] = WARM_TABLES) -> None:
+        """Load the given tables in one catalog query (used at startup)"""
+        async with self._lock:
+            await self._load(tables, None)
+        logger.info(f"Schema cache warmed for {len(self._columns)} tables")
+
+    def invalidate(self, table: Optional[str] = None) -> None:
+        """Drop one table (or every table) from the cache"""
+        if table is None:
+            self._columns.clear()
+            self._generated.clear()
+        else:
+            self._columns.pop(table, None)
+            self._generated.pop(table, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "tables": sorted(self._columns),
+            "hits": self.hits,
+            "misses": self.misses,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+# ============================================================================
+# Singleton Instance
+# ============================================================================
+
+_schema_cache_instance: Optional[SchemaCache] = None
+
+
+def get_schema_cache() -> SchemaCache:
+    """Get or create the schema cache singleton"""
+    global _schema_cache_instance
+    if _schema_cache_instance is None:
+        _schema_cache_instance = SchemaCache()
+    return _schema_cache_instance
+
+
+def invalidate_schema_cache(table: Optional[str] = None) -> None:
+    """Invalidate cached columns, e.g. after a migration"""
+    if _schema_cache_instance is not None:
+        _schema_cache_instance.invalidate(table)
@@ -11,7 +11,9 @@ FastAPI application with:
 Architecture: Python + LangChain + Pydantic + FastAPI + PostgreSQL
 """
 
+import asyncio
 from contextlib import asynccontextmanager
+from functools import partial
 from typing import AsyncGenerator, Dict, Optional, Any, Set, List
 import logging
 import os
@@ -178,17 +180,17 @@ async def initialize_services():
     # Initialize database first (other services may depend on it)
     from .db import init_database, check_database_health
     try:
-        init_database(
-            database_url=settings.DATABASE_URL,
-            pool_size=5,
-            max_overflow=10
-        )
+        # Pool sizing comes from the DB_POOL_* environment settings
+        init_database(database_url=settings.DATABASE_URL)
         logger.info("Database connection initialized")
 
         # Check database health
         db_health = await check_database_health()
         if db_health["status"] == "healthy":
             logger.info(f"Database health check passed: {db_health['latency_ms']}ms latency")
+            # Column probes on request paths are served from this cache
+            from .db.schema_cache import get_schema_cache
+            await get_schema_cache().warm()
         else:
             logger.warning(f"Database health check warning: {db_health['message']}")
     except Exception as e:
@@ -207,6 +209,15 @@ async def initialize_services():
     orchestrator = get_orchestrator()
     logger.info("Agent orchestrator initialized")
 
+    # Relay WebSocket broadcasts between workers (WS_BROADCAST_BACKEND)
+    from .websocket.broadcast_backend import create_broadcast_backend
+    try:
+        await connection_manager.start_backend(
+            create_broadcast_backend(database_url=settings.DATABASE_URL)
+        )
+    except Exception as e:
+        logger.error(f"WebSocket broadcast backend unavailable, broadcasts stay in-process: {e}")
+
     # Initialize WebSocket agent bridge
     from .websocket import initialize_agent_bridge
     agent_bridge = initialize_agent_bridge(connection_manager)
@@ -236,6 +247,13 @@ async def initialize_services():
     registry = get_business_registry()
     logger.info(f"Business definitions registry: {len(registry.definitions)} definitions")
 
+    # Pre-warm analysis worker processes (imports pandas/scipy/sklearn once)
+    from .services.analysis_worker_pool import get_analysis_worker_pool
+    try:
+        await get_analysis_worker_pool().start()
+    except Exception as e:
+        logger.warning(f"Analysis worker pool warm-up failed (will start on first use): {e}")
+
     if getattr(app.state, "routes_registered", False):
         logger.info("API routes already registered")
         validate_environment()
@@ -342,6 +360,25 @@ async def cleanup_services():
 
     Called on application shutdown
     """
+    from .services.analysis_worker_pool import shutdown_analysis_worker_pool
+    shutdown_analysis_worker_pool()
+    logger.info("Analysis worker pool stopped")
+
+    from .services.llm_gateway import shutdown_llm_gateway
+    await shutdown_llm_gateway()
+
+    from .services.activity_log import shutdown_activity_log
+    await shutdown_activity_log()
+
+    # Write-behind evidence links must reach the database before it closes
+    from .services.rag_evidence_chain import shutdown_evidence_chain_service
+    await shutdown_evidence_chain_service()
+
+    # Deliver coalesced progress updates, then queued WebSocket messages
+    from .services.progress_bus import shutdown_progress_bus
+    await shutdown_progress_bus()
+    await connection_manager.close_all()
+
     from .db import close_database
     await close_database()
     logger.info("Database connections closed")
@@ -439,9 +476,26 @@ class ConnectionManager:
     - Project-specific: Send to all sessions viewing a project
     - User-specific: Send to all sessions for a user
     - Global: Send to all connected sessions
+
+    Sends never await a client: each socket has a bounded queue drained by
+    its own writer task (see src/websocket/fanout.py), so one slow viewer
+    cannot hold up a broadcast or the agent step emitting it.
+
+    With a distributed broadcast backend (WS_BROADCAST_BACKEND, see
+    src/websocket/broadcast_backend.py) broadcasts, and messages for
+    sessions connected to another worker, are relayed to every worker.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_queue_size: Optional[int] = None,
+        slow_consumer_policy: Optional[str] = None,
+        send_timeout: Optional[float] = None
+    ):
+        from .websocket.fanout import (
+            WS_SEND_QUEUE_SIZE, WS_SLOW_CONSUMER_POLICY, WS_SEND_TIMEOUT_SECONDS
+        )
+
         # Core storage
         self.active_connections: Dict[str, WebSocket] = {}
         self.session_info: Dict[str, Dict[str, Any]] = {}
@@ -450,6 +504,58 @@ class ConnectionManager:
         self.project_connections: Dict[str, Set[str]] = {}  # project_id -> session_ids
         self.user_connections: Dict[str, Set[str]] = {}     # user_id -> session_ids
 
+        # Outbound queue + writer task per session
+        self.clients: Dict[str, Any] = {}
+        self.max_queue_size = max_queue_size or WS_SEND_QUEUE_SIZE
+        self.slow_consumer_policy = slow_consumer_policy or WS_SLOW_CONSUMER_POLICY
+        self.send_timeout = send_timeout or WS_SEND_TIMEOUT_SECONDS
+        self.stats = {"broadcasts": 0, "messages": 0, "slow_disconnects": 0, "remote_messages": 0}
+        # Counters of clients that have already disconnected
+        self._closed_client_stats = {"sent": 0, "dropped": 0, "coalesced": 0}
+
+        # Cross-worker delivery; in-process until start_backend() is called
+        from .websocket.broadcast_backend import BroadcastBackend, new_worker_id
+        self.worker_id = new_worker_id()
+        self.backend = BroadcastBackend()
+
+    async def start_backend(self, backend: Any):
+        """Relay broadcasts through a cross-worker backend."""
+        await backend.start(self._on_remote_envelope)
+        self.backend = backend
+        logger.info(f"WebSocket broadcast backend: {backend.name} (worker {self.worker_id})")
+
+    async def _publish_remote(self, target: str, key: Optional[str], message: dict):
+        """Hand a message to the other workers (no-op for the in-process backend)"""
+        if not self.backend.distributed:
+            return
+        await self.backend.publish({
+            "origin": self.worker_id,
+            "target": target,
+            "key": key,
+            "message": message
+        })
+
+    async def _on_remote_envelope(self, envelope: Dict[str, Any]):
+        """Deliver a message published by another worker to local sessions"""
+        if envelope.get("origin") == self.worker_id:
+            return
+        target = envelope.get("target")
+        key = envelope.get("key")
+        if target == "all":
+            session_ids = list(self.clients)
+        elif target == "project":
+            session_ids = list(self.project_connections.get(key, ()))
+        elif target == "user":
+            session_ids = list(self.user_connections.get(key, ()))
+        elif target == "session":
+            session_ids = [key] if key in self.clients else []
+        else:
+            logger.warning(f"Unknown broadcast target: {target}")
+            return
+        if session_ids:
+            self.stats["remote_messages"] += 1
+            await self._fan_out(session_ids, envelope.get("message") or {})
+
     async def connect(
         self,
         websocket: WebSocket,
@@ -466,10 +572,24 @@ class ConnectionManager:
             project_id: Optional project ID for project-based routing
             user_id: Optional user ID for user-based routing
         """
+        from .websocket.fanout import ClientConnection
+
         await websocket.accept()
 
+        # A reconnect under the same session id replaces the old socket
+        if session_id in self.active_connections:
+            self.disconnect(session_id)
+
         # Store connection
         self.active_connections[session_id] = websocket
+        self.clients[session_id] = ClientConnection(
+            websocket,
+            session_id,
+            max_queue_size=self.max_queue_size,
+            policy=self.slow_consumer_policy,
+            send_timeout=self.send_timeout,
+            on_closed=self._client_closed
+        )
 
         # Store session metadata
         self.session_info[session_id] = {
@@ -501,6 +621,13 @@ class ConnectionManager:
         project_id = info.get("project_id")
         user_id = info.get("user_id")
 
+        # Stop the writer task; queued messages are discarded
+        client = self.clients.pop(session_id, None)
+        if client is not None:
+            client.close()
+            for key in self._closed_client_stats:
+                self._closed_client_stats[key] += client.stats[key]
+
         # Remove from active connections
         if session_id in self.active_connections:
             del self.active_connections[session_id]
@@ -523,41 +650,57 @@ class ConnectionManager:
 
         logger.info(f"WebSocket disconnected: session_id={session_id}")
 
+    def _client_closed(self, client: Any):
+        """Writer failed or client fell behind: drop the session if still current"""
+        if self.clients.get(client.session_id) is client:
+            if client.policy == "disconnect" or client.stalled:
+                self.stats["slow_disconnects"] += 1
+            self.disconnect(client.session_id)
+
+    async def _fan_out(self, session_ids: List[str], message: dict) -> int:
+        """
+        Queue one message for several sessions.
+
+        The message is wrapped (and serialized) once for all recipients.
+        Returns the number of sessions it was queued for.
+        """
+        from .websocket.fanout import OutboundMessage
+
+        outbound = OutboundMessage(message)
+        queued = 0
+        for session_id in session_ids:
+            client = self.clients.get(session_id)
+            if client is not None and client.enqueue(outbound):
+                queued += 1
+        self.stats["messages"] += queued
+
+        # Let idle writers pick the message up before the caller moves on
+        if queued:
+            await asyncio.sleep(0)
+        return queued
+
     async def send_message(self, session_id: str, message: dict):
         """
         Send a message to a specific session.
 
-        Returns False if session not found or send failed.
+        Returns False if session not found or the client was disconnected
+        for falling behind. Delivery happens on the session's writer task.
+        Sessions of other workers are reached through the broadcast backend.
         """
-        if session_id not in self.active_connections:
-            return False
-
-        try:
-            websocket = self.active_connections[session_id]
-            await websocket.send_json(message)
-            return True
-        except Exception as e:
-            logger.warning(f"Failed to send message to session {session_id}: {e}")
-            self.disconnect(session_id)
+        if session_id not in self.clients:
+            await self._publish_remote("session", session_id, message)
             return False
+        return await self._fan_out([session_id], message) == 1
 
     async def broadcast(self, message: dict):
         """
         Broadcast a message to all connected sessions.
 
-        Automatically cleans up disconnected sessions.
+        Sessions whose writer fails are disconnected automatically.
         """
-        disconnected = []
-        for session_id, websocket in self.active_connections.items():
-            try:
-                await websocket.send_json(message)
-            except Exception as e:
-                logger.warning(f"Broadcast failed for session {session_id}: {e}")
-                disconnected.append(session_id)
-
-        # Clean up disconnected sessions
-        for session_id in disconnected:
-            self.disconnect(session_id)
+        self.stats["broadcasts"] += 1
+        await self._fan_out(list(self.clients), message)
+        await self._publish_remote("all", None, message)
 
     async def broadcast_to_project(self, project_id: str, message: dict):
         """
@@ -567,13 +710,13 @@ class ConnectionManager:
             project_id: Project ID to broadcast to
             message: Message to broadcast
         """
+        self.stats["broadcasts"] += 1
+        await self._publish_remote("project", project_id, message)
         if project_id not in self.project_connections:
             logger.debug(f"No connections for project {project_id}")
             return
 
-        session_ids = list(self.project_connections[project_id])
-        for session_id in session_ids:
-            await self.send_message(session_id, message)
+        await self._fan_out(list(self.project_connections[project_id]), message)
 
     async def broadcast_to_user(self, user_id: str, message: dict):
         """
@@ -583,13 +726,31 @@ class ConnectionManager:
             user_id: User ID to broadcast to
             message: Message to broadcast
         """
+        self.stats["broadcasts"] += 1
+        await self._publish_remote("user", user_id, message)
         if user_id not in self.user_connections:
             logger.debug(f"No connections for user {user_id}")
             return
 
-        session_ids = list(self.user_connections[user_id])
-        for session_id in session_ids:
-            await self.send_message(session_id, message)
+        await self._fan_out(list(self.user_connections[user_id]), message)
+
+    async def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Wait for every queued message to be written.
+
+        Returns False if some client did not drain within the timeout.
+        """
+        results = await asyncio.gather(
+            *(client.drain(timeout) for client in list(self.clients.values()))
+        )
+        return all(results)
+
+    async def close_all(self, timeout: float = 2.0):
+        """Flush pending messages, then stop every writer task and the backend."""
+        await self.flush(timeout)
+        for session_id in list(self.clients):
+            self.disconnect(session_id)
+        await self.backend.stop()
 
     def get_connection_count(self) -> int:
         """Get total number of active connections."""
@@ -603,6 +764,21 @@ class ConnectionManager:
         """Get number of connections for a specific user."""
         return len(self.user_connections.get(user_id, set()))
 
+    def get_stats(self) -> Dict[str, Any]:
+        """Connection, queue and slow-consumer counters."""
+        totals = dict(self._closed_client_stats)
+        for client in self.clients.values():
+            for key in totals:
+                totals[key] += client.stats[key]
+        return {
+            "connections": len(self.clients),
+            "queued": sum(client.queued for client in self.clients.values()),
+            "slow_consumer_policy": self.slow_consumer_policy,
+            "broadcast_backend": self.backend.get_stats(),
+            **self.stats,
+            **totals
+        }
+
 
 connection_manager = ConnectionManager()
 
@@ -630,16 +806,26 @@ async def emit_progress(
         progress: Progress percentage (0-100)
         message: Human-readable progress message
         data: Optional additional data
+
+    Updates for the same session and step are coalesced by the progress
+    bus (PROGRESS_FRAME_INTERVAL_MS); the 100% update is always delivered.
     """
-    await connection_manager.send_message(session_id, {
-        "type": "progress",
-        "session_id": session_id,
-        "step": step,
-        "progress": progress,
-        "message": message,
-        "data": data or {},
-        "timestamp": datetime.utcnow().isoformat()
-    })
+    from .services.progress_bus import get_progress_bus
+
+    await get_progress_bus().publish(
+        (session_id, step),
+        {
+            "type": "progress",
+            "session_id": session_id,
+            "step": step,
+            "progress": progress,
+            "message": message,
+            "data": data or {},
+            "timestamp": datetime.utcnow().isoformat()
+        },
+        partial(connection_manager.send_message, session_id),
+        terminal=progress >= 100
+    )
 
 
 async def emit_error(
@@ -657,14 +843,21 @@ async def emit_error(
         error: Error message
         data: Optional additional data
     """
-    await connection_manager.send_message(session_id, {
-        "type": "error",
-        "session_id": session_id,
-        "step": step,
-        "error": error,
-        "data": data or {},
-        "timestamp": datetime.utcnow().isoformat()
-    })
+    from .services.progress_bus import get_progress_bus
+
+    await get_progress_bus().publish(
+        (session_id, step),
+        {
+            "type": "error",
+            "session_id": session_id,
+            "step": step,
+            "error": error,
+            "data": data or {},
+            "timestamp": datetime.utcnow().isoformat()
+        },
+        partial(connection_manager.send_message, session_id),
+        terminal=True
+    )
 
 
 async def emit_completion(
@@ -682,14 +875,21 @@ async def emit_completion(
         message: Human-readable completion message
         results: Optional results data
     """
-    await connection_manager.send_message(session_id, {
-        "type": "complete",
-        "session_id": session_id,
-        "step": step,
-        "message": message,
-        "results": results or {},
-        "timestamp": datetime.utcnow().isoformat()
-    })
+    from .services.progress_bus import get_progress_bus
+
+    await get_progress_bus().publish(
+        (session_id, step),
+        {
+            "type": "complete",
+            "session_id": session_id,
+            "step": step,
+            "message": message,
+            "results": results or {},
+            "timestamp": datetime.utcnow().isoformat()
+        },
+        partial(connection_manager.send_message, session_id),
+        terminal=True
+    )
 
 
 @app.websocket("/ws/{session_id}")
@@ -901,6 +1101,9 @@ async def health_check():
     Returns service health status including database connectivity.
     """
     from .db import check_database_health
+    from .services.activity_log import get_activity_log
+    from .services.progress_bus import get_progress_bus
+    from .services.rag_evidence_chain import get_evidence_chain_stats
 
     # Check database health
     db_health = await check_database_health()
@@ -916,6 +1119,7 @@ async def health_check():
             "api": "up",
             "database": db_health["status"],
             "database_latency_ms": db_health.get("latency_ms"),
+            "database_pool": db_health.get("pool"),
             "orchestrator": "up",
             "semantic_matching": "up",
             "evidence_chain": "up",
@@ -924,6 +1128,10 @@ async def health_check():
             "knowledge_service": "up",
             "admin_service": "up"
         },
+        "evidence_chain": get_evidence_chain_stats(),
+        "websocket": connection_manager.get_stats(),
+        "progress": get_progress_bus().get_stats(),
+        "activity_log": get_activity_log().get_stats(),
         "timestamp": datetime.utcnow().isoformat()
     }
 
@@ -90,6 +90,8 @@ class Project(Base):
     industry = Column(String(100))
     journey_step = Column(String(50))
     journey_progress = Column(JSON, nullable=True)
+    # Bumped by every journey_progress patch (optimistic concurrency)
+    journey_progress_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=False), default=datetime.utcnow)
     updated_at = Column(DateTime(timezone=False), default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -295,6 +297,7 @@ class EvidenceLink(Base):
     confidence = Column(Float)
     data_metadata = Column("metadata", JSON, nullable=True)
     created_at = Column(DateTime(timezone=False), default=datetime.utcnow)
+    revision = Column(Integer, nullable=False, default=1, server_default="1")  # Bumped by every upsert
 
     # Relationships
     project = relationship("Project")
@@ -306,6 +309,29 @@ class EvidenceLink(Base):
     )
 
 
+# ============================================================================
+# Agent Activity Table
+# ============================================================================
+
+class AgentActivity(Base):
+    """Agent activity log entries (written behind by the activity log service)"""
+    __tablename__ = "agent_activities"
+
+    id = Column(String(36), primary_key=True)
+    # No foreign key: activities are batched and may name projects that are
+    # not (yet) visible to the flushing transaction
+    project_id = Column(String(36), nullable=False)
+    agent = Column(String(64), nullable=False)
+    action = Column(String(100), nullable=False)
+    detail = Column(Text)
+    created_at = Column(DateTime(timezone=False), default=datetime.utcnow, nullable=False)
+
+    # Indexes
+    __table_args__ = (
+        Index('ix_agent_activities_project_created', 'project_id', 'created_at', 'id'),
+    )
+
+
 # ============================================================================
 # Artifact Table
 # ============================================================================
@@ -402,6 +428,7 @@ class ColumnEmbedding(Base):
     column_name = Column(String(255), nullable=False)
     embedding = Column(JSON)  # Vector as list of floats
     embedding_model = Column(String(50))
+    content_hash = Column(String(64))  # sha256 of model + embedded text
     created_at = Column(DateTime(timezone=False), default=datetime.utcnow)
 
     # Relationships
@@ -412,6 +439,7 @@ class ColumnEmbedding(Base):
         Index('ix_column_embeddings_dataset_id', 'dataset_id'),
         Index('ix_column_embeddings_column_name', 'column_name'),
         Index('ix_column_embeddings_model', 'embedding_model'),
+        Index('ix_column_embeddings_model_content_hash', 'embedding_model', 'content_hash'),
     )
 
 
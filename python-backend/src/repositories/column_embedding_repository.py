@@ -4,11 +4,86 @@ Column Embedding Repository
 Handles column embedding database operations for semantic matching.
 """
 
-from typing import Optional, List, Dict, Any
+import logging
+import os
+import uuid
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
 
+from sqlalchemy import text as sa_text
+
 from .base_repository import BaseRepository
 from ..models.database import jsonb_dumps, jsonb_loads
+from ..services.vector_index import VectorIndex
+
+logger = logging.getLogger(__name__)
+
+# Dimension of the pgvector `embedding_vector` column (vector(1536));
+# embeddings of other sizes are searched in-process
+PGVECTOR_DIMENSIONS = int(os.getenv("PGVECTOR_DIMENSIONS", "1536"))
+# HNSW candidate list size per query across all datasets (pgvector default is 40)
+PGVECTOR_EF_SEARCH = int(os.getenv("PGVECTOR_EF_SEARCH", "100"))
+# Memory budget for the in-process fallback index
+COLUMN_VECTOR_INDEX_MAX_BYTES = int(os.getenv("COLUMN_VECTOR_INDEX_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+# ============================================================================
+# In-process Vector Index
+# ============================================================================
+
+_column_vector_index: Optional[VectorIndex] = None
+# dataset_id -> ((row count, latest created_at), collection names)
+_indexed_datasets: Dict[str, Tuple[Tuple[int, str], List[str]]] = {}
+
+
+def get_column_vector_index() -> VectorIndex:
+    """Get or create the in-process column vector index"""
+    global _column_vector_index
+    if _column_vector_index is None:
+        _column_vector_index = VectorIndex(max_bytes=COLUMN_VECTOR_INDEX_MAX_BYTES)
+    return _column_vector_index
+
+
+def _collection_name(dataset_id: str, dimension: int) -> str:
+    return f"{dataset_id}:{dimension}"
+
+
+def _is_indexed(index: VectorIndex, dataset_id: str, version: Tuple[int, str]) -> bool:
+    entry = _indexed_datasets.get(dataset_id)
+    if entry is None or entry[0] != version:
+        return False
+    # Collections may have been evicted under the memory budget
+    return all(index.get(name) is not None for name in entry[1])
+
+
+def _pgvector_scope(dataset_id: Optional[str]) -> Tuple[str, Dict[str, Any]]:
+    """
+    WITH clause defining `scoped`, the rows a pgvector search ranks.
+
+    A dataset-scoped search ranks that dataset's rows exactly: the
+    MATERIALIZED CTE keeps the planner off the global HNSW index, whose
+    approximate scan returns ~ef_search candidates from every dataset before
+    the dataset filter runs, so small datasets in a large table came back
+    short or empty. Unscoped searches use the index.
+    """
+    where = "embedding_vector IS NOT NULL"
+    params: Dict[str, Any] = {}
+    if dataset_id:
+        where += " AND dataset_id = :dataset_id"
+        params["dataset_id"] = dataset_id
+    materialized = "MATERIALIZED " if dataset_id else ""
+    return (
+        f"WITH scoped AS {materialized}("
+        "SELECT id, dataset_id, column_name, embedding_vector "
+        f"FROM column_embeddings WHERE {where}) "
+    ), params
+
+
+def _drop_dataset_from_index(dataset_id: str) -> None:
+    entry = _indexed_datasets.pop(str(dataset_id), None)
+    if entry is not None and _column_vector_index is not None:
+        for name in entry[1]:
+            _column_vector_index.drop(name)
 
 
 class ColumnEmbedding(BaseRepository):
@@ -134,74 +209,386 @@ class ColumnEmbeddingRepository(BaseRepository[ColumnEmbedding]):
         self,
         query_embedding: List[float],
         dataset_id: Optional[str] = None,
-        limit: int = 10
+        limit: int = 10,
+        backend: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
-        Search for columns with similar embeddings
-        Uses cosine similarity
+        Search for columns with similar embeddings (cosine similarity)
+
+        Uses the pgvector HNSW index when the table has an `embedding_vector`
+        column and the query has PGVECTOR_DIMENSIONS dimensions; otherwise
+        answers from an in-process matrix per dataset, reloaded only when the
+        dataset's stored embeddings change.
 
         Args:
             query_embedding: Query embedding vector
             dataset_id: Optional dataset filter
             limit: Maximum results
+            backend: Force "pgvector" or "memory" (None = pick automatically)
 
         Returns:
-            List of columns with similarity scores
+            List of columns with similarity scores, most similar first
         """
-        # This is a simplified implementation
-        # In production, would use pgvector's cosine distance
-
-        base_query = """
-            SELECT id, dataset_id, column_name, embedding, embedding_model
-            FROM column_embeddings
+        from ..db import get_db_context
+        from ..db.schema_cache import get_schema_cache
+
+        if not query_embedding or limit <= 0:
+            return []
+
+        async with get_db_context() as session:
+            if backend is None:
+                columns = await get_schema_cache().get_columns(self.table_name, session)
+                use_pgvector = (
+                    "embedding_vector" in columns
+                    and len(query_embedding) == PGVECTOR_DIMENSIONS
+                )
+                backend = "pgvector" if use_pgvector else "memory"
+
+            if backend == "pgvector":
+                return await self._search_pgvector(session, query_embedding, dataset_id, limit)
+            return await self._search_in_process(session, query_embedding, dataset_id, limit)
+
+    async def search_similar_columns_many(
+        self,
+        query_embeddings: List[List[float]],
+        dataset_id: Optional[str] = None,
+        limit: int = 10,
+    ) -> List[List[Dict[str, Any]]]:
         """
+        search_similar_columns for several queries in one round trip
 
-        params = []
-        if dataset_id:
-            base_query += " WHERE dataset_id = $1"
-            params.append(dataset_id)
-        else:
-            base_query += " WHERE dataset_id IS NOT NULL"
-
-        query = base_query + f" LIMIT {limit * 10}"  # Get more for calculation
-        records = await self._db_manager.fetch(query, *params)
-
-        # Calculate cosine similarity
-        import numpy as np
+        pgvector answers every query with one LATERAL top-k statement; the
+        in-process index refreshes the dataset matrices once and scores all
+        queries with one matrix product per dataset.
 
-        results = []
-        query_vec = np.array(query_embedding)
+        Returns:
+            One result list per query, most similar first
+        """
+        from ..db import get_db_context
+        from ..db.schema_cache import get_schema_cache
+
+        if not query_embeddings or limit <= 0:
+            return [[] for _ in query_embeddings]
+
+        dimensions = {len(query) for query in query_embeddings}
+        async with get_db_context() as session:
+            columns = await get_schema_cache().get_columns(self.table_name, session)
+            if "embedding_vector" in columns and dimensions == {PGVECTOR_DIMENSIONS}:
+                return await self._search_pgvector_many(session, query_embeddings, dataset_id, limit)
+
+            index = get_column_vector_index()
+            versions = await self._dataset_versions(session, dataset_id)
+            results: List[List[Dict[str, Any]]] = [[] for _ in query_embeddings]
+            for dimension in dimensions:
+                positions = [i for i, query in enumerate(query_embeddings) if len(query) == dimension]
+                names = [_collection_name(ds, dimension) for ds in versions]
+                with index.pinned(names):
+                    await self._refresh_vector_index(session, index, dataset_id, versions)
+                    hit_lists = index.search_many(
+                        [query_embeddings[i] for i in positions], k=limit, collections=names
+                    )
+                for position, hits in zip(positions, hit_lists):
+                    results[position] = [
+                        {
+                            'id': hit.id,
+                            'dataset_id': hit.payload['dataset_id'],
+                            'column_name': hit.payload['column_name'],
+                            'similarity': hit.score
+                        }
+                        for hit in hits
+                    ]
+            return results
+
+    async def _search_pgvector_many(
+        self,
+        session,
+        query_embeddings: List[List[float]],
+        dataset_id: Optional[str],
+        limit: int
+    ) -> List[List[Dict[str, Any]]]:
+        """Per-query top-k from one statement (a LATERAL scan per query, see _pgvector_scope)"""
+        scope, params = _pgvector_scope(dataset_id)
+        params.update({
+            "queries": [jsonb_dumps(list(query)) for query in query_embeddings],
+            "limit": limit,
+        })
+
+        if not dataset_id:
+            await session.execute(sa_text(f"SET LOCAL hnsw.ef_search = {int(PGVECTOR_EF_SEARCH)}"))
+        result = await session.execute(
+            sa_text(
+                f"{scope}"
+                "SELECT q.position, m.id, m.dataset_id, m.column_name, m.similarity "
+                "FROM unnest(CAST(:queries AS text[])) WITH ORDINALITY AS q(query, position) "
+                "CROSS JOIN LATERAL ("
+                "SELECT c.id, c.dataset_id, c.column_name, "
+                "1 - (c.embedding_vector <=> CAST(q.query AS vector)) AS similarity "
+                "FROM scoped c "
+                "ORDER BY c.embedding_vector <=> CAST(q.query AS vector) "
+                "LIMIT :limit"
+                ") AS m "
+                "ORDER BY q.position, m.similarity DESC"
+            ),
+            params,
+        )
+        results: List[List[Dict[str, Any]]] = [[] for _ in query_embeddings]
+        for position, row_id, row_dataset_id, column_name, similarity in result.fetchall():
+            results[int(position) - 1].append({
+                'id': row_id,
+                'dataset_id': row_dataset_id,
+                'column_name': column_name,
+                'similarity': float(similarity)
+            })
+        return results
 
-        for record in records:
-            emb = record.get('embedding')
-            if emb:
-                emb_vec = np.array(emb)
+    async def _search_pgvector(
+        self,
+        session,
+        query_embedding: List[float],
+        dataset_id: Optional[str],
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """Top-k via `<=>` ordering on the vector column (see _pgvector_scope)"""
+        scope, params = _pgvector_scope(dataset_id)
+        params.update({"query": jsonb_dumps(list(query_embedding)), "limit": limit})
+
+        if not dataset_id:
+            await session.execute(sa_text(f"SET LOCAL hnsw.ef_search = {int(PGVECTOR_EF_SEARCH)}"))
+        result = await session.execute(
+            sa_text(
+                f"{scope}"
+                "SELECT id, dataset_id, column_name, "
+                "1 - (embedding_vector <=> CAST(CAST(:query AS text) AS vector)) AS similarity "
+                "FROM scoped "
+                "ORDER BY embedding_vector <=> CAST(CAST(:query AS text) AS vector) "
+                "LIMIT :limit"
+            ),
+            params,
+        )
+        return [
+            {
+                'id': row_id,
+                'dataset_id': row_dataset_id,
+                'column_name': column_name,
+                'similarity': float(similarity)
+            }
+            for row_id, row_dataset_id, column_name, similarity in result.fetchall()
+        ]
+
+    async def _search_in_process(
+        self,
+        session,
+        query_embedding: List[float],
+        dataset_id: Optional[str],
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """Top-k via one matmul per dataset matrix"""
+        index = get_column_vector_index()
+        versions = await self._dataset_versions(session, dataset_id)
+        names = [_collection_name(ds, len(query_embedding)) for ds in versions]
+
+        # Pinned so loading later datasets cannot evict earlier ones under
+        # the memory budget before the search has scored them
+        with index.pinned(names):
+            await self._refresh_vector_index(session, index, dataset_id, versions)
+            hits = index.search(query_embedding, k=limit, collections=names)
+        return [
+            {
+                'id': hit.id,
+                'dataset_id': hit.payload['dataset_id'],
+                'column_name': hit.payload['column_name'],
+                'similarity': hit.score
+            }
+            for hit in hits
+        ]
+
+    async def _dataset_versions(self, session, dataset_id: Optional[str]) -> Dict[str, Tuple[int, str]]:
+        """(row count, latest created_at) per dataset in scope; writes bump either"""
+        where = "WHERE dataset_id = :dataset_id" if dataset_id else "WHERE dataset_id IS NOT NULL"
+        params = {"dataset_id": dataset_id} if dataset_id else {}
+        result = await session.execute(
+            sa_text(
+                "SELECT dataset_id, COUNT(*), MAX(created_at) "
+                f"FROM column_embeddings {where} GROUP BY dataset_id"
+            ),
+            params,
+        )
+        return {str(ds): (int(count), str(latest)) for ds, count, latest in result.fetchall()}
+
+    async def _refresh_vector_index(
+        self,
+        session,
+        index: VectorIndex,
+        dataset_id: Optional[str],
+        versions: Dict[str, Tuple[int, str]],
+    ) -> None:
+        """
+        Make sure the in-process index holds current matrices for the datasets
+        in scope (`versions`), reloading only those whose stored rows changed.
+        """
+        stale = [ds for ds, version in versions.items() if not _is_indexed(index, ds, version)]
+        if stale:
+            result = await session.execute(
+                sa_text(
+                    "SELECT id, dataset_id, column_name, embedding FROM column_embeddings "
+                    "WHERE dataset_id = ANY(:dataset_ids)"
+                ),
+                {"dataset_ids": stale},
+            )
+            grouped: Dict[str, Dict[int, Dict[str, list]]] = {}
+            for row_id, row_dataset_id, column_name, embedding in result.fetchall():
+                vector = jsonb_loads(embedding) if isinstance(embedding, str) else embedding
+                if not vector:
+                    continue
+                by_dim = grouped.setdefault(str(row_dataset_id), {}).setdefault(
+                    len(vector), {"ids": [], "vectors": [], "payloads": []}
+                )
+                by_dim["ids"].append(row_id)
+                by_dim["vectors"].append(vector)
+                by_dim["payloads"].append({"dataset_id": row_dataset_id, "column_name": column_name})
+
+            for ds in stale:
+                _drop_dataset_from_index(ds)
+                names = []
+                for dimension, entry in grouped.get(ds, {}).items():
+                    name = _collection_name(ds, dimension)
+                    index.replace(name, entry["ids"], entry["vectors"], entry["payloads"])
+                    names.append(name)
+                _indexed_datasets[ds] = (versions[ds], names)
+            logger.debug(f"Reloaded column vectors for {len(stale)} dataset(s)")
+
+        if dataset_id is None:
+            for ds in [ds for ds in _indexed_datasets if ds not in versions]:
+                _drop_dataset_from_index(ds)
+        elif dataset_id not in versions:
+            _drop_dataset_from_index(dataset_id)
+
+    async def find_by_content_hashes(
+        self,
+        embedding_model: str,
+        content_hashes: List[str],
+        dataset_id: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Look up previously computed embeddings by content hash.
 
-                # Cosine similarity
-                dot_product = np.dot(query_vec, emb_vec)
-                norm_a = np.linalg.norm(query_vec)
-                norm_b = np.linalg.norm(emb_vec)
+        The hash covers the embedded text and model, so a match can be reused
+        by any dataset. Rows belonging to `dataset_id` are preferred.
 
-                if norm_a > 0 and norm_b > 0:
-                    similarity = float(dot_product / (norm_a * norm_b))
-                else:
-                    similarity = 0.0
+        Returns:
+            {content_hash: {"embedding": [...], "own": bool}}; empty when the
+            table has no content_hash column yet
+        """
+        from ..db import get_db_context
+        from ..db.schema_cache import get_schema_cache
+
+        if not content_hashes:
+            return {}
+
+        async with get_db_context() as session:
+            columns = await get_schema_cache().get_columns(self.table_name, session)
+            if "content_hash" not in columns:
+                return {}
+            result = await session.execute(
+                sa_text(
+                    "SELECT DISTINCT ON (content_hash) content_hash, embedding, "
+                    "dataset_id = :dataset_id AS own "
+                    "FROM column_embeddings "
+                    "WHERE embedding_model = :model AND content_hash = ANY(:hashes) "
+                    "ORDER BY content_hash, (dataset_id = :dataset_id) DESC"
+                ),
+                {"model": embedding_model, "hashes": list(content_hashes), "dataset_id": dataset_id or ""},
+            )
+            rows = result.fetchall()
+
+        found: Dict[str, Dict[str, Any]] = {}
+        for content_hash, embedding, own in rows:
+            vector = jsonb_loads(embedding) if isinstance(embedding, str) else embedding
+            if vector:
+                found[content_hash] = {"embedding": vector, "own": bool(own)}
+        return found
+
+    async def replace_dataset_embeddings(
+        self,
+        dataset_id: str,
+        project_id: str,
+        embedding_model: str,
+        rows: List[Dict[str, Any]]
+    ) -> int:
+        """
+        Replace the stored embeddings of a dataset's columns in one transaction.
 
-                results.append({
-                    'id': record.get('id'),
-                    'dataset_id': record.get('dataset_id'),
-                    'column_name': record.get('column_name'),
-                    'similarity': similarity
-                })
+        Args:
+            dataset_id: Dataset ID
+            project_id: Owning project (datasets without one use their own ID)
+            embedding_model: Model that produced the vectors
+            rows: [{"column_name", "embedding", "content_hash", "column_type"?}]
 
-        # Sort by similarity and limit
-        results.sort(key=lambda x: x['similarity'], reverse=True)
-        return results[:limit]
+        Returns:
+            Number of rows written
+        """
+        from ..db import get_db_context
+        from ..db.schema_cache import get_schema_cache
+
+        if not rows:
+            return 0
+
+        async with get_db_context() as session:
+            schema_cache = get_schema_cache()
+            columns = await schema_cache.get_columns(self.table_name, session)
+            insert_columns = ["dataset_id", "column_name", "embedding", "embedding_model"]
+            # Drizzle creates a serial id; the Alembic String(36) id has no default
+            if "id" not in await schema_cache.get_generated_columns(self.table_name, session):
+                insert_columns.insert(0, "id")
+            for optional in ("project_id", "content_hash", "embedding_dimensions", "column_type"):
+                if optional in columns:
+                    insert_columns.append(optional)
+            values = [':' + col for col in insert_columns]
+            if "embedding_vector" in columns:
+                insert_columns.append("embedding_vector")
+                values.append("CAST(CAST(:embedding_vector AS text) AS vector)")
+
+            await session.execute(
+                sa_text(
+                    "DELETE FROM column_embeddings "
+                    "WHERE dataset_id = :dataset_id AND column_name = ANY(:column_names)"
+                ),
+                {"dataset_id": dataset_id, "column_names": [row["column_name"] for row in rows]},
+            )
+            params = [
+                {
+                    "id": str(uuid.uuid4()),
+                    "dataset_id": dataset_id,
+                    "project_id": project_id,
+                    "column_name": row["column_name"],
+                    "embedding": jsonb_dumps(list(row["embedding"])),
+                    "embedding_model": embedding_model,
+                    "content_hash": row.get("content_hash"),
+                    "embedding_dimensions": len(row["embedding"]),
+                    "column_type": row.get("column_type"),
+                    "embedding_vector": jsonb_dumps(list(row["embedding"]))
+                    if len(row["embedding"]) == PGVECTOR_DIMENSIONS else None,
+                }
+                for row in rows
+            ]
+            await session.execute(
+                sa_text(
+                    f"INSERT INTO column_embeddings ({', '.join(insert_columns)}) "
+                    f"VALUES ({', '.join(values)})"
+                ),
+                params,
+            )
+            await session.commit()
+
+        _drop_dataset_from_index(dataset_id)
+
+        return len(rows)
 
     async def delete_by_dataset(self, dataset_id: str) -> int:
         """Delete all embeddings for a dataset"""
         query = "DELETE FROM column_embeddings WHERE dataset_id = $1"
         result = await self._db_manager.execute(query, dataset_id)
+        _drop_dataset_from_index(dataset_id)
         return int(result.split()[1]) if result else 0
 
     async def update_embedding(
@@ -218,11 +605,15 @@ class ColumnEmbeddingRepository(BaseRepository[ColumnEmbedding]):
         existing = await self.find_by_dataset_and_column(dataset_id, column_name)
 
         if existing:
-            # Update existing
-            return await self.update(existing.id, {
+            # Update existing; created_at marks when the vector was written, and
+            # bumping it changes the dataset version every worker's index checks
+            updated = await self.update(existing.id, {
                 'embedding': jsonb_dumps(embedding),
-                'embedding_model': embedding_model
+                'embedding_model': embedding_model,
+                'created_at': datetime.utcnow()
             })
+            _drop_dataset_from_index(dataset_id)
+            return updated
         else:
             # Create new
             col_emb = ColumnEmbedding()
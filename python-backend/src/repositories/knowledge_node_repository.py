@@ -5,8 +5,10 @@ Handles CRUD operations for knowledge graph, patterns, and feedback.
 """
 
 from typing import Optional, List
-from sqlalchemy import select, and_, or_
+from sqlalchemy import select, and_, or_, text as sa_text
 from .base_repository import BaseRepository
+from ..db import get_db_context
+from ..db.schema_cache import get_schema_cache
 from ..models.database import (
     KnowledgeNode as NodeModel,
     KnowledgeEdge as EdgeModel,
@@ -95,6 +97,98 @@ class KnowledgeNodeRepository(BaseRepository[NodeModel]):
         result = await self._db_manager.fetch(query)
         return self._record_list_to_model_list(result)
 
+    @staticmethod
+    def _select_list(columns) -> Optional[str]:
+        """
+        Select list aliased to the ORM field names
+
+        Databases created from the Drizzle schema store the same fields as
+        label/summary/attributes and have no source/confidence columns.
+        Returns None when the table is missing.
+        """
+        if "title" in columns:
+            title, content = "title", "content"
+        elif "label" in columns:
+            title = "label"
+            content = "jsonb_build_object('summary', summary, 'attributes', attributes)"
+        else:
+            return None
+        selected = ["id", "type", f"{title} AS title", f"{content} AS content"]
+        for column in ("source", "confidence", "updated_at"):
+            selected.append(column if column in columns else f"NULL AS {column}")
+        return ", ".join(selected)
+
+    async def search_ranked(
+        self,
+        query: str,
+        node_types: Optional[List[str]] = None,
+        limit: int = 20,
+    ) -> Optional[List[dict]]:
+        """
+        Full-text search over the `search_vector` tsvector column (GIN indexed)
+
+        Returns rows ordered by ts_rank_cd with a `rank` in [0, 1), or None
+        when the column has not been migrated yet.
+        """
+        async with get_db_context() as session:
+            columns = await get_schema_cache().get_columns(self.table_name, session)
+            select_list = self._select_list(columns)
+            if "search_vector" not in columns or select_list is None:
+                return None
+
+            type_filter = ""
+            params = {"query": query, "limit": limit}
+            if node_types:
+                type_filter = "AND lower(type) = ANY(:node_types)"
+                params["node_types"] = [str(node_type).lower() for node_type in node_types]
+
+            # Normalization 32 maps rank to rank / (rank + 1)
+            result = await session.execute(
+                sa_text(
+                    f"SELECT {select_list}, "
+                    "ts_rank_cd(search_vector, q, 32) AS rank "
+                    "FROM knowledge_nodes, websearch_to_tsquery('english', :query) AS q "
+                    f"WHERE search_vector @@ q {type_filter} "
+                    "ORDER BY rank DESC, confidence DESC NULLS LAST "
+                    "LIMIT :limit"
+                ),
+                params,
+            )
+            return [dict(row) for row in result.mappings().all()]
+
+    async def find_all(self, limit: Optional[int] = None) -> List[dict]:
+        """Fetch nodes as column dicts (for building in-process indexes)"""
+        async with get_db_context() as session:
+            columns = await get_schema_cache().get_columns(self.table_name, session)
+            select_list = self._select_list(columns)
+            if select_list is None:
+                return []
+
+            sql = f"SELECT {select_list} FROM knowledge_nodes ORDER BY id"
+            params = {}
+            if limit is not None:
+                sql += " LIMIT :limit"
+                params["limit"] = limit
+            result = await session.execute(sa_text(sql), params)
+            return [dict(row) for row in result.mappings().all()]
+
+    async def content_version(self) -> Optional[tuple]:
+        """
+        (row count, latest updated_at) of the table
+
+        Changes whenever any process inserts, updates or deletes a node, so
+        in-process indexes can tell when they are stale.
+        """
+        async with get_db_context() as session:
+            columns = await get_schema_cache().get_columns(self.table_name, session)
+            if "updated_at" not in columns:
+                return None
+            result = await session.execute(
+                sa_text("SELECT count(*), max(updated_at) FROM knowledge_nodes")
+            )
+            row = result.first()
+            return tuple(row) if row is not None else None
+
     async def create(self, model: NodeModel) -> NodeModel:
         """Create a new knowledge node"""
         if not model.id:
@@ -226,6 +320,37 @@ class KnowledgeEdgeRepository(BaseRepository[EdgeModel]):
         result = await self._db_manager.fetchrow(query)
         return self._record_to_model(result)
 
+    async def find_by_from_nodes(
+        self,
+        from_node_ids: List[str],
+        relationships: Optional[List[str]] = None,
+        min_weight: Optional[float] = None,
+    ) -> list:
+        """
+        Find outgoing edges for a set of nodes in one query
+
+        Used to expand a whole traversal frontier per round trip.
+        """
+        if not from_node_ids:
+            return []
+        where_clauses = [EdgeModel.from_node_id.in_(list(from_node_ids))]
+        if relationships:
+            where_clauses.append(EdgeModel.relationship.in_(list(relationships)))
+        if min_weight is not None:
+            where_clauses.append(EdgeModel.weight >= min_weight)
+        # Select columns (not the entity) so rows come back as plain column dicts
+        query = select(*EdgeModel.__table__.columns).where(and_(*where_clauses))
+        result = await self._db_manager.fetch(query)
+        return [dict(r) for r in result] if result else []
+
+    async def find_all(self, limit: Optional[int] = None) -> list:
+        """Fetch edges for building an in-memory adjacency list"""
+        query = select(*EdgeModel.__table__.columns)
+        if limit is not None:
+            query = query.limit(limit)
+        result = await self._db_manager.fetch(query)
+        return [dict(r) for r in result] if result else []
+
     async def create(self, model: EdgeModel) -> EdgeModel:
         """Create a new knowledge edge"""
         if not model.id:
@@ -8,6 +8,8 @@ from typing import Optional, List, Dict, Any
 from datetime import datetime
 
 from .base_repository import BaseRepository
+from ..db import get_db_context
+from ..services.journey_state import patch_journey_progress
 from ..models.database import jsonb_dumps, jsonb_loads
 
 
@@ -174,6 +176,10 @@ class ProjectRepository(BaseRepository[Project]):
         """
         Update journey progress for a project
 
+        The updated keys are merged in SQL (see services.journey_state), so
+        concurrent writers of other keys are not overwritten and
+        journey_progress_version is bumped.
+
         Args:
             project_id: Project ID
             updates: Dictionary of progress updates
@@ -181,14 +187,12 @@ class ProjectRepository(BaseRepository[Project]):
         Returns:
             Updated Project instance
         """
-        # Get existing progress
-        project = await self.find_by_id(project_id)
-        if project and project.journey_progress:
-            # Merge with existing progress
-            merged = {**project.journey_progress, **updates}
-            return await self.update(project_id, {'journey_progress': merged})
-        else:
-            return await self.update(project_id, {'journey_progress': updates})
+        async with get_db_context() as session:
+            patched = await patch_journey_progress(session, project_id, set_values=updates)
+            await session.commit()
+        if patched is None:
+            return None
+        return await self.find_by_id(project_id)
 
     async def find_by_industry(
         self,
@@ -0,0 +1,437 @@
+"""
+Agent Activity Log
+
+Bounded, persistent log of agent activities per project, replacing the
+unbounded in-process `_agent_activities` dict in agent_pipeline_routes.
+
+Features:
+- Fixed-size ring buffer per project (ACTIVITY_LOG_BUFFER_SIZE) and an LRU
+  bound on the number of buffered projects, so memory stays bounded
+- Write-behind persistence to the `agent_activities` table: entries are
+  buffered and inserted in batches by a background flush
+- Keyset-paginated, time-windowed reads (newest first, cursor = the oldest
+  entry of the previous page), served from the table so every worker sees
+  the same log; the ring buffer answers when the table is unavailable
+- A missing table is re-checked every ACTIVITY_LOG_TABLE_RECHECK_SECONDS, so
+  persistence starts once the migration has been applied
+
+Usage:
+    from src.services.activity_log import get_activity_log
+
+    log = get_activity_log()
+    log.record(project_id, "data_scientist", "analyze_data", "types=['regression']")
+    page = await log.query(project_id, limit=50, before=cursor)
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import text as sa_text
+
+from ..db import get_db_context
+from ..db.schema_cache import get_schema_cache
+
+logger = logging.getLogger(__name__)
+
+# Most recent activities kept in memory per project
+ACTIVITY_LOG_BUFFER_SIZE = int(os.getenv("ACTIVITY_LOG_BUFFER_SIZE", "500"))
+# Projects with an in-memory buffer; the least recently used is evicted
+ACTIVITY_LOG_MAX_PROJECTS = int(os.getenv("ACTIVITY_LOG_MAX_PROJECTS", "1000"))
+ACTIVITY_LOG_PERSIST = os.getenv("ACTIVITY_LOG_PERSIST", "true").lower() == "true"
+ACTIVITY_LOG_FLUSH_INTERVAL_SECONDS = float(os.getenv("ACTIVITY_LOG_FLUSH_INTERVAL_SECONDS", "2.0"))
+ACTIVITY_LOG_FLUSH_BATCH_SIZE = int(os.getenv("ACTIVITY_LOG_FLUSH_BATCH_SIZE", "500"))
+# Unflushed entries kept while the database is unreachable; the oldest are dropped
+ACTIVITY_LOG_MAX_PENDING = int(os.getenv("ACTIVITY_LOG_MAX_PENDING", "10000"))
+ACTIVITY_LOG_MAX_PAGE_SIZE = 500
+ACTIVITY_LOG_DEFAULT_PAGE_SIZE = 100
+# Seconds before a missing agent_activities table is looked up again
+ACTIVITY_LOG_TABLE_RECHECK_SECONDS = float(os.getenv("ACTIVITY_LOG_TABLE_RECHECK_SECONDS", "300"))
+
+AGENT_DISPLAY_NAMES = {
+    "project_manager": "Project Manager",
+    "pm": "Project Manager",
+    "business": "Business Analyst",
+    "business_agent": "Business Analyst",
+    "data_engineer": "Data Engineer",
+    "data_scientist": "Data Scientist",
+    "researcher": "Researcher",
+    "template_research": "Researcher",
+    "customer_support": "Customer Support",
+    "conversation": "Customer Support",
+    "orchestrator": "Project Manager",
+    "technical_ai": "Data Scientist",
+    "technical_ai_agent": "Data Scientist",
+}
+
+ACTIVITY_COLUMNS = ("id", "project_id", "agent", "action", "detail", "created_at")
+
+
+def agent_display_name(agent: str) -> str:
+    return AGENT_DISPLAY_NAMES.get(agent, agent.replace("_", " ").title())
+
+
+def _timestamp(moment: datetime) -> str:
+    # Fixed precision keeps timestamps (and cursors) ordered as strings
+    return moment.isoformat(timespec="microseconds")
+
+
+def _naive_utc(moment: Optional[datetime]) -> Optional[datetime]:
+    """Timestamps are stored as naive UTC"""
+    if moment is None or moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def encode_cursor(entry: Dict[str, Any]) -> str:
+    return f"{entry['timestamp']}|{entry['id']}"
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """(timestamp, id) of a cursor; raises ValueError if malformed"""
+    timestamp, _, entry_id = cursor.partition("|")
+    return _timestamp(_naive_utc(datetime.fromisoformat(timestamp))), entry_id
+
+
+class ActivityLog:
+    """Per-project activity ring buffers with write-behind persistence"""
+
+    def __init__(
+        self,
+        buffer_size: int = ACTIVITY_LOG_BUFFER_SIZE,
+        max_projects: int = ACTIVITY_LOG_MAX_PROJECTS,
+        persist: bool = ACTIVITY_LOG_PERSIST,
+        flush_interval: float = ACTIVITY_LOG_FLUSH_INTERVAL_SECONDS,
+        flush_batch_size: int = ACTIVITY_LOG_FLUSH_BATCH_SIZE,
+        max_pending: int = ACTIVITY_LOG_MAX_PENDING,
+        table_recheck_seconds: float = ACTIVITY_LOG_TABLE_RECHECK_SECONDS,
+    ):
+        self.buffer_size = buffer_size
+        self.max_projects = max_projects
+        self.persist = persist
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+        self.table_recheck_seconds = table_recheck_seconds
+
+        self._buffers: "OrderedDict[str, Deque[Dict[str, Any]]]" = OrderedDict()
+        self._pending: Deque[Tuple[str, Dict[str, Any]]] = deque(maxlen=max_pending)
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self._last_recorded: Optional[datetime] = None
+        # None until the first flush or read checks for the table
+        self._table_available: Optional[bool] = None
+        self._table_checked_at = 0.0
+        self.stats = {
+            "recorded": 0, "flushed": 0, "flushes": 0, "flush_errors": 0,
+            "dropped_pending": 0, "evicted_projects": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def record(self, project_id: str, agent: str, action: str, detail: str = "") -> Dict[str, Any]:
+        """Append an activity entry for a project"""
+        # Strictly increasing per worker, so (timestamp, id) cursors keep
+        # insertion order even for entries recorded within one microsecond
+        now = datetime.utcnow()
+        if self._last_recorded is not None and now <= self._last_recorded:
+            now = self._last_recorded + timedelta(microseconds=1)
+        self._last_recorded = now
+        entry = {
+            "id": str(uuid.uuid4()),
+            "agent": agent,
+            "agentName": agent_display_name(agent),
+            "action": action,
+            "detail": detail,
+            "timestamp": _timestamp(now),
+        }
+        buffer = self._buffers.get(project_id)
+        if buffer is None:
+            buffer = self._buffers[project_id] = deque(maxlen=self.buffer_size)
+            if len(self._buffers) > self.max_projects:
+                self._buffers.popitem(last=False)
+                self.stats["evicted_projects"] += 1
+        else:
+            self._buffers.move_to_end(project_id)
+        buffer.append(entry)
+        self.stats["recorded"] += 1
+
+        if self.persist and self._table_maybe_available():
+            if len(self._pending) == self._pending.maxlen:
+                self.stats["dropped_pending"] += 1
+            self._pending.append((project_id, entry))
+            self._schedule_flush()
+        return entry
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    async def query(
+        self,
+        project_id: str,
+        limit: int = ACTIVITY_LOG_DEFAULT_PAGE_SIZE,
+        before: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        """
+        One page of a project's activities, newest page first.
+
+        Args:
+            project_id: Project to read
+            limit: Page size (capped at ACTIVITY_LOG_MAX_PAGE_SIZE)
+            before: nextCursor of the previous page
+            since: Only activities at or after this time (UTC)
+            until: Only activities before this time (UTC)
+
+        Returns:
+            {"activities": [...oldest first], "nextCursor", "hasMore", "source"}
+        """
+        limit = max(1, min(limit, ACTIVITY_LOG_MAX_PAGE_SIZE))
+        cursor = decode_cursor(before) if before else None
+        since, until = _naive_utc(since), _naive_utc(until)
+
+        rows = None
+        if self.persist and self._table_maybe_available():
+            rows = await self._query_table(project_id, limit + 1, cursor, since, until)
+        source = "database"
+        if rows is None:
+            rows = self._query_buffer(project_id, limit + 1, cursor, since, until)
+            source = "memory"
+
+        has_more = len(rows) > limit
+        page = rows[:limit]
+        page.reverse()
+        return {
+            "activities": page,
+            "nextCursor": encode_cursor(page[0]) if has_more and page else None,
+            "hasMore": has_more,
+            "source": source,
+        }
+
+    def _query_buffer(
+        self,
+        project_id: str,
+        count: int,
+        cursor: Optional[Tuple[str, str]],
+        since: Optional[datetime],
+        until: Optional[datetime],
+    ) -> List[Dict[str, Any]]:
+        """Newest-first matches from the ring buffer"""
+        low = _timestamp(since) if since else None
+        high = _timestamp(until) if until else None
+        matches = []
+        for entry in reversed(self._buffers.get(project_id, ())):
+            timestamp = entry["timestamp"]
+            if cursor is not None and (timestamp, entry["id"]) >= cursor:
+                continue
+            if high is not None and timestamp >= high:
+                continue
+            if low is not None and timestamp < low:
+                break
+            matches.append(entry)
+            if len(matches) == count:
+                break
+        return matches
+
+    async def _query_table(
+        self,
+        project_id: str,
+        count: int,
+        cursor: Optional[Tuple[str, str]],
+        since: Optional[datetime],
+        until: Optional[datetime],
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Newest-first matches from agent_activities; None if unavailable"""
+        # This worker's unflushed entries must be part of the page
+        await self.flush()
+        conditions = ["project_id = :project_id"]
+        params: Dict[str, Any] = {"project_id": project_id, "count": count}
+        if since is not None:
+            conditions.append("created_at >= :since")
+            params["since"] = since
+        if until is not None:
+            conditions.append("created_at < :until")
+            params["until"] = until
+        if cursor is not None:
+            conditions.append("(created_at, id) < (:cursor_at, :cursor_id)")
+            params["cursor_at"] = datetime.fromisoformat(cursor[0])
+            params["cursor_id"] = cursor[1]
+        try:
+            async with get_db_context() as session:
+                if not await self._check_table(session):
+                    return None
+                result = await session.execute(
+                    sa_text(
+                        f"SELECT {', '.join(ACTIVITY_COLUMNS)} FROM agent_activities "
+                        f"WHERE {' AND '.join(conditions)} "
+                        "ORDER BY created_at DESC, id DESC LIMIT :count"
+                    ),
+                    params,
+                )
+                rows = result.mappings().all()
+        except Exception as e:
+            logger.debug(f"Could not read agent activities for project {project_id}: {e}")
+            return None
+        return [_row_to_entry(row) for row in rows]
+
+    def _table_maybe_available(self) -> bool:
+        """False only while a recent check found no agent_activities table"""
+        if self._table_available is not False:
+            return True
+        return time.monotonic() - self._table_checked_at >= self.table_recheck_seconds
+
+    async def _check_table(self, session: Any) -> bool:
+        if self._table_available or not self._table_maybe_available():
+            return bool(self._table_available)
+        schema_cache = get_schema_cache()
+        if self._table_available is False:
+            # The cached empty column set would hide a freshly migrated table
+            schema_cache.invalidate("agent_activities")
+        columns = await schema_cache.get_columns("agent_activities", session)
+        self._table_checked_at = time.monotonic()
+        if not columns:
+            self._pending.clear()
+            if self._table_available is None:
+                logger.info("agent_activities table not present; agent activities kept in memory only")
+        elif self._table_available is False:
+            logger.info("agent_activities table found; persisting agent activities")
+        self._table_available = bool(columns)
+        return self._table_available
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _schedule_flush(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (sync caller); the next async flush picks these up
+            return
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        delay = 0.0 if len(self._pending) >= self.flush_batch_size else self.flush_interval
+        self._flush_task = loop.create_task(self._flush_after(delay))
+
+    async def _flush_after(self, delay: float) -> None:
+        if delay:
+            await asyncio.sleep(delay)
+        errors = self.stats["flush_errors"]
+        await self.flush()
+        self._flush_task = None
+        # Entries recorded while flushing go out with the next batch; after a
+        # failure, wait for the next write before retrying
+        if self._pending and self.stats["flush_errors"] == errors:
+            self._schedule_flush()
+
+    async def flush(self) -> int:
+        """Insert pending entries into agent_activities; returns rows written"""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch = list(self._pending)
+            self._pending.clear()
+            try:
+                async with get_db_context() as session:
+                    if not await self._check_table(session):
+                        return 0
+                    await session.execute(
+                        sa_text(
+                            f"INSERT INTO agent_activities ({', '.join(ACTIVITY_COLUMNS)}) "
+                            f"VALUES ({', '.join(':' + col for col in ACTIVITY_COLUMNS)}) "
+                            "ON CONFLICT (id) DO NOTHING"
+                        ),
+                        [_entry_to_row(project_id, entry) for project_id, entry in batch],
+                    )
+                    await session.commit()
+            except asyncio.CancelledError:
+                self._requeue(batch)
+                raise
+            except Exception as e:
+                self._requeue(batch)
+                self.stats["flush_errors"] += 1
+                logger.warning(f"Failed to persist {len(batch)} agent activities: {e}")
+                return 0
+
+            self.stats["flushes"] += 1
+            self.stats["flushed"] += len(batch)
+            return len(batch)
+
+    def _requeue(self, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Put a failed batch back ahead of newer entries, within the pending bound"""
+        newer = list(self._pending)
+        combined = batch + newer
+        overflow = max(0, len(combined) - (self._pending.maxlen or len(combined)))
+        self.stats["dropped_pending"] += overflow
+        self._pending.clear()
+        self._pending.extend(combined[overflow:])
+
+    async def close(self) -> None:
+        """Flush outstanding writes and stop the background flush"""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "projects": len(self._buffers),
+            "buffered": sum(len(buffer) for buffer in self._buffers.values()),
+            "pending": len(self._pending),
+            "persisted": self._table_available,
+            **self.stats,
+        }
+
+
+def _entry_to_row(project_id: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": entry["id"],
+        "project_id": project_id,
+        "agent": entry["agent"],
+        "action": entry["action"],
+        "detail": entry["detail"],
+        "created_at": datetime.fromisoformat(entry["timestamp"]),
+    }
+
+
+def _row_to_entry(row: Any) -> Dict[str, Any]:
+    return {
+        "id": row["id"],
+        "agent": row["agent"],
+        "agentName": agent_display_name(row["agent"]),
+        "action": row["action"],
+        "detail": row["detail"] or "",
+        "timestamp": _timestamp(row["created_at"]),
+    }
+
+
+# ============================================================================
+# Singleton
+# ============================================================================
+
+_activity_log_instance: Optional[ActivityLog] = None
+
+
+def get_activity_log() -> ActivityLog:
+    """Get or create the activity log singleton"""
+    global _activity_log_instance
+    if _activity_log_instance is None:
+        _activity_log_instance = ActivityLog()
+    return _activity_log_instance
+
+
+async def shutdown_activity_log() -> None:
+    """Flush write-behind activities before the database closes"""
+    if _activity_log_instance is not None:
+        await _activity_log_instance.close()
@@ -20,15 +20,14 @@ import uuid
 from functools import partial
 import asyncio
 import json
-import sys
-from pathlib import Path
+
+import pandas as pd
 
 # LangChain and LangGraph imports
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
 from langchain_core.tools import tool, Tool
-from sqlalchemy import text as sa_text
 
 # Local imports
 from ..models.schemas import (
@@ -36,10 +35,13 @@ from ..models.schemas import (
     AgentMessage, AgentToolCall, AgentType, QuestionElementMapping,
     AnalysisType, TransformationPlan, Insight
 )
-from ..db import get_db_context
 from .tool_registry import get_tools_by_agent, get_tool_registry, ToolRegistry
 from .llm_providers import get_llm, LLMProvider, LLMConfig
 from .deepagent_runtime import DeepAgentRuntime
+from .dataset_store import get_dataset_store
+from .dataset_loader import load_primary_dataset, load_project_dataset_ids
+from .analysis_worker_pool import get_analysis_worker_pool, StagedFrame, UnsupportedAnalysisError
+from ..constants import MAX_ANALYSIS_TIMEOUT_MS, TOTAL_EXECUTION_TIMEOUT_MS
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -267,18 +269,8 @@ class LLMFactory:
 # Workflow Step Functions
 # ============================================================================
 
-ANALYSIS_MODULE_FILE_MAP: Dict[str, str] = {
-    "descriptive_stats": "descriptive_stats.py",
-    "descriptive": "descriptive_stats.py",
-    "correlation": "correlation_analysis.py",
-    "regression": "regression_analysis.py",
-    "clustering": "clustering_analysis.py",
-    "time_series": "time_series_analysis.py",
-    "statistical_tests": "statistical_tests.py",
-    "classification": "classification_analysis.py",
-    "eda": "eda_analysis.py",
-    "comparative": "statistical_tests.py",
-}
+# Rows handed to each analysis module (a sample for large datasets)
+ANALYSIS_INPUT_ROW_LIMIT = 1000
 
 
 def _coerce_json(value: Any) -> Any:
@@ -320,81 +312,43 @@ def _safe_scalar_pairs(summary: Dict[str, Any], limit: int = 2) -> List[str]:
     return points
 
 
-async def _load_project_dataset_ids(project_id: str) -> List[str]:
-    async with get_db_context() as session:
-        result = await session.execute(
-            sa_text(
-                "SELECT id FROM datasets "
-                "WHERE project_id = :project_id "
-                "ORDER BY created_at ASC"
-            ),
-            {"project_id": project_id},
-        )
-        return [str(row[0]) for row in result.fetchall() if row and row[0]]
-
-
 async def _load_dataset_rows(
     project_id: str,
     dataset_ids: List[str],
 ) -> Tuple[Optional[str], List[Dict[str, Any]]]:
-    normalized_dataset_ids = [str(dataset_id) for dataset_id in (dataset_ids or []) if str(dataset_id).strip()]
+    record = await load_primary_dataset(project_id, dataset_ids)
+    if record is None:
+        return None, []
 
-    async with get_db_context() as session:
-        column_result = await session.execute(
-            sa_text(
-                "SELECT column_name FROM information_schema.columns "
-                "WHERE table_name = 'datasets'"
-            )
-        )
-        dataset_columns = {row[0] for row in column_result.fetchall()}
-
-        selectable_columns = ["id", "project_id"]
-        for candidate in ("ingestion_metadata", "metadata", "data", "preview"):
-            if candidate in dataset_columns:
-                selectable_columns.append(candidate)
-
-        where_parts = ["d.project_id = :project_id"]
-        params: Dict[str, Any] = {"project_id": project_id}
-
-        if normalized_dataset_ids:
-            placeholders: List[str] = []
-            for index, dataset_id in enumerate(normalized_dataset_ids):
-                key = f"dataset_id_{index}"
-                params[key] = dataset_id
-                placeholders.append(f":{key}")
-            where_parts.append(f"d.id IN ({', '.join(placeholders)})")
-
-        select_clause = ", ".join([f'd.\"{col}\"' for col in selectable_columns])
-        dataset_query = (
-            f"SELECT {select_clause} FROM datasets d "
-            f"WHERE {' AND '.join(where_parts)} "
-            f"ORDER BY d.created_at ASC LIMIT 1"
-        )
-        dataset_result = await session.execute(sa_text(dataset_query), params)
-        dataset_row = dataset_result.first()
-        if dataset_row is None:
-            return None, []
-
-        dataset_data = dict(zip(dataset_result.keys(), dataset_row))
-        candidates = [
-            (_coerce_json(dataset_data.get("ingestion_metadata")) or {}).get("transformedData")
-            if isinstance(_coerce_json(dataset_data.get("ingestion_metadata")), dict)
-            else None,
-            (_coerce_json(dataset_data.get("metadata")) or {}).get("transformedData")
-            if isinstance(_coerce_json(dataset_data.get("metadata")), dict)
-            else None,
-            _coerce_json(dataset_data.get("data")),
-            _coerce_json(dataset_data.get("preview")),
-        ]
+    for candidate in record.transformed_payloads():
+        rows = _extract_rows(candidate)
+        if rows:
+            return record.id, rows
 
-        for candidate in candidates:
-            rows = _extract_rows(candidate)
-            if rows:
-                return str(dataset_data.get("id")), rows
+    rows = await get_dataset_store().load_rows(record.id, row_range=(0, ANALYSIS_INPUT_ROW_LIMIT))
+    if rows:
+        return record.id, rows
+
+    rows = _extract_rows(record.preview)
+    if rows:
+        return record.id, rows
 
     return None, []
 
 
+async def _load_transformed_rows(dataset_id: Optional[str]) -> List[Dict[str, Any]]:
+    """
+    Analysis input rows of the transformation step's output.
+
+    state["transformed_data"] only carries a preview; the rows themselves
+    are in the columnar store under the transformed dataset ID.
+    """
+    store = get_dataset_store()
+    if not dataset_id or not await asyncio.to_thread(store.exists, dataset_id):
+        return []
+    return await store.load_rows(dataset_id, row_range=(0, ANALYSIS_INPUT_ROW_LIMIT))
+
+
 def _normalize_analysis_output(analysis_type: str, payload: Any, error: Optional[str] = None) -> Dict[str, Any]:
     if not isinstance(payload, dict):
         payload = {}
@@ -423,25 +377,16 @@ async def _execute_analysis_module(
     dataset_id: Optional[str],
     rows: List[Dict[str, Any]],
     pii_columns: Optional[List[str]] = None,
+    staged_frame: Optional[StagedFrame] = None,
+    timeout: Optional[float] = None,
 ) -> Dict[str, Any]:
-    module_file = ANALYSIS_MODULE_FILE_MAP.get(str(analysis_type).strip().lower())
-    if not module_file:
-        return _normalize_analysis_output(
-            analysis_type,
-            {},
-            error=f"Unsupported analysis type: {analysis_type}",
-        )
-
-    module_path = Path(__file__).resolve().parent.parent / "analysis_modules" / module_file
-    if not module_path.exists():
-        return _normalize_analysis_output(
-            analysis_type,
-            {},
-            error=f"Analysis module not found: {module_file}",
-        )
+    """
+    Run one analysis module on the persistent worker pool.
 
-    input_payload = {
-        "data": rows[:1000],
+    `staged_frame` lets several analyses share one shared-memory copy of the
+    rows; `timeout` (seconds) bounds the module's run time.
+    """
+    params = {
         "project_id": project_id,
         "dataset_id": dataset_id,
         "pii_columns_to_exclude": pii_columns or [],
@@ -449,59 +394,122 @@ async def _execute_analysis_module(
     }
 
     try:
-        process = await asyncio.create_subprocess_exec(
-            sys.executable,
-            str(module_path),
-            stdin=asyncio.subprocess.PIPE,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await process.communicate(
-            input=json.dumps(input_payload).encode("utf-8")
-        )
-    except Exception as exc:
+        frame = staged_frame if staged_frame is not None else pd.DataFrame(rows[:ANALYSIS_INPUT_ROW_LIMIT])
+        payload = await get_analysis_worker_pool().run(analysis_type, frame, params, timeout=timeout)
+    except UnsupportedAnalysisError as exc:
+        return _normalize_analysis_output(analysis_type, {}, error=str(exc))
+    except asyncio.TimeoutError:
         return _normalize_analysis_output(
             analysis_type,
             {},
-            error=f"Failed to start module {module_file}: {exc}",
+            error=f"Analysis {analysis_type} timed out after {timeout:.0f}s",
         )
-
-    if process.returncode != 0:
-        error_text = stderr.decode("utf-8", errors="ignore").strip() or "Unknown module failure"
+    except Exception as exc:
         return _normalize_analysis_output(
             analysis_type,
             {},
-            error=f"Module execution failed ({module_file}): {error_text}",
+            error=f"Module execution failed ({analysis_type}): {exc}",
         )
 
-    raw_output = stdout.decode("utf-8", errors="ignore").strip()
-    if not raw_output:
-        return _normalize_analysis_output(
-            analysis_type,
-            {},
-            error=f"Module {module_file} returned empty output",
-        )
+    return _normalize_analysis_output(analysis_type, payload)
+
+
+async def _run_analysis_plan(
+    state: WorkflowState,
+    analysis_types: List[str],
+    rows: List[Dict[str, Any]],
+    dataset_id: Optional[str],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run independent analyses concurrently on the worker pool.
+
+    Concurrency is bounded by the pool size. Each analysis waits at most
+    MAX_ANALYSIS_TIMEOUT_MS for a worker and gets as long again once a
+    worker picks it up, and the whole plan is
+    bounded by TOTAL_EXECUTION_TIMEOUT_MS; stragglers past the overall
+    deadline are cancelled (their workers are replaced). Progress is
+    emitted per analysis type as each one finishes.
+    """
+    unique_types = list(dict.fromkeys(analysis_types))
+    if not unique_types:
+        return {}
+
+    session_id = state.get("session_id", state["project_id"])
+    pool = get_analysis_worker_pool()
+    staged = await pool.stage(pd.DataFrame(rows[:ANALYSIS_INPUT_ROW_LIMIT]))
+    per_analysis_timeout = MAX_ANALYSIS_TIMEOUT_MS / 1000
+
+    tasks: Dict[asyncio.Task, str] = {
+        asyncio.create_task(
+            _execute_analysis_module(
+                analysis_type=analysis_type,
+                project_id=state["project_id"],
+                dataset_id=str(dataset_id) if dataset_id else None,
+                rows=rows,
+                pii_columns=[],
+                staged_frame=staged,
+                timeout=per_analysis_timeout,
+            ),
+            name=f"analysis:{analysis_type}",
+        ): analysis_type
+        for analysis_type in unique_types
+    }
+
+    results: Dict[str, Dict[str, Any]] = {}
+    total = len(unique_types)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + TOTAL_EXECUTION_TIMEOUT_MS / 1000
+    pending = set(tasks)
 
-    parsed_output: Optional[Dict[str, Any]] = None
     try:
-        parsed_output = json.loads(raw_output)
-    except Exception:
-        start = raw_output.find("{")
-        end = raw_output.rfind("}")
-        if start != -1 and end > start:
-            try:
-                parsed_output = json.loads(raw_output[start:end + 1])
-            except Exception:
-                parsed_output = None
-
-    if parsed_output is None:
-        return _normalize_analysis_output(
+        while pending:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                analysis_type = tasks[task]
+                try:
+                    run_result = task.result()
+                except asyncio.CancelledError:
+                    run_result = _normalize_analysis_output(analysis_type, {}, error="Analysis cancelled")
+                except Exception as e:
+                    run_result = _normalize_analysis_output(analysis_type, {}, error=f"Analysis failed: {e}")
+                results[analysis_type] = run_result
+
+                try:
+                    from ..main import emit_progress
+                    per_type_progress = 85 + int((len(results) / total) * 8)
+                    await emit_progress(
+                        session_id=session_id,
+                        step="execution",
+                        progress=per_type_progress,
+                        message=f"Completed {analysis_type}",
+                        data={
+                            "analysis_type": analysis_type,
+                            "success": run_result.get("success", False),
+                        },
+                    )
+                except Exception as e:
+                    logger.warning(f"Could not emit progress: {e}")
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        staged.release()
+
+    for task in pending:
+        analysis_type = tasks[task]
+        logger.warning(f"Analysis {analysis_type} cancelled: total execution budget exhausted")
+        results[analysis_type] = _normalize_analysis_output(
             analysis_type,
             {},
-            error=f"Unable to parse JSON output from {module_file}",
+            error=f"Cancelled after the {TOTAL_EXECUTION_TIMEOUT_MS // 1000}s total execution budget",
         )
 
-    return _normalize_analysis_output(analysis_type, parsed_output)
+    # Keep the plan's ordering for downstream consumers
+    return {analysis_type: results[analysis_type] for analysis_type in unique_types}
 
 
 def _build_insights_from_results(analysis_results: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -668,7 +676,7 @@ async def step_upload(state: WorkflowState) -> WorkflowState:
 
     # Load existing project datasets as the execution context for downstream steps.
     try:
-        dataset_ids = await _load_project_dataset_ids(state["project_id"])
+        dataset_ids = await load_project_dataset_ids(state["project_id"])
         state["datasets"] = dataset_ids
         state["primary_dataset_id"] = dataset_ids[0] if dataset_ids else None
         if not dataset_ids:
@@ -919,8 +927,10 @@ async def step_execution(state: WorkflowState) -> WorkflowState:
     except Exception as e:
         logger.warning(f"Could not emit progress: {e}")
 
-    transformed_rows = _extract_rows(state.get("transformed_data"))
     dataset_id = state.get("transformed_dataset_id") or state.get("primary_dataset_id")
+    transformed_rows = await _load_transformed_rows(state.get("transformed_dataset_id"))
+    if not transformed_rows:
+        transformed_rows = _extract_rows(state.get("transformed_data"))
 
     if not transformed_rows:
         try:
@@ -950,34 +960,12 @@ async def step_execution(state: WorkflowState) -> WorkflowState:
         except Exception as e:
             logger.warning(f"Could not emit error: {e}")
     else:
-        analysis_results: Dict[str, Dict[str, Any]] = {}
-        total = max(len(analysis_types), 1)
-
-        for idx, analysis_type in enumerate(analysis_types):
-            run_result = await _execute_analysis_module(
-                analysis_type=analysis_type,
-                project_id=state["project_id"],
-                dataset_id=str(dataset_id) if dataset_id else None,
-                rows=transformed_rows,
-                pii_columns=[],
-            )
-            analysis_results[analysis_type] = run_result
-
-            try:
-                from ..main import emit_progress
-                per_type_progress = 85 + int(((idx + 1) / total) * 8)
-                await emit_progress(
-                    session_id=state.get("session_id", state["project_id"]),
-                    step="execution",
-                    progress=per_type_progress,
-                    message=f"Completed {analysis_type}",
-                    data={
-                        "analysis_type": analysis_type,
-                        "success": run_result.get("success", False),
-                    },
-                )
-            except Exception as e:
-                logger.warning(f"Could not emit progress: {e}")
+        analysis_results = await _run_analysis_plan(
+            state,
+            analysis_types,
+            transformed_rows,
+            str(dataset_id) if dataset_id else None,
+        )
 
         success_count = sum(1 for result in analysis_results.values() if result.get("success"))
         state["analysis_results"] = analysis_results
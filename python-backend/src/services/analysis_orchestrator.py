@@ -19,12 +19,22 @@ import asyncio
 from datetime import datetime
 from dataclasses import dataclass, asdict
 
+import pandas as pd
+
 # Local imports
 from ..models.schemas import (
     AnalysisType, AnalysisRequest, AnalysisResult,
     Insight, EvidenceLink, QuestionElementMapping,
     TransformationResult
 )
+from ..constants import MAX_ANALYSIS_TIMEOUT_MS
+from .analysis_worker_pool import (
+    StagedFrame,
+    UnsupportedAnalysisError,
+    get_analysis_worker_pool,
+    resolve_analysis_module,
+)
+from .progress_bus import get_progress_bus
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -70,6 +80,27 @@ class ReconciledResult:
     errors: List[str]
 
 
+# ============================================================================
+# Input Helpers
+# ============================================================================
+
+def _to_frame(data: Any) -> pd.DataFrame:
+    """Normalize the accepted analysis inputs into a DataFrame"""
+    if isinstance(data, pd.DataFrame):
+        return data
+    if isinstance(data, dict):
+        for key in ("data", "rows", "records"):
+            if isinstance(data.get(key), list):
+                return pd.DataFrame(data[key])
+        try:
+            return pd.DataFrame(data)  # column-oriented {"col": [...]}
+        except ValueError:
+            return pd.DataFrame([data])  # a single record
+    if isinstance(data, list):
+        return pd.DataFrame(data)
+    raise ValueError(f"Unsupported analysis input: {type(data).__name__}")
+
+
 # ============================================================================
 # Analysis Orchestration Service
 # ============================================================================
@@ -101,12 +132,43 @@ class AnalysisOrchestrator:
         self.progress_listeners.append(listener)
 
     def _notify_progress(self, progress: AnalysisProgress):
-        """Notify all progress listeners"""
-        for listener in self.progress_listeners:
-            try:
-                asyncio.create_task(listener(progress))
-            except Exception as e:
-                logger.error(f"Error notifying listener: {e}", exc_info=True)
+        """
+        Notify all progress listeners
+
+        Goes through the progress bus: bursts for the same session/step are
+        coalesced, 100% updates always go out, and the notifying task is
+        tracked rather than fire-and-forget.
+        """
+        if not self.progress_listeners:
+            return
+        get_progress_bus().publish_nowait(
+            (progress.session_id, progress.step),
+            progress,
+            self._deliver_progress,
+            terminal=progress.percentage >= 100
+        )
+
+    async def _deliver_progress(self, progress: AnalysisProgress):
+        """Run every listener for one update; a failing listener does not stop the rest"""
+        results = await asyncio.gather(
+            *(listener(progress) for listener in list(self.progress_listeners)),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Error notifying listener: {result}", exc_info=result)
+
+    async def _broadcast_answer(self, project_id: str, answer: Dict[str, Any]) -> None:
+        """Send one generated answer to the project's WebSocket sessions"""
+        from ..main import connection_manager
+
+        await connection_manager.broadcast_to_project(project_id, {
+            "type": "analysis:answer",
+            "project_id": project_id,
+            "question_id": answer.get("question_id"),
+            "answer": answer,
+            "timestamp": datetime.utcnow().isoformat()
+        })
 
     async def execute_single_analysis(
         self,
@@ -179,31 +241,25 @@ class AnalysisOrchestrator:
         context: AnalysisContext
     ) -> AnalysisResult:
         """
-        Run the appropriate analysis module
+        Run the appropriate analysis module on the analysis worker pool
+
+        The module is resolved by import name (not a CWD-relative path) and
+        executed in a pre-warmed worker process; the rows are handed over
+        through shared memory, so nothing blocks the event loop and the
+        payload size is not limited by the command line.
 
         Args:
             analysis_type: Type of analysis
-            data: Data to analyze
+            data: Data to analyze (DataFrame, row list, {"data": rows} dict,
+                or a frame already staged with the worker pool)
             context: Analysis context
 
         Returns:
             AnalysisResult with standardized output
         """
-        # Map analysis types to modules
-        module_map = {
-            AnalysisType.DESCRIPTIVE_STATS: "descriptive_stats",
-            AnalysisType.CORRELATION: "correlation_analysis",
-            AnalysisType.REGRESSION: "regression_analysis",
-            AnalysisType.CLUSTERING: "clustering_analysis",
-            AnalysisType.CLASSIFICATION: "classification_analysis",
-            AnalysisType.TIME_SERIES: "time_series_analysis",
-            AnalysisType.STATISTICAL_TESTS: "statistical_tests",
-            AnalysisType.TEXT_ANALYSIS: "text_analysis",
-            AnalysisType.GROUP_ANALYSIS: "group_analysis"
-        }
-
-        module_name = module_map.get(analysis_type)
-        if not module_name:
+        try:
+            resolve_analysis_module(analysis_type.value)
+        except UnsupportedAnalysisError:
             return AnalysisResult(
                 success=False,
                 analysis_type=analysis_type,
@@ -211,67 +267,27 @@ class AnalysisOrchestrator:
                 errors=[f"Unknown analysis type: {analysis_type.value}"]
             )
 
-        # Dynamically import and run the analysis module
-        try:
-            # Import the analysis module
-            from ..analysis_modules import module_name as analysis_module
-
-            # Check if module has a main function
-            if hasattr(analysis_module, "main"):
-                # Prepare input for the module
-                import json
-                input_data = {
-                    "data": data,
-                    "project_id": context.project_id,
-                    "pii_columns_to_exclude": [],
-                    "question_mappings": [m.dict() for m in context.question_mappings]
-                }
-
-                # Run the module
-                import subprocess
-                import io
-                import sys
-
-                # Execute Python script with input
-                process = subprocess.Popen(
-                    [sys.executable, "-c",
-                     f"import json; input_data = json.dumps({json.dumps(input_data)}); "
-                     f"exec(open('src/analysis_modules/{module_name}.py').read(), globals())"],
-                    stdin=subprocess.PIPE,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True
-                )
-
-                stdout, stderr = process.communicate()
-
-                if process.returncode != 0:
-                    raise Exception(f"Module execution failed: {stderr}")
-
-                # Parse result
-                result = json.loads(stdout)
-
-                return AnalysisResult(
-                    success=result.get("success", False),
-                    analysis_type=analysis_type,
-                    data=result.get("data", {}),
-                    metadata=result.get("metadata", {}),
-                    errors=result.get("errors", [])
-                )
-            else:
-                return AnalysisResult(
-                    success=False,
-                    analysis_type=analysis_type,
-                    data={},
-                    errors=[f"Module {module_name} has no main function"]
-                )
+        params = {
+            "project_id": context.project_id,
+            "dataset_id": context.dataset_id,
+            "pii_columns_to_exclude": [],
+            "question_mappings": [m.dict() for m in context.question_mappings],
+        }
 
-        except ImportError as e:
+        try:
+            frame = data if isinstance(data, StagedFrame) else _to_frame(data)
+            result = await get_analysis_worker_pool().run(
+                analysis_type.value,
+                frame,
+                params,
+                timeout=MAX_ANALYSIS_TIMEOUT_MS / 1000,
+            )
+        except asyncio.TimeoutError:
             return AnalysisResult(
                 success=False,
                 analysis_type=analysis_type,
                 data={},
-                errors=[f"Analysis module not found: {str(e)}"]
+                errors=[f"Analysis timed out after {MAX_ANALYSIS_TIMEOUT_MS // 1000}s"]
             )
         except Exception as e:
             return AnalysisResult(
@@ -281,6 +297,14 @@ class AnalysisOrchestrator:
                 errors=[f"Module execution error: {str(e)}"]
             )
 
+        return AnalysisResult(
+            success=bool(result.get("success", False)),
+            analysis_type=analysis_type,
+            data=result.get("data") if isinstance(result.get("data"), dict) else {},
+            metadata=result.get("metadata") if isinstance(result.get("metadata"), dict) else {},
+            errors=[str(e) for e in (result.get("errors") or [])]
+        )
+
     async def execute_multiple_analyses(
         self,
         context: AnalysisContext,
@@ -298,18 +322,29 @@ class AnalysisOrchestrator:
         """
         results = {}
 
+        # Stage the rows in shared memory once for all analyses
+        staged = None
+        try:
+            staged = await get_analysis_worker_pool().stage(_to_frame(data))
+        except Exception as e:
+            logger.warning(f"Could not stage analysis data, each analysis will convert it: {e}")
+
         # Execute all requested analyses
         tasks = []
         for analysis_type in context.analysis_types:
             task = self.execute_single_analysis(
                 context=context,
                 analysis_type=analysis_type,
-                data=data
+                data=staged if staged is not None else data
             )
             tasks.append(task)
 
         # Wait for all analyses to complete
-        completed_results = await asyncio.gather(*tasks, return_exceptions=True)
+        try:
+            completed_results = await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            if staged is not None:
+                staged.release()
 
         # Process results
         for i, result in enumerate(completed_results):
@@ -354,17 +389,21 @@ class AnalysisOrchestrator:
         """
         try:
             # Import services for reconciliation
-            from .result_interpreter import ResultInterpreter
+            from .result_interpreter import get_result_interpreter
             from .rag_evidence_chain import get_evidence_chain_service
 
-            interpreter = ResultInterpreter()
+            interpreter = get_result_interpreter()
             evidence_service = get_evidence_chain_service()
 
-            # Generate answers to questions
+            async def _stream_answer(answer: Dict[str, Any]) -> None:
+                await self._broadcast_answer(context.project_id, answer)
+
+            # Generate answers to questions (each is pushed to the client as it completes)
             answers = await interpreter.generate_answers(
                 questions=context.question_mappings,
                 analysis_results=analysis_results,
-                business_context=context.business_context
+                business_context=context.business_context,
+                on_answer=_stream_answer
             )
 
             # Generate insights
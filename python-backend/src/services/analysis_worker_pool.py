@@ -0,0 +1,476 @@
+"""
+Analysis Worker Pool
+
+Persistent, pre-warmed process pool for the analysis modules in
+`src/analysis_modules`. Replaces spawning `python <module>.py` per call.
+
+Features:
+- Worker processes import every analysis module once at start-up, so warm
+  calls skip interpreter start and the pandas/scipy/sklearn import cost
+- DataFrames are handed over as Arrow IPC files in shared memory
+  (/dev/shm when available) and memory-mapped by the worker — no JSON
+  round-trip of the rows
+- Modules run through their standard `main(input_config)` entry point and
+  keep the standard result contract (success, analysis_type, data,
+  metadata, errors)
+- Per-analysis timeouts and cancellation: only the affected worker is
+  killed and replaced with a fresh warm one
+- Waiting for a worker is bounded too; when every worker is gone and none
+  can be restarted, callers get AnalysisPoolUnavailableError instead of
+  queueing forever
+
+Usage:
+    pool = get_analysis_worker_pool()
+    result = await pool.run("correlation", frame, {"project_id": project_id})
+"""
+
+from typing import Dict, List, Optional, Any, Union
+import asyncio
+import contextlib
+import importlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+from .dataset_store import rows_to_table
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+# Number of worker processes (default: up to 4, bounded by CPU count)
+ANALYSIS_POOL_WORKERS = int(os.getenv("ANALYSIS_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Directory for Arrow IPC hand-off files (tmpfs when available)
+ANALYSIS_POOL_SHM_DIR = os.getenv(
+    "ANALYSIS_POOL_SHM_DIR",
+    "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(),
+)
+
+_ANALYSIS_PACKAGE = __name__.rsplit(".", 2)[0] + ".analysis_modules"
+
+_WORKER_READY = "ready"
+
+# Analysis type -> module in src/analysis_modules
+ANALYSIS_MODULE_MAP: Dict[str, str] = {
+    "descriptive_stats": "descriptive_stats",
+    "descriptive": "descriptive_stats",
+    "correlation": "correlation_analysis",
+    "regression": "regression_analysis",
+    "clustering": "clustering_analysis",
+    "time_series": "time_series_analysis",
+    "statistical_tests": "statistical_tests",
+    "classification": "classification_analysis",
+    "eda": "eda_analysis",
+    "comparative": "statistical_tests",
+}
+
+
+class UnsupportedAnalysisError(ValueError):
+    """Raised when no analysis module is registered for an analysis type"""
+
+
+class AnalysisPoolUnavailableError(RuntimeError):
+    """Raised when the pool has no live workers and cannot start new ones"""
+
+
+def resolve_analysis_module(analysis_type: str) -> str:
+    """Get the fully qualified module name for an analysis type"""
+    module = ANALYSIS_MODULE_MAP.get(str(analysis_type).strip().lower())
+    if not module:
+        raise UnsupportedAnalysisError(f"Unsupported analysis type: {analysis_type}")
+    return f"{_ANALYSIS_PACKAGE}.{module}"
+
+
+def _error_payload(analysis_type: str, message: str) -> Dict[str, Any]:
+    return {
+        "success": False,
+        "analysis_type": analysis_type,
+        "data": {},
+        "metadata": {},
+        "errors": [message],
+    }
+
+
+# ============================================================================
+# Worker Process Side
+# ============================================================================
+
+def _warm_worker(module_names: List[str]) -> None:
+    """Import every analysis module once per worker"""
+    for module_name in module_names:
+        try:
+            importlib.import_module(module_name)
+        except Exception as e:  # a broken module must not take the worker down
+            logging.getLogger(__name__).warning(f"Could not preload {module_name}: {e}")
+
+
+def _run_in_worker(
+    module_name: str,
+    analysis_type: str,
+    frame_path: str,
+    params: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Execute one analysis inside a worker process"""
+    module = importlib.import_module(module_name)
+
+    with pa.memory_map(frame_path, "r") as source:
+        frame = pa.ipc.open_file(source).read_all().to_pandas()
+
+    input_config = dict(params)
+    input_config["data"] = frame
+    input_config.setdefault("analysis_type", analysis_type)
+
+    captured = io.StringIO()
+    exit_code: Any = 0
+    with contextlib.redirect_stdout(captured):
+        try:
+            module.main(input_config)
+        except SystemExit as exc:
+            exit_code = exc.code or 0
+
+    raw_output = captured.getvalue().strip()
+    try:
+        payload = json.loads(raw_output) if raw_output else None
+    except json.JSONDecodeError:
+        payload = None
+
+    if not isinstance(payload, dict):
+        message = "returned empty output" if not raw_output else "returned non-JSON output"
+        return _error_payload(analysis_type, f"Module {module_name} {message} (exit code {exit_code})")
+    return payload
+
+
+def _worker_main(conn: Connection, module_names: List[str]) -> None:
+    """Worker process loop: warm up, then execute tasks until told to stop"""
+    _warm_worker(module_names)
+    conn.send(_WORKER_READY)
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if task is None:
+            break
+        module_name, analysis_type, frame_path, params = task
+        try:
+            result = _run_in_worker(module_name, analysis_type, frame_path, params)
+        except Exception as e:
+            result = _error_payload(analysis_type, f"Analysis failed: {e}")
+        conn.send(result)
+
+
+# ============================================================================
+# Parent Side
+# ============================================================================
+
+@dataclass
+class StagedFrame:
+    """A DataFrame written once to shared memory and reusable across runs"""
+    path: str
+    row_count: int
+
+    def release(self) -> None:
+        """Remove the hand-off file"""
+        with contextlib.suppress(OSError):
+            os.unlink(self.path)
+
+
+class _Worker:
+    """One worker process and the parent end of its pipe"""
+
+    def __init__(self, context: multiprocessing.context.BaseContext, module_names: List[str]):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, module_names),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+    @property
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def kill(self) -> None:
+        with contextlib.suppress(Exception):
+            self.process.kill()
+            self.process.join(timeout=1)
+        with contextlib.suppress(Exception):
+            self.conn.close()
+
+    def stop(self) -> None:
+        with contextlib.suppress(Exception):
+            self.conn.send(None)
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.kill()
+        with contextlib.suppress(Exception):
+            self.conn.close()
+
+
+class AnalysisWorkerPool:
+    """
+    Persistent process pool that executes analysis modules in-process.
+
+    Each worker is an individually managed process, so a timed-out or
+    cancelled analysis kills and replaces only its own worker. `run` may be
+    awaited concurrently; callers queue for an idle worker, which bounds
+    concurrency at `max_workers`. The wait for a worker and the run itself
+    are each bounded by their own timeout.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, shm_dir: Optional[str] = None):
+        """Initialize the pool (processes are started by `start` or the first `run`)"""
+        self.max_workers = max(1, int(max_workers or ANALYSIS_POOL_WORKERS))
+        self.shm_dir = Path(shm_dir or ANALYSIS_POOL_SHM_DIR)
+        self._module_names = sorted({f"{_ANALYSIS_PACKAGE}.{m}" for m in ANALYSIS_MODULE_MAP.values()})
+        # forkserver avoids forking the threaded server process itself
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self._context = multiprocessing.get_context(method)
+        self._workers: List[_Worker] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._runs = 0
+        self._failures = 0
+        self._timeouts = 0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self._context, self._module_names)
+        self._workers.append(worker)
+        return worker
+
+    async def _await_ready(self, worker: _Worker) -> None:
+        message = await asyncio.to_thread(worker.conn.recv)
+        if message != _WORKER_READY:
+            raise RuntimeError(f"Unexpected worker handshake: {message!r}")
+
+    async def start(self) -> None:
+        """Start all worker processes and wait until their modules are imported"""
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._idle is not None:
+                return
+            started = time.perf_counter()
+            workers = [self._spawn() for _ in range(self.max_workers)]
+            try:
+                await asyncio.gather(*[self._await_ready(worker) for worker in workers])
+            except Exception as e:
+                for worker in workers:
+                    worker.kill()
+                    self._workers.remove(worker)
+                raise AnalysisPoolUnavailableError(f"Analysis worker pool failed to start: {e}") from e
+            self._idle = asyncio.Queue()
+            for worker in workers:
+                self._idle.put_nowait(worker)
+            logger.info(
+                f"Analysis worker pool warm: {len(workers)} workers in "
+                f"{(time.perf_counter() - started) * 1000:.0f}ms"
+            )
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop all worker processes"""
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            if wait:
+                worker.stop()
+            else:
+                worker.kill()
+        self._idle = None
+        self._start_lock = None
+
+    async def _replace(self, worker: _Worker) -> None:
+        """Kill a worker and put a fresh, warmed one back into rotation"""
+        worker.kill()
+        if worker in self._workers:
+            self._workers.remove(worker)
+        if self._idle is None:
+            return
+        for attempt in range(2):
+            replacement = self._spawn()
+            try:
+                await self._await_ready(replacement)
+            except Exception as e:
+                logger.error(f"Failed to start replacement analysis worker (attempt {attempt + 1}): {e}")
+                replacement.kill()
+                self._workers.remove(replacement)
+                continue
+            self._idle.put_nowait(replacement)
+            return
+        if self._workers:
+            logger.error("Analysis worker pool is running with reduced capacity")
+            return
+        logger.error("Analysis worker pool has no live workers left")
+        # Wake the callers queued for a worker; each one passes it on
+        self._idle.put_nowait(None)
+
+    async def _acquire(self, timeout: Optional[float]) -> _Worker:
+        """Take an idle, live worker, waiting at most `timeout` seconds"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        while True:
+            if not self._workers:
+                raise AnalysisPoolUnavailableError("Analysis worker pool has no live workers")
+            remaining = max(0.0, deadline - loop.time()) if deadline is not None else None
+            worker = await asyncio.wait_for(self._idle.get(), timeout=remaining)
+            if worker is None:
+                self._idle.put_nowait(None)
+                raise AnalysisPoolUnavailableError("Analysis worker pool has no live workers")
+            if worker.alive:
+                return worker
+            await self._replace(worker)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics"""
+        return {
+            "max_workers": self.max_workers,
+            "running": self._idle is not None,
+            "idle_workers": self._idle.qsize() if self._idle is not None else 0,
+            "runs": self._runs,
+            "failures": self._failures,
+            "timeouts": self._timeouts,
+            "shm_dir": str(self.shm_dir),
+        }
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    def _write_frame(self, frame: pd.DataFrame) -> StagedFrame:
+        """Write a frame as an Arrow IPC file for workers to memory-map"""
+        try:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            # Mixed-type object columns: fall back to the store's tolerant conversion
+            table = rows_to_table(frame.to_dict(orient="records"), [str(c) for c in frame.columns])
+
+        self.shm_dir.mkdir(parents=True, exist_ok=True)
+        path = self.shm_dir / f"analysis-{uuid.uuid4().hex}.arrow"
+        with pa.OSFile(str(path), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        return StagedFrame(path=str(path), row_count=table.num_rows)
+
+    async def stage(self, frame: pd.DataFrame) -> StagedFrame:
+        """
+        Write a frame to shared memory once so several analyses can read it.
+
+        The caller must `release()` the staged frame when done.
+        """
+        return await asyncio.to_thread(self._write_frame, frame)
+
+    async def run(
+        self,
+        analysis_type: str,
+        frame: Union[pd.DataFrame, StagedFrame],
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        acquire_timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run one analysis module on a DataFrame.
+
+        Args:
+            analysis_type: Analysis type (see ANALYSIS_MODULE_MAP)
+            frame: Input data, or a frame staged with `stage()`
+            params: Extra module configuration (project_id, pii_columns_to_exclude, ...)
+            timeout: Seconds the analysis may run once a worker picks it up (None = no limit)
+            acquire_timeout: Seconds to wait for an idle worker (defaults to `timeout`)
+
+        Returns:
+            Module result dict: {success, analysis_type, data, metadata, errors}
+
+        Raises:
+            UnsupportedAnalysisError: If the analysis type has no module
+            AnalysisPoolUnavailableError: If no worker is alive and none can be started
+            asyncio.TimeoutError: If no worker frees up in time, or `timeout`
+                elapses during the run (the worker is replaced)
+            asyncio.CancelledError: If the caller is cancelled (the worker is replaced)
+        """
+        module_name = resolve_analysis_module(analysis_type)
+        if self._idle is not None and not self._workers:
+            # Every worker died and could not be replaced: start over
+            self._idle = None
+        if self._idle is None:
+            await self.start()
+        if acquire_timeout is None:
+            acquire_timeout = timeout
+
+        owns_frame = not isinstance(frame, StagedFrame)
+        staged = await self.stage(frame) if owns_frame else frame
+        self._runs += 1
+
+        try:
+            try:
+                worker = await self._acquire(acquire_timeout)
+            except asyncio.TimeoutError:
+                self._timeouts += 1
+                logger.warning(f"No analysis worker became free for {analysis_type} within {acquire_timeout}s")
+                raise
+
+            healthy = False
+            try:
+                worker.conn.send((module_name, analysis_type, staged.path, dict(params or {})))
+                result = await asyncio.wait_for(asyncio.to_thread(worker.conn.recv), timeout=timeout)
+                healthy = True
+                return result
+            except asyncio.TimeoutError:
+                self._timeouts += 1
+                logger.warning(f"Analysis {analysis_type} timed out after {timeout}s; replacing its worker")
+                raise
+            except (EOFError, OSError, BrokenPipeError) as e:
+                self._failures += 1
+                logger.error(f"Analysis worker died during {analysis_type}: {e}")
+                return _error_payload(analysis_type, f"Analysis worker crashed: {e}")
+            finally:
+                if healthy:
+                    self._idle.put_nowait(worker)
+                else:
+                    # Timed out, cancelled or crashed: the worker may still be busy
+                    await asyncio.shield(self._replace(worker))
+        finally:
+            if owns_frame:
+                staged.release()
+
+
+# ============================================================================
+# Singleton Instance
+# ============================================================================
+
+_pool_instance: Optional[AnalysisWorkerPool] = None
+
+
+def get_analysis_worker_pool() -> AnalysisWorkerPool:
+    """Get or create the analysis worker pool singleton"""
+    global _pool_instance
+    if _pool_instance is None:
+        _pool_instance = AnalysisWorkerPool()
+    return _pool_instance
+
+
+def shutdown_analysis_worker_pool() -> None:
+    """Stop the worker pool if it was started"""
+    global _pool_instance
+    if _pool_instance is not None:
+        _pool_instance.shutdown(wait=False)
+        _pool_instance = None
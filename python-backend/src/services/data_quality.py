@@ -0,0 +1,315 @@
+"""
+Data Quality Engine
+
+Vectorized data-quality metrics over columnar dataset frames.
+
+Features:
+- Per-column null, blank-string and distinct counts (pandas column ops,
+  no per-cell Python loops)
+- Duplicate detection from a 64-bit hash per row
+- Completeness / uniqueness / weighted quality score
+- Reports cached per dataset and invalidated when the stored file changes,
+  so the data-quality, verify and profile endpoints share one computation
+
+Usage:
+    from src.services.data_quality import get_dataset_quality, combine_quality
+
+    report = await get_dataset_quality(dataset_id)
+    summary = report.to_summary()
+"""
+
+import asyncio
+import logging
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .dataset_store import get_dataset_store
+
+logger = logging.getLogger(__name__)
+
+# Row hashes are kept with cached reports (8 bytes per row) so project-wide
+# duplicates can be counted without reloading datasets.
+DATA_QUALITY_CACHE_MAX_BYTES = int(os.getenv("DATA_QUALITY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Weighted quality score: completeness 60%, uniqueness 40%
+COMPLETENESS_WEIGHT = 0.6
+UNIQUENESS_WEIGHT = 0.4
+
+_HASH_MULTIPLIER = np.uint64(0x100000001B3)
+_MISSING_COLUMN_HASH = np.uint64(0x9E3779B97F4A7C15)
+
+
+# ============================================================================
+# Report
+# ============================================================================
+
+@dataclass
+class QualityReport:
+    """Quality metrics for one dataset (or a combination of datasets)"""
+    columns: List[str]
+    total_rows: int
+    na_counts: Dict[str, int]
+    blank_counts: Dict[str, int]
+    distinct_counts: Dict[str, int]
+    duplicate_rows: int
+    row_hashes: np.ndarray = field(repr=False, default_factory=lambda: np.empty(0, dtype=np.uint64))
+
+    @property
+    def null_counts(self) -> Dict[str, int]:
+        """Missing values per column: nulls plus blank strings"""
+        return {col: self.na_counts[col] + self.blank_counts[col] for col in self.columns}
+
+    @property
+    def completeness(self) -> float:
+        total_cells = self.total_rows * len(self.columns)
+        if total_cells == 0:
+            return 0.0
+        return (total_cells - sum(self.null_counts.values())) / total_cells
+
+    @property
+    def uniqueness(self) -> float:
+        if self.total_rows == 0:
+            return 1.0
+        return (self.total_rows - self.duplicate_rows) / self.total_rows
+
+    @property
+    def quality_score(self) -> float:
+        if self.total_rows == 0:
+            return 0.0
+        return self.completeness * COMPLETENESS_WEIGHT + self.uniqueness * UNIQUENESS_WEIGHT
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.row_hashes.nbytes) + 64 * len(self.columns)
+
+    def to_summary(self) -> Dict[str, Any]:
+        """Summary in the shape returned by the data-quality endpoint"""
+        null_counts = self.null_counts
+        rows = self.total_rows or 1
+        return {
+            "completeness": round(self.completeness, 4),
+            "duplicateRows": self.duplicate_rows,
+            "nullCounts": null_counts,
+            "columnCompleteness": {col: round((rows - null_counts[col]) / rows, 4) for col in self.columns}
+            if self.total_rows else {col: 0.0 for col in self.columns},
+            "totalRows": self.total_rows,
+            "totalColumns": len(self.columns),
+            "qualityScore": round(self.quality_score, 4),
+        }
+
+
+# ============================================================================
+# Computation
+# ============================================================================
+
+def _hash_column(series: pd.Series) -> np.ndarray:
+    values = series.to_numpy()
+    try:
+        return pd.util.hash_array(values, categorize=False)
+    except (TypeError, ValueError):
+        # Nested JSON values (dicts/lists) are not hashable; hash their text
+        return pd.util.hash_array(series.astype(str).to_numpy(), categorize=False)
+
+
+def _distinct_count(series: pd.Series) -> int:
+    try:
+        return int(series.nunique(dropna=True))
+    except TypeError:
+        return int(series.dropna().astype(str).nunique())
+
+
+def _blank_count(series: pd.Series) -> int:
+    if series.dtype != object and not pd.api.types.is_string_dtype(series.dtype):
+        return 0
+    try:
+        stripped = series.str.strip()
+    except AttributeError:
+        # Object column without any string values
+        return 0
+    return int((stripped == "").sum())
+
+
+def compute_quality(frame: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> QualityReport:
+    """
+    Compute quality metrics for a frame.
+
+    Args:
+        frame: Dataset rows
+        columns: Columns to assess (e.g. the stored schema). Columns absent
+            from the frame count as entirely null. None = frame columns.
+
+    Returns:
+        QualityReport
+    """
+    columns = [str(col) for col in (columns if columns else frame.columns)]
+    total_rows = len(frame)
+    present = [col for col in columns if col in frame.columns]
+
+    na = frame[present].isna().sum() if present else pd.Series(dtype="int64")
+    na_counts = {col: int(na[col]) if col in frame.columns else total_rows for col in columns}
+    blank_counts = {col: _blank_count(frame[col]) if col in frame.columns else 0 for col in columns}
+    distinct_counts = {col: _distinct_count(frame[col]) if col in frame.columns else 0 for col in columns}
+
+    row_hashes = np.zeros(total_rows, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for col in columns:
+            column_hash = _hash_column(frame[col]) if col in frame.columns else _MISSING_COLUMN_HASH
+            row_hashes = row_hashes * _HASH_MULTIPLIER ^ column_hash
+
+    duplicate_rows = total_rows - int(np.unique(row_hashes).size)
+
+    return QualityReport(
+        columns=columns,
+        total_rows=total_rows,
+        na_counts=na_counts,
+        blank_counts=blank_counts,
+        distinct_counts=distinct_counts,
+        duplicate_rows=duplicate_rows,
+        row_hashes=row_hashes,
+    )
+
+
+def combine_quality(reports: Sequence[QualityReport]) -> QualityReport:
+    """
+    Combine per-dataset reports into a project-wide report.
+
+    Columns are the union across datasets; a dataset lacking a column
+    contributes its rows as nulls. Rows are only compared for duplicates
+    against datasets with the same column list.
+    """
+    columns: List[str] = []
+    for report in reports:
+        columns.extend(col for col in report.columns if col not in columns)
+
+    total_rows = sum(report.total_rows for report in reports)
+    na_counts = {
+        col: sum(report.na_counts.get(col, report.total_rows) for report in reports) for col in columns
+    }
+    blank_counts = {col: sum(report.blank_counts.get(col, 0) for report in reports) for col in columns}
+
+    groups: Dict[Tuple[str, ...], List[np.ndarray]] = {}
+    for report in reports:
+        groups.setdefault(tuple(report.columns), []).append(report.row_hashes)
+    duplicate_rows = 0
+    for hashes in groups.values():
+        merged = np.concatenate(hashes) if hashes else np.empty(0, dtype=np.uint64)
+        duplicate_rows += int(merged.size - np.unique(merged).size)
+
+    return QualityReport(
+        columns=columns,
+        total_rows=total_rows,
+        na_counts=na_counts,
+        blank_counts=blank_counts,
+        distinct_counts={},
+        duplicate_rows=duplicate_rows,
+    )
+
+
+# ============================================================================
+# Per-dataset Cache
+# ============================================================================
+
+class DataQualityCache:
+    """LRU cache of reports keyed by dataset and column selection, bounded by bytes"""
+
+    def __init__(self, max_bytes: int = DATA_QUALITY_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, Optional[Tuple[str, ...]]], Tuple[Tuple[int, int], QualityReport]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version: Optional[Tuple[int, int]]) -> Optional[QualityReport]:
+        entry = self._entries.get(key)
+        if entry is None or version is None or entry[0] != version:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, version: Tuple[int, int], report: QualityReport) -> None:
+        self._discard(key)
+        if report.nbytes > self.max_bytes:
+            return
+        self._entries[key] = (version, report)
+        self._bytes += report.nbytes
+        while self._bytes > self.max_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            self._discard(oldest)
+
+    def invalidate(self, dataset_id: str) -> None:
+        for key in [key for key in self._entries if key[0] == dataset_id]:
+            self._discard(key)
+
+    def _discard(self, key) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1].nbytes
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_quality_cache_instance: Optional[DataQualityCache] = None
+
+
+def get_quality_cache() -> DataQualityCache:
+    """Get or create the data-quality cache singleton"""
+    global _quality_cache_instance
+    if _quality_cache_instance is None:
+        _quality_cache_instance = DataQualityCache()
+    return _quality_cache_instance
+
+
+async def get_dataset_quality(
+    dataset_id: str,
+    columns: Optional[Sequence[str]] = None,
+    frame: Optional[pd.DataFrame] = None,
+) -> Optional[QualityReport]:
+    """
+    Get the quality report for a stored dataset, computing it on a cache miss.
+
+    Args:
+        dataset_id: Dataset ID
+        columns: Columns to assess (None = every stored column)
+        frame: Already-loaded rows for the dataset, if the caller has them
+
+    Returns:
+        QualityReport, or None if the dataset has no rows available
+    """
+    store = get_dataset_store()
+    cache = get_quality_cache()
+
+    stored_columns = store.columns(dataset_id)
+    if columns is not None and list(columns) == stored_columns:
+        columns = None
+    key = (str(dataset_id), tuple(columns) if columns is not None else None)
+
+    report = cache.get(key, store.version(dataset_id))
+    if report is not None:
+        return report
+
+    if frame is None:
+        frame = await store.load(dataset_id, columns=columns)
+    if frame is None or (frame.empty and not len(frame.columns)):
+        return None
+
+    report = await asyncio.to_thread(compute_quality, frame, columns)
+
+    # Loading may have backfilled a legacy dataset, so read the version again
+    version = store.version(dataset_id)
+    if version is not None:
+        cache.put(key, version, report)
+    return report
@@ -37,6 +37,8 @@ except Exception as e:
 
 from pydantic import BaseModel, Field
 
+from .data_quality import QualityReport, compute_quality
+
 
 # ============================================================================
 # Models
@@ -184,7 +186,8 @@ class DataVerificationService:
         project_id: str,
         dataset_id: str,
         data: Any,
-        schema: Optional[Dict[str, Any]] = None
+        schema: Optional[Dict[str, Any]] = None,
+        quality_report: Optional[QualityReport] = None
     ) -> VerificationResult:
         """
         Verify a dataset for PII and data quality.
@@ -194,6 +197,7 @@ class DataVerificationService:
             dataset_id: Dataset ID
             data: Dataset data (DataFrame or dict representation)
             schema: Optional schema information
+            quality_report: Precomputed (usually cached) quality report for `data`
 
         Returns:
             VerificationResult with PII findings and quality scores
@@ -203,17 +207,20 @@ class DataVerificationService:
         if df is None:
             return self._empty_verification_result(project_id, dataset_id)
 
+        if quality_report is None:
+            quality_report = compute_quality(df)
+
         # Detect PII
         pii_fields = await self._detect_pii(df)
 
         # Assess data quality
-        quality_score = self._assess_quality(df)
+        quality_score = self._assess_quality(df, quality_report)
 
         # Generate issues and recommendations
         issues, warnings, recommendations = self._generate_findings(df, pii_fields, quality_score)
 
         # Profile columns
-        column_profiles = self._profile_columns(df)
+        column_profiles = self._profile_columns(df, quality_report)
 
         return VerificationResult(
             project_id=project_id,
@@ -295,21 +302,23 @@ class DataVerificationService:
         else:
             return "personally_identifiable_information"
 
-    def _assess_quality(self, df: 'pd.DataFrame') -> DataQualityScore:
+    def _assess_quality(self, df: 'pd.DataFrame', report: Optional[QualityReport] = None) -> DataQualityScore:
         """Calculate data quality scores"""
-        total_cells = len(df) * len(df.columns)
-        null_cells = df.isnull().sum().sum()
+        if report is None:
+            report = compute_quality(df)
+
+        total_cells = report.total_rows * len(report.columns)
+        null_cells = sum(report.na_counts.values())
 
         # Completeness: fraction of non-null values
         completeness = 1.0 - (null_cells / total_cells) if total_cells > 0 else 1.0
 
         # Uniqueness: average uniqueness across columns
         uniqueness_scores = []
-        for column in df.columns:
-            unique_count = df[column].nunique()
-            non_null_count = df[column].notna().sum()
+        for column in report.columns:
+            non_null_count = report.total_rows - report.na_counts[column]
             if non_null_count > 0:
-                uniqueness_scores.append(unique_count / non_null_count)
+                uniqueness_scores.append(report.distinct_counts[column] / non_null_count)
         uniqueness = sum(uniqueness_scores) / len(uniqueness_scores) if uniqueness_scores else 1.0
 
         validity_scores: List[float] = []
@@ -446,17 +455,26 @@ class DataVerificationService:
 
         return issues, warnings, recommendations
 
-    def _profile_columns(self, df: 'pd.DataFrame') -> List[Dict[str, Any]]:
+    def _profile_columns(self, df: 'pd.DataFrame', report: Optional[QualityReport] = None) -> List[Dict[str, Any]]:
         """Generate profile information for each column"""
+        if report is None:
+            report = compute_quality(df)
+
         profiles = []
 
         for column in df.columns:
             col_data = df[column]
+            null_count = report.na_counts.get(str(column))
+            if null_count is None:
+                null_count = int(col_data.isnull().sum())
+            unique_count = report.distinct_counts.get(str(column))
+            if unique_count is None:
+                unique_count = int(col_data.nunique())
             profile: Dict[str, Any] = {
                 "name": column,
-                "nullable": col_data.isnull().any(),
-                "unique_count": col_data.nunique(),
-                "null_count": col_data.isnull().sum(),
+                "nullable": null_count > 0,
+                "unique_count": unique_count,
+                "null_count": null_count,
                 "sample_values": col_data.dropna().astype(str).head(5).tolist()
             }
 
@@ -470,7 +488,7 @@ class DataVerificationService:
                 profile["type"] = "datetime"
             else:
                 # Check if categorical (low cardinality) or text (high cardinality)
-                unique_ratio = col_data.nunique() / max(len(col_data), 1)
+                unique_ratio = unique_count / max(len(col_data), 1)
                 profile["type"] = "categorical" if unique_ratio < 0.5 else "text"
                 profile["max_length"] = col_data.astype(str).str.len().max()
 
@@ -0,0 +1,163 @@
+"""
+Dataset Record Loader
+
+Typed access to the datasets linked to a project. Replaces the per-call
+query builders that probed information_schema before every load.
+
+Features:
+- Project linkage through the project_datasets junction table (and the
+  legacy datasets.project_id column where a database still has it)
+- Optional JSON columns selected from the cached table schema
+- JSON payloads decoded once into a DatasetRecord
+- Stale schema cache refreshed and the query retried on undefined columns
+
+Usage:
+    from src.services.dataset_loader import load_primary_dataset
+
+    record = await load_primary_dataset(project_id, dataset_ids)
+    if record:
+        rows = record.transformed_payloads()
+"""
+
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from sqlalchemy import bindparam, text as sa_text
+from sqlalchemy.exc import ProgrammingError
+
+from ..db import get_db_context
+from ..db.schema_cache import get_schema_cache
+
+logger = logging.getLogger(__name__)
+
+# Optional JSON columns read from datasets when the table has them
+DATASET_PAYLOAD_COLUMNS = ("schema", "preview", "ingestion_metadata", "metadata")
+
+
+def _decode_json(value: Any) -> Any:
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except Exception:
+            return value
+    return value
+
+
+@dataclass
+class DatasetRecord:
+    """A dataset row with its JSON payload columns decoded"""
+    id: str
+    schema: Optional[Dict[str, Any]] = None
+    preview: Any = None
+    ingestion_metadata: Dict[str, Any] = field(default_factory=dict)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_row(cls, row: Mapping[str, Any]) -> "DatasetRecord":
+        schema = _decode_json(row.get("schema"))
+        ingestion = _decode_json(row.get("ingestion_metadata"))
+        metadata = _decode_json(row.get("metadata"))
+        return cls(
+            id=str(row["id"]),
+            schema=schema if isinstance(schema, dict) else None,
+            preview=_decode_json(row.get("preview")),
+            ingestion_metadata=ingestion if isinstance(ingestion, dict) else {},
+            metadata=metadata if isinstance(metadata, dict) else {},
+        )
+
+    def transformed_payloads(self) -> List[Any]:
+        """Previously transformed data, ingestion metadata first"""
+        return [
+            self.ingestion_metadata.get("transformedData"),
+            self.metadata.get("transformedData"),
+        ]
+
+
+async def _query_project_datasets(
+    project_id: str,
+    dataset_ids: Sequence[str],
+    limit: Optional[int],
+    newest_first: bool,
+    include_payloads: bool,
+) -> List[DatasetRecord]:
+    async with get_db_context() as session:
+        dataset_columns = await get_schema_cache().get_columns("datasets", session)
+
+        select_parts = ["d.id AS id"]
+        if include_payloads:
+            select_parts.extend(
+                f'd."{column}" AS "{column}"' for column in DATASET_PAYLOAD_COLUMNS if column in dataset_columns
+            )
+        link_condition = "pd.project_id IS NOT NULL"
+        if "project_id" in dataset_columns:
+            link_condition = f"({link_condition} OR d.project_id = :project_id)"
+
+        query = (
+            f"SELECT {', '.join(select_parts)} FROM datasets d "
+            "LEFT JOIN project_datasets pd ON pd.dataset_id = d.id AND pd.project_id = :project_id "
+            f"WHERE {link_condition}"
+        )
+        params: Dict[str, Any] = {"project_id": project_id}
+        if dataset_ids:
+            query += " AND d.id IN :dataset_ids"
+            params["dataset_ids"] = list(dataset_ids)
+
+        direction = "DESC" if newest_first else "ASC"
+        query += f" ORDER BY COALESCE(pd.added_at, d.created_at) {direction}, d.id ASC"
+        if limit is not None:
+            query += " LIMIT :limit"
+            params["limit"] = limit
+
+        statement = sa_text(query)
+        if dataset_ids:
+            statement = statement.bindparams(bindparam("dataset_ids", expanding=True))
+
+        result = await session.execute(statement, params)
+        return [DatasetRecord.from_row(row) for row in result.mappings().all()]
+
+
+async def load_project_datasets(
+    project_id: str,
+    dataset_ids: Optional[Sequence[str]] = None,
+    limit: Optional[int] = None,
+    newest_first: bool = False,
+    include_payloads: bool = True,
+) -> List[DatasetRecord]:
+    """
+    Load the datasets linked to a project.
+
+    Args:
+        project_id: Project ID
+        dataset_ids: Restrict to these dataset IDs (empty/None = all linked)
+        limit: Maximum number of records
+        newest_first: Order by most recently linked instead of first linked
+        include_payloads: Also read the JSON payload columns
+
+    Returns:
+        List of DatasetRecord
+    """
+    normalized_ids = [str(dataset_id) for dataset_id in (dataset_ids or []) if str(dataset_id).strip()]
+    try:
+        return await _query_project_datasets(project_id, normalized_ids, limit, newest_first, include_payloads)
+    except ProgrammingError as e:
+        # A migration in another process may have dropped a cached column
+        logger.info(f"Dataset query failed against cached schema, refreshing: {e}")
+        get_schema_cache().invalidate("datasets")
+        return await _query_project_datasets(project_id, normalized_ids, limit, newest_first, include_payloads)
+
+
+async def load_primary_dataset(
+    project_id: str,
+    dataset_ids: Optional[Sequence[str]] = None,
+) -> Optional[DatasetRecord]:
+    """Load the first dataset linked to a project (optionally among dataset_ids)"""
+    records = await load_project_datasets(project_id, dataset_ids, limit=1)
+    return records[0] if records else None
+
+
+async def load_project_dataset_ids(project_id: str) -> List[str]:
+    """IDs of the datasets linked to a project, first linked first"""
+    records = await load_project_datasets(project_id, include_payloads=False)
+    return [record.id for record in records]
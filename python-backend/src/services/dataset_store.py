@@ -0,0 +1,733 @@
+"""
+Columnar Dataset Store
+
+Persists dataset rows as Parquet files keyed by dataset_id so the
+`datasets` table only has to hold metadata plus a pointer
+(`ingestion_metadata.columnarStore`).
+
+Features:
+- Column-pruned reads (only the requested columns are decoded)
+- Row-range reads that touch only the overlapping row groups
+- Memory-mapped file access (Arrow buffers are sliced, not copied)
+- Incremental writes (`open_writer`) for chunked streaming ingestion
+- Lazy backfill for legacy datasets that still carry a JSON `data` blob
+
+Usage:
+    store = get_dataset_store()
+    frame = await store.load(dataset_id, columns=["region", "revenue"], row_range=(0, 500))
+"""
+
+from typing import Dict, List, Optional, Any, Sequence, Tuple
+import asyncio
+import json
+import logging
+import os
+import re
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, date
+from decimal import Decimal
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import text as sa_text
+
+from ..constants import DATASET_STORE_ROW_GROUP_SIZE
+from ..db import get_db_context
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+# Directory holding one Parquet file per dataset (relative to project root)
+DATASET_STORE_DIR = Path(os.getenv("DATASET_STORE_DIR", "uploads/datasets"))
+
+COLUMNAR_FORMAT = "parquet"
+
+# Key under ingestion_metadata that points at the columnar file
+COLUMNAR_POINTER_KEY = "columnarStore"
+
+_SAFE_ID_PATTERN = re.compile(r"[^A-Za-z0-9_\-]")
+
+
+# ============================================================================
+# Data Classes
+# ============================================================================
+
+@dataclass
+class DatasetPointer:
+    """Location and shape of a dataset persisted in the columnar store"""
+    dataset_id: str
+    path: str
+    row_count: int
+    columns: List[str] = field(default_factory=list)
+    size_bytes: int = 0
+    format: str = COLUMNAR_FORMAT
+    written_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+
+    def to_metadata(self) -> Dict[str, Any]:
+        """Serialize for storage in `ingestion_metadata.columnarStore`"""
+        return {
+            "format": self.format,
+            "path": self.path,
+            "rowCount": self.row_count,
+            "columns": self.columns,
+            "sizeBytes": self.size_bytes,
+            "writtenAt": self.written_at,
+        }
+
+
+# ============================================================================
+# Arrow Conversion Helpers
+# ============================================================================
+
+def _normalize_cell(value: Any) -> Any:
+    """Convert values Arrow cannot infer consistently into stable scalars."""
+    if isinstance(value, (dict, list, tuple)):
+        return json.dumps(value, default=str)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    if isinstance(value, float) and value != value:  # NaN
+        return None
+    return value
+
+
+def _column_to_array(values: List[Any]) -> pa.Array:
+    """
+    Build an Arrow array for one column.
+
+    Mixed-type columns (e.g. ints and strings from loosely typed JSON)
+    fall back to a string column rather than failing the write.
+    """
+    normalized = [_normalize_cell(v) for v in values]
+    try:
+        array = pa.array(normalized)
+        if pa.types.is_null(array.type):
+            return pa.array(normalized, type=pa.string())
+        return array
+    except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+        return pa.array(
+            [None if v is None else (v.isoformat() if isinstance(v, (datetime, date)) else str(v))
+             for v in normalized],
+            type=pa.string(),
+        )
+
+
+def rows_to_table(rows: Sequence[Dict[str, Any]], columns: Optional[Sequence[str]] = None) -> pa.Table:
+    """Convert a list of row dicts into an Arrow table with a stable column order."""
+    if columns is None:
+        ordered: Dict[str, None] = {}
+        for row in rows:
+            for key in row.keys():
+                ordered.setdefault(str(key), None)
+        columns = list(ordered.keys())
+
+    arrays = [_column_to_array([row.get(col) for row in rows]) for col in columns]
+    return pa.Table.from_arrays(arrays, names=[str(col) for col in columns])
+
+
+def _to_string_array(column: pa.ChunkedArray) -> pa.Array:
+    """Render any column as strings (dates as ISO-8601), keeping nulls"""
+    return pa.array(
+        [None if v is None else (v.isoformat() if isinstance(v, (datetime, date)) else str(v))
+         for v in column.to_pylist()],
+        type=pa.string(),
+    )
+
+
+def _cast_lenient(column: pa.ChunkedArray, target: pa.DataType) -> Tuple[pa.Array, int]:
+    """
+    Cast a column value-by-value, nulling values that cannot be represented.
+
+    Returns the cast array and the number of values that were dropped.
+    """
+    values: List[Any] = []
+    conflicts = 0
+    for value in column.to_pylist():
+        if value is None:
+            values.append(None)
+            continue
+        try:
+            values.append(pa.scalar(value).cast(target).as_py())
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, OverflowError):
+            values.append(None)
+            conflicts += 1
+    return pa.array(values, type=target), conflicts
+
+
+def _is_number(data_type: pa.DataType) -> bool:
+    return pa.types.is_integer(data_type) or pa.types.is_floating(data_type)
+
+
+def _promote_type(current: pa.DataType, incoming: pa.DataType) -> pa.DataType:
+    """
+    Narrowest type holding both: numbers widen to float64, anything else
+    that disagrees becomes string.
+    """
+    if current == incoming:
+        return current
+    if pa.types.is_signed_integer(current) and pa.types.is_signed_integer(incoming):
+        return pa.int64()
+    if _is_number(current) and _is_number(incoming):
+        return pa.float64()
+    return pa.string()
+
+
+def _conform_table(
+    table: pa.Table,
+    schema: pa.Schema,
+    conflicts: Optional[Dict[str, int]] = None,
+) -> pa.Table:
+    """
+    Cast a table to `schema`. Strings accept anything; values that still
+    cannot be cast are nulled and counted in `conflicts`.
+    """
+    arrays = []
+    for schema_field in schema:
+        column = table.column(schema_field.name)
+        if column.type == schema_field.type:
+            arrays.append(column)
+            continue
+        if pa.types.is_string(schema_field.type):
+            arrays.append(_to_string_array(column))
+            continue
+        try:
+            arrays.append(column.cast(schema_field.type))
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            cast, dropped = _cast_lenient(column, schema_field.type)
+            arrays.append(cast)
+            if dropped and conflicts is not None:
+                conflicts[schema_field.name] = conflicts.get(schema_field.name, 0) + dropped
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+# ============================================================================
+# Incremental Writer
+# ============================================================================
+
+class DatasetStreamWriter:
+    """
+    Appends row chunks to a dataset's Parquet file.
+
+    The column set is fixed by the first chunk (or by `columns` when the
+    caller knows the headers up front). The Arrow schema starts from the
+    first chunk and is promoted when a later chunk disagrees: integers widen
+    to float64, mixed columns become strings, and columns that were null so
+    far take the first real type. A promotion rewrites the rows written so
+    far one row group at a time (each column can promote at most a few
+    times) and is recorded in `promoted_columns`. Values that still cannot be
+    cast are written as null and counted in `type_conflicts`; keys outside
+    the column set are counted in `dropped_columns`. The file is written to
+    a temp path and only moved into place by `close()`.
+    """
+
+    def __init__(self, store: "DatasetStore", dataset_id: str, columns: Optional[Sequence[str]] = None):
+        self.store = store
+        self.dataset_id = str(dataset_id)
+        self.columns: Optional[List[str]] = [str(col) for col in columns] if columns else None
+        self.schema: Optional[pa.Schema] = None
+        self.row_count = 0
+        self.type_conflicts: Dict[str, int] = {}
+        self.dropped_columns: Dict[str, int] = {}
+        self.promoted_columns: Dict[str, str] = {}
+
+        self._path = store.path_for(dataset_id)
+        self._tmp_path = _temp_path(self._path)
+        self._writer: Optional[pq.ParquetWriter] = None
+        self._untyped: set = set()
+        self._closed = False
+
+    def write_rows(self, rows: Sequence[Dict[str, Any]]) -> Optional[pa.Table]:
+        """
+        Append a chunk of row dicts.
+
+        Returns:
+            The Arrow table that was written (conformed to the file schema),
+            or None for an empty chunk
+        """
+        if self._closed:
+            raise RuntimeError(f"Writer for dataset {self.dataset_id} is closed")
+        if not rows:
+            return None
+
+        if self.columns is None:
+            ordered: Dict[str, None] = {}
+            for row in rows:
+                for key in row.keys():
+                    ordered.setdefault(str(key), None)
+            self.columns = list(ordered.keys())
+
+        self._count_dropped(rows)
+        table = rows_to_table(rows, self.columns)
+
+        if self.schema is None:
+            self.schema = table.schema
+            self._untyped = {name for name in table.column_names if _all_null(table.column(name))}
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            self._writer = pq.ParquetWriter(self._tmp_path, self.schema)
+        elif table.schema != self.schema:
+            promoted = self._promoted_schema(table)
+            if promoted != self.schema:
+                self._rewrite(promoted)
+            table = _conform_table(table, self.schema, self.type_conflicts)
+
+        self._untyped -= {name for name in self._untyped if not _all_null(table.column(name))}
+        self._writer.write_table(table, row_group_size=DATASET_STORE_ROW_GROUP_SIZE)
+        self.row_count += table.num_rows
+        return table
+
+    def close(self) -> DatasetPointer:
+        """Finish the file and atomically move it into place"""
+        if self._closed:
+            raise RuntimeError(f"Writer for dataset {self.dataset_id} is already closed")
+        self._closed = True
+
+        if self._writer is None:
+            # No rows were written; still persist the header so readers see the columns
+            columns = self.columns or []
+            empty = pa.Table.from_arrays(
+                [pa.array([], type=pa.string()) for _ in columns], names=columns
+            )
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            pq.write_table(empty, self._tmp_path)
+        else:
+            self._writer.close()
+
+        size_bytes = self._tmp_path.stat().st_size
+        os.replace(self._tmp_path, self._path)
+        return DatasetPointer(
+            dataset_id=self.dataset_id,
+            path=str(self._path),
+            row_count=self.row_count,
+            columns=list(self.columns or []),
+            size_bytes=size_bytes,
+        )
+
+    def abort(self) -> None:
+        """Discard everything written so far"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer is not None:
+            try:
+                self._writer.close()
+            except Exception:
+                pass
+        self._tmp_path.unlink(missing_ok=True)
+
+    def _count_dropped(self, rows: Sequence[Dict[str, Any]]) -> None:
+        known = set(self.columns or [])
+        for row in rows:
+            for key in row.keys():
+                if str(key) not in known:
+                    self.dropped_columns[str(key)] = self.dropped_columns.get(str(key), 0) + 1
+
+    def _promoted_schema(self, table: pa.Table) -> pa.Schema:
+        """File schema widened to hold this chunk"""
+        fields = []
+        for schema_field in self.schema:
+            column = table.column(schema_field.name)
+            data_type = schema_field.type
+            if not _all_null(column):
+                if schema_field.name in self._untyped:
+                    data_type = column.type
+                else:
+                    data_type = _promote_type(data_type, column.type)
+            fields.append(schema_field.with_type(data_type))
+        return pa.schema(fields)
+
+    def _rewrite(self, schema: pa.Schema) -> None:
+        """Re-encode the rows written so far under a promoted schema"""
+        for old_field, new_field in zip(self.schema, schema):
+            if old_field.type != new_field.type and old_field.name not in self._untyped:
+                self.promoted_columns[new_field.name] = str(new_field.type)
+                logger.info(
+                    f"Dataset {self.dataset_id}: column '{new_field.name}' promoted "
+                    f"from {old_field.type} to {new_field.type}"
+                )
+
+        self._writer.close()
+        source_path = self._tmp_path
+        target_path = _temp_path(self._path)
+        writer = pq.ParquetWriter(target_path, schema)
+        try:
+            source = pq.ParquetFile(source_path)
+            try:
+                for index in range(source.num_row_groups):
+                    writer.write_table(
+                        _conform_table(source.read_row_group(index), schema, self.type_conflicts),
+                        row_group_size=DATASET_STORE_ROW_GROUP_SIZE,
+                    )
+            finally:
+                source.close()
+        except BaseException:
+            # abort() still removes the source file
+            self._writer = None
+            writer.close()
+            target_path.unlink(missing_ok=True)
+            raise
+        source_path.unlink(missing_ok=True)
+
+        self._writer = writer
+        self._tmp_path = target_path
+        self.schema = schema
+
+
+def _temp_path(path: Path) -> Path:
+    """Unique temp file next to `path`, so concurrent writers never share one"""
+    return path.with_name(f".{path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
+
+
+def _all_null(column: pa.ChunkedArray) -> bool:
+    return column.null_count == len(column)
+
+
+# ============================================================================
+# Dataset Store
+# ============================================================================
+
+class DatasetStore:
+    """
+    File-backed columnar store for dataset rows.
+
+    One Parquet file per dataset. Reads are memory-mapped and pruned to the
+    requested columns and row groups, so callers that need a handful of
+    columns or a preview window never decode the full dataset.
+    """
+
+    def __init__(self, base_dir: Optional[Path] = None):
+        """Initialize the store rooted at `base_dir`"""
+        self.base_dir = Path(base_dir) if base_dir is not None else DATASET_STORE_DIR
+
+    # ------------------------------------------------------------------
+    # Paths
+    # ------------------------------------------------------------------
+
+    def path_for(self, dataset_id: str) -> Path:
+        """Get the Parquet path for a dataset"""
+        safe_id = _SAFE_ID_PATTERN.sub("_", str(dataset_id))
+        return self.base_dir / f"{safe_id}.{COLUMNAR_FORMAT}"
+
+    def exists(self, dataset_id: str) -> bool:
+        """Check whether a dataset has been written to the store"""
+        return self.path_for(dataset_id).exists()
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def write_table(self, dataset_id: str, table: pa.Table) -> DatasetPointer:
+        """
+        Persist an Arrow table for a dataset (atomic replace).
+
+        Args:
+            dataset_id: Dataset ID
+            table: Arrow table to write
+
+        Returns:
+            DatasetPointer describing the written file
+        """
+        path = self.path_for(dataset_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = _temp_path(path)
+
+        try:
+            pq.write_table(table, tmp_path, row_group_size=DATASET_STORE_ROW_GROUP_SIZE)
+            size_bytes = tmp_path.stat().st_size
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        return DatasetPointer(
+            dataset_id=str(dataset_id),
+            path=str(path),
+            row_count=table.num_rows,
+            columns=list(table.column_names),
+            size_bytes=size_bytes,
+        )
+
+    def write_rows(
+        self,
+        dataset_id: str,
+        rows: Sequence[Dict[str, Any]],
+        columns: Optional[Sequence[str]] = None,
+    ) -> DatasetPointer:
+        """Persist a list of row dicts for a dataset"""
+        return self.write_table(dataset_id, rows_to_table(rows, columns))
+
+    def open_writer(self, dataset_id: str, columns: Optional[Sequence[str]] = None) -> DatasetStreamWriter:
+        """Open an incremental writer for chunked ingestion (see DatasetStreamWriter)"""
+        return DatasetStreamWriter(self, dataset_id, columns)
+
+    def write_frame(self, dataset_id: str, frame: pd.DataFrame) -> DatasetPointer:
+        """
+        Persist a DataFrame for a dataset.
+
+        Rows are converted and written one row group at a time, so only a
+        single chunk of row dicts exists alongside the frame.
+        """
+        writer = self.open_writer(dataset_id, [str(col) for col in frame.columns])
+        try:
+            for start in range(0, len(frame), DATASET_STORE_ROW_GROUP_SIZE):
+                chunk = frame.iloc[start:start + DATASET_STORE_ROW_GROUP_SIZE].set_axis(writer.columns, axis=1)
+                writer.write_rows(chunk.to_dict(orient="records"))
+            return writer.close()
+        except BaseException:
+            writer.abort()
+            raise
+
+    def delete(self, dataset_id: str) -> bool:
+        """Remove a dataset's columnar file. Returns True if a file was deleted."""
+        path = self.path_for(dataset_id)
+        try:
+            path.unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    # ------------------------------------------------------------------
+    # Reads (synchronous, used from worker threads)
+    # ------------------------------------------------------------------
+
+    def version(self, dataset_id: str) -> Optional[Tuple[int, int]]:
+        """
+        Get a cheap change token for a dataset's file: (mtime_ns, size).
+
+        Writes replace the file atomically, so the token changes whenever the
+        stored rows do. Returns None if the dataset is not in the store.
+        """
+        try:
+            stat = self.path_for(dataset_id).stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def columns(self, dataset_id: str) -> List[str]:
+        """Get column names from the file footer without reading any data"""
+        path = self.path_for(dataset_id)
+        if not path.exists():
+            return []
+        return list(pq.read_schema(path, memory_map=True).names)
+
+    def row_count(self, dataset_id: str) -> int:
+        """Get the row count from the file footer without reading any data"""
+        path = self.path_for(dataset_id)
+        if not path.exists():
+            return 0
+        return pq.ParquetFile(path, memory_map=True).metadata.num_rows
+
+    def read_table(
+        self,
+        dataset_id: str,
+        columns: Optional[Sequence[str]] = None,
+        row_range: Optional[Tuple[int, int]] = None,
+    ) -> Optional[pa.Table]:
+        """
+        Read a dataset as an Arrow table.
+
+        Args:
+            dataset_id: Dataset ID
+            columns: Column names to read (unknown names are ignored; None = all)
+            row_range: Half-open (start, stop) row window; None = all rows
+
+        Returns:
+            Arrow table, or None if the dataset is not in the store
+        """
+        path = self.path_for(dataset_id)
+        if not path.exists():
+            return None
+
+        parquet_file = pq.ParquetFile(path, memory_map=True)
+        available = parquet_file.schema_arrow.names
+        selected = [col for col in columns if col in available] if columns is not None else None
+
+        if row_range is None:
+            return parquet_file.read(columns=selected)
+
+        start, stop = self._clamp_range(row_range, parquet_file.metadata.num_rows)
+        if stop <= start:
+            return parquet_file.schema_arrow.empty_table().select(selected or available)
+
+        # Only decode the row groups overlapping [start, stop)
+        group_indices: List[int] = []
+        first_group_offset = None
+        offset = 0
+        for index in range(parquet_file.num_row_groups):
+            group_rows = parquet_file.metadata.row_group(index).num_rows
+            group_end = offset + group_rows
+            if group_end > start and offset < stop:
+                group_indices.append(index)
+                if first_group_offset is None:
+                    first_group_offset = offset
+            offset = group_end
+            if offset >= stop:
+                break
+
+        table = parquet_file.read_row_groups(group_indices, columns=selected)
+        return table.slice(start - (first_group_offset or 0), stop - start)
+
+    def read(
+        self,
+        dataset_id: str,
+        columns: Optional[Sequence[str]] = None,
+        row_range: Optional[Tuple[int, int]] = None,
+    ) -> pd.DataFrame:
+        """Read a dataset as a DataFrame (empty if not in the store)"""
+        table = self.read_table(dataset_id, columns=columns, row_range=row_range)
+        if table is None:
+            return pd.DataFrame()
+        return table.to_pandas()
+
+    @staticmethod
+    def _clamp_range(row_range: Tuple[int, int], total_rows: int) -> Tuple[int, int]:
+        start, stop = row_range
+        start = max(0, int(start or 0))
+        stop = total_rows if stop is None else min(int(stop), total_rows)
+        return start, stop
+
+    # ------------------------------------------------------------------
+    # Async API (used by routes and services)
+    # ------------------------------------------------------------------
+
+    async def load(
+        self,
+        dataset_id: str,
+        columns: Optional[Sequence[str]] = None,
+        row_range: Optional[Tuple[int, int]] = None,
+    ) -> pd.DataFrame:
+        """
+        Load a dataset as a DataFrame.
+
+        Datasets uploaded before the columnar store existed are backfilled
+        from their legacy `data` JSON column on first access.
+
+        Args:
+            dataset_id: Dataset ID
+            columns: Column names to load (None = all)
+            row_range: Half-open (start, stop) row window (None = all rows)
+
+        Returns:
+            DataFrame (empty if the dataset has no stored rows)
+        """
+        table = await self._load_table(dataset_id, columns, row_range)
+        if table is None:
+            return pd.DataFrame()
+        return await asyncio.to_thread(table.to_pandas)
+
+    async def load_rows(
+        self,
+        dataset_id: str,
+        columns: Optional[Sequence[str]] = None,
+        row_range: Optional[Tuple[int, int]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Load a dataset as a list of JSON-compatible row dicts.
+
+        Same semantics as load(), but skips the pandas round trip so nulls
+        stay None and integer columns stay integers.
+        """
+        table = await self._load_table(dataset_id, columns, row_range)
+        if table is None:
+            return []
+        return await asyncio.to_thread(table.to_pylist)
+
+    async def _load_table(
+        self,
+        dataset_id: str,
+        columns: Optional[Sequence[str]],
+        row_range: Optional[Tuple[int, int]],
+    ) -> Optional[pa.Table]:
+        if not dataset_id:
+            return None
+        if not self.exists(dataset_id):
+            backfilled = await self._backfill_from_legacy(dataset_id)
+            if not backfilled:
+                return None
+        return await asyncio.to_thread(self.read_table, dataset_id, columns, row_range)
+
+    async def _backfill_from_legacy(self, dataset_id: str) -> bool:
+        """
+        Migrate a legacy dataset (rows in `datasets.data`) into the store.
+
+        The legacy column is left untouched; only the pointer is recorded so
+        later reads go straight to the columnar file.
+        """
+        try:
+            async with get_db_context() as session:
+                result = await session.execute(
+                    sa_text("SELECT data, ingestion_metadata FROM datasets WHERE id = :id"),
+                    {"id": dataset_id},
+                )
+                row = result.mappings().first()
+                if row is None:
+                    return False
+
+                rows = _legacy_rows(row["data"])
+                if not rows:
+                    return False
+
+                pointer = await asyncio.to_thread(self.write_rows, dataset_id, rows)
+
+                metadata = _coerce_json(row["ingestion_metadata"])
+                metadata = metadata if isinstance(metadata, dict) else {}
+                metadata[COLUMNAR_POINTER_KEY] = pointer.to_metadata()
+                await session.execute(
+                    sa_text(
+                        "UPDATE datasets SET ingestion_metadata = CAST(:meta AS jsonb) "
+                        "WHERE id = :id"
+                    ),
+                    {"meta": json.dumps(metadata), "id": dataset_id},
+                )
+                await session.commit()
+
+            logger.info(f"Backfilled dataset {dataset_id} into columnar store ({pointer.row_count} rows)")
+            return True
+        except Exception as e:
+            logger.warning(f"Columnar backfill unavailable for dataset {dataset_id}: {e}")
+            return False
+
+
+def _coerce_json(value: Any) -> Any:
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except Exception:
+            return value
+    return value
+
+
+def _legacy_rows(payload: Any) -> List[Dict[str, Any]]:
+    """Extract row dicts from a legacy `data` column payload"""
+    normalized = _coerce_json(payload)
+    if isinstance(normalized, dict):
+        for key in ("data", "rows", "records"):
+            candidate = normalized.get(key)
+            if isinstance(candidate, list):
+                normalized = candidate
+                break
+    if isinstance(normalized, list):
+        return [row for row in normalized if isinstance(row, dict)]
+    return []
+
+
+# ============================================================================
+# Singleton Instance
+# ============================================================================
+
+_store_instance: Optional[DatasetStore] = None
+
+
+def get_dataset_store() -> DatasetStore:
+    """Get the singleton dataset store instance"""
+    global _store_instance
+    if _store_instance is None:
+        _store_instance = DatasetStore()
+    return _store_instance
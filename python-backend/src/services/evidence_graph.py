@@ -0,0 +1,509 @@
+"""
+Evidence Graph
+
+Indexed, persistent store for evidence-chain links
+(question → element → transformation → insight → answer).
+
+Features:
+- Links keyed by ID (rebuilding a chain updates links instead of duplicating them)
+- Adjacency indexes by project, (source_type, source_id) and
+  (target_type, target_id), so lookups and multi-hop traversals only touch
+  the edges they follow
+- Write-behind persistence to the `evidence_links` table: writes are
+  buffered and upserted in batches by a background flush
+- A batch that fails is retried row by row (one savepoint per link), so a
+  single bad row (FK violation, over-long ID) is quarantined instead of
+  blocking every later write; unreachable databases are retried with
+  exponential backoff and the pending queue is bounded
+- Lazy per-project load from `evidence_links`, repeated whenever the
+  project's persisted version (row count and summed per-row revision)
+  shows that another worker inserted or updated links
+
+Usage:
+    from src.services.evidence_graph import EvidenceGraph
+
+    graph = EvidenceGraph()
+    graph.add_links(links)
+    await graph.ensure_loaded(project_id)
+    chain = graph.traverse(project_id, "question", question_id)
+"""
+
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import text as sa_text
+
+from ..db import get_db_context
+from ..db.schema_cache import get_schema_cache
+from ..models.database import jsonb_loads
+from ..models.schemas import EvidenceLink, LinkType
+
+logger = logging.getLogger(__name__)
+
+# Seconds between a write and its flush to evidence_links
+EVIDENCE_FLUSH_INTERVAL_SECONDS = float(os.getenv("EVIDENCE_FLUSH_INTERVAL_SECONDS", "2.0"))
+# Pending links that trigger an immediate flush
+EVIDENCE_FLUSH_BATCH_SIZE = int(os.getenv("EVIDENCE_FLUSH_BATCH_SIZE", "500"))
+# Unflushed links kept while the database is unreachable; the oldest are dropped
+EVIDENCE_MAX_PENDING = int(os.getenv("EVIDENCE_MAX_PENDING", "50000"))
+# Upper bound of the delay between retries of a failed flush
+EVIDENCE_FLUSH_MAX_BACKOFF_SECONDS = float(os.getenv("EVIDENCE_FLUSH_MAX_BACKOFF_SECONDS", "60"))
+# Rejected links kept for inspection (get_rejected)
+EVIDENCE_MAX_REJECTED = 1000
+
+EVIDENCE_LINK_COLUMNS = (
+    "id", "project_id", "source_type", "source_id", "target_type",
+    "target_id", "link_type", "confidence", "metadata", "created_at",
+)
+
+# Bumped by every upsert of a row, so updates change persisted_version too
+EVIDENCE_REVISION_COLUMN = "revision"
+
+_UPSERT_SQL = (
+    f"INSERT INTO evidence_links ({', '.join(EVIDENCE_LINK_COLUMNS)}) "
+    f"VALUES ({', '.join(':' + col for col in EVIDENCE_LINK_COLUMNS)}) "
+    "ON CONFLICT (id) DO UPDATE SET "
+    "link_type = EXCLUDED.link_type, confidence = EXCLUDED.confidence, "
+    "metadata = EXCLUDED.metadata"
+)
+_UPSERT_REVISED_SQL = (
+    f"{_UPSERT_SQL}, {EVIDENCE_REVISION_COLUMN} = "
+    f"COALESCE(evidence_links.{EVIDENCE_REVISION_COLUMN}, 0) + 1"
+)
+
+NodeKey = Tuple[str, str, str]  # (project_id, node_type, node_id)
+
+
+class EvidenceGraph:
+    """Evidence links with adjacency indexes and write-behind persistence"""
+
+    def __init__(
+        self,
+        flush_interval: float = EVIDENCE_FLUSH_INTERVAL_SECONDS,
+        flush_batch_size: int = EVIDENCE_FLUSH_BATCH_SIZE,
+        persist: bool = True,
+        max_pending: int = EVIDENCE_MAX_PENDING,
+        max_backoff: float = EVIDENCE_FLUSH_MAX_BACKOFF_SECONDS,
+    ):
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+        self.persist = persist
+        self.max_pending = max_pending
+        self.max_backoff = max_backoff
+
+        self._links: Dict[str, EvidenceLink] = {}
+        # Dicts as insertion-ordered sets of link IDs
+        self._by_project: Dict[str, Dict[str, None]] = {}
+        self._outgoing: Dict[NodeKey, Dict[str, None]] = {}
+        self._incoming: Dict[NodeKey, Dict[str, None]] = {}
+
+        self._pending: Dict[str, EvidenceLink] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self._failed_flushes = 0
+        # link ID -> (link, error) of rows the database refused
+        self._rejected: Dict[str, Tuple[EvidenceLink, str]] = {}
+        # Links being written by the running flush
+        self._flushing: Dict[str, EvidenceLink] = {}
+        # project_id -> persisted_version when its links were last loaded
+        self._loaded_versions: Dict[str, Tuple[int, Any]] = {}
+        self.stats = {
+            "flushed": 0, "flushes": 0, "flush_errors": 0, "loaded": 0,
+            "rejected": 0, "dropped_pending": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def add_link(self, link: EvidenceLink) -> None:
+        self.add_links([link])
+
+    def add_links(self, links: Iterable[EvidenceLink]) -> None:
+        """Insert or replace links and queue them for persistence"""
+        added = 0
+        for link in links:
+            self._index(link)
+            if self.persist:
+                self._pending.pop(link.id, None)
+                self._pending[link.id] = link
+            added += 1
+        if added and self.persist:
+            self._trim_pending()
+            self._schedule_flush()
+
+    def _index(self, link: EvidenceLink) -> None:
+        existing = self._links.get(link.id)
+        if existing is not None:
+            self._unindex(existing)
+        self._links[link.id] = link
+        self._by_project.setdefault(link.project_id, {})[link.id] = None
+        self._outgoing.setdefault((link.project_id, link.source_type, link.source_id), {})[link.id] = None
+        self._incoming.setdefault((link.project_id, link.target_type, link.target_id), {})[link.id] = None
+
+    def _unindex(self, link: EvidenceLink) -> None:
+        for index, key in (
+            (self._by_project, link.project_id),
+            (self._outgoing, (link.project_id, link.source_type, link.source_id)),
+            (self._incoming, (link.project_id, link.target_type, link.target_id)),
+        ):
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.pop(link.id, None)
+                if not bucket:
+                    del index[key]
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._links)
+
+    def get(self, link_id: str) -> Optional[EvidenceLink]:
+        return self._links.get(link_id)
+
+    def all_links(self) -> List[EvidenceLink]:
+        return list(self._links.values())
+
+    def links_for_project(self, project_id: str) -> List[EvidenceLink]:
+        return [self._links[link_id] for link_id in self._by_project.get(project_id, ())]
+
+    def outgoing(self, project_id: str, source_type: str, source_id: str) -> List[EvidenceLink]:
+        """Links whose source is the given node"""
+        return [self._links[link_id] for link_id in self._outgoing.get((project_id, source_type, source_id), ())]
+
+    def incoming(self, project_id: str, target_type: str, target_id: str) -> List[EvidenceLink]:
+        """Links whose target is the given node"""
+        return [self._links[link_id] for link_id in self._incoming.get((project_id, target_type, target_id), ())]
+
+    def traverse(
+        self,
+        project_id: str,
+        start_type: str,
+        start_id: str,
+        max_depth: int = 4,
+        direction: str = "downstream",
+        link_types: Optional[Iterable[LinkType]] = None,
+        min_confidence: float = 0.0,
+    ) -> List[EvidenceLink]:
+        """
+        Breadth-first multi-hop traversal from a node.
+
+        Args:
+            project_id: Project ID
+            start_type: Node type to start from (e.g. "question")
+            start_id: Node ID to start from
+            max_depth: Maximum number of hops
+            direction: "downstream" follows source → target, "upstream" the reverse
+            link_types: Only follow these link types (None = all)
+            min_confidence: Skip links below this confidence
+
+        Returns:
+            Links reached, in breadth-first order (each at most once)
+        """
+        if direction not in ("downstream", "upstream"):
+            raise ValueError(f"Unknown traversal direction: {direction}")
+        adjacency = self._outgoing if direction == "downstream" else self._incoming
+        allowed = {LinkType(t) for t in link_types} if link_types else None
+
+        visited_nodes = {(start_type, start_id)}
+        seen_links: Set[str] = set()
+        chain: List[EvidenceLink] = []
+        frontier = deque([(start_type, start_id, 0)])
+
+        while frontier:
+            node_type, node_id, depth = frontier.popleft()
+            if depth >= max_depth:
+                continue
+            for link_id in adjacency.get((project_id, node_type, node_id), ()):
+                if link_id in seen_links:
+                    continue
+                link = self._links[link_id]
+                if allowed is not None and link.link_type not in allowed:
+                    continue
+                if link.confidence < min_confidence:
+                    continue
+                seen_links.add(link_id)
+                chain.append(link)
+                next_node = (
+                    (link.target_type, link.target_id) if direction == "downstream"
+                    else (link.source_type, link.source_id)
+                )
+                if next_node not in visited_nodes:
+                    visited_nodes.add(next_node)
+                    frontier.append((next_node[0], next_node[1], depth + 1))
+        return chain
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _schedule_flush(self, delay: Optional[float] = None) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (sync caller); the next async flush picks these up
+            return
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        if delay is None:
+            delay = 0.0 if len(self._pending) >= self.flush_batch_size else self.flush_interval
+        self._flush_task = loop.create_task(self._flush_after(delay))
+
+    async def _flush_after(self, delay: float) -> None:
+        if delay:
+            await asyncio.sleep(delay)
+        errors = self.stats["flush_errors"]
+        await self.flush()
+        self._flush_task = None
+        if self.stats["flush_errors"] != errors:
+            # Database unreachable: retry with exponential backoff
+            self._failed_flushes += 1
+            backoff = max(self.flush_interval, 1.0) * 2 ** (self._failed_flushes - 1)
+            self._schedule_flush(min(backoff, self.max_backoff))
+            return
+        self._failed_flushes = 0
+        # Links added while flushing go out with the next batch
+        if self._pending:
+            self._schedule_flush()
+
+    async def flush(self) -> int:
+        """Upsert pending links into evidence_links; returns rows written"""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch = self._pending
+            self._pending = {}
+            self._flushing = batch
+            try:
+                written = await self._write_batch(batch)
+            except asyncio.CancelledError:
+                self._requeue(batch)
+                raise
+            except Exception as e:
+                logger.info(f"Batch upsert of {len(batch)} evidence links failed, retrying per link: {e}")
+                try:
+                    written = await self._write_each(batch)
+                except asyncio.CancelledError:
+                    self._requeue(batch)
+                    raise
+                except Exception as e:
+                    self._requeue(batch)
+                    self.stats["flush_errors"] += 1
+                    logger.warning(f"Failed to persist {len(batch)} evidence links: {e}")
+                    return 0
+            finally:
+                self._flushing = {}
+
+            self.stats["flushes"] += 1
+            self.stats["flushed"] += written
+            return written
+
+    async def _write_batch(self, batch: Dict[str, EvidenceLink]) -> int:
+        async with get_db_context() as session:
+            columns = await get_schema_cache().get_columns("evidence_links", session)
+            if not columns:
+                logger.debug("evidence_links table not present; evidence links kept in memory only")
+                return 0
+            await session.execute(sa_text(_upsert_sql(columns)), [_link_to_row(link) for link in batch.values()])
+            await session.commit()
+        return len(batch)
+
+    async def _write_each(self, batch: Dict[str, EvidenceLink]) -> int:
+        """Upsert links one savepoint at a time and quarantine the ones refused"""
+        written = 0
+        async with get_db_context() as session:
+            upsert = sa_text(_upsert_sql(await get_schema_cache().get_columns("evidence_links", session)))
+            for link_id, link in batch.items():
+                try:
+                    async with session.begin_nested():
+                        await session.execute(upsert, _link_to_row(link))
+                except Exception as e:
+                    if not await _session_usable(session):
+                        raise
+                    self._reject(link, e)
+                else:
+                    written += 1
+            await session.commit()
+        return written
+
+    def _reject(self, link: EvidenceLink, error: Exception) -> None:
+        self._rejected.pop(link.id, None)
+        self._rejected[link.id] = (link, str(error))
+        while len(self._rejected) > EVIDENCE_MAX_REJECTED:
+            self._rejected.pop(next(iter(self._rejected)))
+        self.stats["rejected"] += 1
+        logger.warning(f"Dropping evidence link {link.id} the database refused: {error}")
+
+    def get_rejected(self) -> List[Dict[str, Any]]:
+        """Links the database refused (most recent last), with the error"""
+        return [{"link": link, "error": error} for link, error in self._rejected.values()]
+
+    def _requeue(self, batch: Dict[str, EvidenceLink]) -> None:
+        """Put a failed batch back ahead of newer versions, within the pending bound"""
+        requeued = {link_id: link for link_id, link in batch.items() if link_id not in self._pending}
+        requeued.update(self._pending)
+        self._pending = requeued
+        self._trim_pending()
+
+    def _trim_pending(self) -> None:
+        overflow = len(self._pending) - self.max_pending
+        if overflow <= 0:
+            return
+        for link_id in list(self._pending)[:overflow]:
+            del self._pending[link_id]
+        self.stats["dropped_pending"] += overflow
+        logger.warning(f"Evidence link queue full; dropped {overflow} unflushed links")
+
+    async def close(self) -> None:
+        """Flush outstanding writes and stop the background flush"""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+
+    async def ensure_loaded(self, project_id: str) -> None:
+        """
+        Load a project's persisted links, and load them again whenever
+        persisted_version shows that another worker changed them. Links
+        not flushed yet by this process are kept over the stored rows.
+        """
+        if not self.persist:
+            return
+        try:
+            async with get_db_context() as session:
+                columns = await get_schema_cache().get_columns("evidence_links", session)
+                if not columns:
+                    return
+                version = await _read_version(session, project_id, columns)
+                if self._loaded_versions.get(project_id) == version:
+                    return
+                result = await session.execute(
+                    sa_text(
+                        f"SELECT {', '.join(EVIDENCE_LINK_COLUMNS)} FROM evidence_links "
+                        "WHERE project_id = :project_id ORDER BY created_at"
+                    ),
+                    {"project_id": project_id},
+                )
+                rows = result.mappings().all()
+        except Exception as e:
+            logger.debug(f"Could not load evidence links for project {project_id}: {e}")
+            return
+
+        loaded = 0
+        for row in rows:
+            if row["id"] in self._pending or row["id"] in self._flushing:
+                continue  # in-memory version is newer
+            link = _row_to_link(row)
+            if link is not None and link != self._links.get(link.id):
+                self._index(link)
+                loaded += 1
+        self._loaded_versions[project_id] = version
+        self.stats["loaded"] += loaded
+        if loaded:
+            logger.info(f"Loaded {loaded} evidence links for project {project_id}")
+
+    async def persisted_version(self, project_id: str) -> Optional[Tuple[int, Any]]:
+        """
+        (row count, summed row revisions) of a project's evidence_links
+
+        Every worker reads the same value, and every insert or update of a
+        link changes it; None without a table or database.
+        """
+        if not self.persist:
+            return None
+        try:
+            async with get_db_context() as session:
+                columns = await get_schema_cache().get_columns("evidence_links", session)
+                if not columns:
+                    return None
+                return await _read_version(session, project_id, columns)
+        except Exception as e:
+            logger.debug(f"Could not read evidence link version for project {project_id}: {e}")
+            return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "links": len(self._links),
+            "projects": len(self._by_project),
+            "pending": len(self._pending),
+            "quarantined": len(self._rejected),
+            **self.stats,
+        }
+
+
+def _upsert_sql(columns: Iterable[str]) -> str:
+    """Upsert statement; bumps the row revision once the column is migrated"""
+    return _UPSERT_REVISED_SQL if EVIDENCE_REVISION_COLUMN in columns else _UPSERT_SQL
+
+
+async def _read_version(session: Any, project_id: str, columns: Iterable[str]) -> Tuple[int, Any]:
+    """
+    (row count, summed row revisions) of a project's evidence_links; falls
+    back to the latest created_at until the revision column exists, which
+    only notices new links
+    """
+    if EVIDENCE_REVISION_COLUMN in columns:
+        aggregate = f"COALESCE(SUM({EVIDENCE_REVISION_COLUMN}), 0)"
+    else:
+        aggregate = "MAX(created_at)"
+    result = await session.execute(
+        sa_text(f"SELECT COUNT(*), {aggregate} FROM evidence_links WHERE project_id = :project_id"),
+        {"project_id": project_id},
+    )
+    row = result.first()
+    return (int(row[0]), row[1]) if row is not None else (0, None)
+
+
+async def _session_usable(session: Any) -> bool:
+    """Whether a per-row failure was the row's fault rather than the connection's"""
+    try:
+        await session.execute(sa_text("SELECT 1"))
+        return True
+    except Exception:
+        return False
+
+
+def _link_to_row(link: EvidenceLink) -> Dict[str, Any]:
+    return {
+        "id": link.id,
+        "project_id": link.project_id,
+        "source_type": link.source_type,
+        "source_id": link.source_id,
+        "target_type": link.target_type,
+        "target_id": link.target_id,
+        "link_type": link.link_type.value,
+        "confidence": link.confidence,
+        "metadata": json.dumps(link.metadata, default=str) if link.metadata is not None else None,
+        "created_at": link.created_at,
+    }
+
+
+def _row_to_link(row: Any) -> Optional[EvidenceLink]:
+    metadata = row["metadata"]
+    try:
+        return EvidenceLink(
+            id=row["id"],
+            project_id=row["project_id"],
+            source_type=row["source_type"],
+            source_id=row["source_id"],
+            target_type=row["target_type"],
+            target_id=row["target_id"],
+            link_type=LinkType(row["link_type"]),
+            confidence=row["confidence"] or 0.0,
+            metadata=jsonb_loads(metadata) if isinstance(metadata, str) else metadata,
+            created_at=row["created_at"] or datetime.utcnow(),
+        )
+    except (ValueError, ValidationError) as e:
+        logger.debug(f"Skipping unreadable evidence link {row['id']}: {e}")
+        return None
@@ -0,0 +1,311 @@
+"""
+Journey State
+
+Targeted updates of `projects.journey_progress`. Routes used to SELECT the
+whole JSONB document, mutate it in Python and write every byte back; as
+projects mature the document grows to megabytes, every step rewrote it and
+concurrent writers silently lost each other's updates.
+
+Features:
+- Patches are applied in SQL (`||`, `-`, per-key merge/append), so a write
+  carries only the keys that changed and leaves every other key untouched
+- Reads fetch only the requested top-level keys (`journey_progress -> key`)
+- Optimistic concurrency through `projects.journey_progress_version`: every
+  patch bumps it, and a patch with `expected_version` fails with
+  JourneyVersionConflict when another writer got there first
+- `update_journey_key` wraps the read / mutate / conditional write loop for
+  updates that must inspect the current value (e.g. one checkpoint in a list)
+- Degrades to unconditional key-level patches while the version column has
+  not been migrated yet
+
+Usage:
+    from src.services.journey_state import patch_journey_progress, update_journey_key
+
+    await patch_journey_progress(
+        session, project_id,
+        set_values={"currentStep": "results"},
+        merge={"payment": {"isPaid": True}},
+        append={"checkpoints": [checkpoint]},
+        remove=["executionResults"],
+    )
+
+    def approve(checkpoints):
+        ...
+        return checkpoints  # or None to leave the key unchanged
+
+    result = await update_journey_key(session, project_id, "checkpoints", approve)
+"""
+
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import text as sa_text
+
+from ..db.schema_cache import get_schema_cache
+
+logger = logging.getLogger(__name__)
+
+JOURNEY_VERSION_COLUMN = "journey_progress_version"
+# Attempts of the read / mutate / write loop before a conflict is surfaced
+JOURNEY_UPDATE_MAX_RETRIES = int(os.getenv("JOURNEY_UPDATE_MAX_RETRIES", "5"))
+
+_EMPTY_OBJECT = "CAST('{}' AS jsonb)"
+_EMPTY_ARRAY = "CAST('[]' AS jsonb)"
+
+
+class JourneyVersionConflict(Exception):
+    """Raised when journey_progress changed since the caller read it."""
+
+    def __init__(self, project_id: str, expected_version: int):
+        super().__init__(
+            f"journey_progress of project {project_id} is no longer at version {expected_version}"
+        )
+        self.project_id = project_id
+        self.expected_version = expected_version
+
+
+@dataclass
+class JourneyPatchResult:
+    """Outcome of a patch: the new version and the requested keys after it."""
+    version: Optional[int]
+    values: Dict[str, Any] = field(default_factory=dict)
+    applied: bool = True
+
+
+def _sub_document(key_param: str, json_type: str, empty: str) -> str:
+    """Current value of one top-level key, or an empty value of json_type."""
+    value = f"journey_progress -> CAST(:{key_param} AS text)"
+    return f"(CASE WHEN jsonb_typeof({value}) = '{json_type}' THEN {value} ELSE {empty} END)"
+
+
+def build_journey_patch(
+    *,
+    set_values: Optional[Mapping[str, Any]] = None,
+    merge: Optional[Mapping[str, Mapping[str, Any]]] = None,
+    append: Optional[Mapping[str, Sequence[Any]]] = None,
+    remove: Iterable[str] = (),
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Build the SQL expression for the new journey_progress and its parameters.
+
+    Args:
+        set_values: Top-level keys replaced wholesale
+        merge: Top-level object keys shallow-merged with the given fields
+        append: Top-level array keys extended with the given items
+        remove: Top-level keys deleted
+
+    Returns:
+        (expression, params); the expression reads the current row's
+        journey_progress, so it is only valid inside `UPDATE projects SET`
+    """
+    params: Dict[str, Any] = {}
+    expression = (
+        "(CASE WHEN jsonb_typeof(journey_progress) = 'object' "
+        f"THEN journey_progress ELSE {_EMPTY_OBJECT} END)"
+    )
+
+    for index, key in enumerate(remove):
+        params[f"jp_remove_{index}"] = key
+        expression = f"({expression} - CAST(:jp_remove_{index} AS text))"
+
+    if set_values:
+        params["jp_set"] = json.dumps(dict(set_values), default=str)
+        expression = f"{expression} || CAST(:jp_set AS jsonb)"
+
+    for index, (key, fields) in enumerate((merge or {}).items()):
+        params[f"jp_merge_key_{index}"] = key
+        params[f"jp_merge_{index}"] = json.dumps(dict(fields), default=str)
+        current = _sub_document(f"jp_merge_key_{index}", "object", _EMPTY_OBJECT)
+        expression = (
+            f"{expression} || jsonb_build_object(CAST(:jp_merge_key_{index} AS text), "
+            f"{current} || CAST(:jp_merge_{index} AS jsonb))"
+        )
+
+    for index, (key, items) in enumerate((append or {}).items()):
+        params[f"jp_append_key_{index}"] = key
+        params[f"jp_append_{index}"] = json.dumps(list(items), default=str)
+        current = _sub_document(f"jp_append_key_{index}", "array", _EMPTY_ARRAY)
+        expression = (
+            f"{expression} || jsonb_build_object(CAST(:jp_append_key_{index} AS text), "
+            f"{current} || CAST(:jp_append_{index} AS jsonb))"
+        )
+
+    return expression, params
+
+
+async def _has_version_column(session) -> bool:
+    columns = await get_schema_cache().get_columns("projects", session)
+    return JOURNEY_VERSION_COLUMN in columns
+
+
+async def patch_journey_progress(
+    session,
+    project_id: str,
+    *,
+    set_values: Optional[Mapping[str, Any]] = None,
+    merge: Optional[Mapping[str, Mapping[str, Any]]] = None,
+    append: Optional[Mapping[str, Sequence[Any]]] = None,
+    remove: Iterable[str] = (),
+    expected_version: Optional[int] = None,
+    returning: Sequence[str] = (),
+) -> Optional[JourneyPatchResult]:
+    """
+    Apply a targeted patch to a project's journey_progress.
+
+    The caller owns the transaction and commits it.
+
+    Args:
+        session: Database session
+        project_id: Project ID
+        set_values / merge / append / remove: See build_journey_patch
+        expected_version: Only apply when journey_progress_version still
+            equals this value (ignored until the column exists)
+        returning: Top-level keys to return as they are after the patch
+
+    Returns:
+        JourneyPatchResult, or None when the project does not exist
+
+    Raises:
+        JourneyVersionConflict: expected_version is stale
+    """
+    expression, params = build_journey_patch(
+        set_values=set_values, merge=merge, append=append, remove=remove
+    )
+    versioned = await _has_version_column(session)
+
+    assignments = [f"journey_progress = {expression}"]
+    selected = ["id"]
+    where = "id = :jp_project_id"
+    params["jp_project_id"] = project_id
+    if versioned:
+        assignments.append(
+            f"{JOURNEY_VERSION_COLUMN} = COALESCE({JOURNEY_VERSION_COLUMN}, 0) + 1"
+        )
+        selected.append(JOURNEY_VERSION_COLUMN)
+        if expected_version is not None:
+            where += f" AND COALESCE({JOURNEY_VERSION_COLUMN}, 0) = :jp_expected_version"
+            params["jp_expected_version"] = expected_version
+    assignments.append("updated_at = NOW()")
+    for index, key in enumerate(returning):
+        params[f"jp_return_{index}"] = key
+        selected.append(f"CAST(journey_progress -> CAST(:jp_return_{index} AS text) AS text)")
+
+    result = await session.execute(
+        sa_text(
+            f"UPDATE projects SET {', '.join(assignments)} "
+            f"WHERE {where} RETURNING {', '.join(selected)}"
+        ),
+        params,
+    )
+    row = result.first()
+    if row is None:
+        if versioned and expected_version is not None and await _project_exists(session, project_id):
+            raise JourneyVersionConflict(project_id, expected_version)
+        return None
+
+    values = list(row)[1:]
+    version = values.pop(0) if versioned else None
+    return JourneyPatchResult(
+        version=version,
+        values={key: _decode(value) for key, value in zip(returning, values)},
+    )
+
+
+async def read_journey_keys(
+    session,
+    project_id: str,
+    keys: Sequence[str],
+) -> Optional[Tuple[Dict[str, Any], Optional[int]]]:
+    """
+    Read selected top-level keys of journey_progress and its version.
+
+    Returns:
+        ({key: value or None}, version), or None when the project does not
+        exist; version is None until the version column exists
+    """
+    versioned = await _has_version_column(session)
+    params: Dict[str, Any] = {"jp_project_id": project_id}
+    selected: List[str] = [JOURNEY_VERSION_COLUMN if versioned else "NULL"]
+    for index, key in enumerate(keys):
+        params[f"jp_key_{index}"] = key
+        selected.append(f"CAST(journey_progress -> CAST(:jp_key_{index} AS text) AS text)")
+
+    result = await session.execute(
+        sa_text(f"SELECT {', '.join(selected)} FROM projects WHERE id = :jp_project_id"),
+        params,
+    )
+    row = result.first()
+    if row is None:
+        return None
+    version, *values = list(row)
+    return {key: _decode(value) for key, value in zip(keys, values)}, version
+
+
+async def update_journey_key(
+    session,
+    project_id: str,
+    key: str,
+    mutate: Callable[[Any], Any],
+    *,
+    max_retries: int = JOURNEY_UPDATE_MAX_RETRIES,
+) -> Optional[JourneyPatchResult]:
+    """
+    Read one key, let `mutate` compute its new value and write it back only
+    if nobody changed journey_progress in between; retries on conflict.
+
+    `mutate` receives the current value (None when missing) and returns the
+    new value, or None to leave the key unchanged. It may run more than once.
+
+    Returns:
+        JourneyPatchResult with values={key: new value} (applied=False and
+        the current value when mutate returned None), or None when the
+        project does not exist
+
+    Raises:
+        JourneyVersionConflict: still conflicting after max_retries attempts
+    """
+    attempts = max(1, max_retries)
+    for attempt in range(1, attempts + 1):
+        current = await read_journey_keys(session, project_id, [key])
+        if current is None:
+            return None
+        values, version = current
+
+        new_value = mutate(values[key])
+        if new_value is None:
+            return JourneyPatchResult(version=version, values=values, applied=False)
+
+        try:
+            result = await patch_journey_progress(
+                session,
+                project_id,
+                set_values={key: new_value},
+                expected_version=version,
+            )
+        except JourneyVersionConflict:
+            if attempt == attempts:
+                raise
+            logger.debug(
+                f"journey_progress.{key} of project {project_id} changed concurrently, "
+                f"retrying ({attempt}/{attempts})"
+            )
+            continue
+        if result is not None:
+            result.values = {key: new_value}
+        return result
+    return None
+
+
+async def _project_exists(session, project_id: str) -> bool:
+    result = await session.execute(
+        sa_text("SELECT 1 FROM projects WHERE id = :id"), {"id": project_id}
+    )
+    return result.first() is not None
+
+
+def _decode(value: Optional[str]) -> Any:
+    """Sub-documents are selected as text so every driver returns the same shape."""
+    return json.loads(value) if value is not None else None
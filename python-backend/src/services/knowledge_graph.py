@@ -0,0 +1,160 @@
+"""
+Knowledge Graph Adjacency
+
+In-memory adjacency list over the `knowledge_edges` table, used by
+KnowledgeService to expand traversal frontiers without a database round
+trip per node.
+
+Features:
+- Outgoing edges per node, loaded in one query and refreshed after a TTL
+- Write-through: edges created through KnowledgeService are added in place
+- Relationship and minimum-weight filtering at expansion time
+- Disabled automatically when the edge table exceeds the size budget, in
+  which case callers fall back to one batched query per frontier
+
+Usage:
+    from src.services.knowledge_graph import KnowledgeAdjacencyCache
+
+    cache = KnowledgeAdjacencyCache()
+    if await cache.ensure_loaded(edge_repo):
+        edges = cache.expand(frontier_ids, relationships=["supports"])
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+KNOWLEDGE_ADJACENCY_CACHE_ENABLED = os.getenv("KNOWLEDGE_ADJACENCY_CACHE_ENABLED", "true").lower() == "true"
+KNOWLEDGE_ADJACENCY_CACHE_TTL_SECONDS = float(os.getenv("KNOWLEDGE_ADJACENCY_CACHE_TTL_SECONDS", "300"))
+# Larger edge tables are traversed with batched frontier queries instead
+KNOWLEDGE_ADJACENCY_CACHE_MAX_EDGES = int(os.getenv("KNOWLEDGE_ADJACENCY_CACHE_MAX_EDGES", "200000"))
+
+
+def edge_matches(
+    edge: Dict[str, Any],
+    relationships: Optional[Iterable[str]] = None,
+    min_weight: Optional[float] = None,
+) -> bool:
+    """Whether an edge passes the relationship and weight filters"""
+    if relationships is not None and edge.get("relationship") not in relationships:
+        return False
+    if min_weight is not None and _edge_weight(edge) < min_weight:
+        return False
+    return True
+
+
+def _edge_weight(edge: Dict[str, Any]) -> float:
+    weight = edge.get("weight")
+    return float(weight) if weight is not None else 1.0
+
+
+class KnowledgeAdjacencyCache:
+    """Outgoing-edge adjacency list for the knowledge graph"""
+
+    def __init__(
+        self,
+        enabled: bool = KNOWLEDGE_ADJACENCY_CACHE_ENABLED,
+        ttl_seconds: float = KNOWLEDGE_ADJACENCY_CACHE_TTL_SECONDS,
+        max_edges: int = KNOWLEDGE_ADJACENCY_CACHE_MAX_EDGES,
+    ):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.max_edges = max_edges
+        self._outgoing: Dict[str, List[Dict[str, Any]]] = {}
+        self._edge_count = 0
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self.stats = {"loads": 0, "load_errors": 0, "too_large": 0}
+
+    @property
+    def is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl_seconds
+
+    async def ensure_loaded(self, edge_repo: Any) -> bool:
+        """Load or refresh the adjacency list; False means query per frontier"""
+        if not self.enabled:
+            return False
+        if self.is_fresh:
+            return True
+        async with self._lock:
+            if self.is_fresh:
+                return True
+            try:
+                # One extra row tells us the table is over budget without reading all of it
+                edges = await edge_repo.find_all(limit=self.max_edges + 1)
+            except Exception as e:
+                self.stats["load_errors"] += 1
+                logger.debug(f"Could not load knowledge edges: {e}")
+                return False
+            if len(edges) > self.max_edges:
+                self.stats["too_large"] += 1
+                self.invalidate()
+                logger.info(
+                    f"knowledge_edges exceeds {self.max_edges} rows; traversals use batched queries"
+                )
+                return False
+
+            outgoing: Dict[str, List[Dict[str, Any]]] = {}
+            for edge in edges:
+                from_id = edge.get("from_node_id")
+                if from_id:
+                    outgoing.setdefault(from_id, []).append(edge)
+            self._outgoing = outgoing
+            self._edge_count = len(edges)
+            self._loaded_at = time.monotonic()
+            self.stats["loads"] += 1
+            return True
+
+    def invalidate(self) -> None:
+        self._outgoing = {}
+        self._edge_count = 0
+        self._loaded_at = None
+
+    def add_edge(self, edge: Dict[str, Any]) -> None:
+        """Apply a newly written edge to a loaded adjacency list"""
+        from_id = edge.get("from_node_id")
+        if self._loaded_at is None or not from_id:
+            return
+        bucket = self._outgoing.setdefault(from_id, [])
+        if edge.get("id") is not None:
+            bucket[:] = [existing for existing in bucket if existing.get("id") != edge.get("id")]
+        bucket.append(edge)
+        self._edge_count = sum(len(edges) for edges in self._outgoing.values())
+
+    def remove_edge(self, edge_id: str) -> None:
+        for from_id, bucket in list(self._outgoing.items()):
+            remaining = [edge for edge in bucket if edge.get("id") != edge_id]
+            if len(remaining) != len(bucket):
+                self._edge_count -= len(bucket) - len(remaining)
+                if remaining:
+                    self._outgoing[from_id] = remaining
+                else:
+                    del self._outgoing[from_id]
+
+    def expand(
+        self,
+        node_ids: Iterable[str],
+        relationships: Optional[Iterable[str]] = None,
+        min_weight: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Outgoing edges of every node in a frontier, in frontier order"""
+        allowed = set(relationships) if relationships is not None else None
+        return [
+            edge
+            for node_id in node_ids
+            for edge in self._outgoing.get(node_id, ())
+            if edge_matches(edge, allowed, min_weight)
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "loaded": self._loaded_at is not None,
+            "nodes": len(self._outgoing),
+            "edges": self._edge_count,
+            **self.stats,
+        }
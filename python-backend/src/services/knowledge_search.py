@@ -0,0 +1,250 @@
+"""
+Knowledge Search Index
+
+In-process BM25 inverted index over knowledge nodes, used by
+KnowledgeService when the database has no `knowledge_nodes.search_vector`
+(tsvector) column or is unreachable.
+
+Features:
+- Postings per token with term frequencies; BM25 (k1/b) ranking with
+  top-k selection, so results come back ordered
+- Node-type filtering applied while scoring postings, before top-k
+- Incremental add/remove: nodes written through KnowledgeService are
+  indexed immediately
+- Bootstrap from the knowledge_nodes table when it is readable, then a
+  periodic version check (row count, latest updated_at) that reloads the
+  table when another process wrote nodes
+
+Usage:
+    from src.services.knowledge_search import KnowledgeSearchIndex
+
+    index = KnowledgeSearchIndex()
+    index.add_node({"id": "n1", "type": "kpi", "title": "Retention KPI", "content": {...}})
+    hits = index.search("retention rate", limit=10, node_types=["kpi"])
+"""
+
+import asyncio
+import heapq
+import logging
+import math
+import os
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on nodes read from the table to bootstrap the index
+KNOWLEDGE_SEARCH_BOOTSTRAP_LIMIT = int(os.getenv("KNOWLEDGE_SEARCH_BOOTSTRAP_LIMIT", "50000"))
+# Seconds to wait before retrying a failed bootstrap
+KNOWLEDGE_SEARCH_RETRY_SECONDS = 60.0
+# Seconds between checks of the table version after the bootstrap
+KNOWLEDGE_SEARCH_REFRESH_SECONDS = float(os.getenv("KNOWLEDGE_SEARCH_REFRESH_SECONDS", "300"))
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in", "is", "it",
+    "of", "on", "or", "the", "to", "what", "when", "which", "with",
+})
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN_PATTERN.findall((text or "").lower()) if token not in _STOPWORDS]
+
+
+def node_search_text(node: Dict[str, Any]) -> str:
+    """Title plus the string values of a node's content"""
+    parts = [str(node.get("title") or "")]
+    _collect_strings(node.get("content"), parts)
+    return " ".join(parts)
+
+
+def _collect_strings(value: Any, parts: List[str]) -> None:
+    if isinstance(value, dict):
+        for item in value.values():
+            _collect_strings(item, parts)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _collect_strings(item, parts)
+    elif isinstance(value, str):
+        # Identifiers like churn_rate should match "churn rate"
+        parts.append(value.replace("_", " "))
+    elif value is not None:
+        parts.append(str(value))
+
+
+class BM25Index:
+    """Incrementally updated BM25 inverted index"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_tokens: Dict[str, Dict[str, int]] = {}
+        self._doc_len: Dict[str, int] = {}
+        self._doc_type: Dict[str, str] = {}
+        self._total_len = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_len)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_len
+
+    @property
+    def token_count(self) -> int:
+        return len(self._postings)
+
+    def add(self, doc_id: str, text: str, doc_type: str = "") -> None:
+        """Index a document, replacing any previous version"""
+        self.remove(doc_id)
+        counts: Dict[str, int] = {}
+        for token in tokenize(text):
+            counts[token] = counts.get(token, 0) + 1
+        for token, tf in counts.items():
+            self._postings.setdefault(token, {})[doc_id] = tf
+        length = sum(counts.values())
+        self._doc_tokens[doc_id] = counts
+        self._doc_len[doc_id] = length
+        self._doc_type[doc_id] = (doc_type or "").lower()
+        self._total_len += length
+
+    def remove(self, doc_id: str) -> bool:
+        counts = self._doc_tokens.pop(doc_id, None)
+        if counts is None:
+            return False
+        for token in counts:
+            posting = self._postings.get(token)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self._postings[token]
+        self._total_len -= self._doc_len.pop(doc_id, 0)
+        self._doc_type.pop(doc_id, None)
+        return True
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        doc_types: Optional[Iterable[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """Top documents by BM25 score, highest first"""
+        doc_count = len(self._doc_len)
+        if not doc_count or limit <= 0:
+            return []
+        allowed: Optional[Set[str]] = (
+            {str(doc_type).lower() for doc_type in doc_types} if doc_types else None
+        )
+        avg_len = self._total_len / doc_count or 1.0
+
+        scores: Dict[str, float] = {}
+        for token in set(tokenize(query)):
+            posting = self._postings.get(token)
+            if not posting:
+                continue
+            idf = math.log(1.0 + (doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+            for doc_id, tf in posting.items():
+                if allowed is not None and self._doc_type[doc_id] not in allowed:
+                    continue
+                norm = self.k1 * (1.0 - self.b + self.b * self._doc_len[doc_id] / avg_len)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1.0) / (tf + norm)
+
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+
+class KnowledgeSearchIndex:
+    """BM25 index of knowledge nodes plus the node payloads it returns"""
+
+    def __init__(
+        self,
+        bootstrap_limit: int = KNOWLEDGE_SEARCH_BOOTSTRAP_LIMIT,
+        refresh_seconds: float = KNOWLEDGE_SEARCH_REFRESH_SECONDS,
+    ):
+        self.bootstrap_limit = bootstrap_limit
+        self.refresh_seconds = refresh_seconds
+        self.index = BM25Index()
+        self._nodes: Dict[str, Dict[str, Any]] = {}
+        # Node IDs that came from the table, as opposed to in-process adds
+        self._loaded_ids: Set[str] = set()
+        self._bootstrapped = False
+        self._version: Any = None
+        self._retry_at = 0.0
+        self._refresh_at = 0.0
+        self.reloads = 0
+        self._lock = asyncio.Lock()
+
+    def add_node(self, node: Dict[str, Any]) -> None:
+        node_id = node.get("id")
+        if not node_id:
+            return
+        node_id = str(node_id)
+        self._nodes[node_id] = node
+        self.index.add(node_id, node_search_text(node), str(node.get("type") or ""))
+
+    def remove_node(self, node_id: str) -> None:
+        self._nodes.pop(node_id, None)
+        self.index.remove(node_id)
+
+    def _due(self) -> bool:
+        now = time.monotonic()
+        if now < self._retry_at:
+            return False
+        return not self._bootstrapped or now >= self._refresh_at
+
+    async def ensure_loaded(self, node_repo: Any) -> None:
+        """
+        Index the knowledge_nodes table, and re-index it when its version
+        changed since the last load; nodes added in-process are kept
+        """
+        if not self._due():
+            return
+        async with self._lock:
+            if not self._due():
+                return
+            try:
+                # Read the version first: a write racing the load shows up next time
+                version = await node_repo.content_version()
+                if self._bootstrapped and version is not None and version == self._version:
+                    self._refresh_at = time.monotonic() + self.refresh_seconds
+                    return
+                records = await node_repo.find_all(limit=self.bootstrap_limit)
+            except Exception as e:
+                # No database: search whatever was indexed in-process
+                self._retry_at = time.monotonic() + KNOWLEDGE_SEARCH_RETRY_SECONDS
+                logger.debug(f"Knowledge search index load skipped: {e}")
+                return
+
+            loaded: Set[str] = set()
+            for record in records:
+                if record.get("id"):
+                    loaded.add(str(record["id"]))
+                    self.add_node(record)
+            for node_id in self._loaded_ids - loaded:
+                self.remove_node(node_id)
+            self._loaded_ids = loaded
+            if self._bootstrapped:
+                self.reloads += 1
+            self._bootstrapped = True
+            self._version = version
+            self._refresh_at = time.monotonic() + self.refresh_seconds
+            logger.info(f"Knowledge search index loaded {len(records)} nodes")
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        node_types: Optional[List[str]] = None,
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        return [
+            (self._nodes[node_id], score)
+            for node_id, score in self.index.search(query, limit=limit, doc_types=node_types)
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "nodes": len(self.index),
+            "tokens": self.index.token_count,
+            "bootstrapped": self._bootstrapped,
+            "reloads": self.reloads,
+        }
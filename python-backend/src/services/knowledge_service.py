@@ -13,7 +13,6 @@ from __future__ import annotations
 
 from typing import Optional, List, Dict, Any
 from datetime import datetime
-import re
 import uuid
 from types import SimpleNamespace
 from ..repositories.knowledge_node_repository import (
@@ -23,6 +22,8 @@ from ..repositories.knowledge_node_repository import (
     get_template_feedback_repository,
 )
 from ..models.database import db_manager
+from .knowledge_graph import KnowledgeAdjacencyCache
+from .knowledge_search import KnowledgeSearchIndex
 
 
 class KnowledgeService:
@@ -43,11 +44,15 @@ class KnowledgeService:
         edge_repo: Optional["KnowledgeEdgeRepository"] = None,
         pattern_repo: Optional["AnalysisPatternRepository"] = None,
         feedback_repo: Optional["TemplateFeedbackRepository"] = None,
+        adjacency_cache: Optional[KnowledgeAdjacencyCache] = None,
+        search_index: Optional[KnowledgeSearchIndex] = None,
     ):
         self.node_repo = node_repo or get_knowledge_node_repository(db_manager)
         self.edge_repo = edge_repo or get_knowledge_edge_repository(db_manager)
         self.pattern_repo = pattern_repo or get_analysis_pattern_repository(db_manager)
         self.feedback_repo = feedback_repo or get_template_feedback_repository(db_manager)
+        self.adjacency_cache = adjacency_cache or KnowledgeAdjacencyCache()
+        self.search_index = search_index or KnowledgeSearchIndex()
 
     # ========================================================================
     # Knowledge Graph Operations
@@ -92,7 +97,11 @@ class KnowledgeService:
         node_types: Optional[List[str]] = None,
     ) -> List[Dict[str, Any]]:
         """
-        Search knowledge graph by semantic similarity
+        Search knowledge graph with ranked full-text retrieval
+
+        Uses the `search_vector` tsvector column (GIN index, ts_rank_cd)
+        when it exists, otherwise the in-process BM25 index. Node-type
+        filtering happens inside the search, before the limit is applied.
 
         Args:
             query: Search query text
@@ -100,46 +109,32 @@ class KnowledgeService:
             node_types: Optional list of node types to filter
 
         Returns:
-            List of matching knowledge nodes with relevance scores
+            List of matching knowledge nodes, best first, with relevance in [0, 1)
         """
         try:
-            nodes = await self.node_repo.search(query, node_types=node_types, limit=limit)
+            ranked = await self.node_repo.search_ranked(query, node_types=node_types, limit=limit)
         except Exception:
-            return []
-        query_tokens = {
-            token for token in re.findall(r"[a-z0-9]+", query.lower()) if token
-        }
-
-        results = []
-        for node in nodes:
-            node_dict = self._node_to_dict(node)
-            title = str(node_dict.get("title") or "")
-            content = node_dict.get("content") or {}
-            searchable_text = f"{title} {content}".lower()
-            node_tokens = {
-                token for token in re.findall(r"[a-z0-9]+", searchable_text) if token
-            }
-            overlap = len(query_tokens & node_tokens)
-            token_denominator = max(len(query_tokens), 1)
-            relevance = overlap / token_denominator
-
-            if node_types:
-                normalized_types = {str(node_type).lower() for node_type in node_types}
-                current_type = str(node_dict.get("type") or "").lower()
-                if current_type not in normalized_types:
-                    continue
-
-            results.append({
-                "id": node_dict.get("id"),
-                "type": node_dict.get("type"),
-                "title": title,
-                "content": content,
-                "confidence": node_dict.get("confidence", 1.0),
-                "relevance": round(float(relevance), 4),
-            })
+            ranked = None
+        if ranked is not None:
+            return [self._search_result(row, float(row.get("rank") or 0.0)) for row in ranked]
+
+        await self.search_index.ensure_loaded(self.node_repo)
+        return [
+            # Same rank / (rank + 1) scale as ts_rank_cd normalization 32
+            self._search_result(node, score / (score + 1.0))
+            for node, score in self.search_index.search(query, limit=limit, node_types=node_types)
+        ]
 
-        results.sort(key=lambda item: (item.get("relevance", 0.0), item.get("confidence", 0.0)), reverse=True)
-        return results[:limit]
+    def _search_result(self, node: Any, relevance: float) -> Dict[str, Any]:
+        node_dict = self._node_to_dict(node)
+        return {
+            "id": node_dict.get("id"),
+            "type": node_dict.get("type"),
+            "title": str(node_dict.get("title") or ""),
+            "content": node_dict.get("content") or {},
+            "confidence": node_dict.get("confidence", 1.0),
+            "relevance": round(relevance, 4),
+        }
 
     async def get_most_used_patterns(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get most-used active patterns ordered by usage count."""
@@ -149,49 +144,86 @@ class KnowledgeService:
             return []
         return [self._pattern_to_dict(pattern) for pattern in patterns]
 
-    async def get_related_nodes(self, node_id: str, max_depth: int = 2) -> List[Dict[str, Any]]:
+    async def get_related_nodes(
+        self,
+        node_id: str,
+        max_depth: int = 2,
+        relationships: Optional[List[str]] = None,
+        min_weight: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
         """
         Get nodes related to a given node via the knowledge graph
 
+        Expands one breadth-first level at a time: each frontier costs a
+        single lookup in the adjacency cache, or one batched edge query
+        when the cache is unavailable.
+
         Args:
             node_id: ID of the starting node
             max_depth: Maximum depth to traverse
+            relationships: Only follow edges with these relationships (None = all)
+            min_weight: Only follow edges with at least this weight
 
         Returns:
-            List of related nodes in graph structure
+            List of related nodes in graph structure, nearest first. Each
+            node carries the weight of the edge that reached it and the
+            product of edge weights along its path.
         """
         if max_depth <= 0:
             return []
 
         related_nodes = []
         seen = {node_id}
-        frontier: List[tuple[str, int]] = [(node_id, 0)]
-
-        while frontier:
-            current_id, depth = frontier.pop(0)
-            if depth >= max_depth:
-                continue
+        path_weights = {node_id: 1.0}
+        frontier: List[str] = [node_id]
 
+        for depth in range(max_depth):
+            if not frontier:
+                break
             try:
-                edges = await self.edge_repo.find_by_nodes(from_node_id=current_id)
+                edges = await self._expand_frontier(frontier, relationships, min_weight)
             except Exception:
                 break
-            for edge in edges or []:
+
+            next_frontier: List[str] = []
+            for edge in edges:
                 to_id = edge.get("to_node_id") if isinstance(edge, dict) else None
-                relationship = edge.get("relationship") if isinstance(edge, dict) else "connected"
                 if not to_id or to_id in seen:
                     continue
 
+                weight = edge.get("weight")
+                weight = float(weight) if weight is not None else 1.0
+                path_weight = path_weights.get(edge.get("from_node_id"), 1.0) * weight
                 seen.add(to_id)
+                path_weights[to_id] = path_weight
                 related_nodes.append({
                     "id": to_id,
-                    "relationship": relationship or "connected",
+                    "relationship": edge.get("relationship") or "connected",
                     "distance": depth + 1,
+                    "weight": weight,
+                    "path_weight": round(path_weight, 6),
                 })
-                frontier.append((to_id, depth + 1))
+                next_frontier.append(to_id)
+            frontier = next_frontier
 
         return related_nodes
 
+    async def _expand_frontier(
+        self,
+        frontier: List[str],
+        relationships: Optional[List[str]],
+        min_weight: Optional[float],
+    ) -> List[Dict[str, Any]]:
+        """Outgoing edges for every node in a traversal frontier"""
+        if await self.adjacency_cache.ensure_loaded(self.edge_repo):
+            return self.adjacency_cache.expand(frontier, relationships=relationships, min_weight=min_weight)
+        edges = await self.edge_repo.find_by_from_nodes(
+            frontier, relationships=relationships, min_weight=min_weight
+        )
+        # Keep frontier order so traversal output is deterministic
+        order = {node: index for index, node in enumerate(frontier)}
+        return sorted(edges or [], key=lambda edge: order.get(edge.get("from_node_id"), len(order)))
+
     async def get_analysis_pattern(
         self,
         analysis_type: str,
@@ -299,6 +331,15 @@ class KnowledgeService:
                 "message": f"Pattern creation failed: {e}",
             }
         pattern_dict = self._pattern_to_dict(pattern)
+        if pattern_dict.get("id"):
+            # Learned patterns are searchable alongside knowledge nodes
+            self.search_index.add_node({
+                "id": pattern_dict["id"],
+                "type": "analysis_pattern",
+                "title": pattern_name,
+                "content": {"analysis_type": analysis_type, "parameters": pattern_model.parameters},
+                "confidence": pattern_model.confidence,
+            })
 
         return {
             "pattern_id": pattern_dict.get("id"),
@@ -485,6 +526,8 @@ class KnowledgeService:
             created_node = await self.node_repo.create(node_model)
             created_node_dict = self._node_to_dict(created_node)
             created_or_existing[node_seed["title"]] = str(created_node_dict.get("id"))
+            # The repository assigns node_model.id on create
+            self.search_index.add_node(self._node_to_dict(node_model))
             nodes_created += 1
 
         edge_specs = [
@@ -516,7 +559,14 @@ class KnowledgeService:
                 weight=1.0,
                 created_at=None,
             )
-            await self.edge_repo.create(edge_model)
+            created_edge = await self.edge_repo.create(edge_model)
+            self.adjacency_cache.add_edge({
+                "id": getattr(created_edge, "id", None) or edge_model.id,
+                "from_node_id": from_id,
+                "to_node_id": to_id,
+                "relationship": relationship,
+                "weight": edge_model.weight,
+            })
             edges_created += 1
 
         existing_patterns = await self.pattern_repo.find_by_type("classification", limit=1)
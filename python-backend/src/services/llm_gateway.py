@@ -0,0 +1,441 @@
+"""
+LLM Gateway
+
+Shared async text-generation client for route handlers.
+
+Features:
+- Non-blocking calls: Gemini through its async API (or a worker thread),
+  OpenAI through one long-lived AsyncOpenAI client with a pooled httpx
+  transport
+- Global and per-provider concurrency limits
+- LRU/TTL response cache keyed by (provider, model, prompt hash,
+  temperature, max_tokens); identical in-flight prompts share one call
+- Provider fallback in order (Gemini, then OpenAI)
+- Local stub provider for offline benchmarks and tests
+
+Configuration (environment):
+- LLM_MAX_CONCURRENCY / LLM_PROVIDER_CONCURRENCY: in-flight request limits
+- LLM_CACHE_SIZE / LLM_CACHE_TTL_SECONDS: response cache bounds (0 disables)
+- LLM_REQUEST_TIMEOUT_SECONDS: per-call timeout
+- LLM_GATEWAY_PROVIDERS: comma-separated provider order ("stub" for offline)
+- LLM_STUB_LATENCY_MS: simulated latency of the stub provider
+
+Usage:
+    from src.services.llm_gateway import get_llm_gateway
+
+    text = await get_llm_gateway().generate(prompt)
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_PROVIDER_CONCURRENCY = int(os.getenv("LLM_PROVIDER_CONCURRENCY", "8"))
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "512"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "900"))
+LLM_REQUEST_TIMEOUT_SECONDS = float(os.getenv("LLM_REQUEST_TIMEOUT_SECONDS", "60"))
+LLM_GATEWAY_PROVIDERS = os.getenv("LLM_GATEWAY_PROVIDERS", "gemini,openai")
+LLM_STUB_LATENCY_MS = float(os.getenv("LLM_STUB_LATENCY_MS", "0"))
+
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+OPENAI_CHAT_MODEL = os.getenv("OPENAI_CHAT_MODEL", "gpt-4o-mini")
+
+# OpenAI sampling defaults when the caller does not choose (Gemini keeps the model's own)
+OPENAI_DEFAULT_TEMPERATURE = 0.7
+OPENAI_DEFAULT_MAX_TOKENS = 2000
+
+CacheKey = Tuple[str, str, str, Optional[float], Optional[int]]
+
+
+# ============================================================================
+# Providers
+# ============================================================================
+
+class GatewayProvider(ABC):
+    """Base class for a text-generation backend"""
+
+    name = "base"
+
+    def __init__(self, model: str):
+        self.model = model
+
+    def available(self) -> bool:
+        return True
+
+    @abstractmethod
+    async def generate(
+        self,
+        prompt: str,
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+    ) -> Optional[str]:
+        """
+        Generate text for a prompt.
+
+        temperature / max_tokens are None when the caller did not choose;
+        the provider then applies its own defaults.
+        """
+        pass
+
+    async def close(self) -> None:
+        return None
+
+
+class GeminiProvider(GatewayProvider):
+    """Google Gemini via google-generativeai"""
+
+    name = "gemini"
+
+    def __init__(self, model: str = GEMINI_MODEL):
+        super().__init__(model)
+        self._model = None
+        self._init_failed = False
+
+    def _get_model(self):
+        if self._model is not None or self._init_failed:
+            return self._model
+        api_key = os.getenv("GOOGLE_AI_API_KEY")
+        if not api_key:
+            return None
+        try:
+            import google.generativeai as genai
+            genai.configure(api_key=api_key)
+            self._model = genai.GenerativeModel(self.model)
+            logger.info("Gemini LLM client initialized")
+        except Exception as e:
+            logger.warning(f"Failed to initialize Gemini: {e}")
+            self._init_failed = True
+        return self._model
+
+    def available(self) -> bool:
+        return self._get_model() is not None
+
+    async def generate(
+        self,
+        prompt: str,
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+    ) -> Optional[str]:
+        model = self._get_model()
+        # Only override what the caller chose; otherwise the model's defaults apply
+        generation_config = {}
+        if temperature is not None:
+            generation_config["temperature"] = temperature
+        if max_tokens is not None:
+            generation_config["max_output_tokens"] = max_tokens
+        kwargs = {"generation_config": generation_config} if generation_config else {}
+        if hasattr(model, "generate_content_async"):
+            response = await model.generate_content_async(prompt, **kwargs)
+        else:
+            # Older SDKs only ship the blocking call; keep it off the event loop
+            response = await asyncio.to_thread(model.generate_content, prompt, **kwargs)
+        return response.text
+
+
+class OpenAIProvider(GatewayProvider):
+    """OpenAI chat completions through one pooled AsyncOpenAI client"""
+
+    name = "openai"
+
+    def __init__(self, model: str = OPENAI_CHAT_MODEL, max_connections: int = LLM_PROVIDER_CONCURRENCY):
+        super().__init__(model)
+        self.max_connections = max_connections
+        self._client = None
+
+    def available(self) -> bool:
+        return bool(os.getenv("OPENAI_API_KEY"))
+
+    def _get_client(self):
+        if self._client is None:
+            import httpx
+            import openai
+
+            self._client = openai.AsyncOpenAI(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                timeout=LLM_REQUEST_TIMEOUT_SECONDS,
+                http_client=httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections,
+                    ),
+                    timeout=LLM_REQUEST_TIMEOUT_SECONDS,
+                ),
+            )
+        return self._client
+
+    async def generate(
+        self,
+        prompt: str,
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+    ) -> Optional[str]:
+        response = await self._get_client().chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=OPENAI_DEFAULT_TEMPERATURE if temperature is None else temperature,
+            max_tokens=OPENAI_DEFAULT_MAX_TOKENS if max_tokens is None else max_tokens,
+        )
+        return response.choices[0].message.content
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+class StubProvider(GatewayProvider):
+    """Deterministic offline provider; echoes a digest of the prompt"""
+
+    name = "stub"
+
+    def __init__(self, model: str = "stub-echo", latency_ms: float = LLM_STUB_LATENCY_MS):
+        super().__init__(model)
+        self.latency_ms = latency_ms
+        self.calls = 0
+
+    async def generate(
+        self,
+        prompt: str,
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+    ) -> Optional[str]:
+        self.calls += 1
+        if self.latency_ms > 0:
+            await asyncio.sleep(self.latency_ms / 1000)
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+        return f"[stub:{digest}] {prompt[:200]}"
+
+
+PROVIDER_CLASSES = {
+    GeminiProvider.name: GeminiProvider,
+    OpenAIProvider.name: OpenAIProvider,
+    StubProvider.name: StubProvider,
+}
+
+
+# ============================================================================
+# Response Cache
+# ============================================================================
+
+class ResponseCache:
+    """LRU cache with per-entry TTL"""
+
+    def __init__(self, max_entries: int = LLM_CACHE_SIZE, ttl_seconds: float = LLM_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[CacheKey, Tuple[float, str]]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get(self, key: CacheKey) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: CacheKey, value: str) -> None:
+        if not self.enabled:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# ============================================================================
+# Gateway
+# ============================================================================
+
+class LLMGateway:
+    """Concurrency-limited, cached access to the configured LLM providers"""
+
+    def __init__(
+        self,
+        providers: Optional[List[GatewayProvider]] = None,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        provider_concurrency: int = LLM_PROVIDER_CONCURRENCY,
+        cache: Optional[ResponseCache] = None,
+        timeout: float = LLM_REQUEST_TIMEOUT_SECONDS,
+    ):
+        if providers is None:
+            names = [name.strip().lower() for name in LLM_GATEWAY_PROVIDERS.split(",") if name.strip()]
+            providers = [PROVIDER_CLASSES[name]() for name in names if name in PROVIDER_CLASSES]
+        self.providers = providers
+        self.timeout = timeout
+        self.cache = cache if cache is not None else ResponseCache()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._provider_semaphores = {
+            provider.name: asyncio.Semaphore(provider_concurrency) for provider in providers
+        }
+        self._in_flight: Dict[CacheKey, asyncio.Future] = {}
+        self._stats: Dict[str, Any] = {
+            "requests": 0,
+            "cache_hits": 0,
+            "coalesced": 0,
+            "provider_calls": {provider.name: 0 for provider in providers},
+            "provider_failures": {provider.name: 0 for provider in providers},
+        }
+
+    @staticmethod
+    def _cache_key(
+        provider: GatewayProvider,
+        prompt: str,
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+    ) -> CacheKey:
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return (
+            provider.name,
+            provider.model,
+            prompt_hash,
+            None if temperature is None else round(float(temperature), 3),
+            None if max_tokens is None else int(max_tokens),
+        )
+
+    async def generate(
+        self,
+        prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        use_cache: bool = True,
+    ) -> Optional[str]:
+        """
+        Generate text with the first provider that succeeds.
+
+        Args:
+            prompt: Prompt text
+            temperature: Sampling temperature (None = provider default)
+            max_tokens: Maximum tokens to generate (None = provider default)
+            use_cache: Serve/store identical prompts from the response cache
+
+        Returns:
+            Generated text, or None if no provider is available or all failed
+        """
+        self._stats["requests"] += 1
+        providers = [provider for provider in self.providers if provider.available()]
+
+        if use_cache:
+            for provider in providers:
+                cached = self.cache.get(self._cache_key(provider, prompt, temperature, max_tokens))
+                if cached is not None:
+                    self._stats["cache_hits"] += 1
+                    return cached
+
+        for provider in providers:
+            key = self._cache_key(provider, prompt, temperature, max_tokens)
+            try:
+                text = await self._call(provider, key, prompt, temperature, max_tokens, use_cache)
+            except Exception as e:
+                self._stats["provider_failures"][provider.name] += 1
+                logger.warning(f"{provider.name} generation failed, trying next provider: {e}")
+                continue
+            if text is not None:
+                return text
+
+        if not providers:
+            logger.warning("No LLM provider available. Set GOOGLE_AI_API_KEY or OPENAI_API_KEY.")
+        return None
+
+    async def _call(
+        self,
+        provider: GatewayProvider,
+        key: CacheKey,
+        prompt: str,
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        use_cache: bool,
+    ) -> Optional[str]:
+        if use_cache:
+            pending = self._in_flight.get(key)
+            if pending is not None:
+                self._stats["coalesced"] += 1
+                return await asyncio.shield(pending)
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        if use_cache:
+            self._in_flight[key] = future
+        try:
+            async with self._semaphore, self._provider_semaphores[provider.name]:
+                self._stats["provider_calls"][provider.name] += 1
+                text = await asyncio.wait_for(
+                    provider.generate(prompt, temperature, max_tokens), timeout=self.timeout
+                )
+            if use_cache and text is not None:
+                self.cache.put(key, text)
+            future.set_result(text)
+            return text
+        except asyncio.CancelledError:
+            # Coalesced waiters were not cancelled themselves; let them fall through
+            future.set_exception(RuntimeError("Shared LLM request was cancelled"))
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters see the failure; mark it retrieved for the no-waiter case
+            future.exception()
+            raise
+        finally:
+            if use_cache:
+                self._in_flight.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get request, cache and per-provider counters"""
+        requests = self._stats["requests"]
+        return {
+            **self._stats,
+            "cache_entries": len(self.cache),
+            "cache_hit_rate": round(self._stats["cache_hits"] / requests, 4) if requests else 0.0,
+            "in_flight": len(self._in_flight),
+        }
+
+    async def close(self) -> None:
+        """Close provider connection pools"""
+        for provider in self.providers:
+            try:
+                await provider.close()
+            except Exception as e:
+                logger.debug(f"Error closing {provider.name} provider: {e}")
+
+
+# ============================================================================
+# Singleton Instance
+# ============================================================================
+
+_llm_gateway_instance: Optional[LLMGateway] = None
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Get or create the LLM gateway singleton"""
+    global _llm_gateway_instance
+    if _llm_gateway_instance is None:
+        _llm_gateway_instance = LLMGateway()
+    return _llm_gateway_instance
+
+
+async def shutdown_llm_gateway() -> None:
+    """Close the gateway's HTTP pools (application shutdown)"""
+    global _llm_gateway_instance
+    if _llm_gateway_instance is not None:
+        await _llm_gateway_instance.close()
+        _llm_gateway_instance = None
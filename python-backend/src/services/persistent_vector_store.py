@@ -0,0 +1,302 @@
+"""
+Persistent Vector Store
+
+Per-collection embedding matrices persisted to disk and memory-mapped on
+first use, so similarity search survives restarts and every uvicorn
+worker shares one page-cache copy of each index instead of holding its own.
+
+Features:
+- One directory per collection: normalized float32 `.npy` matrix plus a
+  JSON id/payload map, published atomically through a manifest
+- Lazy, read-only `np.load(mmap_mode="r")` on first search
+- Collections kept in the VectorIndex LRU under a memory budget
+- Writes from another worker are picked up on the next access (manifest
+  inode/mtime check); writers serialize on a per-collection file lock
+
+Usage:
+    from src.services.persistent_vector_store import get_vector_store
+
+    store = get_vector_store()
+    store.upsert("columns_ds1", ids, vectors, payloads)
+    hits = store.search(["columns_ds1"], query_vector, k=10)
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .vector_index import VectorCollection, VectorHit, VectorIndex, normalize_rows
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows development machines
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+VECTOR_STORE_PATH = Path(os.getenv("VECTOR_STORE_PATH", "./vector_stores"))
+# Budget for mapped matrices held open per worker (pages are shared via the OS cache)
+VECTOR_STORE_CACHE_MAX_BYTES = int(os.getenv("VECTOR_STORE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+MANIFEST_FILE = "manifest.json"
+# Manifest re-reads when a concurrent write removes the files being loaded
+_LOAD_ATTEMPTS = 3
+
+_SAFE_NAME_PATTERN = re.compile(r"[^A-Za-z0-9_\-]")
+
+
+# ============================================================================
+# Store
+# ============================================================================
+
+class PersistentVectorStore:
+    """Disk-backed, memory-mapped vector collections"""
+
+    def __init__(self, base_dir: Optional[Path] = None, max_bytes: Optional[int] = VECTOR_STORE_CACHE_MAX_BYTES):
+        self.base_dir = Path(base_dir or VECTOR_STORE_PATH)
+        self.index = VectorIndex(max_bytes=max_bytes)
+        # collection -> manifest file identity the mapped entry was loaded from
+        self._loaded: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Paths
+    # ------------------------------------------------------------------
+
+    def path_for(self, collection: str) -> Path:
+        safe = _SAFE_NAME_PATTERN.sub("_", collection)
+        return self.base_dir / safe
+
+    def _manifest_identity(self, collection: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path_for(collection) / MANIFEST_FILE)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns)
+
+    def exists(self, collection: str) -> bool:
+        return self._manifest_identity(collection) is not None
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def get(self, collection: str) -> Optional[VectorCollection]:
+        """Mapped collection, (re)loading it if missing or rewritten on disk"""
+        identity = self._manifest_identity(collection)
+        if identity is None:
+            self._forget(collection)
+            return None
+
+        entry = self.index.get(collection)
+        if entry is not None and self._loaded.get(collection) == identity:
+            return entry
+
+        with self._lock:
+            entry = self.index.get(collection)
+            if entry is not None and self._loaded.get(collection) == identity:
+                return entry
+            entry = self._load(collection)
+            if entry is None:
+                return None
+            self.index.put(collection, entry)
+            self._loaded[collection] = identity
+            return entry
+
+    def _load(self, collection: str) -> Optional[VectorCollection]:
+        directory = self.path_for(collection)
+        for attempt in range(_LOAD_ATTEMPTS):
+            try:
+                manifest = json.loads((directory / MANIFEST_FILE).read_text())
+                token = manifest["version"]
+                items = json.loads((directory / f"items-{token}.json").read_text())
+                # Zero-length files cannot be mapped
+                matrix = np.load(directory / f"vectors-{token}.npy", mmap_mode="r" if manifest.get("count") else None)
+                break
+            except FileNotFoundError as e:
+                # A writer published a newer generation and cleaned up the one
+                # this manifest named; read the manifest again
+                if attempt + 1 < _LOAD_ATTEMPTS and (directory / MANIFEST_FILE).exists():
+                    logger.debug(f"Vector collection {collection} changed while loading, retrying")
+                    continue
+                logger.warning(f"Could not load vector collection {collection}: {e}")
+                return None
+            except (KeyError, ValueError) as e:
+                logger.warning(f"Could not load vector collection {collection}: {e}")
+                return None
+        return VectorCollection(
+            ids=items["ids"],
+            matrix=matrix,
+            payloads=items["payloads"],
+            version=token,
+        )
+
+    def search(
+        self,
+        collections: Iterable[str],
+        query: Any,
+        k: int = 10,
+        min_score: Optional[float] = None,
+    ) -> List[VectorHit]:
+        """Top-k cosine search across collections (missing ones are skipped)"""
+        return self.search_many(collections, [query], k=k, min_score=min_score)[0]
+
+    def search_many(
+        self,
+        collections: Iterable[str],
+        queries: Any,
+        k: int = 10,
+        min_score: Optional[float] = None,
+    ) -> List[List[VectorHit]]:
+        """Top-k search for a batch of query vectors; one hit list per query"""
+        requested = list(dict.fromkeys(collections))
+        # Pinned so mapping later collections cannot evict earlier ones
+        # under the budget before they are scored
+        with self.index.pinned(requested):
+            names = [name for name in requested if self.get(name) is not None]
+            if not names:
+                return [[] for _ in range(len(queries))]
+            return self.index.search_many(queries, k=k, collections=names, min_score=min_score)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def replace(
+        self,
+        collection: str,
+        ids: Sequence[Any],
+        vectors: Any,
+        payloads: Optional[Sequence[Dict[str, Any]]] = None,
+    ) -> int:
+        """Overwrite a collection"""
+        with self._file_lock(collection):
+            self._write(collection, list(ids), normalize_rows(vectors) if len(ids) else None,
+                        list(payloads) if payloads is not None else [{} for _ in ids])
+        return len(ids)
+
+    def upsert(
+        self,
+        collection: str,
+        ids: Sequence[Any],
+        vectors: Any,
+        payloads: Optional[Sequence[Dict[str, Any]]] = None,
+    ) -> int:
+        """Insert or overwrite rows by id, keeping the rest of the collection"""
+        if not len(ids):
+            return self.count(collection)
+        new_matrix = normalize_rows(vectors)
+        new_payloads = list(payloads) if payloads is not None else [{} for _ in ids]
+
+        with self._file_lock(collection):
+            current = self._load(collection) if self.exists(collection) else None
+            if current is None or current.dimension != new_matrix.shape[1]:
+                merged_ids, matrix, merged_payloads = list(ids), new_matrix, new_payloads
+            else:
+                replacing = set(ids)
+                keep = [row for row, row_id in enumerate(current.ids) if row_id not in replacing]
+                merged_ids = [current.ids[row] for row in keep] + list(ids)
+                merged_payloads = [current.payloads[row] for row in keep] + new_payloads
+                matrix = np.concatenate([np.asarray(current.matrix[keep]), new_matrix])
+            self._write(collection, merged_ids, matrix, merged_payloads)
+        return len(merged_ids)
+
+    def delete(self, collection: str) -> bool:
+        """Remove a collection from disk and memory"""
+        directory = self.path_for(collection)
+        self._forget(collection)
+        if not directory.exists():
+            return False
+        with self._file_lock(collection):
+            for path in directory.iterdir():
+                if path.name != ".lock":
+                    path.unlink(missing_ok=True)
+        return True
+
+    def count(self, collection: str) -> int:
+        entry = self.get(collection)
+        return len(entry) if entry is not None else 0
+
+    def _write(self, collection: str, ids: List[Any], matrix: Optional[np.ndarray], payloads: List[Dict[str, Any]]) -> None:
+        directory = self.path_for(collection)
+        directory.mkdir(parents=True, exist_ok=True)
+        token = uuid.uuid4().hex[:12]
+        if matrix is None:
+            matrix = np.empty((0, 0), dtype=np.float32)
+
+        try:
+            previous = json.loads((directory / MANIFEST_FILE).read_text()).get("version")
+        except (FileNotFoundError, ValueError):
+            previous = None
+
+        np.save(directory / f"vectors-{token}.npy", np.ascontiguousarray(matrix, dtype=np.float32))
+        (directory / f"items-{token}.json").write_text(
+            json.dumps({"ids": ids, "payloads": payloads}, default=str)
+        )
+        manifest_tmp = directory / f"{MANIFEST_FILE}.tmp"
+        manifest_tmp.write_text(json.dumps({
+            "version": token,
+            "count": len(ids),
+            "dimension": int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+        }))
+        os.replace(manifest_tmp, directory / MANIFEST_FILE)
+
+        # The previous generation stays on disk until the next write, so a
+        # reader that read the old manifest just before the replace can still
+        # open its files; older generations are removed. Readers that already
+        # map a removed matrix keep it until they reload.
+        keep = {token, previous}
+        for path in directory.iterdir():
+            if path.name.startswith(("vectors-", "items-")) and path.stem.split("-", 1)[1] not in keep:
+                path.unlink(missing_ok=True)
+
+        self._forget(collection)
+        logger.debug(f"Persisted vector collection {collection} ({len(ids)} vectors)")
+
+    def _forget(self, collection: str) -> None:
+        self._loaded.pop(collection, None)
+        self.index.drop(collection)
+
+    @contextmanager
+    def _file_lock(self, collection: str):
+        directory = self.path_for(collection)
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(directory / ".lock", "w") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"base_dir": str(self.base_dir), **self.index.get_stats()}
+
+
+# ============================================================================
+# Singleton Instance
+# ============================================================================
+
+_vector_store_instance: Optional[PersistentVectorStore] = None
+
+
+def get_vector_store() -> PersistentVectorStore:
+    """Get or create the persistent vector store singleton"""
+    global _vector_store_instance
+    if _vector_store_instance is None:
+        _vector_store_instance = PersistentVectorStore()
+    return _vector_store_instance
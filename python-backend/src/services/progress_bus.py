@@ -0,0 +1,243 @@
+"""
+Progress Bus
+
+Coalesces and throttles progress events before they reach WebSocket
+clients and in-process progress listeners.
+
+Features:
+- Per-key (session, step) frame interval: the first update in a frame is
+  delivered at once, later ones within the frame collapse into the most
+  recent update, which is delivered when the frame closes
+- Terminal events (complete, error, progress >= 100) are never delayed or
+  dropped; they supersede a pending update for the same step and first
+  flush the session's other pending steps, so the final state is kept
+- Deferred deliveries and listener notifications run as tracked tasks
+  (no fire-and-forget create_task), awaited on shutdown
+- Published/delivered/coalesced counters and per-second event rates
+
+Usage:
+    from src.services.progress_bus import get_progress_bus
+
+    bus = get_progress_bus()
+    await bus.publish((session_id, "execution"), message, deliver)
+    bus.publish_nowait((session_id, "execution"), event, deliver, terminal=True)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Minimum spacing between delivered updates for the same (session, step); 0 disables coalescing
+PROGRESS_FRAME_INTERVAL_MS = float(os.getenv("PROGRESS_FRAME_INTERVAL_MS", "250"))
+# Tracked keys above which stale delivery timestamps are pruned
+PROGRESS_BUS_MAX_KEYS = int(os.getenv("PROGRESS_BUS_MAX_KEYS", "10000"))
+PROGRESS_RATE_WINDOW_SECONDS = 60
+
+Deliver = Callable[[Any], Awaitable[Any]]
+
+
+class _RateMeter:
+    """Events per second over a sliding window of one-second buckets"""
+
+    def __init__(self, window_seconds: int = PROGRESS_RATE_WINDOW_SECONDS):
+        self.window_seconds = window_seconds
+        self._buckets: Deque[List[int]] = deque()
+
+    def mark(self) -> None:
+        second = int(time.monotonic())
+        if self._buckets and self._buckets[-1][0] == second:
+            self._buckets[-1][1] += 1
+        else:
+            self._buckets.append([second, 1])
+        self._trim(second)
+
+    def rate(self) -> float:
+        self._trim(int(time.monotonic()))
+        return sum(count for _, count in self._buckets) / self.window_seconds
+
+    def _trim(self, now: int) -> None:
+        while self._buckets and self._buckets[0][0] <= now - self.window_seconds:
+            self._buckets.popleft()
+
+
+class ProgressBus:
+    """Coalescing, throttled delivery of progress events"""
+
+    def __init__(self, frame_interval_ms: float = PROGRESS_FRAME_INTERVAL_MS):
+        self.frame_interval = max(0.0, frame_interval_ms) / 1000.0
+        self._last_delivered: Dict[Hashable, float] = {}
+        self._pending: Dict[Hashable, Tuple[Any, Deliver]] = {}
+        self._flushers: Dict[Hashable, asyncio.Task] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats = {
+            "published": 0,
+            "delivered": 0,
+            "coalesced": 0,
+            "terminal": 0,
+            "delivery_errors": 0,
+        }
+        self._published_rate = _RateMeter()
+        self._delivered_rate = _RateMeter()
+
+    # ------------------------------------------------------------------
+    # Publishing
+    # ------------------------------------------------------------------
+
+    async def publish(self, key: Tuple[Any, Any], message: Any, deliver: Deliver, terminal: bool = False) -> None:
+        """
+        Publish an event; immediate deliveries are awaited.
+
+        Args:
+            key: (session, step) the update belongs to
+            message: Event handed to deliver
+            deliver: Coroutine function that sends one event
+            terminal: Final event for the step (never coalesced)
+        """
+        for item, item_deliver in self._submit(key, message, deliver, terminal):
+            await self._deliver(item, item_deliver)
+
+    def publish_nowait(self, key: Tuple[Any, Any], message: Any, deliver: Deliver, terminal: bool = False) -> None:
+        """Publish from synchronous code; immediate deliveries run as tracked tasks"""
+        ready = self._submit(key, message, deliver, terminal)
+        if ready:
+            self.spawn(self._deliver_all(ready))
+
+    def _submit(
+        self, key: Tuple[Any, Any], message: Any, deliver: Deliver, terminal: bool
+    ) -> List[Tuple[Any, Deliver]]:
+        """Record one event and return those to deliver now, in order"""
+        self.stats["published"] += 1
+        self._published_rate.mark()
+
+        if terminal:
+            self.stats["terminal"] += 1
+            superseded = self._pending.pop(key, None)
+            if superseded is not None:
+                self.stats["coalesced"] += 1
+            self._cancel_flusher(key)
+            # Earlier updates for the session's other steps go out first
+            ready = self._take_pending(lambda pending_key: pending_key[0] == key[0])
+            for done_key in [k for k in self._last_delivered if k[0] == key[0]]:
+                del self._last_delivered[done_key]
+            return ready + [(message, deliver)]
+
+        if self.frame_interval <= 0:
+            return [(message, deliver)]
+
+        now = time.monotonic()
+        last = self._last_delivered.get(key)
+        if key not in self._pending and (last is None or now - last >= self.frame_interval):
+            self._mark_delivered(key, now)
+            return [(message, deliver)]
+
+        if key in self._pending:
+            self.stats["coalesced"] += 1
+        self._pending[key] = (message, deliver)
+        if key not in self._flushers:
+            delay = max(0.0, (last or now) + self.frame_interval - now)
+            self._flushers[key] = self.spawn(self._flush_later(key, delay))
+        return []
+
+    def _take_pending(self, predicate: Callable[[Hashable], bool]) -> List[Tuple[Any, Deliver]]:
+        ready = []
+        for pending_key in [k for k in self._pending if predicate(k)]:
+            ready.append(self._pending.pop(pending_key))
+            self._cancel_flusher(pending_key)
+        return ready
+
+    def _cancel_flusher(self, key: Hashable) -> None:
+        flusher = self._flushers.pop(key, None)
+        if flusher is not None and flusher is not asyncio.current_task():
+            flusher.cancel()
+
+    def _mark_delivered(self, key: Hashable, now: float) -> None:
+        self._last_delivered[key] = now
+        if len(self._last_delivered) > PROGRESS_BUS_MAX_KEYS:
+            # Keys idle for a full frame behave exactly like unseen keys
+            cutoff = now - self.frame_interval
+            for stale_key in [k for k, at in self._last_delivered.items() if at < cutoff]:
+                del self._last_delivered[stale_key]
+
+    async def _flush_later(self, key: Hashable, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._flushers.pop(key, None)
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return
+        self._mark_delivered(key, time.monotonic())
+        await self._deliver(*pending)
+
+    async def _deliver_all(self, items: List[Tuple[Any, Deliver]]) -> None:
+        for message, deliver in items:
+            await self._deliver(message, deliver)
+
+    async def _deliver(self, message: Any, deliver: Deliver) -> None:
+        try:
+            await deliver(message)
+        except Exception as e:
+            self.stats["delivery_errors"] += 1
+            logger.warning(f"Progress delivery failed: {e}")
+            return
+        self.stats["delivered"] += 1
+        self._delivered_rate.mark()
+
+    # ------------------------------------------------------------------
+    # Task tracking
+    # ------------------------------------------------------------------
+
+    def spawn(self, coro: Awaitable[Any]) -> asyncio.Task:
+        """Run a coroutine as a task the bus keeps a reference to until it finishes"""
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Progress task failed: {task.exception()}")
+
+    async def flush(self) -> None:
+        """Deliver every pending update now and wait for in-flight tasks"""
+        ready = self._take_pending(lambda _key: True)
+        await self._deliver_all(ready)
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        published = self.stats["published"]
+        return {
+            "frame_interval_ms": round(self.frame_interval * 1000),
+            "pending": len(self._pending),
+            "tasks_in_flight": len(self._tasks),
+            "publish_rate_per_second": round(self._published_rate.rate(), 3),
+            "delivery_rate_per_second": round(self._delivered_rate.rate(), 3),
+            "reduction": round(1 - self.stats["delivered"] / published, 4) if published else 0.0,
+            **self.stats,
+        }
+
+
+# ============================================================================
+# Singleton
+# ============================================================================
+
+_progress_bus_instance: Optional[ProgressBus] = None
+
+
+def get_progress_bus() -> ProgressBus:
+    """Get or create the progress bus singleton"""
+    global _progress_bus_instance
+    if _progress_bus_instance is None:
+        _progress_bus_instance = ProgressBus()
+    return _progress_bus_instance
+
+
+async def shutdown_progress_bus() -> None:
+    """Deliver pending updates and wait for listener tasks"""
+    if _progress_bus_instance is not None:
+        await _progress_bus_instance.flush()
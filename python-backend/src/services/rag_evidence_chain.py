@@ -12,13 +12,13 @@ Uses LangChain for:
 """
 
 from typing import Dict, List, Optional, Any, Tuple
+import asyncio
 import logging
 import hashlib
 from datetime import datetime
 
 # LangChain imports
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-from langchain_community.vectorstores import FAISS, PGVector
 from langchain_core.documents import Document
 from langchain_core.retrievers import BaseRetriever
 # from langchain.chains import RetrievalQA, ConversationalRetrievalChain  # Deprecated in langchain v1.0+
@@ -30,6 +30,9 @@ from ..models.schemas import (
     EvidenceLink, EvidenceChainQuery, EvidenceChainResponse,
     LinkType, QuestionElementMapping, AnalysisResult, Insight
 )
+from .evidence_graph import EvidenceGraph
+from .persistent_vector_store import get_vector_store
+from .semantic_answer_cache import SemanticAnswerCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -82,15 +85,48 @@ class EvidenceChainStore:
     """
     Stores and retrieves evidence chain documents
 
-    Uses vector stores for similarity search and RAG
+    Document vectors live in the persistent vector store (one collection
+    per project), so retrieval survives restarts and is shared by workers.
+    Links live in an indexed EvidenceGraph persisted to evidence_links.
     """
 
     def __init__(self, embedding_model=None, use_pgvector: bool = True):
         """Initialize the evidence chain store"""
         self.embedding_model = embedding_model or OpenAIEmbeddings()
         self.use_pgvector = use_pgvector
-        self.vector_stores: Dict[str, Any] = {}
-        self.links: List[EvidenceLink] = []
+        self.vector_stores = get_vector_store()
+        self.graph = EvidenceGraph()
+        # project_id -> count of document/link writes made by this process;
+        # other workers' writes show up through version()
+        self._revisions: Dict[str, int] = {}
+
+    @property
+    def links(self) -> List[EvidenceLink]:
+        """All links currently held in memory"""
+        return self.graph.all_links()
+
+    async def version(self, project_id: str) -> Tuple[int, Optional[str], Optional[Tuple[int, Any]]]:
+        """
+        Evidence version of a project
+
+        Combines this process's write counter (covers links not flushed
+        yet) with values every worker sees: the generation token of the
+        project's vector collection manifest and the evidence_links
+        persisted version (row count, summed row revisions). Changes
+        whenever any worker adds documents or adds or updates links.
+        """
+        # get() stats the manifest and may map the collection; keep it off the loop
+        collection = await asyncio.to_thread(self.vector_stores.get, f"evidence_{project_id}")
+        links = await self.graph.persisted_version(project_id)
+        return (
+            self._revisions.get(project_id, 0),
+            collection.version if collection is not None else None,
+            links,
+        )
+
+    def _bump(self, project_ids: Any) -> None:
+        for project_id in set(project_ids):
+            self._revisions[project_id] = self._revisions.get(project_id, 0) + 1
 
     def add_document(
         self,
@@ -107,16 +143,43 @@ class EvidenceChainStore:
         Returns:
             Document ID
         """
-        # Add to vector store
-        collection_name = f"evidence_{project_id}"
-        vector_store = self._get_vector_store(collection_name)
-
-        langchain_doc = document.to_langchain_document()
-        vector_store.add_documents([langchain_doc])
-
+        self.add_documents(project_id, [document])
         logger.info(f"Added {document.doc_type} document {document.doc_id} to evidence chain")
         return document.doc_id
 
+    def add_documents(
+        self,
+        project_id: str,
+        documents: List[EvidenceDocument]
+    ) -> List[str]:
+        """
+        Add several documents with one embedding call and one store write
+
+        Args:
+            project_id: Project ID
+            documents: EvidenceDocuments to add
+
+        Returns:
+            Document IDs
+        """
+        missing = [doc for doc in documents if doc.embedding is None]
+        if missing:
+            vectors = self.embedding_model.embed_documents([doc.content for doc in missing])
+            for doc, vector in zip(missing, vectors):
+                doc.embedding = vector
+
+        self.vector_stores.upsert(
+            f"evidence_{project_id}",
+            [doc.doc_id for doc in documents],
+            [doc.embedding for doc in documents],
+            [
+                {**doc.metadata, "doc_id": doc.doc_id, "doc_type": doc.doc_type, "content": doc.content}
+                for doc in documents
+            ],
+        )
+        self._bump([project_id])
+        return [doc.doc_id for doc in documents]
+
     def add_link(self, link: EvidenceLink) -> None:
         """
         Add a link to the evidence chain
@@ -124,18 +187,25 @@ class EvidenceChainStore:
         Args:
             link: EvidenceLink to add
         """
-        self.links.append(link)
-        logger.info(
+        self.graph.add_link(link)
+        self._bump([link.project_id])
+        logger.debug(
             f"Added link: {link.source_type}:{link.source_id} -> "
             f"{link.target_type}:{link.target_id} ({link.link_type.value})"
         )
 
+    def add_links(self, links: List[EvidenceLink]) -> None:
+        """Add several links (persisted together by the next flush)"""
+        self.graph.add_links(links)
+        self._bump(link.project_id for link in links)
+
+    async def ensure_loaded(self, project_id: str) -> None:
+        """Load a project's persisted links if this process has not yet"""
+        await self.graph.ensure_loaded(project_id)
+
     def get_links_for_project(self, project_id: str) -> List[EvidenceLink]:
         """Get all links for a project"""
-        return [
-            link for link in self.links
-            if link.project_id == project_id
-        ]
+        return self.graph.links_for_project(project_id)
 
     def get_links_for_question(
         self,
@@ -143,12 +213,34 @@ class EvidenceChainStore:
         question_id: str
     ) -> List[EvidenceLink]:
         """Get all links starting from a question"""
-        return [
-            link for link in self.links
-            if link.project_id == project_id
-            and link.source_type == "question"
-            and link.source_id == question_id
-        ]
+        return self.graph.outgoing(project_id, "question", question_id)
+
+    def get_links_for_node(
+        self,
+        project_id: str,
+        node_type: str,
+        node_id: str
+    ) -> List[EvidenceLink]:
+        """Get links into and out of a node"""
+        return (
+            self.graph.incoming(project_id, node_type, node_id)
+            + self.graph.outgoing(project_id, node_type, node_id)
+        )
+
+    def trace(
+        self,
+        project_id: str,
+        start_type: str,
+        start_id: str,
+        max_depth: int = 4,
+        direction: str = "downstream",
+        link_types: Optional[List[LinkType]] = None
+    ) -> List[EvidenceLink]:
+        """Multi-hop chain from a node (see EvidenceGraph.traverse)"""
+        return self.graph.traverse(
+            project_id, start_type, start_id,
+            max_depth=max_depth, direction=direction, link_types=link_types
+        )
 
     async def retrieve_evidence(
         self,
@@ -156,7 +248,8 @@ class EvidenceChainStore:
         query: str,
         top_k: int = 10,
         min_score: float = 0.0,
-        doc_types: Optional[List[str]] = None
+        doc_types: Optional[List[str]] = None,
+        query_embedding: Optional[List[float]] = None
     ) -> Tuple[List[Document], List[float]]:
         """
         Retrieve evidence documents using similarity search
@@ -167,18 +260,20 @@ class EvidenceChainStore:
             top_k: Number of results
             min_score: Minimum similarity score
             doc_types: Optional filter by document types
+            query_embedding: Embedding of `query`, if the caller already has it
 
         Returns:
             Tuple of (documents, scores)
         """
-        collection_name = f"evidence_{project_id}"
-        vector_store = self._get_vector_store(collection_name)
-
-        # Search with score
-        results = await vector_store.asimilarity_search_with_score(
-            query=query,
-            k=top_k
+        if query_embedding is None:
+            query_embedding = await self.embedding_model.aembed_query(query)
+        hits = await asyncio.to_thread(
+            self.vector_stores.search, [f"evidence_{project_id}"], query_embedding, top_k
         )
+        results = []
+        for hit in hits:
+            metadata = {key: value for key, value in hit.payload.items() if key != "content"}
+            results.append((Document(page_content=hit.payload.get("content", ""), metadata=metadata), hit.score))
 
         # Filter by score and doc type
         filtered_results = []
@@ -195,27 +290,6 @@ class EvidenceChainStore:
 
         return documents, scores
 
-    def _get_vector_store(self, collection_name: str) -> Any:
-        """Get or create vector store for a collection"""
-        if collection_name in self.vector_stores:
-            return self.vector_stores[collection_name]
-
-        # Create new vector store
-        if self.use_pgvector:
-            vector_store = PGVector(
-                collection_name=collection_name,
-                embedding_function=self.embedding_model,
-                connection_string="postgresql://..."  # Load from env
-            )
-        else:
-            vector_store = FAISS.from_documents(
-                documents=[],
-                embedding=self.embedding_model
-            )
-
-        self.vector_stores[collection_name] = vector_store
-        return vector_store
-
 
 # ============================================================================
 # Evidence Chain Builder
@@ -257,24 +331,22 @@ class EvidenceChainBuilder:
             List of EvidenceLink
         """
         links = []
+        documents = []
+        question_mappings = [m for m in mappings if m.question_id == question_id]
 
         # Step 1: Add question document
-        question_doc = EvidenceDocument(
+        documents.append(EvidenceDocument(
             doc_id=question_id,
             doc_type="question",
             content=question,
             metadata={"project_id": project_id, "question": question}
-        )
-        self.store.add_document(project_id, question_doc)
+        ))
 
         # Step 2: Question → Elements links
-        for mapping in mappings:
-            if mapping.question_id != question_id:
-                continue
-
+        for mapping in question_mappings:
             for i, element_id in enumerate(mapping.related_elements):
                 # Add element document if not exists
-                element_doc = EvidenceDocument(
+                documents.append(EvidenceDocument(
                     doc_id=element_id,
                     doc_type="element",
                     content=f"Element: {element_id}",
@@ -284,11 +356,10 @@ class EvidenceChainBuilder:
                         "columns": mapping.related_columns,
                         "relevance_score": mapping.relevance_scores[i] if i < len(mapping.relevance_scores) else 0
                     }
-                )
-                self.store.add_document(project_id, element_doc)
+                ))
 
                 # Create link
-                link = EvidenceLink(
+                links.append(EvidenceLink(
                     id=self._generate_link_id(question_id, element_id, "question_element"),
                     project_id=project_id,
                     source_type="question",
@@ -298,35 +369,30 @@ class EvidenceChainBuilder:
                     link_type=LinkType.QUESTION_ELEMENT,
                     confidence=mapping.relevance_scores[i] if i < len(mapping.relevance_scores) else 0.0,
                     metadata={"question_text": question, "element_name": element_id}
-                )
-                self.store.add_link(link)
-                links.append(link)
+                ))
 
         # Step 3: Elements → Transformations links
+        element_ids = list(dict.fromkeys(
+            element_id for mapping in question_mappings for element_id in mapping.related_elements
+        ))
         for transformation_id in transformation_ids:
-            for mapping in mappings:
-                if mapping.question_id != question_id:
-                    continue
-
-                for element_id in mapping.related_elements:
-                    link = EvidenceLink(
-                        id=self._generate_link_id(element_id, transformation_id, "element_transformation"),
-                        project_id=project_id,
-                        source_type="element",
-                        source_id=element_id,
-                        target_type="transformation",
-                        target_id=transformation_id,
-                        link_type=LinkType.ELEMENT_TRANSFORMATION,
-                        confidence=0.8,  # Default confidence
-                        metadata={"transformation_type": "derived_column"}
-                    )
-                    self.store.add_link(link)
-                    links.append(link)
+            for element_id in element_ids:
+                links.append(EvidenceLink(
+                    id=self._generate_link_id(element_id, transformation_id, "element_transformation"),
+                    project_id=project_id,
+                    source_type="element",
+                    source_id=element_id,
+                    target_type="transformation",
+                    target_id=transformation_id,
+                    link_type=LinkType.ELEMENT_TRANSFORMATION,
+                    confidence=0.8,  # Default confidence
+                    metadata={"transformation_type": "derived_column"}
+                ))
 
         # Step 4: Transformations → Insights links
         for insight in insights:
             # Add insight document
-            insight_doc = EvidenceDocument(
+            documents.append(EvidenceDocument(
                 doc_id=insight.id,
                 doc_type="insight",
                 content=f"{insight.title}: {insight.description}",
@@ -336,12 +402,11 @@ class EvidenceChainBuilder:
                     "significance": insight.significance,
                     "elements": insight.data_elements_used
                 }
-            )
-            self.store.add_document(project_id, insight_doc)
+            ))
 
             # Create link to first transformation (simplified)
             if transformation_ids:
-                link = EvidenceLink(
+                links.append(EvidenceLink(
                     id=self._generate_link_id(transformation_ids[0], insight.id, "transformation_insight"),
                     project_id=project_id,
                     source_type="transformation",
@@ -354,9 +419,12 @@ class EvidenceChainBuilder:
                         "insight_type": insight.type,
                         "significance": insight.significance
                     }
-                )
-                self.store.add_link(link)
-                links.append(link)
+                ))
+
+        # One embedding call / vector-store write and one link batch per chain
+        self.store.add_documents(project_id, list({doc.doc_id: doc for doc in documents}.values()))
+        self.store.add_links(links)
+        logger.info(f"Built evidence chain for question {question_id}: {len(links)} links")
 
         return links
 
@@ -380,7 +448,8 @@ class RAGAnswerGenerator:
     def __init__(
         self,
         store: EvidenceChainStore,
-        llm: Optional[Any] = None
+        llm: Optional[Any] = None,
+        cache: Optional[SemanticAnswerCache] = None
     ):
         """
         Initialize the RAG answer generator
@@ -388,9 +457,11 @@ class RAGAnswerGenerator:
         Args:
             store: EvidenceChainStore for retrieving evidence
             llm: LLM for generating answers (optional)
+            cache: Semantic answer cache (optional)
         """
         self.store = store
         self.llm = llm or ChatOpenAI(temperature=0.3)
+        self.cache = cache or SemanticAnswerCache()
 
     async def generate_answer(
         self,
@@ -409,14 +480,24 @@ class RAGAnswerGenerator:
             include_context: Whether to include context in the response
 
         Returns:
-            Dictionary with answer, context, and metadata
+            Dictionary with answer, context, and metadata. Answers reused
+            from the semantic cache carry a "cache" entry.
         """
+        question_embedding = await self.store.embedding_model.aembed_query(question)
+        version = await self.store.version(project_id)
+        cached = self.cache.lookup(project_id, version, question_embedding, top_k)
+        if cached is not None:
+            if not include_context:
+                cached["context"] = []
+            return cached
+
         # Retrieve relevant evidence
         documents, scores = await self.store.retrieve_evidence(
             project_id=project_id,
             query=question,
             top_k=top_k,
-            min_score=0.5
+            min_score=0.5,
+            query_embedding=question_embedding
         )
 
         # Build context
@@ -428,13 +509,18 @@ class RAGAnswerGenerator:
             context=context
         )
 
-        return {
+        response = {
             "answer": answer,
-            "context": context if include_context else [],
+            "context": context,
             "evidence_count": len(documents),
             "average_relevance": sum(scores) / len(scores) if scores else 0.0,
             "generated_at": datetime.utcnow().isoformat()
         }
+        self.cache.store(project_id, version, question_embedding, response, top_k)
+
+        if not include_context:
+            response = {**response, "context": []}
+        return response
 
     def _build_context(
         self,
@@ -612,11 +698,9 @@ class EvidenceChainService:
             doc_types=doc_types
         )
 
-        # Get links for the question
-        links = self.store.get_links_for_question(
-            project_id=query.project_id,
-            question_id=query.question_id
-        )
+        # Full question → element → transformation → insight chain
+        await self.store.ensure_loaded(query.project_id)
+        links = self.store.trace(query.project_id, "question", query.question_id)
 
         # Generate answer using RAG
         answer_result = await self.answer_generator.generate_answer(
@@ -654,10 +738,57 @@ class EvidenceChainService:
             question=question
         )
 
-    def get_chain_for_project(self, project_id: str) -> List[EvidenceLink]:
+    async def get_chain_for_project(self, project_id: str) -> List[EvidenceLink]:
         """Get all links in the evidence chain for a project"""
+        await self.store.ensure_loaded(project_id)
         return self.store.get_links_for_project(project_id)
 
+    async def get_links_for_node(
+        self,
+        project_id: str,
+        node_type: str,
+        node_id: str
+    ) -> List[EvidenceLink]:
+        """Get links into and out of one node (e.g. an insight)"""
+        await self.store.ensure_loaded(project_id)
+        return self.store.get_links_for_node(project_id, node_type, node_id)
+
+    async def trace_chain(
+        self,
+        project_id: str,
+        start_type: str,
+        start_id: str,
+        max_depth: int = 4,
+        direction: str = "downstream",
+        link_types: Optional[List[LinkType]] = None
+    ) -> List[EvidenceLink]:
+        """
+        Follow the evidence chain from a node in one call
+
+        Args:
+            project_id: Project ID
+            start_type: Node type (question, element, transformation, insight, answer)
+            start_id: Node ID
+            max_depth: Maximum hops
+            direction: "downstream" (question → answer) or "upstream" (answer → question)
+            link_types: Only follow these link types
+
+        Returns:
+            Links reached, nearest first
+        """
+        await self.store.ensure_loaded(project_id)
+        return self.store.trace(project_id, start_type, start_id, max_depth, direction, link_types)
+
+    async def close(self) -> None:
+        """Flush pending evidence links"""
+        await self.store.graph.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "evidence_graph": self.store.graph.get_stats(),
+            "answer_cache": self.answer_generator.cache.get_stats(),
+        }
+
 
 # ============================================================================
 # Singleton Instance
@@ -674,6 +805,19 @@ def get_evidence_chain_service() -> EvidenceChainService:
     return _evidence_service
 
 
+def get_evidence_chain_stats() -> Optional[Dict[str, Any]]:
+    """Cache and graph stats, or None if the service has not been started"""
+    if _evidence_service is None:
+        return None
+    return _evidence_service.get_stats()
+
+
+async def shutdown_evidence_chain_service() -> None:
+    """Flush pending evidence links if the service was started"""
+    if _evidence_service is not None:
+        await _evidence_service.close()
+
+
 # ============================================================================
 # Convenience Functions
 # ============================================================================
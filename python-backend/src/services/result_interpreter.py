@@ -9,12 +9,19 @@ Based on PDF requirements:
 - Generates answers to user questions from analysis results
 - Creates evidence chain linking questions → elements → insights → answers
 - Generates supporting materials with business context
+- Answers questions concurrently (bounded), optionally packing several
+  questions into one structured-output call, and reports each answer as
+  soon as it is ready
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Awaitable, Callable, Dict, List, Optional, Any, Tuple
+import asyncio
+import json
 import logging
+import os
+import re
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 # LangChain for LLM-powered interpretation
 from langchain_openai import ChatOpenAI
@@ -31,6 +38,13 @@ from ..models.schemas import (
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Answer-generation LLM calls in flight per generate_answers call
+RESULT_ANSWER_CONCURRENCY = int(os.getenv("RESULT_ANSWER_CONCURRENCY", "4"))
+# Questions packed into one structured-output call (1 = one prompt per question)
+RESULT_ANSWER_BATCH_SIZE = int(os.getenv("RESULT_ANSWER_BATCH_SIZE", "1"))
+
+AnswerCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
 
 # ============================================================================
 # Data Classes
@@ -44,7 +58,7 @@ class AnswerContext:
     analysis_results: Dict[str, AnalysisResult]
     question_mapping: QuestionElementMapping
     business_context: Optional[Dict[str, Any]] = None
-    evidence_links: List = []
+    evidence_links: List = field(default_factory=list)
 
 
 @dataclass
@@ -52,9 +66,9 @@ class BusinessContext:
     """Business context for interpretation"""
     industry: Optional[str] = None
     audience_type: Optional[str] = None  # non-tech, business, tech
-    goals: List[str] = []
-    key_metrics: List[str] = []
-    business_definitions: Dict[str, Any] = {}
+    goals: List[str] = field(default_factory=list)
+    key_metrics: List[str] = field(default_factory=list)
+    business_definitions: Dict[str, Any] = field(default_factory=dict)
 
 
 @dataclass
@@ -64,7 +78,7 @@ class InterpretationResult:
     confidence: float
     evidence_summary: List[str]
     business_translation: Optional[str] = None
-    recommended_actions: List[str]
+    recommended_actions: List[str] = field(default_factory=list)
 
 
 # ============================================================================
@@ -80,14 +94,23 @@ class ResultInterpreter:
     - Business Agent: For translating to business language
     """
 
-    def __init__(self, llm=None):
+    def __init__(
+        self,
+        llm=None,
+        max_concurrency: int = RESULT_ANSWER_CONCURRENCY,
+        batch_size: int = RESULT_ANSWER_BATCH_SIZE,
+    ):
         """
         Initialize the result interpreter
 
         Args:
             llm: Optional LLM for interpretation
+            max_concurrency: Answer LLM calls allowed in flight at once
+            batch_size: Questions answered per LLM call (1 = one call each)
         """
         self.llm = llm or ChatOpenAI(temperature=0.3)
+        self.max_concurrency = max(1, max_concurrency)
+        self.batch_size = max(1, batch_size)
         self.business_agent_prompt = self._get_business_agent_prompt()
         self.data_scientist_prompt = self._get_data_scientist_prompt()
 
@@ -131,66 +154,131 @@ Return a technical but clear interpretation with supporting evidence."""
         self,
         questions: List[QuestionElementMapping],
         analysis_results: Dict[str, AnalysisResult],
-        business_context: Optional[Dict[str, Any]] = None
+        business_context: Optional[Dict[str, Any]] = None,
+        on_answer: Optional[AnswerCallback] = None,
     ) -> List[Dict[str, Any]]:
         """
         Generate answers to user questions from analysis results
 
+        Questions are answered concurrently (at most `max_concurrency` LLM
+        calls in flight), `batch_size` questions per call.
+
         Args:
             questions: Question-element mappings
             analysis_results: Results from all analyses
             business_context: Business context
+            on_answer: Optional coroutine called with each answer as soon as
+                it is ready (e.g. to stream it to the client)
 
         Returns:
-            List of answers with question_id, text, confidence
+            List of answers with question_id, text, confidence, in question order
         """
-        answers = []
+        if not questions:
+            return []
+
+        # Gathered once per call and shared by every question's prompt
+        evidence_texts = self._collect_evidence(analysis_results)
+        contexts = [
+            AnswerContext(
+                question=question_mapping.question_text,
+                question_id=question_mapping.question_id,
+                analysis_results=analysis_results,
+                question_mapping=question_mapping,
+                business_context=business_context
+            )
+            for question_mapping in questions
+        ]
+        batches = [
+            list(range(start, min(start + self.batch_size, len(contexts))))
+            for start in range(0, len(contexts), self.batch_size)
+        ]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _answer_batch(positions: List[int]) -> List[Tuple[int, Dict[str, Any]]]:
+            async with semaphore:
+                batch_contexts = [contexts[position] for position in positions]
+                if len(batch_contexts) == 1:
+                    results = [await self._answer_one(batch_contexts[0], evidence_texts)]
+                else:
+                    results = await self._answer_many(batch_contexts, evidence_texts)
+            return list(zip(positions, results))
+
+        answers: List[Optional[Dict[str, Any]]] = [None] * len(contexts)
+        for finished in asyncio.as_completed([_answer_batch(positions) for positions in batches]):
+            for position, answer in await finished:
+                answers[position] = answer
+                if on_answer is not None:
+                    try:
+                        await on_answer(answer)
+                    except Exception as e:
+                        logger.warning(f"Answer callback failed for {answer['question_id']}: {e}")
 
-        for question_mapping in questions:
-            try:
-                # Build answer context
-                context = AnswerContext(
-                    question=question_mapping.question_text,
-                    question_id=question_mapping.question_id,
-                    analysis_results=analysis_results,
-                    question_mapping=question_mapping,
-                    business_context=business_context
-                )
-
-                # Generate answer using Business Agent
-                result = await self._generate_business_answer(context)
-
-                answers.append({
-                    "question_id": question_mapping.question_id,
-                    "question_text": question_mapping.question_text,
-                    "answer": result.answer,
-                    "confidence": result.confidence,
-                    "evidence_summary": result.evidence_summary
-                })
-
-                logger.info(
-                    f"Generated answer for question {question_mapping.question_id}: "
-                    f"{result.answer[:100]}..."
-                )
-
-            except Exception as e:
-                logger.error(
-                    f"Error generating answer for {question_mapping.question_id}: {e}",
-                    exc_info=True
-                )
-                answers.append({
-                    "question_id": question_mapping.question_id,
-                    "question_text": question_mapping.question_text,
-                    "answer": f"Unable to generate answer: {str(e)}",
-                    "confidence": 0.0,
-                    "evidence_summary": []
-                })
+        return answers
+
+    async def _answer_one(self, context: AnswerContext, evidence_texts: List[str]) -> Dict[str, Any]:
+        """Answer one question with its own LLM call; errors become answer entries"""
+        try:
+            result = await self._generate_business_answer(context, evidence_texts)
+        except Exception as e:
+            logger.error(
+                f"Error generating answer for {context.question_id}: {e}",
+                exc_info=True
+            )
+            return self._error_answer(context, e)
+
+        logger.info(
+            f"Generated answer for question {context.question_id}: "
+            f"{result.answer[:100]}..."
+        )
+        return self._answer_entry(context, result)
 
+    async def _answer_many(self, contexts: List[AnswerContext], evidence_texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Answer several questions with one structured-output call
+
+        Questions missing from (or unparseable in) the response are retried
+        with their own prompt.
+        """
+        try:
+            response = await self.llm.ainvoke(self._build_batch_answer_prompt(contexts, evidence_texts))
+            texts = self._parse_batch_answers(response.content)
+        except Exception as e:
+            logger.warning(f"Batched answer generation failed for {len(contexts)} questions: {e}")
+            texts = {}
+
+        answers = []
+        for context in contexts:
+            text = texts.get(context.question_id)
+            if not text:
+                answers.append(await self._answer_one(context, evidence_texts))
+                continue
+            answers.append(self._answer_entry(context, self._interpretation(context, evidence_texts, text)))
         return answers
 
+    @staticmethod
+    def _answer_entry(context: AnswerContext, result: InterpretationResult) -> Dict[str, Any]:
+        return {
+            "question_id": context.question_id,
+            "question_text": context.question,
+            "answer": result.answer,
+            "confidence": result.confidence,
+            "evidence_summary": result.evidence_summary
+        }
+
+    @staticmethod
+    def _error_answer(context: AnswerContext, error: Exception) -> Dict[str, Any]:
+        return {
+            "question_id": context.question_id,
+            "question_text": context.question,
+            "answer": f"Unable to generate answer: {str(error)}",
+            "confidence": 0.0,
+            "evidence_summary": []
+        }
+
     async def _generate_business_answer(
         self,
-        context: AnswerContext
+        context: AnswerContext,
+        evidence_texts: Optional[List[str]] = None
     ) -> InterpretationResult:
         """
         Generate a business-friendly answer
@@ -199,12 +287,14 @@ Return a technical but clear interpretation with supporting evidence."""
 
         Args:
             context: Answer context with question and results
+            evidence_texts: Evidence already gathered for these results
 
         Returns:
             InterpretationResult with answer and metadata
         """
         # Gather relevant evidence from analysis results
-        evidence_texts = self._gather_evidence(context)
+        if evidence_texts is None:
+            evidence_texts = self._gather_evidence(context)
 
         # Build prompt for LLM
         prompt = self._build_answer_prompt(context, evidence_texts)
@@ -212,22 +302,28 @@ Return a technical but clear interpretation with supporting evidence."""
         # Generate answer
         response = await self.llm.ainvoke(prompt)
 
+        return self._interpretation(context, evidence_texts, response.content)
+
+    def _interpretation(self, context: AnswerContext, evidence_texts: List[str], text: str) -> InterpretationResult:
         # Extract confidence based on evidence quality
         confidence = self._calculate_confidence(context, evidence_texts)
 
         return InterpretationResult(
-            answer=response.content,
+            answer=text,
             confidence=confidence,
             evidence_summary=evidence_texts,
-            business_translation=self._extract_business_meaning(response.content),
-            recommended_actions=self._extract_actions(response.content)
+            business_translation=self._extract_business_meaning(text),
+            recommended_actions=self._extract_actions(text)
         )
 
     def _gather_evidence(self, context: AnswerContext) -> List[str]:
         """Gather evidence from analysis results"""
+        return self._collect_evidence(context.analysis_results)
+
+    def _collect_evidence(self, analysis_results: Dict[str, AnalysisResult]) -> List[str]:
         evidence = []
 
-        for analysis_type, result in context.analysis_results.items():
+        for analysis_type, result in analysis_results.items():
             if not result.success:
                 continue
 
@@ -269,6 +365,53 @@ If the evidence doesn't fully answer the question, acknowledge what's available.
 
         return prompt
 
+    def _build_batch_answer_prompt(
+        self,
+        contexts: List[AnswerContext],
+        evidence: List[str]
+    ) -> str:
+        """Build one prompt answering several questions as a JSON array"""
+        questions = "\n\n".join(
+            f"""Question ID: {context.question_id}
+Question: {context.question}
+Related Data Elements: {', '.join(context.question_mapping.related_elements)}
+Intent Type: {context.question_mapping.intent_type.value if context.question_mapping.intent_type else 'general'}"""
+            for context in contexts
+        )
+        return f"""{self.business_agent_prompt}
+
+Available Analysis Results:
+{chr(10).join(f'- {e}' for e in evidence)}
+
+Questions:
+{questions}
+
+For each question, generate a clear, business-friendly answer that directly addresses it.
+Use the evidence above to support your answers.
+If the evidence doesn't fully answer a question, acknowledge what's available.
+
+Format as JSON array, one entry per question:
+[
+  {{"question_id": "question id from above", "answer": "business-friendly answer"}}
+]
+"""
+
+    @staticmethod
+    def _parse_batch_answers(text: str) -> Dict[str, str]:
+        """question_id -> answer from a batched JSON response"""
+        match = re.search(r"\[.*\]", text or "", re.DOTALL)
+        if not match:
+            return {}
+        try:
+            entries = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            return {}
+        return {
+            str(entry["question_id"]): str(entry["answer"])
+            for entry in entries
+            if isinstance(entry, dict) and entry.get("question_id") and entry.get("answer")
+        }
+
     def _calculate_confidence(
         self,
         context: AnswerContext,
@@ -393,7 +536,6 @@ Format as JSON array:
 
             # Parse insights from response
             try:
-                import json
                 insights_data = json.loads(response.content)
                 for insight_data in insights_data:
                     insights.append(Insight(**insight_data))
@@ -0,0 +1,160 @@
+"""
+Semantic Answer Cache
+
+Caches RAG answers per project so re-asking the same or a near-identical
+question on an unchanged evidence store skips retrieval and the LLM call.
+
+Features:
+- Entries keyed by project, evidence-store version and question embedding
+- Hits by cosine similarity above a threshold (exact repeats score 1.0)
+- Entries for older evidence versions are never served and are pruned on
+  the next access, so adding documents or links invalidates a project
+- Per-project entry cap (oldest evicted first) and TTL
+- Hit/miss counters and hit rate for monitoring
+
+Usage:
+    from src.services.semantic_answer_cache import SemanticAnswerCache
+
+    cache = SemanticAnswerCache()
+    cached = cache.lookup(project_id, version, question_embedding, top_k=10)
+    if cached is None:
+        response = ...
+        cache.store(project_id, version, question_embedding, response, top_k=10)
+"""
+
+import copy
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+RAG_ANSWER_CACHE_ENABLED = os.getenv("RAG_ANSWER_CACHE_ENABLED", "true").lower() == "true"
+# Minimum cosine similarity between questions for a cached answer to be reused
+RAG_ANSWER_CACHE_SIMILARITY = float(os.getenv("RAG_ANSWER_CACHE_SIMILARITY", "0.95"))
+RAG_ANSWER_CACHE_MAX_PER_PROJECT = int(os.getenv("RAG_ANSWER_CACHE_MAX_PER_PROJECT", "256"))
+RAG_ANSWER_CACHE_TTL_SECONDS = float(os.getenv("RAG_ANSWER_CACHE_TTL_SECONDS", "3600"))
+
+
+@dataclass
+class _CachedAnswer:
+    version: Hashable
+    top_k: int
+    vector: np.ndarray
+    response: Dict[str, Any]
+    created_at: float
+
+
+class SemanticAnswerCache:
+    """Per-project cache of answers, matched by question embedding"""
+
+    def __init__(
+        self,
+        enabled: bool = RAG_ANSWER_CACHE_ENABLED,
+        similarity_threshold: float = RAG_ANSWER_CACHE_SIMILARITY,
+        max_entries_per_project: int = RAG_ANSWER_CACHE_MAX_PER_PROJECT,
+        ttl_seconds: float = RAG_ANSWER_CACHE_TTL_SECONDS,
+    ):
+        self.enabled = enabled
+        self.similarity_threshold = similarity_threshold
+        self.max_entries_per_project = max_entries_per_project
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, List[_CachedAnswer]] = {}
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "invalidated": 0}
+
+    def lookup(
+        self,
+        project_id: str,
+        version: Hashable,
+        embedding: Any,
+        top_k: int,
+    ) -> Optional[Dict[str, Any]]:
+        """Cached response for the most similar question, if close enough"""
+        if not self.enabled:
+            return None
+        query = _normalize(embedding)
+        candidates = [
+            entry for entry in self._live_entries(project_id, version)
+            if entry.top_k == top_k and entry.vector.shape == query.shape
+        ]
+        if not candidates:
+            self.stats["misses"] += 1
+            return None
+
+        scores = np.stack([entry.vector for entry in candidates]) @ query
+        best = int(np.argmax(scores))
+        if float(scores[best]) < self.similarity_threshold:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        response = copy.deepcopy(candidates[best].response)
+        response["cache"] = {"hit": True, "similarity": round(float(scores[best]), 4)}
+        return response
+
+    def store(
+        self,
+        project_id: str,
+        version: Hashable,
+        embedding: Any,
+        response: Dict[str, Any],
+        top_k: int,
+    ) -> None:
+        if not self.enabled:
+            return
+        entries = self._live_entries(project_id, version)
+        entries.append(_CachedAnswer(
+            version=version,
+            top_k=top_k,
+            vector=_normalize(embedding),
+            response=copy.deepcopy(response),
+            created_at=time.monotonic(),
+        ))
+        if len(entries) > self.max_entries_per_project:
+            del entries[: len(entries) - self.max_entries_per_project]
+        self._entries[project_id] = entries
+        self.stats["stores"] += 1
+
+    def invalidate(self, project_id: Optional[str] = None) -> None:
+        """Drop cached answers for one project (or all projects)"""
+        if project_id is None:
+            dropped = sum(len(entries) for entries in self._entries.values())
+            self._entries.clear()
+        else:
+            dropped = len(self._entries.pop(project_id, []))
+        self.stats["invalidated"] += dropped
+
+    def _live_entries(self, project_id: str, version: Hashable) -> List[_CachedAnswer]:
+        """Entries for the current evidence version that have not expired"""
+        entries = self._entries.get(project_id)
+        if not entries:
+            return []
+        cutoff = time.monotonic() - self.ttl_seconds
+        live = [entry for entry in entries if entry.version == version and entry.created_at >= cutoff]
+        if len(live) != len(entries):
+            self.stats["invalidated"] += len(entries) - len(live)
+            if live:
+                self._entries[project_id] = live
+            else:
+                del self._entries[project_id]
+        return live
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "enabled": self.enabled,
+            "projects": len(self._entries),
+            "entries": sum(len(entries) for entries in self._entries.values()),
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+            **self.stats,
+        }
+
+
+def _normalize(vector: Any) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32).ravel()
+    norm = float(np.linalg.norm(array))
+    return array / norm if norm > 0 else array
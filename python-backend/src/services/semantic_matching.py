@@ -10,7 +10,10 @@ Provides RAG-based semantic matching for:
 Uses vector embeddings and cosine similarity for semantic understanding.
 """
 
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Set, Tuple
+from collections import OrderedDict
+import asyncio
+import hashlib
 import logging
 from dataclasses import dataclass
 
@@ -24,6 +27,7 @@ from ..models.schemas import (
     AnalysisType, VectorDocument, VectorSearchQuery, VectorSearchResult
 )
 from .llm_providers import get_embedding_provider, LLMProvider
+from .persistent_vector_store import get_vector_store
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -54,6 +58,17 @@ class SemanticConfig:
     TOP_K_RESULTS = 10
     MIN_RESULTS = 3
 
+    # Embedding pipeline settings
+    EMBEDDING_BATCH_SIZE = 64  # texts per aembed_documents call
+    EMBEDDING_BATCH_CONCURRENCY = 4  # batches in flight
+    EMBEDDING_CACHE_SIZE = 4096  # in-process content-hash -> vector entries
+    MAPPING_FALLBACK_CONCURRENCY = 8  # concurrent column_embeddings searches
+
+
+def column_collection(dataset_id: str) -> str:
+    """Vector store collection holding a dataset's column embeddings"""
+    return f"columns_{dataset_id}"
+
 
 # ============================================================================
 # Embedding Providers
@@ -104,17 +119,116 @@ class ColumnEmbeddingGenerator:
     """
     Generates and stores embeddings for dataset columns
 
-    Enables RAG-based matching of questions to columns
+    Enables RAG-based matching of questions to columns. Column texts are
+    embedded in batches, and vectors are reused by content hash (text +
+    model) from an in-process cache and the column_embeddings table, so an
+    unchanged schema is never re-embedded.
     """
 
-    def __init__(self, embedding_model=None):
+    def __init__(self, embedding_model=None, repository=None):
         """Initialize with embedding model"""
         self.embedding_model = embedding_model or EmbeddingProvider.create()
+        self._repository = repository
+        self._vector_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self.stats = {"embedded": 0, "embedding_calls": 0, "memory_hits": 0, "persisted_hits": 0}
+
+    @property
+    def repository(self):
+        if self._repository is None:
+            from ..repositories.column_embedding_repository import get_column_embedding_repository
+            self._repository = get_column_embedding_repository()
+        return self._repository
+
+    @property
+    def model_name(self) -> str:
+        """Name of the embedding model (part of every content hash)"""
+        return str(
+            getattr(self.embedding_model, "model", None)
+            or getattr(self.embedding_model, "model_name", None)
+            or SemanticConfig.EMBEDDING_MODEL
+        )
+
+    def content_hash(self, text: str) -> str:
+        """Hash identifying a vector: same text and model, same embedding"""
+        return hashlib.sha256(f"{self.model_name}\x00{text}".encode("utf-8")).hexdigest()
+
+    def _remember(self, content_hash: str, vector: List[float]) -> None:
+        self._vector_cache[content_hash] = vector
+        self._vector_cache.move_to_end(content_hash)
+        while len(self._vector_cache) > SemanticConfig.EMBEDDING_CACHE_SIZE:
+            self._vector_cache.popitem(last=False)
+
+    async def embed_texts(
+        self,
+        texts: List[str],
+        dataset_id: Optional[str] = None
+    ) -> Tuple[List[List[float]], Set[str]]:
+        """
+        Embed texts, reusing cached vectors and batching the rest
+
+        Args:
+            texts: Texts to embed
+            dataset_id: Dataset whose persisted rows are checked first
+
+        Returns:
+            (vectors in input order, hashes not yet persisted for dataset_id)
+        """
+        hashes = [self.content_hash(text) for text in texts]
+        vectors: Dict[str, List[float]] = {}
+        persisted_for_dataset: Set[str] = set()
+
+        for content_hash in hashes:
+            cached = self._vector_cache.get(content_hash)
+            if cached is not None:
+                vectors[content_hash] = cached
+                self.stats["memory_hits"] += 1
+
+        lookup = list({h for h in hashes if h not in vectors} | (set(hashes) if dataset_id else set()))
+        if lookup:
+            try:
+                found = await self.repository.find_by_content_hashes(self.model_name, lookup, dataset_id)
+            except Exception as e:
+                logger.debug(f"Embedding cache lookup unavailable: {e}")
+                found = {}
+            for content_hash, entry in found.items():
+                if entry.get("own"):
+                    persisted_for_dataset.add(content_hash)
+                if content_hash not in vectors:
+                    vectors[content_hash] = entry["embedding"]
+                    self._remember(content_hash, entry["embedding"])
+                    self.stats["persisted_hits"] += 1
+
+        pending: Dict[str, str] = {}
+        for content_hash, text in zip(hashes, texts):
+            if content_hash not in vectors:
+                pending.setdefault(content_hash, text)
+
+        if pending:
+            items = list(pending.items())
+            batch_size = SemanticConfig.EMBEDDING_BATCH_SIZE
+            batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+            semaphore = asyncio.Semaphore(SemanticConfig.EMBEDDING_BATCH_CONCURRENCY)
+
+            async def embed_batch(batch: List[Tuple[str, str]]) -> List[List[float]]:
+                async with semaphore:
+                    self.stats["embedding_calls"] += 1
+                    return await self.embedding_model.aembed_documents([text for _, text in batch])
+
+            results = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+            for batch, batch_vectors in zip(batches, results):
+                for (content_hash, _), vector in zip(batch, batch_vectors):
+                    vectors[content_hash] = vector
+                    self._remember(content_hash, vector)
+            self.stats["embedded"] += len(items)
+
+        unpersisted = {h for h in hashes if h not in persisted_for_dataset}
+        return [vectors[h] for h in hashes], unpersisted
 
     async def generate_column_embeddings(
         self,
         dataset_id: str,
-        columns: List[ColumnDefinition]
+        columns: List[ColumnDefinition],
+        project_id: Optional[str] = None
     ) -> List[VectorDocument]:
         """
         Generate embeddings for all columns in a dataset
@@ -122,20 +236,19 @@ class ColumnEmbeddingGenerator:
         Args:
             dataset_id: ID of the dataset
             columns: List of column definitions
+            project_id: Owning project, recorded with persisted embeddings
 
         Returns:
             List of vector documents with embeddings
         """
-        documents = []
-
-        for column in columns:
-            # Create a rich text representation of the column
-            column_text = self._create_column_text(column)
+        # Create a rich text representation of each column
+        column_texts = [self._create_column_text(column) for column in columns]
+        embeddings, unpersisted = await self.embed_texts(column_texts, dataset_id)
 
-            # Generate embedding
-            embedding = await self.embedding_model.aembed_query(column_text)
-
-            # Create vector document
+        documents = []
+        to_persist = []
+        for column, column_text, embedding in zip(columns, column_texts, embeddings):
+            content_hash = self.content_hash(column_text)
             doc = VectorDocument(
                 id=f"{dataset_id}_{column.name}",
                 content=column_text,
@@ -146,15 +259,33 @@ class ColumnEmbeddingGenerator:
                     "column_type": column.type.value,
                     "description": column.description or "",
                     "sample_values": column.sample_values,
-                    "pii_sensitivity": column.pii_sensitivity.value
+                    "pii_sensitivity": column.pii_sensitivity.value,
+                    "content_hash": content_hash
                 },
-                project_id=dataset_id,
+                project_id=project_id or dataset_id,
                 document_type="column"
             )
-
             documents.append(doc)
-            logger.info(f"Generated embedding for column: {column.name}")
+            if content_hash in unpersisted:
+                to_persist.append({
+                    "column_name": column.name,
+                    "embedding": embedding,
+                    "content_hash": content_hash,
+                    "column_type": column.type.value
+                })
+
+        if to_persist:
+            try:
+                await self.repository.replace_dataset_embeddings(
+                    dataset_id, project_id or dataset_id, self.model_name, to_persist
+                )
+            except Exception as e:
+                logger.warning(f"Could not persist column embeddings for {dataset_id}: {e}")
 
+        logger.info(
+            f"Prepared {len(documents)} column embeddings for dataset {dataset_id} "
+            f"({self.stats['embedded']} embedded in {self.stats['embedding_calls']} calls so far)"
+        )
         return documents
 
     def _create_column_text(self, column: ColumnDefinition) -> str:
@@ -191,31 +322,55 @@ class ColumnEmbeddingGenerator:
             documents: List of vector documents
             vector_store: Optional pre-existing vector store
         """
-        langchain_docs = [
-            Document(
-                page_content=doc.content,
-                metadata=doc.metadata
-            )
-            for doc in documents
-        ]
+        missing = [doc for doc in documents if doc.embedding is None]
+        if missing:
+            vectors, _ = await self.embed_texts([doc.content for doc in missing])
+            for doc, vector in zip(missing, vectors):
+                doc.embedding = vector
+
+        # Persist the dataset's matrix first: this is what SemanticMatcher
+        # searches, and it survives restarts and is shared across workers
+        await asyncio.to_thread(
+            get_vector_store().upsert,
+            column_collection(dataset_id),
+            [doc.id for doc in documents],
+            [doc.embedding for doc in documents],
+            [{**doc.metadata, "content": doc.content} for doc in documents],
+        )
 
-        if vector_store is None:
-            # Create new vector store
-            if SemanticConfig.USE_PGVECTOR:
-                vector_store = PGVector.from_documents(
-                    documents=langchain_docs,
-                    embedding=self.embedding_model,
-                    collection_name=f"columns_{dataset_id}"
-                )
+        # Build from the precomputed vectors; the store must not re-embed
+        text_embeddings = [(doc.content, doc.embedding) for doc in documents]
+        metadatas = [doc.metadata for doc in documents]
+
+        try:
+            if vector_store is None:
+                # Create new vector store
+                if SemanticConfig.USE_PGVECTOR:
+                    vector_store = PGVector.from_embeddings(
+                        text_embeddings=text_embeddings,
+                        embedding=self.embedding_model,
+                        metadatas=metadatas,
+                        collection_name=column_collection(dataset_id)
+                    )
+                else:
+                    # Use local FAISS store
+                    vector_store = FAISS.from_embeddings(
+                        text_embeddings=text_embeddings,
+                        embedding=self.embedding_model,
+                        metadatas=metadatas
+                    )
             else:
-                # Use local FAISS store
-                vector_store = FAISS.from_documents(
-                    documents=langchain_docs,
-                    embedding=self.embedding_model
-                )
-        else:
-            # Add to existing store
-            vector_store.add_documents(langchain_docs)
+                # Add to existing store
+                if isinstance(vector_store, FAISS):
+                    vector_store.add_embeddings(text_embeddings, metadatas=metadatas)
+                else:
+                    vector_store.add_embeddings(
+                        texts=[text for text, _ in text_embeddings],
+                        embeddings=[vector for _, vector in text_embeddings],
+                        metadatas=metadatas
+                    )
+        except Exception as e:
+            logger.warning(f"LangChain vector store unavailable for dataset {dataset_id}: {e}")
 
         logger.info(f"Stored {len(documents)} column embeddings for dataset {dataset_id}")
         return vector_store
@@ -447,7 +602,8 @@ class SemanticMatcher:
         self.embedding_model = embedding_model or EmbeddingProvider.create()
         self.column_generator = ColumnEmbeddingGenerator(embedding_model)
         self.question_analyzer = QuestionAnalyzer()
-        self.vector_stores: Dict[str, Any] = {}
+        # Disk-backed column matrices, one collection per dataset
+        self.vector_stores = get_vector_store()
 
     async def get_question_element_mappings(
         self,
@@ -459,6 +615,9 @@ class SemanticMatcher:
         """
         Get semantic mappings between questions and data elements
 
+        All questions are embedded in one call and scored against each
+        dataset's column matrix together.
+
         Args:
             questions: List of user questions
             datasets: List of dataset IDs
@@ -466,20 +625,18 @@ class SemanticMatcher:
             top_k: Number of top results to return
 
         Returns:
-            List of QuestionElementMapping
+            List of QuestionElementMapping, in question order
         """
-        mappings = []
-
-        for question in questions:
-            mapping = await self._map_question_to_elements(
-                question=question,
-                datasets=datasets,
-                user_goals=user_goals,
-                top_k=top_k
-            )
-            mappings.append(mapping)
+        if not questions:
+            return []
+
+        embeddings = await self._embed_questions(questions)
+        matches = await self._search_columns(embeddings, datasets, top_k)
 
-        return mappings
+        return [
+            self._build_mapping(question, embedding, question_matches, user_goals, top_k)
+            for question, embedding, question_matches in zip(questions, embeddings, matches)
+        ]
 
     async def _map_question_to_elements(
         self,
@@ -489,28 +646,86 @@ class SemanticMatcher:
         top_k: int
     ) -> QuestionElementMapping:
         """Map a single question to relevant data elements"""
+        mappings = await self.get_question_element_mappings([question], datasets, user_goals, top_k)
+        return mappings[0]
 
-        # Analyze the question
-        analysis = self.question_analyzer.analyze_question(question)
+    async def _embed_questions(self, questions: List[str]) -> List[List[float]]:
+        """
+        Embed questions concurrently (duplicates embedded once)
 
-        # Generate question embedding
-        question_embedding = await self.embedding_model.aembed_query(question)
+        Questions are queries, so they go through aembed_query: models with
+        asymmetric query/document embeddings must not embed them as columns.
+        """
+        unique = list(dict.fromkeys(questions))
+        vectors = await asyncio.gather(*(self.embedding_model.aembed_query(question) for question in unique))
+        by_question = dict(zip(unique, vectors))
+        return [by_question[question] for question in questions]
 
-        # Search for similar columns across all datasets
-        all_matches = []
-        for dataset_id in datasets:
-            vector_store = self.vector_stores.get(dataset_id)
-            if vector_store is None:
-                logger.warning(f"No vector store found for dataset {dataset_id}")
-                continue
+    async def _search_columns(
+        self,
+        embeddings: List[List[float]],
+        datasets: List[str],
+        top_k: int
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Find the best-matching columns for each question embedding
+
+        Returns:
+            Per question, (column_name, similarity) pairs across all datasets
+        """
+        # One matrix product per persisted dataset scores every question
+        collections = [column_collection(dataset_id) for dataset_id in datasets]
+        hit_lists = await asyncio.to_thread(
+            self.vector_stores.search_many,
+            collections,
+            embeddings,
+            top_k,
+            SemanticConfig.SIMILARITY_THRESHOLD,
+        )
+        matches = [[(hit.payload.get("column_name", ""), hit.score) for hit in hits] for hits in hit_lists]
+
+        # Datasets embedded on another host (or before the store existed)
+        # fall back to the column_embeddings table
+        missing = [
+            dataset_id for dataset_id, collection in zip(datasets, collections)
+            if not self.vector_stores.exists(collection)
+        ]
+        if missing:
+            semaphore = asyncio.Semaphore(SemanticConfig.MAPPING_FALLBACK_CONCURRENCY)
+
+            # One batched search per dataset scores every question
+            async def search_dataset(dataset_id: str) -> None:
+                async with semaphore:
+                    try:
+                        row_lists = await self.column_generator.repository.search_similar_columns_many(
+                            embeddings, dataset_id=dataset_id, limit=top_k
+                        )
+                    except Exception as e:
+                        logger.warning(f"No column vectors available for dataset {dataset_id}: {e}")
+                        return
+                for question_matches, rows in zip(matches, row_lists):
+                    question_matches.extend((row["column_name"], row["similarity"]) for row in rows)
+
+            await asyncio.gather(*(search_dataset(dataset_id) for dataset_id in missing))
+
+        return matches
+
+    def _build_mapping(
+        self,
+        question: str,
+        question_embedding: List[float],
+        matches: List[Tuple[str, float]],
+        user_goals: List[str],
+        top_k: int
+    ) -> QuestionElementMapping:
+        """Merge a question's matches into its mapping"""
 
-            # Perform similarity search
-            results = await vector_store.asimilarity_search_with_score(question, k=top_k)
-            all_matches.extend(results)
+        # Analyze the question
+        analysis = self.question_analyzer.analyze_question(question)
 
         # Filter by similarity threshold
         filtered_matches = [
-            (doc, score) for doc, score in all_matches
+            (column_name, score) for column_name, score in matches
             if score >= SemanticConfig.SIMILARITY_THRESHOLD
         ]
 
@@ -522,13 +737,12 @@ class SemanticMatcher:
         related_columns = []
         relevance_scores = []
 
-        for doc, score in filtered_matches[:top_k]:
-            related_elements.append(doc.metadata.get("column_name", ""))
-            related_columns.append(doc.metadata.get("column_name", ""))
+        for column_name, score in filtered_matches[:top_k]:
+            related_elements.append(column_name)
+            related_columns.append(column_name)
             relevance_scores.append(score)
 
         # Create stable question ID
-        import hashlib
         question_id = hashlib.sha256(question.encode()).hexdigest()[:16]
 
         # Create mapping
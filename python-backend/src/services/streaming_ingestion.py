@@ -0,0 +1,462 @@
+"""
+Streaming Dataset Ingestion
+
+Reads uploaded files and connector cursors in bounded chunks and writes
+each chunk straight into the columnar dataset store, so ingestion memory
+is bounded by the chunk size rather than by the dataset size.
+
+Features:
+- Incremental CSV / JSON (array or NDJSON) / XLSX record readers
+- Chunked writes through DatasetStore.open_writer (no row cap)
+- Preview window and schema sample captured from the head of the stream
+- Per-column statistics (nulls, numeric min/max/mean) computed per chunk
+
+Usage:
+    headers, records = iter_csv_records(stream)
+    ingestor = StreamingIngestor(dataset_id, columns=headers)
+    result = ingestor.consume(records)
+"""
+
+from typing import Dict, List, Optional, Any, BinaryIO, Iterable, Iterator, Tuple
+import codecs
+import csv
+import io
+import json
+import logging
+import math
+from dataclasses import dataclass, field
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from ..constants import (
+    DATASET_INGEST_CHUNK_ROWS,
+    DATASET_MINI_PREVIEW_ROWS,
+    DATASET_SCHEMA_SAMPLE_ROWS,
+)
+from .dataset_store import DatasetPointer, DatasetStore, get_dataset_store
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+# Bytes read per step by the incremental text readers
+STREAM_READ_SIZE = 64 * 1024
+
+# Keys that commonly wrap the record array in a JSON document
+JSON_WRAPPER_KEYS = ("data", "rows", "records", "items", "results")
+
+
+# ============================================================================
+# Data Classes
+# ============================================================================
+
+@dataclass
+class ColumnStats:
+    """Running statistics for one column"""
+    null_count: int = 0
+    non_null_count: int = 0
+    numeric_count: int = 0
+    min: Optional[float] = None
+    max: Optional[float] = None
+    total: float = 0.0
+
+    def merge_numeric(self, count: int, minimum: float, maximum: float, total: float) -> None:
+        """Fold the numeric summary of one chunk into the running totals"""
+        if count == 0:
+            return
+        self.numeric_count += count
+        self.min = minimum if self.min is None else min(self.min, minimum)
+        self.max = maximum if self.max is None else max(self.max, maximum)
+        self.total += total
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for storage in `ingestion_metadata.columnStats`"""
+        return {
+            "nullCount": self.null_count,
+            "nonNullCount": self.non_null_count,
+            "numericCount": self.numeric_count,
+            "min": _finite_or_none(self.min),
+            "max": _finite_or_none(self.max),
+            "mean": _finite_or_none(self.total / self.numeric_count) if self.numeric_count else None,
+        }
+
+
+def _finite_or_none(value: Optional[float]) -> Optional[float]:
+    """JSONB rejects NaN/Infinity, so non-finite statistics are stored as null"""
+    if value is None or not math.isfinite(value):
+        return None
+    return value
+
+
+@dataclass
+class StreamingIngestionResult:
+    """Outcome of a streaming ingestion run"""
+    dataset_id: str
+    columns: List[str]
+    row_count: int
+    pointer: DatasetPointer
+    preview: List[Dict[str, Any]] = field(default_factory=list)
+    sample_rows: List[Dict[str, Any]] = field(default_factory=list)
+    column_stats: Dict[str, ColumnStats] = field(default_factory=dict)
+    type_conflicts: Dict[str, int] = field(default_factory=dict)
+    dropped_columns: Dict[str, int] = field(default_factory=dict)
+    promoted_columns: Dict[str, str] = field(default_factory=dict)
+
+    def stats_metadata(self) -> Dict[str, Any]:
+        """Serialize the statistics for `ingestion_metadata`"""
+        metadata: Dict[str, Any] = {
+            "rowCount": self.row_count,
+            "columnStats": {name: stats.to_dict() for name, stats in self.column_stats.items()},
+        }
+        if self.type_conflicts:
+            metadata["typeConflicts"] = dict(self.type_conflicts)
+        if self.promoted_columns:
+            metadata["promotedColumns"] = dict(self.promoted_columns)
+        if self.dropped_columns:
+            metadata["droppedColumns"] = dict(self.dropped_columns)
+        return metadata
+
+
+# ============================================================================
+# Streaming Ingestor
+# ============================================================================
+
+class StreamingIngestor:
+    """
+    Buffers rows into fixed-size chunks and appends them to the dataset store.
+
+    Only one chunk, the preview window and the schema sample are ever held
+    in memory. Statistics are updated from the Arrow table of each chunk as
+    it is written.
+    """
+
+    def __init__(
+        self,
+        dataset_id: str,
+        columns: Optional[List[str]] = None,
+        store: Optional[DatasetStore] = None,
+        chunk_rows: int = DATASET_INGEST_CHUNK_ROWS,
+        preview_rows: int = DATASET_MINI_PREVIEW_ROWS,
+        sample_rows: int = DATASET_SCHEMA_SAMPLE_ROWS,
+    ):
+        """Initialize an ingestor that writes to `store` (default: shared store)"""
+        self.dataset_id = str(dataset_id)
+        self.store = store or get_dataset_store()
+        self.chunk_rows = max(1, int(chunk_rows))
+        self.preview_rows = preview_rows
+        self.sample_rows = sample_rows
+
+        self._writer = self.store.open_writer(self.dataset_id, columns)
+        self._buffer: List[Dict[str, Any]] = []
+        self._preview: List[Dict[str, Any]] = []
+        self._sample: List[Dict[str, Any]] = []
+        self._stats: Dict[str, ColumnStats] = {}
+        self._rows_seen = 0
+
+    @property
+    def rows_seen(self) -> int:
+        """Rows accepted so far (written or buffered)"""
+        return self._rows_seen
+
+    def add_row(self, row: Dict[str, Any]) -> None:
+        """Accept one row; flushes a chunk to the store when the buffer is full"""
+        if self._rows_seen < self.sample_rows:
+            self._sample.append(row)
+        if self._rows_seen < self.preview_rows:
+            self._preview.append(row)
+        self._rows_seen += 1
+
+        self._buffer.append(row)
+        if len(self._buffer) >= self.chunk_rows:
+            self.flush()
+
+    def add_rows(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Accept a batch of rows"""
+        for row in rows:
+            self.add_row(row)
+
+    def flush(self) -> None:
+        """Write the buffered rows to the store"""
+        if not self._buffer:
+            return
+        table = self._writer.write_rows(self._buffer)
+        self._buffer = []
+        if table is not None:
+            self._update_stats(table)
+
+    def finish(self) -> StreamingIngestionResult:
+        """Flush remaining rows, finalize the file and return the result"""
+        self.flush()
+        pointer = self._writer.close()
+
+        if self._writer.type_conflicts:
+            logger.warning(
+                f"Dataset {self.dataset_id}: values that could not be cast were nulled: "
+                f"{self._writer.type_conflicts}"
+            )
+        if self._writer.dropped_columns:
+            logger.warning(
+                f"Dataset {self.dataset_id}: keys outside the column set were dropped: "
+                f"{sorted(self._writer.dropped_columns)}"
+            )
+
+        return StreamingIngestionResult(
+            dataset_id=self.dataset_id,
+            columns=list(pointer.columns),
+            row_count=pointer.row_count,
+            pointer=pointer,
+            preview=self._preview,
+            sample_rows=self._sample,
+            column_stats={col: self._stats.get(col, ColumnStats()) for col in pointer.columns},
+            type_conflicts=dict(self._writer.type_conflicts),
+            dropped_columns=dict(self._writer.dropped_columns),
+            promoted_columns=dict(self._writer.promoted_columns),
+        )
+
+    def abort(self) -> None:
+        """Discard the partially written dataset"""
+        self._buffer = []
+        self._writer.abort()
+
+    def consume(self, rows: Iterable[Dict[str, Any]]) -> StreamingIngestionResult:
+        """
+        Ingest an entire row iterator.
+
+        Any exception (including parse errors raised lazily by the reader)
+        aborts the write and is re-raised.
+        """
+        try:
+            self.add_rows(rows)
+            return self.finish()
+        except BaseException:
+            self.abort()
+            raise
+
+    def _update_stats(self, table: pa.Table) -> None:
+        for name, column in zip(table.column_names, table.columns):
+            stats = self._stats.setdefault(name, ColumnStats())
+            nulls = column.null_count
+            stats.null_count += nulls
+            stats.non_null_count += len(column) - nulls
+
+            if pa.types.is_integer(column.type) or pa.types.is_floating(column.type):
+                if len(column) - nulls == 0:
+                    continue
+                bounds = pc.min_max(column)
+                stats.merge_numeric(
+                    len(column) - nulls,
+                    float(bounds["min"].as_py()),
+                    float(bounds["max"].as_py()),
+                    float(pc.sum(column).as_py()),
+                )
+            elif pa.types.is_string(column.type):
+                numeric = pd.to_numeric(column.to_pandas(), errors="coerce").dropna()
+                if not numeric.empty:
+                    stats.merge_numeric(
+                        int(numeric.size),
+                        float(numeric.min()),
+                        float(numeric.max()),
+                        float(numeric.sum()),
+                    )
+
+
+# ============================================================================
+# Incremental Record Readers
+# ============================================================================
+
+def _is_utf8(stream: BinaryIO) -> bool:
+    """Validate the whole stream as UTF-8 block by block, then rewind it"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    try:
+        while True:
+            block = stream.read(STREAM_READ_SIZE)
+            if not block:
+                decoder.decode(b"", final=True)
+                return True
+            decoder.decode(block, final=False)
+    except UnicodeDecodeError:
+        return False
+    finally:
+        stream.seek(0)
+
+
+def _open_text(stream: BinaryIO) -> io.TextIOWrapper:
+    """
+    Wrap a binary stream for incremental decoding.
+
+    Like the whole-file decode it replaces, the stream is read as UTF-8
+    (optional BOM) only if every byte is valid UTF-8, otherwise as Latin-1.
+    The check is a separate pass over the stream in fixed-size blocks, so no
+    byte is ever silently replaced; decoding itself is strict.
+    """
+    encoding = "utf-8-sig" if _is_utf8(stream) else "latin-1"
+    if encoding == "latin-1":
+        logger.info("Input is not valid UTF-8, decoding as Latin-1")
+    return io.TextIOWrapper(stream, encoding=encoding, errors="strict", newline="")
+
+
+def iter_csv_records(stream: BinaryIO) -> Tuple[List[str], Iterator[Dict[str, Any]]]:
+    """
+    Read CSV records incrementally.
+
+    Returns:
+        (headers, record iterator). Empty cells become None.
+    """
+    reader = csv.DictReader(_open_text(stream))
+    headers = list(reader.fieldnames or [])
+
+    def _records() -> Iterator[Dict[str, Any]]:
+        for row in reader:
+            yield {
+                k: (None if v is None or v.strip() == "" else v)
+                for k, v in row.items()
+                if k is not None  # overflow cells on ragged rows
+            }
+
+    return headers, _records()
+
+
+def _iter_json_values(
+    text: io.TextIOBase,
+    buffer: str,
+    pos: int,
+    terminator: Optional[str],
+) -> Iterator[Any]:
+    """
+    Decode consecutive JSON values from a text stream.
+
+    Values may be separated by commas and/or whitespace. Stops at
+    `terminator` (e.g. "]" for an array body) or at end of stream when
+    `terminator` is None (NDJSON).
+    """
+    decoder = json.JSONDecoder()
+    eof = False
+
+    while True:
+        # Skip separators, refilling the buffer as needed
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            more = text.read(STREAM_READ_SIZE)
+            if not more:
+                eof = True
+            buffer, pos = buffer[pos:] + more, 0
+
+        if pos >= len(buffer):
+            if terminator is not None:
+                raise ValueError("Unexpected end of JSON input")
+            return
+        if terminator is not None and buffer[pos] == terminator:
+            return
+
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+            # A value that ends exactly at the buffer edge may be truncated (e.g. a number)
+            complete = end < len(buffer) or eof
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            complete = False
+
+        if not complete:
+            more = text.read(STREAM_READ_SIZE)
+            if not more:
+                eof = True
+            buffer, pos = buffer[pos:] + more, 0
+            continue
+
+        yield value
+        pos = end
+
+
+def iter_json_records(stream: BinaryIO) -> Tuple[List[str], Iterator[Dict[str, Any]]]:
+    """
+    Read JSON records incrementally.
+
+    Supports a top-level array of objects and newline-delimited JSON, both
+    streamed. A single wrapping object such as {"data": [...]} is decoded
+    in full. Non-object items are skipped.
+
+    Returns:
+        (headers from the first record, record iterator)
+    """
+    text = _open_text(stream)
+    buffer = text.read(STREAM_READ_SIZE)
+    pos = 0
+    while pos < len(buffer) and buffer[pos].isspace():
+        pos += 1
+    if pos >= len(buffer):
+        return [], iter(())
+
+    if buffer[pos] == "[":
+        values: Iterator[Any] = _iter_json_values(text, buffer, pos + 1, "]")
+    elif buffer[pos] == "{":
+        values = _iter_json_values(text, buffer, pos, None)
+        first = next(values, None)
+        second = next(values, None)
+        if second is None:
+            # Single document: unwrap a record array if present
+            document = first
+            for key in JSON_WRAPPER_KEYS:
+                if key in document and isinstance(document[key], list):
+                    document = document[key]
+                    break
+            values = iter(document if isinstance(document, list) else [document])
+        else:
+            values = _chain([first, second], values)
+    else:
+        raise ValueError("JSON file must contain an array of objects")
+
+    records = (value for value in values if isinstance(value, dict))
+    first_record = next(records, None)
+    if first_record is None:
+        return [], iter(())
+    return list(first_record.keys()), _chain([first_record], records)
+
+
+def iter_excel_records(stream: BinaryIO) -> Tuple[List[str], Iterator[Dict[str, Any]]]:
+    """
+    Read the active worksheet of an XLSX workbook row by row (openpyxl read-only mode).
+
+    Returns:
+        (headers, record iterator). The workbook is closed when the iterator is exhausted.
+    """
+    import openpyxl
+
+    wb = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+    ws = wb.active
+    if ws is None:
+        wb.close()
+        raise ValueError("Excel file has no active sheet")
+
+    row_iter = ws.iter_rows(values_only=True)
+    header_row = next(row_iter, None)
+    if header_row is None:
+        wb.close()
+        return [], iter(())
+
+    headers = [str(h) if h is not None else f"column_{i}" for i, h in enumerate(header_row)]
+
+    def _records() -> Iterator[Dict[str, Any]]:
+        try:
+            for row in row_iter:
+                yield {
+                    (headers[j] if j < len(headers) else f"column_{j}"): val
+                    for j, val in enumerate(row)
+                }
+        finally:
+            wb.close()
+
+    return headers, _records()
+
+
+def _chain(head: List[Any], tail: Iterator[Any]) -> Iterator[Any]:
+    yield from head
+    yield from tail
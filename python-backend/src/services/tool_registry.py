@@ -295,6 +295,7 @@ async def execute_transformations(
             "transformation_plan": result.get("transformation_plan"),
             "steps_executed": result.get("steps_executed", []),
             "transformed_data": result.get("transformed_data"),
+            "transformed_dataset_id": result.get("transformed_dataset_id"),
             "row_count": result.get("row_count", 0),
             "column_count": result.get("column_count", 0)
         }
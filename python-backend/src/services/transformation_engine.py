@@ -11,6 +11,7 @@ Features:
 """
 
 from typing import Dict, List, Optional, Any, Tuple, Set
+import asyncio
 import logging
 import hashlib
 import json
@@ -20,7 +21,6 @@ from datetime import datetime
 # Pandas for data transformations
 import pandas as pd
 import numpy as np
-from sqlalchemy import text as sa_text
 
 # Local imports
 from ..models.schemas import (
@@ -28,7 +28,9 @@ from ..models.schemas import (
     TransformationOperation, AggregationMethod, JoinType,
     ColumnDefinition, BusinessDefinition
 )
-from ..db import get_db_context
+from ..constants import DATASET_PREVIEW_ROWS
+from .dataset_store import COLUMNAR_POINTER_KEY, get_dataset_store
+from .dataset_loader import load_primary_dataset
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -364,6 +366,27 @@ class TransformationExecutor:
         Returns:
             TransformationResult with outcome
         """
+        result, final_df = self.execute_plan_frame(plan, datasets, business_context)
+        if final_df is not None:
+            result.transformed_data = self._dataframe_to_dict(final_df)
+        return result
+
+    def execute_plan_frame(
+        self,
+        plan: TransformationPlan,
+        datasets: Dict[str, pd.DataFrame],
+        business_context: Optional[Dict[str, Any]] = None
+    ) -> Tuple[TransformationResult, Optional[pd.DataFrame]]:
+        """
+        Execute a transformation plan and return the transformed DataFrame
+
+        Same as execute_plan, but the result's transformed_data is left
+        empty so callers can persist the frame without converting every
+        row to Python dicts.
+
+        Returns:
+            (TransformationResult, transformed DataFrame or None on failure)
+        """
         try:
             # Validate dependencies
             is_valid, errors = DependencyResolver.validate_dependencies(plan.steps)
@@ -375,7 +398,7 @@ class TransformationExecutor:
                     row_count=0,
                     column_count=0,
                     error=f"Dependency validation failed: {'; '.join(errors)}"
-                )
+                ), None
 
             # Resolve execution order
             ordered_steps = DependencyResolver.resolve_dependencies(plan.steps)
@@ -412,11 +435,11 @@ class TransformationExecutor:
             return TransformationResult(
                 success=True,
                 steps_executed=executed_steps,
-                transformed_data=self._dataframe_to_dict(final_df),
+                transformed_data={},
                 row_count=len(final_df) if final_df is not None else 0,
                 column_count=len(final_df.columns) if final_df is not None else 0,
                 warnings=warnings
-            )
+            ), final_df
 
         except Exception as e:
             logger.error(f"Error executing transformation plan: {e}", exc_info=True)
@@ -427,7 +450,7 @@ class TransformationExecutor:
                 row_count=0,
                 column_count=0,
                 error=str(e)
-            )
+            ), None
 
     def execute_step(
         self,
@@ -814,11 +837,12 @@ class TransformationExecutor:
 
         return df
 
-    def _dataframe_to_dict(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Convert DataFrame to dictionary for storage"""
+    def _dataframe_to_dict(self, df: pd.DataFrame, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Convert DataFrame (or its first `limit` rows) to dictionary for storage"""
+        rows = df.head(limit) if limit is not None else df
         return {
             "columns": df.columns.tolist(),
-            "data": df.to_dict(orient="records"),
+            "data": rows.to_dict(orient="records"),
             "dtypes": {col: str(dtype) for col, dtype in df.dtypes.items()}
         }
 
@@ -827,6 +851,15 @@ class TransformationExecutor:
 # Main Transformation Engine
 # ============================================================================
 
+# Suffix of the store entry holding a dataset's transformed rows
+TRANSFORMED_DATASET_SUFFIX = "__transformed"
+
+
+def transformed_dataset_id_for(dataset_id: str) -> str:
+    """Columnar store ID of the transformed copy of a dataset"""
+    return f"{dataset_id}{TRANSFORMED_DATASET_SUFFIX}"
+
+
 async def compile_and_execute_transformation_plan(
     project_id: str,
     datasets: List[str],
@@ -855,16 +888,8 @@ async def compile_and_execute_transformation_plan(
                 return value
         return value
 
-    def _extract_rows(dataset_row: Dict[str, Any]) -> List[Dict[str, Any]]:
-        metadata = _coerce_json(dataset_row.get("metadata")) or {}
-        ingestion = _coerce_json(dataset_row.get("ingestion_metadata")) or {}
-        candidates = [
-            ingestion.get("transformedData") if isinstance(ingestion, dict) else None,
-            metadata.get("transformedData") if isinstance(metadata, dict) else None,
-            _coerce_json(dataset_row.get("data")),
-            _coerce_json(dataset_row.get("preview")),
-        ]
-        for candidate in candidates:
+    def _extract_rows(*payloads: Any) -> List[Dict[str, Any]]:
+        for candidate in payloads:
             payload = _coerce_json(candidate)
             if isinstance(payload, dict):
                 for key in ("data", "rows", "records"):
@@ -978,65 +1003,43 @@ async def compile_and_execute_transformation_plan(
     try:
         normalized_dataset_ids = [str(dataset_id) for dataset_id in (datasets or []) if str(dataset_id).strip()]
 
-        async with get_db_context() as session:
-            column_result = await session.execute(
-                sa_text(
-                    "SELECT column_name FROM information_schema.columns "
-                    "WHERE table_name = 'datasets'"
-                )
-            )
-            dataset_columns = {row[0] for row in column_result.fetchall()}
-
-            selectable_columns = ["id", "project_id"]
-            for candidate in ("ingestion_metadata", "metadata", "data", "preview"):
-                if candidate in dataset_columns:
-                    selectable_columns.append(candidate)
-
-            if not selectable_columns:
-                raise ValueError("datasets table schema unavailable")
-
-            where_parts = ["d.project_id = :project_id"]
-            params: Dict[str, Any] = {"project_id": project_id}
-            if normalized_dataset_ids:
-                placeholders: List[str] = []
-                for index, dataset_id in enumerate(normalized_dataset_ids):
-                    key = f"dataset_id_{index}"
-                    params[key] = dataset_id
-                    placeholders.append(f":{key}")
-                where_parts.append(f"d.id IN ({', '.join(placeholders)})")
-
-            select_clause = ", ".join([f'd.\"{col}\"' for col in selectable_columns])
-            dataset_query = (
-                f"SELECT {select_clause} FROM datasets d "
-                f"WHERE {' AND '.join(where_parts)} "
-                f"ORDER BY d.id ASC LIMIT 1"
-            )
-
-            dataset_result = await session.execute(sa_text(dataset_query), params)
-            dataset_row = dataset_result.first()
-            if dataset_row is None:
-                return {
-                    "success": False,
-                    "error": "No dataset found for project",
-                    "steps_executed": [],
-                    "transformed_data": {},
-                    "row_count": 0,
-                    "column_count": 0,
-                }
-            dataset_data = dict(zip(dataset_result.keys(), dataset_row))
-
-        rows = _extract_rows(dataset_data)
-        if not rows:
+        record = await load_primary_dataset(project_id, normalized_dataset_ids)
+        if record is None:
             return {
                 "success": False,
-                "error": "No usable dataset rows available for transformation",
+                "error": "No dataset found for project",
                 "steps_executed": [],
                 "transformed_data": {},
                 "row_count": 0,
                 "column_count": 0,
             }
+        dataset_id = record.id
+
+        store = get_dataset_store()
+        source_row_count: Optional[int] = None
+
+        # Prefer previously transformed rows, then the columnar store, then the preview.
+        # From the store only the preview window is read until a step needs every row.
+        rows = _extract_rows(*record.transformed_payloads())
+        if rows:
+            dataframe = pd.DataFrame(rows)
+        else:
+            dataframe = await store.load(dataset_id, row_range=(0, DATASET_PREVIEW_ROWS))
+            if dataframe.empty:
+                rows = _extract_rows(record.preview)
+                if not rows:
+                    return {
+                        "success": False,
+                        "error": "No usable dataset rows available for transformation",
+                        "steps_executed": [],
+                        "transformed_data": {},
+                        "row_count": 0,
+                        "column_count": 0,
+                    }
+                dataframe = pd.DataFrame(rows)
+            else:
+                source_row_count = await asyncio.to_thread(store.row_count, dataset_id)
 
-        dataframe = pd.DataFrame(rows)
         if dataframe.empty:
             return {
                 "success": False,
@@ -1047,13 +1050,14 @@ async def compile_and_execute_transformation_plan(
                 "column_count": 0,
             }
 
-        dataset_id = str(dataset_data.get("id") or (normalized_dataset_ids[0] if normalized_dataset_ids else ""))
         available_columns = [str(col) for col in dataframe.columns.tolist()]
         steps, step_warnings = _build_steps(mappings or [], available_columns)
         executor = get_transformation_executor()
 
         if not steps:
-            transformed_data = executor._dataframe_to_dict(dataframe)
+            row_count = source_row_count if source_row_count is not None else len(dataframe)
+            transformed_data = executor._dataframe_to_dict(dataframe, limit=DATASET_PREVIEW_ROWS)
+            transformed_data["row_count"] = row_count
             return {
                 "success": True,
                 "transformation_plan": {
@@ -1064,9 +1068,9 @@ async def compile_and_execute_transformation_plan(
                 },
                 "steps_executed": [],
                 "transformed_data": transformed_data,
-                "preview_data": transformed_data.get("data", [])[:100],
+                "preview_data": transformed_data["data"],
                 "transformed_dataset_id": dataset_id,
-                "row_count": len(dataframe),
+                "row_count": row_count,
                 "column_count": len(dataframe.columns),
                 "warnings": [
                     *step_warnings,
@@ -1074,6 +1078,9 @@ async def compile_and_execute_transformation_plan(
                 ],
             }
 
+        if source_row_count is not None:
+            dataframe = await store.load(dataset_id)
+
         plan = TransformationPlan(
             project_id=project_id,
             dataset_id=dataset_id,
@@ -1081,10 +1088,11 @@ async def compile_and_execute_transformation_plan(
             business_context=business_context,
             estimated_runtime_ms=max(500, len(steps) * 500),
         )
-        execution_result = executor.execute_plan(
-            plan=plan,
-            datasets={dataset_id: dataframe},
-            business_context=business_context,
+        execution_result, final_frame = await asyncio.to_thread(
+            executor.execute_plan_frame,
+            plan,
+            {dataset_id: dataframe},
+            business_context,
         )
         result_payload = (
             execution_result.model_dump()
@@ -1097,9 +1105,19 @@ async def compile_and_execute_transformation_plan(
             else plan.dict()
         )
         result_payload["warnings"] = [*step_warnings, *(result_payload.get("warnings") or [])]
-        transformed = result_payload.get("transformed_data") or {}
-        result_payload["preview_data"] = transformed.get("data", [])[:100] if isinstance(transformed, dict) else []
         result_payload["transformed_dataset_id"] = dataset_id
+        result_payload["preview_data"] = []
+
+        if final_frame is not None:
+            # Full rows go to the columnar store; results and workflow state keep a preview
+            transformed_id = transformed_dataset_id_for(dataset_id)
+            pointer = await asyncio.to_thread(store.write_frame, transformed_id, final_frame)
+            transformed_data = executor._dataframe_to_dict(final_frame, limit=DATASET_PREVIEW_ROWS)
+            transformed_data["row_count"] = pointer.row_count
+            transformed_data[COLUMNAR_POINTER_KEY] = pointer.to_metadata()
+            result_payload["transformed_data"] = transformed_data
+            result_payload["preview_data"] = transformed_data["data"]
+            result_payload["transformed_dataset_id"] = transformed_id
         return result_payload
     except Exception as e:
         logger.error(f"compile_and_execute_transformation_plan failed: {e}", exc_info=True)
@@ -0,0 +1,254 @@
+"""
+In-process Vector Index
+
+Exact top-k cosine search over per-collection embedding matrices. Used
+where pgvector is not available, and as the reference for benchmarking
+approximate (HNSW/IVF) indexes.
+
+Features:
+- One L2-normalized float32 matrix per collection (e.g. per dataset)
+- Top-k for a query with a single matrix-vector product + argpartition
+- Batched queries scored with one matrix-matrix product per collection
+- Search across several collections without concatenating them
+- Thread-safe replace/drop so writers can refresh a collection in place
+- Optional memory budget with least-recently-searched eviction; collections
+  pinned by an in-flight search are never evicted (the budget may be
+  exceeded until the pin is released)
+
+Usage:
+    from src.services.vector_index import VectorIndex
+
+    index = VectorIndex()
+    index.replace("ds1", ids, vectors, payloads)
+    hits = index.search(query_vector, k=10, collections=["ds1"])
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_rows(vectors: Any) -> np.ndarray:
+    """Convert to a float32 matrix with unit-length rows (zero rows stay zero)"""
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first"""
+    if k <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.int64)
+    if k >= scores.size:
+        return np.argsort(-scores, kind="stable")
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+@dataclass
+class VectorCollection:
+    """A normalized matrix with the ids/payloads of its rows"""
+    ids: List[Any]
+    matrix: np.ndarray
+    payloads: List[Dict[str, Any]] = field(default_factory=list)
+    version: Any = None
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.matrix.nbytes)
+
+    @property
+    def dimension(self) -> int:
+        return int(self.matrix.shape[1]) if self.matrix.ndim == 2 else 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+@dataclass
+class VectorHit:
+    """One search result"""
+    id: Any
+    score: float
+    collection: str
+    payload: Dict[str, Any]
+
+
+class VectorIndex:
+    """Exact cosine-similarity index over named collections"""
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        """
+        Args:
+            max_bytes: Evict least recently searched collections beyond this
+                many bytes of matrix data (None = unbounded)
+        """
+        self.max_bytes = max_bytes
+        self._collections: "OrderedDict[str, VectorCollection]" = OrderedDict()
+        self._bytes = 0
+        self._pins: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def replace(
+        self,
+        collection: str,
+        ids: Sequence[Any],
+        vectors: Any,
+        payloads: Optional[Sequence[Dict[str, Any]]] = None,
+        version: Any = None,
+    ) -> VectorCollection:
+        """Build (or rebuild) a collection from raw vectors"""
+        matrix = normalize_rows(vectors) if len(ids) else np.empty((0, 0), dtype=np.float32)
+        entry = VectorCollection(
+            ids=list(ids),
+            matrix=matrix,
+            payloads=list(payloads) if payloads is not None else [{} for _ in ids],
+            version=version,
+        )
+        return self.put(collection, entry)
+
+    def put(self, collection: str, entry: VectorCollection) -> VectorCollection:
+        """Install a prepared collection"""
+        with self._lock:
+            self._discard(collection)
+            self._collections[collection] = entry
+            self._bytes += entry.nbytes
+            self._evict(keep=collection)
+        return entry
+
+    @contextmanager
+    def pinned(self, collections: Iterable[str]) -> Iterator[None]:
+        """
+        Keep `collections` (loaded now or later inside the block) from being
+        evicted until the block exits, so a search that loads its working set
+        one collection at a time never loses the ones it loaded first.
+        """
+        names = list(dict.fromkeys(collections))
+        with self._lock:
+            for name in names:
+                self._pins[name] = self._pins.get(name, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                for name in names:
+                    remaining = self._pins.pop(name) - 1
+                    if remaining:
+                        self._pins[name] = remaining
+                self._evict()
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Drop least recently searched, unpinned collections down to the budget"""
+        if self.max_bytes is None or self._bytes <= self.max_bytes:
+            return
+        for name in [n for n in self._collections if n != keep and n not in self._pins]:
+            if self._bytes <= self.max_bytes:
+                return
+            logger.debug(f"Evicting vector collection {name}")
+            self._discard(name)
+        if self._bytes > self.max_bytes:
+            logger.debug(
+                f"Vector index over budget while collections are pinned "
+                f"({self._bytes} > {self.max_bytes} bytes)"
+            )
+
+    def get(self, collection: str) -> Optional[VectorCollection]:
+        return self._collections.get(collection)
+
+    def drop(self, collection: Optional[str] = None) -> None:
+        """Remove one collection, or all of them"""
+        with self._lock:
+            if collection is None:
+                self._collections.clear()
+                self._bytes = 0
+            else:
+                self._discard(collection)
+
+    def _discard(self, collection: str) -> None:
+        entry = self._collections.pop(collection, None)
+        if entry is not None:
+            self._bytes -= entry.nbytes
+
+    def collections(self) -> List[str]:
+        return list(self._collections)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "collections": len(self._collections),
+            "vectors": sum(len(entry) for entry in self._collections.values()),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "pinned": len(self._pins),
+        }
+
+    def search(
+        self,
+        query: Any,
+        k: int = 10,
+        collections: Optional[Iterable[str]] = None,
+        min_score: Optional[float] = None,
+    ) -> List[VectorHit]:
+        """
+        Top-k cosine search.
+
+        Args:
+            query: Query vector
+            k: Number of results
+            collections: Collections to search (None = all)
+            min_score: Drop hits below this similarity
+
+        Returns:
+            Hits ordered by descending similarity
+        """
+        return self.search_many([query], k=k, collections=collections, min_score=min_score)[0]
+
+    def search_many(
+        self,
+        queries: Any,
+        k: int = 10,
+        collections: Optional[Iterable[str]] = None,
+        min_score: Optional[float] = None,
+    ) -> List[List[VectorHit]]:
+        """
+        Top-k cosine search for several queries at once: one matrix product
+        per collection scores every query.
+
+        Returns:
+            One hit list per query, each ordered by descending similarity
+        """
+        query_matrix = normalize_rows(queries)
+        names = list(collections) if collections is not None else self.collections()
+
+        per_query: List[List[Tuple[float, str, VectorCollection, int]]] = [[] for _ in range(len(query_matrix))]
+        for name in names:
+            entry = self._collections.get(name)
+            if entry is None or not len(entry) or entry.dimension != query_matrix.shape[1]:
+                continue
+            with self._lock:
+                if name in self._collections:
+                    self._collections.move_to_end(name)
+            scores = query_matrix @ entry.matrix.T
+            for query_row, hits in zip(scores, per_query):
+                for row in top_k(query_row, k):
+                    score = float(query_row[row])
+                    if min_score is None or score >= min_score:
+                        hits.append((score, name, entry, int(row)))
+
+        results = []
+        for hits in per_query:
+            hits.sort(key=lambda hit: hit[0], reverse=True)
+            results.append([
+                VectorHit(id=entry.ids[row], score=score, collection=name, payload=entry.payloads[row])
+                for score, name, entry, row in hits[:k]
+            ])
+        return results
@@ -1,12 +1,20 @@
 """
 WebSocket Agent Bridge Package
 
-Connects agent orchestrator events to WebSocket broadcasts for real-time UI updates.
+Connects agent orchestrator events to WebSocket broadcasts for real-time UI updates,
+and provides the per-connection send queues and cross-worker broadcast
+backends used by the ConnectionManager.
 """
 
 from .agent_bridge import WebSocketAgentBridge, initialize_agent_bridge
+from .fanout import ClientConnection, OutboundMessage
+from .broadcast_backend import BroadcastBackend, create_broadcast_backend
 
 __all__ = [
     "WebSocketAgentBridge",
-    "initialize_agent_bridge"
+    "initialize_agent_bridge",
+    "ClientConnection",
+    "OutboundMessage",
+    "BroadcastBackend",
+    "create_broadcast_backend"
 ]
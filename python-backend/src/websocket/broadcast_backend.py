@@ -0,0 +1,441 @@
+"""
+WebSocket Broadcast Backends
+
+Carries project/user/global broadcasts between API worker processes, so an
+event emitted in one uvicorn worker reaches clients connected to another.
+
+Features:
+- memory (default): single process, nothing leaves the worker
+- unix: workers on one host exchange newline-delimited JSON through a hub
+  on a Unix domain socket; the worker holding the hub lock file serves it,
+  and another worker takes over if that worker exits
+- postgres: LISTEN/NOTIFY on WS_BROADCAST_CHANNEL; messages above the
+  NOTIFY payload limit are split into chunks and reassembled, and a dropped
+  LISTEN connection is re-established in the background
+- Every envelope carries its origin worker id; a worker delivers its own
+  broadcasts locally and ignores their echo
+
+Selection via WS_BROADCAST_BACKEND=memory|unix|postgres. The unix hub needs
+fcntl and AF_UNIX; without them (Windows) the memory backend is used.
+
+Usage:
+    from src.websocket.broadcast_backend import create_broadcast_backend
+
+    backend = create_broadcast_backend(database_url=settings.DATABASE_URL)
+    await backend.start(handle_envelope)
+    await backend.publish({"origin": worker_id, "target": "project", "key": project_id, "message": {...}})
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows development machines
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+WS_BROADCAST_BACKEND = os.getenv("WS_BROADCAST_BACKEND", "memory").lower()
+WS_BROADCAST_SOCKET_PATH = os.getenv("WS_BROADCAST_SOCKET_PATH", "/tmp/chimaridata-ws-broadcast.sock")
+WS_BROADCAST_CHANNEL = os.getenv("WS_BROADCAST_CHANNEL", "ws_broadcast")
+# Largest single envelope accepted on the Unix socket
+WS_BROADCAST_MAX_MESSAGE_BYTES = int(os.getenv("WS_BROADCAST_MAX_MESSAGE_BYTES", str(16 * 1024 * 1024)))
+WS_BROADCAST_RECONNECT_SECONDS = float(os.getenv("WS_BROADCAST_RECONNECT_SECONDS", "1.0"))
+# An idle LISTEN connection is probed this often, so a silently dead one is replaced
+WS_BROADCAST_KEEPALIVE_SECONDS = float(os.getenv("WS_BROADCAST_KEEPALIVE_SECONDS", "30.0"))
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more; chunks stay well below
+_NOTIFY_MAX_BYTES = 7500
+_NOTIFY_CHUNK_BYTES = 5000
+_CHUNK_PREFIX = "#"
+_PARTIAL_TTL_SECONDS = 30.0
+# Hub peers whose unsent buffer grows past this are dropped
+_PEER_BUFFER_LIMIT = 8 * 1024 * 1024
+
+EnvelopeHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def new_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class BroadcastBackend:
+    """In-process backend: broadcasts never leave this worker"""
+
+    name = "memory"
+    distributed = False
+
+    def __init__(self):
+        self._handler: Optional[EnvelopeHandler] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats = {"published": 0, "received": 0, "errors": 0}
+
+    async def start(self, handler: EnvelopeHandler) -> None:
+        self._handler = handler
+
+    async def publish(self, envelope: Dict[str, Any]) -> None:
+        """Send an envelope to the other workers"""
+        return None
+
+    async def stop(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def _dispatch(self, envelope: Dict[str, Any]) -> None:
+        """Hand a received envelope to the handler on a tracked task"""
+        if self._handler is None:
+            return
+        self.stats["received"] += 1
+        task = asyncio.ensure_future(self._handle(envelope))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _handle(self, envelope: Dict[str, Any]) -> None:
+        try:
+            await self._handler(envelope)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Broadcast handler failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, **self.stats}
+
+
+class UnixSocketBroadcastBackend(BroadcastBackend):
+    """Same-host fan-out through a hub on a Unix domain socket"""
+
+    name = "unix"
+    distributed = True
+
+    def __init__(self, path: str = WS_BROADCAST_SOCKET_PATH, reconnect_seconds: float = WS_BROADCAST_RECONNECT_SECONDS):
+        super().__init__()
+        self.path = path
+        self.reconnect_seconds = reconnect_seconds
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._connected = asyncio.Event()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._peers: Set[asyncio.StreamWriter] = set()
+        self._lock_fd: Optional[int] = None
+        self._runner: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.stats.update({"dropped": 0, "hub": False})
+
+    async def start(self, handler: EnvelopeHandler) -> None:
+        await super().start(handler)
+        self._runner = asyncio.create_task(self._maintain())
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout=5.0)
+        except asyncio.TimeoutError:
+            logger.warning(f"Broadcast hub at {self.path} not reachable yet; retrying in background")
+
+    async def _maintain(self) -> None:
+        while not self._stopping:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path, limit=WS_BROADCAST_MAX_MESSAGE_BYTES)
+            except (FileNotFoundError, ConnectionRefusedError):
+                if await self._try_become_hub():
+                    continue
+                await asyncio.sleep(self.reconnect_seconds)
+                continue
+            except Exception as e:
+                logger.warning(f"Broadcast hub connection failed: {e}")
+                await asyncio.sleep(self.reconnect_seconds)
+                continue
+
+            self._writer = writer
+            self._connected.set()
+            try:
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    try:
+                        self._dispatch(json.loads(line))
+                    except ValueError as e:
+                        self.stats["errors"] += 1
+                        logger.warning(f"Malformed broadcast envelope: {e}")
+            except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+                logger.warning(f"Broadcast hub connection lost: {e}")
+            finally:
+                self._writer = None
+                self._connected.clear()
+                writer.close()
+            if not self._stopping:
+                await asyncio.sleep(self.reconnect_seconds)
+
+    async def _try_become_hub(self) -> bool:
+        """Serve the hub if no other worker holds the lock"""
+        if self._server is not None:
+            return True
+        fd = os.open(f"{self.path}.lock", os.O_CREAT | os.O_RDWR, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        # A socket file left by a dead hub refuses connections; replace it
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(
+            self._serve_peer, path=self.path, limit=WS_BROADCAST_MAX_MESSAGE_BYTES
+        )
+        self.stats["hub"] = True
+        logger.info(f"Serving WebSocket broadcast hub at {self.path} (pid {os.getpid()})")
+        return True
+
+    async def _serve_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._peers.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                for peer in list(self._peers):
+                    if peer.transport.get_write_buffer_size() > _PEER_BUFFER_LIMIT:
+                        logger.warning("Dropping broadcast hub peer that stopped reading")
+                        self._peers.discard(peer)
+                        peer.close()
+                        continue
+                    peer.write(line)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+            logger.debug(f"Broadcast hub peer disconnected: {e}")
+        finally:
+            self._peers.discard(writer)
+            writer.close()
+
+    async def publish(self, envelope: Dict[str, Any]) -> None:
+        writer = self._writer
+        if writer is None:
+            self.stats["dropped"] += 1
+            return
+        try:
+            writer.write(json.dumps(envelope, default=str, separators=(",", ":")).encode("utf-8") + b"\n")
+            await writer.drain()
+            self.stats["published"] += 1
+        except (ConnectionError, RuntimeError) as e:
+            self.stats["dropped"] += 1
+            logger.warning(f"Broadcast publish failed: {e}")
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._runner is not None:
+            self._runner.cancel()
+            await asyncio.gather(self._runner, return_exceptions=True)
+        if self._writer is not None:
+            self._writer.close()
+        if self._server is not None:
+            self._server.close()
+            for peer in list(self._peers):
+                peer.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._lock_fd is not None:
+            # Release the lock only after the socket file is gone, so the next
+            # hub never unlinks a live socket
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+            os.close(self._lock_fd)
+            self._lock_fd = None
+        await super().stop()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats.update({"connected": self._writer is not None, "peers": len(self._peers)})
+        return stats
+
+
+class PostgresNotifyBroadcastBackend(BroadcastBackend):
+    """Cross-host fan-out over Postgres LISTEN/NOTIFY"""
+
+    name = "postgres"
+    distributed = True
+
+    def __init__(
+        self,
+        database_url: str,
+        channel: str = WS_BROADCAST_CHANNEL,
+        reconnect_seconds: float = WS_BROADCAST_RECONNECT_SECONDS,
+        keepalive_seconds: float = WS_BROADCAST_KEEPALIVE_SECONDS,
+    ):
+        super().__init__()
+        self.dsn = _asyncpg_dsn(database_url)
+        self.channel = channel
+        self.reconnect_seconds = reconnect_seconds
+        self.keepalive_seconds = keepalive_seconds
+        self._listen_conn = None
+        self._publish_conn = None
+        self._publish_lock = asyncio.Lock()
+        self._connected = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._partials: Dict[str, Tuple[float, List[Optional[str]]]] = {}
+        self.stats.update({"chunked": 0, "reconnects": 0})
+
+    async def start(self, handler: EnvelopeHandler) -> None:
+        await super().start(handler)
+        self._runner = asyncio.create_task(self._maintain())
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout=5.0)
+            logger.info(f"WebSocket broadcasts use LISTEN/NOTIFY on channel {self.channel}")
+        except asyncio.TimeoutError:
+            logger.warning(f"LISTEN on {self.channel} not established yet; retrying in background")
+
+    async def _maintain(self) -> None:
+        """Hold a LISTEN connection, replacing it whenever it drops"""
+        import asyncpg
+
+        while not self._stopping:
+            lost = asyncio.Event()
+            try:
+                conn = await asyncpg.connect(self.dsn)
+                conn.add_termination_listener(lambda _conn: lost.set())
+                await conn.add_listener(self.channel, self._on_notify)
+            except Exception as e:
+                logger.warning(f"Broadcast LISTEN connection failed: {e}")
+                await asyncio.sleep(self.reconnect_seconds)
+                continue
+
+            self._listen_conn = conn
+            self._connected.set()
+            try:
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), timeout=self.keepalive_seconds)
+                    except asyncio.TimeoutError:
+                        await asyncio.wait_for(conn.execute("SELECT 1"), timeout=self.keepalive_seconds)
+            except Exception as e:
+                logger.debug(f"Broadcast LISTEN keepalive failed: {e}")
+            finally:
+                self._connected.clear()
+                self._listen_conn = None
+                if not conn.is_closed():
+                    conn.terminate()
+
+            if not self._stopping:
+                self.stats["reconnects"] += 1
+                logger.warning(
+                    f"Broadcast LISTEN connection on {self.channel} lost; "
+                    f"broadcasts from other workers are missed until it reconnects"
+                )
+                await asyncio.sleep(self.reconnect_seconds)
+
+    async def _publish_connection(self):
+        """Publish connection, (re)opened on demand; call under _publish_lock"""
+        import asyncpg
+
+        if self._publish_conn is None or self._publish_conn.is_closed():
+            self._publish_conn = await asyncpg.connect(self.dsn)
+        return self._publish_conn
+
+    async def publish(self, envelope: Dict[str, Any]) -> None:
+        if self._stopping:
+            return
+        try:
+            payloads = _notify_payloads(json.dumps(envelope, default=str, separators=(",", ":")))
+            if len(payloads) > 1:
+                self.stats["chunked"] += 1
+            async with self._publish_lock:
+                conn = await self._publish_connection()
+                try:
+                    # One transaction: all chunks are delivered together, in order
+                    async with conn.transaction():
+                        for payload in payloads:
+                            await conn.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+                except Exception:
+                    # Reconnect on the next publish
+                    conn.terminate()
+                    self._publish_conn = None
+                    raise
+            self.stats["published"] += 1
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Broadcast NOTIFY failed: {e}")
+
+    def _on_notify(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        text = self._reassemble(payload)
+        if text is None:
+            return
+        try:
+            self._dispatch(json.loads(text))
+        except ValueError as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Malformed broadcast envelope: {e}")
+
+    def _reassemble(self, payload: str) -> Optional[str]:
+        if not payload.startswith(_CHUNK_PREFIX):
+            return payload
+        message_id, index, total, data = payload[1:].split(":", 3)
+        now = time.monotonic()
+        for stale_id in [k for k, (at, _) in self._partials.items() if now - at > _PARTIAL_TTL_SECONDS]:
+            del self._partials[stale_id]
+        _, parts = self._partials.setdefault(message_id, (now, [None] * int(total)))
+        parts[int(index)] = data
+        if any(part is None for part in parts):
+            return None
+        del self._partials[message_id]
+        return base64.b64decode("".join(parts)).decode("utf-8")
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._runner is not None:
+            self._runner.cancel()
+            await asyncio.gather(self._runner, return_exceptions=True)
+        for conn in (self._listen_conn, self._publish_conn):
+            if conn is not None:
+                try:
+                    await conn.close()
+                except Exception as e:
+                    logger.debug(f"Closing broadcast connection failed: {e}")
+        self._listen_conn = self._publish_conn = None
+        await super().stop()
+
+
+def _notify_payloads(text: str) -> List[str]:
+    """Split an envelope into NOTIFY-sized payloads"""
+    raw = text.encode("utf-8")
+    if len(raw) <= _NOTIFY_MAX_BYTES:
+        return [text]
+    encoded = base64.b64encode(raw).decode("ascii")
+    pieces = [encoded[i:i + _NOTIFY_CHUNK_BYTES] for i in range(0, len(encoded), _NOTIFY_CHUNK_BYTES)]
+    message_id = uuid.uuid4().hex
+    return [f"{_CHUNK_PREFIX}{message_id}:{i}:{len(pieces)}:{piece}" for i, piece in enumerate(pieces)]
+
+
+def _asyncpg_dsn(database_url: str) -> str:
+    """asyncpg takes plain postgresql:// URLs, not SQLAlchemy driver URLs"""
+    for prefix in ("postgresql+asyncpg://", "postgresql+psycopg2://", "postgres://"):
+        if database_url.startswith(prefix):
+            return "postgresql://" + database_url[len(prefix):]
+    return database_url
+
+
+def create_broadcast_backend(
+    kind: Optional[str] = None,
+    database_url: Optional[str] = None,
+) -> BroadcastBackend:
+    """Backend selected by WS_BROADCAST_BACKEND (or kind)"""
+    kind = (kind or WS_BROADCAST_BACKEND).lower()
+    if kind == "unix":
+        if fcntl is None or not hasattr(socket, "AF_UNIX"):
+            logger.warning("The unix broadcast backend needs fcntl and AF_UNIX, using memory")
+            return BroadcastBackend()
+        return UnixSocketBroadcastBackend()
+    if kind == "postgres":
+        if not database_url:
+            raise ValueError("The postgres broadcast backend needs a database URL")
+        return PostgresNotifyBroadcastBackend(database_url)
+    if kind != "memory":
+        logger.warning(f"Unknown WS_BROADCAST_BACKEND '{kind}', using memory")
+    return BroadcastBackend()
@@ -0,0 +1,206 @@
+"""
+WebSocket Fan-out
+
+Per-connection outbound queues for the WebSocket ConnectionManager, so a
+slow client only delays its own messages instead of every broadcast.
+
+Features:
+- One bounded send queue and one writer task per socket; broadcasts only
+  enqueue, they never await a client's send
+- Messages are serialized at most once per broadcast and the same text is
+  written to every recipient
+- Slow-consumer policy when a queue is full:
+  - drop_oldest: discard the oldest queued message
+  - coalesce: replace a queued progress update for the same type/step,
+    otherwise discard the oldest message
+  - disconnect: close the socket (code 1013, try again later)
+- A send stuck for longer than WS_SEND_TIMEOUT_SECONDS marks the client
+  as stalled and it is disconnected on the next enqueue
+
+Usage:
+    from src.websocket.fanout import ClientConnection, OutboundMessage
+
+    client = ClientConnection(websocket, session_id, on_closed=on_client_closed)
+    message = OutboundMessage({"type": "progress", "step": "execution", "progress": 40})
+    if not client.enqueue(message):
+        manager.disconnect(session_id)
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Hashable, Optional
+
+from starlette.websockets import WebSocket
+
+logger = logging.getLogger(__name__)
+
+SLOW_CONSUMER_POLICIES = ("drop_oldest", "coalesce", "disconnect")
+
+# Messages buffered per connection before the slow-consumer policy applies
+WS_SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+WS_SLOW_CONSUMER_POLICY = os.getenv("WS_SLOW_CONSUMER_POLICY", "coalesce").lower()
+WS_SEND_TIMEOUT_SECONDS = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "10"))
+
+# Close code for clients disconnected for falling behind ("try again later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class OutboundMessage:
+    """A message shared by all recipients of one broadcast"""
+
+    __slots__ = ("payload", "coalesce_key", "_text")
+
+    def __init__(self, payload: Dict[str, Any]):
+        self.payload = payload
+        # Only progress updates are superseded by a later message
+        self.coalesce_key: Optional[Hashable] = (
+            (payload.get("type"), payload.get("step")) if "progress" in payload else None
+        )
+        self._text: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = json.dumps(self.payload, default=str, separators=(",", ":"), ensure_ascii=False)
+        return self._text
+
+
+class ClientConnection:
+    """Bounded send queue and writer task for one WebSocket"""
+
+    def __init__(
+        self,
+        websocket: Any,
+        session_id: str,
+        max_queue_size: int = WS_SEND_QUEUE_SIZE,
+        policy: str = WS_SLOW_CONSUMER_POLICY,
+        send_timeout: float = WS_SEND_TIMEOUT_SECONDS,
+        on_closed: Optional[Callable[["ClientConnection"], None]] = None,
+    ):
+        if policy not in SLOW_CONSUMER_POLICIES:
+            logger.warning(f"Unknown slow-consumer policy '{policy}', using drop_oldest")
+            policy = "drop_oldest"
+        self.websocket = websocket
+        self.session_id = session_id
+        self.max_queue_size = max(1, max_queue_size)
+        self.policy = policy
+        self.send_timeout = send_timeout
+        self.closed = False
+        self.stats = {"sent": 0, "dropped": 0, "coalesced": 0}
+        self._on_closed = on_closed
+        # Starlette sockets get the pre-serialized text; other socket objects
+        # (bridges, test doubles) only implement send_json
+        self._send_text = isinstance(websocket, WebSocket)
+        self._queue: Deque[OutboundMessage] = deque()
+        self._ready = asyncio.Event()
+        self._sending_since: Optional[float] = None
+        self._writer = asyncio.create_task(self._run())
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    @property
+    def stalled(self) -> bool:
+        return (
+            self._sending_since is not None
+            and time.monotonic() - self._sending_since > self.send_timeout
+        )
+
+    def enqueue(self, message: OutboundMessage) -> bool:
+        """
+        Queue a message for the writer task.
+
+        Returns False when the client should be disconnected (closed,
+        stalled, or over its queue bound under the disconnect policy).
+        """
+        if self.closed:
+            return False
+        if self.stalled:
+            logger.warning(f"WebSocket send stalled for session {self.session_id}, disconnecting")
+            self.close(abort=True)
+            return False
+
+        if len(self._queue) >= self.max_queue_size:
+            if self.policy == "disconnect":
+                logger.warning(
+                    f"WebSocket session {self.session_id} fell {len(self._queue)} messages behind, disconnecting"
+                )
+                self.close(abort=True)
+                return False
+            if self.policy == "coalesce" and self._coalesce(message):
+                return True
+            self._queue.popleft()
+            self.stats["dropped"] += 1
+
+        self._queue.append(message)
+        self._ready.set()
+        return True
+
+    def _coalesce(self, message: OutboundMessage) -> bool:
+        """Replace a queued update with the same key, keeping its position"""
+        if message.coalesce_key is None:
+            return False
+        for position, queued in enumerate(self._queue):
+            if queued.coalesce_key == message.coalesce_key:
+                self._queue[position] = message
+                self.stats["coalesced"] += 1
+                return True
+        return False
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                while not self._queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+                message = self._queue.popleft()
+                self._sending_since = time.monotonic()
+                if self._send_text:
+                    await self.websocket.send_text(message.text)
+                else:
+                    await self.websocket.send_json(message.payload)
+                self._sending_since = None
+                self.stats["sent"] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Failed to send message to session {self.session_id}: {e}")
+            self.close()
+
+    async def drain(self, timeout: float) -> bool:
+        """Wait until the queue is empty; False if it did not drain in time"""
+        deadline = time.monotonic() + timeout
+        while (self._queue or self._sending_since is not None) and not self.closed:
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.01)
+        return True
+
+    def close(self, abort: bool = False) -> None:
+        """
+        Stop the writer and notify the owner.
+
+        With abort=True the socket itself is closed as well, so the client
+        sees the disconnect and can reconnect.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self._queue.clear()
+        if self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        if abort:
+            asyncio.create_task(self._close_socket())
+        if self._on_closed is not None:
+            self._on_closed(self)
+
+    async def _close_socket(self) -> None:
+        try:
+            await self.websocket.close(code=SLOW_CONSUMER_CLOSE_CODE)
+        except Exception as e:
+            logger.debug(f"Closing WebSocket for session {self.session_id} failed: {e}")
@@ -0,0 +1,107 @@
+"""
+Tests for connector ingestion: project ownership and explicit persistence.
+"""
+
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import HTTPException
+
+from src.api import data_ingestion_routes
+from src.api.data_ingestion_routes import IngestRequest, ingest_data_source
+from src.auth.middleware import User
+from src.services import streaming_ingestion
+from src.services.dataset_store import DatasetStore
+
+
+class _Result:
+    def __init__(self, row=None):
+        self._row = row
+
+    def first(self):
+        return self._row
+
+
+class _FakeSession:
+    def __init__(self, owner_id):
+        self.owner_id = owner_id
+        self.inserts = []
+
+    async def execute(self, statement, params=None):
+        sql = str(statement).strip()
+        if sql.startswith("INSERT"):
+            self.inserts.append(sql.split()[2])
+            return _Result()
+        return _Result((self.owner_id,))
+
+    async def commit(self):
+        pass
+
+
+@pytest.fixture
+def ingestion(tmp_path, monkeypatch):
+    session = _FakeSession("owner")
+    store = DatasetStore(base_dir=tmp_path)
+
+    @asynccontextmanager
+    async def _context():
+        yield session
+
+    async def _rows(config, limit=None):
+        yield [{"id": i, "value": i * 2} for i in range(5)]
+
+    monkeypatch.setattr(data_ingestion_routes, "get_db_context", _context)
+    monkeypatch.setattr(data_ingestion_routes, "get_dataset_store", lambda: store)
+    monkeypatch.setattr(streaming_ingestion, "get_dataset_store", lambda: store)
+    monkeypatch.setitem(data_ingestion_routes._INGEST_HANDLERS, "rest_api", _rows)
+    return session, tmp_path
+
+
+def _request(**kwargs):
+    return IngestRequest(sourceType="rest_api", projectId="p1", config={}, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_other_users_cannot_ingest_into_a_project(ingestion) -> None:
+    session, tmp_path = ingestion
+
+    with pytest.raises(HTTPException) as exc:
+        await ingest_data_source(_request(persist=True), current_user=User(id="intruder", email="i@x.io"))
+
+    assert exc.value.status_code == 403
+    assert session.inserts == [] and list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_connection_tests_are_not_persisted_unless_asked(ingestion) -> None:
+    session, tmp_path = ingestion
+    owner = User(id="owner", email="o@x.io")
+
+    preview = await ingest_data_source(_request(label="Test_rest_api"), current_user=owner)
+    assert preview.success and preview.recordCount == 5 and preview.datasetId is None
+    assert session.inserts == [] and list(tmp_path.iterdir()) == []
+
+    imported = await ingest_data_source(_request(persist=True), current_user=owner)
+    assert imported.datasetId
+    assert session.inserts == ["datasets", "project_datasets"]
+    assert [p.name for p in tmp_path.iterdir()] == [f"{imported.datasetId}.parquet"]
+
+
+@pytest.mark.asyncio
+async def test_previews_stop_reading_after_the_preview_rows(ingestion, monkeypatch) -> None:
+    _, tmp_path = ingestion
+    batches_read = []
+
+    async def _endless(config, limit=None):
+        assert limit == data_ingestion_routes.CONNECTOR_PREVIEW_ROWS
+        while True:
+            batches_read.append(limit)
+            yield [{"id": i} for i in range(limit)]
+
+    monkeypatch.setitem(data_ingestion_routes._INGEST_HANDLERS, "rest_api", _endless)
+
+    preview = await ingest_data_source(_request(), current_user=User(id="owner", email="o@x.io"))
+
+    assert preview.success and len(preview.preview) == preview.recordCount == data_ingestion_routes.CONNECTOR_PREVIEW_ROWS
+    assert len(batches_read) == 1
+    assert list(tmp_path.iterdir()) == []
@@ -458,3 +458,32 @@ def test_confidence_gate_fails_when_question_is_not_grounded() -> None:
     blocker_codes = {str(item.get("code")) for item in gate.get("blockers", [])}
     assert "question_data_gap" in blocker_codes
     assert document.get("completeness", {}).get("readyForExecution") is False
+
+
+def test_column_match_index_agrees_with_scoring_every_column() -> None:
+    from src.api.agent_pipeline_routes import _score_term_to_column
+
+    columns = [
+        "id", "emp_id", "department", "employee_attrition_rate", "month", "revenue_usd",
+        "Total Revenue", "region_code", "lead_count", "conversions", "xyz", "q", "tenure_years",
+        "customer_satisfaction_score", "campaign", "channel", "rev", "salesrep",
+    ] + [f"metric_{i}_value" for i in range(200)]
+    term_sets = [
+        ["turnover rate"], ["revenue"], ["sales"], ["id"], ["qq"], ["zzz"], ["nps", "satisfaction"],
+        ["tenure"], ["metric 150"], ["leads", "conversion"], ["abcdefgh"], ["ev"],
+    ]
+
+    for terms in term_sets:
+        for blocked in (set(), {"revenue_usd", "id"}):
+            expected_column, expected_score = None, 0.0
+            for column in columns:
+                if column in blocked:
+                    continue
+                score = max(_score_term_to_column(term, column) for term in terms)
+                if score > expected_score:
+                    expected_column, expected_score = column, score
+
+            assert _best_column_for_terms(terms, columns, blocked_columns=blocked) == (
+                expected_column,
+                expected_score,
+            ), terms
@@ -0,0 +1,40 @@
+"""
+Tests for the chunked upload spooling path.
+"""
+
+import io
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from src.api import upload_routes
+from src.api.upload_routes import _open_records, _spool_upload
+
+
+@pytest.mark.asyncio
+async def test_spool_upload_copies_in_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_routes, "UPLOAD_STREAM_CHUNK_BYTES", 5)
+    payload = b"id,value\n" + b"".join(f"{i},{i * 3}\n".encode() for i in range(50))
+    destination = tmp_path / "upload.csv"
+
+    size = await _spool_upload(UploadFile(file=io.BytesIO(payload), filename="upload.csv"), destination)
+
+    assert size == len(payload)
+    assert destination.read_bytes() == payload
+    with open(destination, "rb") as stream:
+        headers, records = _open_records(stream, "csv")
+        assert headers == ["id", "value"]
+        assert sum(1 for _ in records) == 50
+
+
+@pytest.mark.asyncio
+async def test_spool_upload_enforces_size_limit_and_leaves_no_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_routes, "UPLOAD_STREAM_CHUNK_BYTES", 4)
+    monkeypatch.setattr(upload_routes, "MAX_UPLOAD_FILE_SIZE_BYTES", 10)
+    destination = tmp_path / "too_big.csv"
+
+    with pytest.raises(HTTPException) as exc:
+        await _spool_upload(UploadFile(file=io.BytesIO(b"x" * 32), filename="too_big.csv"), destination)
+
+    assert exc.value.status_code == 413
+    assert list(tmp_path.iterdir()) == []
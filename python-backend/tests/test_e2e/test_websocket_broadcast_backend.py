@@ -0,0 +1,169 @@
+"""
+Cross-worker WebSocket broadcast tests: two ConnectionManagers stand in for
+two uvicorn workers sharing a Unix socket broadcast hub.
+"""
+
+import asyncio
+import json
+import sys
+import types
+
+import pytest
+from starlette.websockets import WebSocket
+
+from src.main import ConnectionManager
+from src.websocket import broadcast_backend
+from src.websocket.broadcast_backend import (
+    BroadcastBackend,
+    PostgresNotifyBroadcastBackend,
+    UnixSocketBroadcastBackend,
+    _notify_payloads,
+    create_broadcast_backend,
+)
+
+
+class _Client(WebSocket):
+    def __init__(self):
+        self.frames = []
+
+    async def accept(self, *args, **kwargs) -> None:
+        return None
+
+    async def send_text(self, data: str) -> None:
+        self.frames.append(json.loads(data))
+
+    async def close(self, code: int = 1000, reason=None) -> None:
+        return None
+
+
+async def _wait_for(predicate, timeout=3.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not reached")
+        await asyncio.sleep(0.01)
+
+
+async def _worker(path):
+    manager = ConnectionManager()
+    await manager.start_backend(UnixSocketBroadcastBackend(str(path), reconnect_seconds=0.05))
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_project_and_user_broadcasts_reach_other_workers(tmp_path) -> None:
+    path = tmp_path / "ws.sock"
+    worker_a = await _worker(path)
+    worker_b = await _worker(path)
+    assert worker_a.backend.get_stats()["hub"] and not worker_b.backend.get_stats()["hub"]
+
+    viewer_a, viewer_b, owner_b = _Client(), _Client(), _Client()
+    await worker_a.connect(viewer_a, "a1", project_id="p1")
+    await worker_b.connect(viewer_b, "b1", project_id="p1")
+    await worker_b.connect(owner_b, "b2", user_id="u1")
+
+    await worker_a.broadcast_to_project("p1", {"type": "progress", "step": "execution", "progress": 40})
+    await worker_a.broadcast_to_user("u1", {"type": "notice"})
+    await worker_a.send_message("b2", {"type": "direct"})
+
+    await _wait_for(lambda: len(owner_b.frames) == 2 and viewer_b.frames)
+    assert viewer_a.frames == [{"type": "progress", "step": "execution", "progress": 40}]
+    assert viewer_b.frames == viewer_a.frames  # delivered once, not echoed back to worker A
+    assert [f["type"] for f in owner_b.frames] == ["notice", "direct"]
+
+    # Worker B takes over the hub when worker A shuts down
+    await worker_a.close_all(timeout=0)
+    worker_c = await _worker(path)
+    await _wait_for(lambda: worker_b.backend.get_stats()["connected"])
+    viewer_c = _Client()
+    await worker_c.connect(viewer_c, "c1", project_id="p1")
+    await _wait_for(lambda: worker_c.backend.get_stats()["connected"])
+    await worker_b.broadcast_to_project("p1", {"type": "complete"})
+    await _wait_for(lambda: viewer_c.frames)
+    assert viewer_c.frames == [{"type": "complete"}]
+    assert worker_b.backend.get_stats()["hub"] or worker_c.backend.get_stats()["hub"]
+
+    await worker_b.close_all(timeout=0)
+    await worker_c.close_all(timeout=0)
+
+
+def test_notify_payloads_chunk_and_reassemble_large_envelopes() -> None:
+    backend = PostgresNotifyBroadcastBackend("postgresql+asyncpg://u:p@localhost/db")
+    assert backend.dsn == "postgresql://u:p@localhost/db"
+
+    small = json.dumps({"message": "hi"})
+    assert _notify_payloads(small) == [small]
+
+    large = json.dumps({"message": "é" * 20000})
+    payloads = _notify_payloads(large)
+    assert len(payloads) > 1
+    assert all(len(p.encode("utf-8")) < 8000 for p in payloads)
+    # Chunks of concurrent messages may interleave
+    results = [backend._reassemble(p) for p in reversed(payloads)]
+    assert results[:-1] == [None] * (len(payloads) - 1)
+    assert results[-1] == large
+
+
+def test_unix_backend_falls_back_to_memory_without_fcntl(monkeypatch) -> None:
+    monkeypatch.setattr(broadcast_backend, "fcntl", None)
+    backend = create_broadcast_backend("unix")
+    assert type(backend) is BroadcastBackend
+
+
+class _FakeListenConnection:
+    def __init__(self):
+        self.listeners = {}
+        self.on_terminate = []
+        self.closed = False
+
+    def add_termination_listener(self, callback):
+        self.on_terminate.append(callback)
+
+    async def add_listener(self, channel, callback):
+        self.listeners[channel] = callback
+
+    async def execute(self, *args):
+        return None
+
+    def is_closed(self):
+        return self.closed
+
+    def terminate(self):
+        self.closed = True
+
+    async def close(self):
+        self.closed = True
+
+    def drop(self):
+        """The server went away"""
+        self.closed = True
+        for callback in self.on_terminate:
+            callback(self)
+
+
+@pytest.mark.asyncio
+async def test_postgres_backend_re_listens_after_the_connection_drops(monkeypatch) -> None:
+    connections = []
+
+    async def connect(dsn):
+        connections.append(_FakeListenConnection())
+        return connections[-1]
+
+    monkeypatch.setitem(sys.modules, "asyncpg", types.SimpleNamespace(connect=connect))
+    received = []
+
+    async def handler(envelope):
+        received.append(envelope)
+
+    backend = PostgresNotifyBroadcastBackend("postgresql://u:p@localhost/db", reconnect_seconds=0.01)
+    await backend.start(handler)
+    connections[0].drop()
+    await _wait_for(lambda: backend.get_stats()["reconnects"] == 1 and backend._listen_conn is not None)
+
+    assert len(connections) == 2
+    connections[1].listeners["ws_broadcast"](connections[1], 1, "ws_broadcast", json.dumps({"key": "p1"}))
+    await _wait_for(lambda: received)
+    assert received == [{"key": "p1"}]
+
+    await backend.stop()
+    assert connections[1].closed
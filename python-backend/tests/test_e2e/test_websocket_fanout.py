@@ -0,0 +1,106 @@
+"""
+WebSocket fan-out tests: per-connection queues, slow consumers and
+serialize-once broadcasts with hundreds of simulated clients.
+"""
+
+import asyncio
+import json
+
+import pytest
+from starlette.websockets import WebSocket
+
+from src.main import ConnectionManager
+
+
+class _SimulatedClient(WebSocket):
+    """Starlette socket without a transport; records the text frames it is sent"""
+
+    def __init__(self, send_delay: float = 0.0):
+        self.frames = []
+        self.send_delay = send_delay
+        self.close_codes = []
+
+    async def accept(self, *args, **kwargs) -> None:
+        return None
+
+    async def send_text(self, data: str) -> None:
+        if self.send_delay:
+            await asyncio.sleep(self.send_delay)
+        self.frames.append(data)
+
+    async def close(self, code: int = 1000, reason=None) -> None:
+        self.close_codes.append(code)
+
+
+def _progress(step: str, progress: int) -> dict:
+    return {"type": "progress", "step": step, "progress": progress, "message": f"{progress}%"}
+
+
+async def _connect_clients(manager, count, project_id="p1"):
+    clients = [_SimulatedClient() for _ in range(count)]
+    for i, client in enumerate(clients):
+        await manager.connect(client, f"s{i}", project_id=project_id)
+    return clients
+
+
+@pytest.mark.asyncio
+async def test_slow_client_does_not_delay_project_broadcast() -> None:
+    manager = ConnectionManager(max_queue_size=8, slow_consumer_policy="coalesce")
+    clients = await _connect_clients(manager, 300)
+    slow = _SimulatedClient(send_delay=60)
+    await manager.connect(slow, "slow", project_id="p1")
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    for progress in range(50):
+        await manager.broadcast_to_project("p1", _progress("execution", progress))
+    await manager.broadcast_to_project("p1", {"type": "complete", "step": "execution"})
+    assert loop.time() - started < 5
+
+    assert await manager.flush(timeout=0.5) is False  # only the slow client is behind
+    for client in clients:
+        assert [json.loads(f).get("progress") for f in client.frames] == list(range(50)) + [None]
+    # Frames are serialized once per broadcast and shared by every recipient
+    assert all(c.frames[0] is clients[0].frames[0] for c in clients)
+
+    stats = manager.get_stats()
+    assert stats["connections"] == 301
+    assert stats["queued"] <= 8
+    assert stats["coalesced"] > 0
+    await manager.close_all(timeout=0)
+    assert manager.get_connection_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_disconnect_policy_closes_slow_consumer() -> None:
+    manager = ConnectionManager(max_queue_size=4, slow_consumer_policy="disconnect")
+    clients = await _connect_clients(manager, 20)
+    slow = _SimulatedClient(send_delay=60)
+    await manager.connect(slow, "slow", project_id="p1")
+
+    for progress in range(10):
+        await manager.broadcast_to_project("p1", _progress("execution", progress))
+    await asyncio.sleep(0)
+
+    assert "slow" not in manager.active_connections
+    assert slow.close_codes == [1013]
+    assert manager.get_stats()["slow_disconnects"] == 1
+    assert await manager.flush(timeout=5)
+    assert all(len(client.frames) == 10 for client in clients)
+    assert await manager.send_message("slow", _progress("execution", 99)) is False
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_keeps_latest_messages_in_order() -> None:
+    manager = ConnectionManager(max_queue_size=3, slow_consumer_policy="drop_oldest")
+    client = _SimulatedClient(send_delay=0.05)
+    await manager.connect(client, "s1")
+
+    for i in range(10):
+        await manager.send_message("s1", {"type": "log", "n": i})
+    assert await manager.flush(timeout=5)
+
+    received = [json.loads(frame)["n"] for frame in client.frames]
+    assert received[0] == 0 and received[-3:] == [7, 8, 9]
+    assert received == sorted(received)
+    assert manager.get_stats()["dropped"] == 10 - len(received)
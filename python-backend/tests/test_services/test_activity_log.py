@@ -0,0 +1,167 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.db import schema_cache as schema_cache_module
+from src.db.schema_cache import SchemaCache
+from src.services import activity_log
+from src.services.activity_log import ACTIVITY_COLUMNS, ActivityLog
+
+
+async def _read_all(log, project_id, limit):
+    """Walk every page; returns (entries oldest first, page count)"""
+    entries, pages, cursor = [], 0, None
+    while True:
+        page = await log.query(project_id, limit=limit, before=cursor)
+        pages += 1
+        entries[:0] = page["activities"]
+        if not page["hasMore"]:
+            return entries, pages
+        cursor = page["nextCursor"]
+
+
+@pytest.mark.asyncio
+async def test_ring_buffers_bound_memory_and_pages_walk_back_in_order() -> None:
+    log = ActivityLog(buffer_size=50, max_projects=3, persist=False)
+    for i in range(120):
+        log.record("p1", "data_scientist", "step", str(i))
+    for project in ("p2", "p3", "p4"):
+        log.record(project, "pm", "start")
+
+    stats = log.get_stats()
+    assert stats["projects"] == 3 and stats["evicted_projects"] == 1
+    assert (await log.query("p1"))["activities"] == []  # least recently used, evicted
+
+    for i in range(120):
+        log.record("p5", "data_scientist", "step", str(i))
+    page = await log.query("p5", limit=20)
+    assert [a["detail"] for a in page["activities"]] == [str(i) for i in range(100, 120)]
+    assert page["activities"][0]["agentName"] == "Data Scientist"
+    assert page["hasMore"] and page["source"] == "memory"
+
+    entries, pages = await _read_all(log, "p5", limit=20)
+    assert [a["detail"] for a in entries] == [str(i) for i in range(70, 120)]
+    assert pages == 3
+
+
+@pytest.mark.asyncio
+async def test_time_window_filters_entries() -> None:
+    log = ActivityLog(persist=False)
+    first = log.record("p1", "pm", "early")
+    boundary = datetime.fromisoformat(first["timestamp"]) + timedelta(microseconds=1)
+    await asyncio.sleep(0.001)
+    log.record("p1", "pm", "late")
+
+    assert [a["action"] for a in (await log.query("p1", since=boundary))["activities"]] == ["late"]
+    assert [a["action"] for a in (await log.query("p1", until=boundary))["activities"]] == ["early"]
+
+
+class _Result:
+    def __init__(self, rows=(), keys=()):
+        self._rows = list(rows)
+        self._keys = list(keys)
+
+    def fetchall(self):
+        return self._rows
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return [dict(zip(self._keys, row)) for row in self._rows]
+
+
+class _FakeActivityTable:
+    """agent_activities as a dict; SELECTs honour the keyset condition"""
+
+    def __init__(self):
+        self.rows = {}
+        self.inserts = 0
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        if "information_schema" in sql:
+            return _Result([("agent_activities", column) for column in ACTIVITY_COLUMNS])
+        if sql.startswith("INSERT"):
+            self.inserts += 1
+            for row in params:
+                self.rows.setdefault(row["id"], row)
+            return _Result()
+        rows = [r for r in self.rows.values() if r["project_id"] == params["project_id"]]
+        if "cursor_at" in params:
+            rows = [r for r in rows if (r["created_at"], r["id"]) < (params["cursor_at"], params["cursor_id"])]
+        rows.sort(key=lambda r: (r["created_at"], r["id"]), reverse=True)
+        rows = rows[:params["count"]]
+        return _Result([tuple(r[c] for c in ACTIVITY_COLUMNS) for r in rows], ACTIVITY_COLUMNS)
+
+    async def commit(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_activities_are_written_behind_and_visible_to_other_workers(monkeypatch) -> None:
+    table = _FakeActivityTable()
+
+    @asynccontextmanager
+    async def _context():
+        yield table
+
+    monkeypatch.setattr(activity_log, "get_db_context", _context)
+    monkeypatch.setattr(schema_cache_module, "_schema_cache_instance", SchemaCache(ttl_seconds=60))
+
+    worker_a = ActivityLog(buffer_size=10, flush_interval=0.01)
+    for i in range(30):
+        worker_a.record("p1", "data_engineer", "clean", str(i))
+    assert table.inserts == 0
+
+    await asyncio.sleep(0.05)
+    assert table.inserts == 1 and len(table.rows) == 30
+    assert worker_a.get_stats()["pending"] == 0
+
+    # Another worker (or a restarted one) pages through the full history,
+    # although each in-memory buffer only holds the last 10 entries
+    worker_b = ActivityLog(buffer_size=10)
+    worker_b.record("p1", "pm", "review")
+    entries, pages = await _read_all(worker_b, "p1", limit=8)
+    assert [a["detail"] for a in entries[:30]] == [str(i) for i in range(30)]
+    assert entries[-1]["action"] == "review"
+    assert pages == 4
+    assert (await worker_b.query("p1", limit=5))["source"] == "database"
+
+
+@pytest.mark.asyncio
+async def test_missing_table_is_rechecked_after_the_interval(monkeypatch) -> None:
+    table = _FakeActivityTable()
+    migrated = False
+
+    class _Session:
+        async def execute(self, statement, params=None):
+            if "information_schema" in str(statement) and not migrated:
+                return _Result()
+            return await table.execute(statement, params)
+
+        async def commit(self):
+            pass
+
+    @asynccontextmanager
+    async def _context():
+        yield _Session()
+
+    monkeypatch.setattr(activity_log, "get_db_context", _context)
+    monkeypatch.setattr(schema_cache_module, "_schema_cache_instance", SchemaCache(ttl_seconds=600))
+
+    log = ActivityLog(flush_interval=0, table_recheck_seconds=0.05)
+    log.record("p1", "pm", "before migration")
+    await log.flush()
+    assert log.get_stats()["persisted"] is False and log.get_stats()["pending"] == 0
+
+    migrated = True
+    log.record("p1", "pm", "not yet rechecked")
+    assert log.get_stats()["pending"] == 0
+    await asyncio.sleep(0.06)
+    log.record("p1", "pm", "after migration")
+    await log.flush()
+    assert log.get_stats()["persisted"] is True
+    assert [row["action"] for row in table.rows.values()] == ["after migration"]
@@ -0,0 +1,39 @@
+import pytest
+
+from src.models.schemas import AnalysisType
+from src.services import analysis_orchestrator as orchestrator_module
+from src.services.analysis_orchestrator import AnalysisContext, AnalysisOrchestrator
+from src.services.analysis_worker_pool import AnalysisWorkerPool
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    worker_pool = AnalysisWorkerPool(max_workers=1, shm_dir=str(tmp_path))
+    monkeypatch.setattr(orchestrator_module, "get_analysis_worker_pool", lambda: worker_pool)
+    yield worker_pool
+    worker_pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_execute_multiple_analyses_runs_modules_through_worker_pool(pool, tmp_path) -> None:
+    context = AnalysisContext(
+        project_id="p1",
+        user_id="u1",
+        dataset_id="ds1",
+        analysis_types=[AnalysisType.DESCRIPTIVE_STATS, AnalysisType.TEXT_ANALYSIS],
+        question_mappings=[],
+    )
+    rows = [{"revenue": float(i), "region": "north" if i % 2 else "south"} for i in range(2000)]
+
+    results = await AnalysisOrchestrator().execute_multiple_analyses(context, {"data": rows})
+
+    descriptive = results["descriptive_stats"]
+    assert descriptive.success is True
+    assert descriptive.data["summary"]["recordCount"] == 2000
+
+    text = results["text_analysis"]
+    assert text.success is False
+    assert text.errors == ["Unknown analysis type: text_analysis"]
+
+    # The shared-memory hand-off file is released after the run
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+import pytest
+
+from src.services import agent_orchestrator
+
+
+class _FakeStaged:
+    def __init__(self) -> None:
+        self.released = False
+
+    def release(self) -> None:
+        self.released = True
+
+
+class _FakePool:
+    def __init__(self) -> None:
+        self.staged = _FakeStaged()
+
+    async def stage(self, frame):
+        return self.staged
+
+
+def _patch_runtime(monkeypatch, durations):
+    pool = _FakePool()
+    monkeypatch.setattr(agent_orchestrator, "get_analysis_worker_pool", lambda: pool)
+
+    async def _fake_execute(analysis_type, **kwargs):
+        await asyncio.sleep(durations[analysis_type])
+        return {"success": True, "analysis_type": analysis_type, "data": {}, "metadata": {}, "errors": []}
+
+    monkeypatch.setattr(agent_orchestrator, "_execute_analysis_module", _fake_execute)
+    return pool
+
+
+@pytest.mark.asyncio
+async def test_analysis_plan_runs_concurrently_and_keeps_plan_order(monkeypatch) -> None:
+    durations = {"descriptive": 0.3, "correlation": 0.1, "regression": 0.2}
+    pool = _patch_runtime(monkeypatch, durations)
+    state = {"project_id": "p1", "session_id": "s1"}
+
+    started = time.perf_counter()
+    results = await agent_orchestrator._run_analysis_plan(
+        state, ["descriptive", "correlation", "regression", "correlation"], [{"a": 1}], "ds1"
+    )
+    elapsed = time.perf_counter() - started
+
+    assert list(results) == ["descriptive", "correlation", "regression"]
+    assert all(result["success"] for result in results.values())
+    # About as long as the slowest analysis, not the sum (0.6s)
+    assert elapsed < 0.5
+    assert pool.staged.released
+
+
+@pytest.mark.asyncio
+async def test_analysis_plan_cancels_stragglers_at_total_deadline(monkeypatch) -> None:
+    durations = {"descriptive": 0.05, "clustering": 5.0}
+    _patch_runtime(monkeypatch, durations)
+    monkeypatch.setattr(agent_orchestrator, "TOTAL_EXECUTION_TIMEOUT_MS", 300)
+    state = {"project_id": "p1", "session_id": "s1"}
+
+    started = time.perf_counter()
+    results = await agent_orchestrator._run_analysis_plan(
+        state, ["descriptive", "clustering"], [{"a": 1}], None
+    )
+
+    assert time.perf_counter() - started < 1.0
+    assert results["descriptive"]["success"] is True
+    assert results["clustering"]["success"] is False
+    assert "total execution budget" in results["clustering"]["errors"][0]
@@ -0,0 +1,94 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+from src.services.analysis_worker_pool import (
+    AnalysisPoolUnavailableError,
+    AnalysisWorkerPool,
+    UnsupportedAnalysisError,
+    resolve_analysis_module,
+)
+
+
+@pytest.fixture
+def pool(tmp_path):
+    worker_pool = AnalysisWorkerPool(max_workers=1, shm_dir=str(tmp_path))
+    yield worker_pool
+    worker_pool.shutdown()
+
+
+def test_resolve_analysis_module_aliases() -> None:
+    assert resolve_analysis_module("Descriptive").endswith("analysis_modules.descriptive_stats")
+    assert resolve_analysis_module("comparative").endswith("analysis_modules.statistical_tests")
+    with pytest.raises(UnsupportedAnalysisError):
+        resolve_analysis_module("astrology")
+
+
+@pytest.mark.asyncio
+async def test_run_descriptive_stats_in_warm_worker(pool, tmp_path) -> None:
+    frame = pd.DataFrame({
+        "revenue": [10.0, 12.5, 9.0, 14.0, 11.0],
+        "region": ["n", "s", "n", "e", "w"],
+    })
+    await pool.start()
+
+    result = await pool.run("descriptive", frame, {"project_id": "p1"})
+    again = await pool.run("descriptive", frame, {"project_id": "p1"})
+
+    assert result["success"] is True
+    assert result["data"]["summary"]["recordCount"] == 5
+    assert result["data"]["statistics"]["revenue"]["max"] == pytest.approx(14.0)
+    assert again["data"]["statistics"] == result["data"]["statistics"]
+    # Hand-off files are removed after each run
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_module_validation_error_is_returned_not_raised(pool) -> None:
+    frame = pd.DataFrame({"a": [1, 2, 3], "mixed": [1, "x", None]})
+
+    # descriptive_stats requires project_id and exits non-zero without it
+    result = await pool.run("descriptive", frame, {})
+
+    assert result["success"] is False
+    assert result["errors"]
+
+
+@pytest.mark.asyncio
+async def test_timed_out_analysis_replaces_only_its_worker(pool) -> None:
+    frame = pd.DataFrame({"revenue": [1.0, 2.0, 3.0]})
+    await pool.start()
+
+    with pytest.raises(asyncio.TimeoutError):
+        await pool.run("descriptive", frame, {"project_id": "p1"}, timeout=0.0001)
+
+    result = await pool.run("descriptive", frame, {"project_id": "p1"}, timeout=60)
+    assert result["success"] is True
+    assert pool.get_stats()["timeouts"] == 1
+    assert pool.get_stats()["idle_workers"] == 1
+
+
+@pytest.mark.asyncio
+async def test_waiting_for_a_worker_is_bounded_and_fails_once_the_pool_is_gone(pool, monkeypatch) -> None:
+    frame = pd.DataFrame({"revenue": [1.0, 2.0, 3.0]})
+    await pool.start()
+    busy = await pool._idle.get()
+
+    with pytest.raises(asyncio.TimeoutError):
+        await pool.run("descriptive", frame, {"project_id": "p1"}, timeout=60, acquire_timeout=0.05)
+
+    # The busy worker dies and no replacement can start: queued callers fail instead of hanging
+    waiter = asyncio.create_task(pool.run("descriptive", frame, {"project_id": "p1"}))
+    await asyncio.sleep(0.05)
+
+    async def _never_ready(worker):
+        raise EOFError("worker exited during start-up")
+
+    monkeypatch.setattr(pool, "_await_ready", _never_ready)
+    await pool._replace(busy)
+
+    with pytest.raises(AnalysisPoolUnavailableError):
+        await asyncio.wait_for(waiter, timeout=5)
+    with pytest.raises(AnalysisPoolUnavailableError):
+        await pool.run("descriptive", frame, {"project_id": "p1"})
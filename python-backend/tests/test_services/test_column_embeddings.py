@@ -0,0 +1,129 @@
+from contextlib import asynccontextmanager
+
+import pytest
+
+import src.db as db_module
+from src.db import schema_cache as schema_cache_module
+from src.db.schema_cache import SchemaCache
+from src.models.schemas import ColumnDefinition, ColumnType
+from src.repositories.column_embedding_repository import ColumnEmbeddingRepository
+from src.services.semantic_matching import ColumnEmbeddingGenerator, SemanticConfig
+
+
+class _FakeEmbeddings:
+    model = "fake-embedding-1"
+
+    def __init__(self):
+        self.calls = []
+
+    async def aembed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), float(index)] for index, text in enumerate(texts)]
+
+    async def aembed_query(self, text):
+        raise AssertionError("columns must be embedded in batches")
+
+
+class _InMemoryRepository:
+    def __init__(self):
+        self.rows = {}
+
+    async def find_by_content_hashes(self, embedding_model, content_hashes, dataset_id=None):
+        found = {}
+        for (row_dataset, _), row in self.rows.items():
+            if row["model"] == embedding_model and row["content_hash"] in content_hashes:
+                entry = found.setdefault(row["content_hash"], {"embedding": row["embedding"], "own": False})
+                entry["own"] = entry["own"] or row_dataset == dataset_id
+        return found
+
+    async def replace_dataset_embeddings(self, dataset_id, project_id, embedding_model, rows):
+        for row in rows:
+            self.rows[(dataset_id, row["column_name"])] = {**row, "model": embedding_model}
+        return len(rows)
+
+
+def _columns(count, renamed=None):
+    return [
+        ColumnDefinition(name=renamed if renamed and i == 0 else f"q{i}", type=ColumnType.NUMERIC)
+        for i in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_columns_are_embedded_in_batches_and_reused_by_content_hash():
+    repository = _InMemoryRepository()
+    embeddings = _FakeEmbeddings()
+    generator = ColumnEmbeddingGenerator(embedding_model=embeddings, repository=repository)
+
+    documents = await generator.generate_column_embeddings("ds1", _columns(300), project_id="p1")
+
+    assert len(documents) == 300
+    batch_size = SemanticConfig.EMBEDDING_BATCH_SIZE
+    assert len(embeddings.calls) == -(-300 // batch_size)
+    assert all(len(call) <= batch_size for call in embeddings.calls)
+    assert len(repository.rows) == 300
+
+    # A fresh process (empty memory cache) re-ingesting the same schema
+    cold_embeddings = _FakeEmbeddings()
+    cold = ColumnEmbeddingGenerator(embedding_model=cold_embeddings, repository=repository)
+    again = await cold.generate_column_embeddings("ds1", _columns(300), project_id="p1")
+
+    assert cold_embeddings.calls == []
+    assert [doc.embedding for doc in again] == [doc.embedding for doc in documents]
+
+    # Only the changed column is embedded
+    await cold.generate_column_embeddings("ds1", _columns(300, renamed="revenue"), project_id="p1")
+    assert len(cold_embeddings.calls) == 1
+    assert len(cold_embeddings.calls[0]) == 1
+
+
+class _Result:
+    def __init__(self, rows=()):
+        self._rows = list(rows)
+
+    def fetchall(self):
+        return self._rows
+
+
+class _EmbeddingTable:
+    """column_embeddings whose id is either serial (Drizzle) or String(36) (Alembic)"""
+
+    def __init__(self, serial_id):
+        self.serial_id = serial_id
+        self.inserted = []
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        if "is_identity" in sql:
+            return _Result([("id",), ("created_at",)] if self.serial_id else [("created_at",)])
+        if "information_schema" in sql:
+            return _Result([("column_embeddings", c) for c in ("id", "dataset_id", "column_name", "embedding",
+                                                               "embedding_model", "content_hash")])
+        if sql.startswith("INSERT"):
+            self.inserted.append((sql, params))
+        return _Result()
+
+    async def commit(self):
+        pass
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("serial_id", [True, False])
+async def test_replace_generates_ids_only_without_a_column_default(monkeypatch, serial_id):
+    table = _EmbeddingTable(serial_id)
+
+    @asynccontextmanager
+    async def _context():
+        yield table
+
+    monkeypatch.setattr(db_module, "get_db_context", _context)
+    monkeypatch.setattr(schema_cache_module, "_schema_cache_instance", SchemaCache(ttl_seconds=60))
+
+    rows = [{"column_name": f"c{i}", "embedding": [0.1, 0.2], "content_hash": f"h{i}"} for i in range(2)]
+    assert await ColumnEmbeddingRepository().replace_dataset_embeddings("ds1", "p1", "fake", rows) == 2
+
+    sql, params = table.inserted[0]
+    columns = sql[sql.index("(") + 1:sql.index(")")].split(", ")
+    assert ("id" in columns) is not serial_id
+    if not serial_id:
+        assert len({row["id"] for row in params}) == 2
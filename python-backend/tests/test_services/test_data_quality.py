@@ -0,0 +1,73 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.services import data_quality
+from src.services.data_quality import DataQualityCache, combine_quality, compute_quality, get_dataset_quality
+from src.services.dataset_store import DatasetStore
+
+
+def test_compute_quality_counts_nulls_blanks_and_duplicates() -> None:
+    frame = pd.DataFrame({
+        "region": ["north", "  ", None, "north", "south"],
+        "revenue": [10.0, 12.0, None, 10.0, 9.0],
+        "tags": [["a"], ["b"], None, ["a"], {"k": 1}],
+    })
+
+    report = compute_quality(frame)
+
+    assert report.na_counts == {"region": 1, "revenue": 1, "tags": 1}
+    assert report.blank_counts == {"region": 1, "revenue": 0, "tags": 0}
+    assert report.distinct_counts["region"] == 3
+    assert report.duplicate_rows == 1
+
+    summary = report.to_summary()
+    assert summary["nullCounts"] == {"region": 2, "revenue": 1, "tags": 1}
+    assert summary["completeness"] == round(11 / 15, 4)
+    assert summary["qualityScore"] == round((11 / 15) * 0.6 + (4 / 5) * 0.4, 4)
+
+
+def test_schema_columns_missing_from_frame_count_as_null() -> None:
+    report = compute_quality(pd.DataFrame({"a": [1, 2]}), columns=["a", "b"])
+
+    assert report.null_counts == {"a": 0, "b": 2}
+    assert report.to_summary()["columnCompleteness"] == {"a": 1.0, "b": 0.0}
+
+
+def test_combine_quality_finds_duplicates_across_datasets() -> None:
+    first = compute_quality(pd.DataFrame({"id": [1, 2], "v": ["x", "y"]}))
+    second = compute_quality(pd.DataFrame({"id": [2, 3], "v": ["y", "z"]}))
+    other = compute_quality(pd.DataFrame({"code": ["x"]}))
+
+    combined = combine_quality([first, second, other])
+
+    assert combined.total_rows == 5
+    assert combined.duplicate_rows == 1
+    assert combined.columns == ["id", "v", "code"]
+    assert combined.null_counts == {"id": 1, "v": 1, "code": 4}
+
+
+@pytest.mark.asyncio
+async def test_dataset_quality_is_cached_until_the_store_file_changes(tmp_path, monkeypatch) -> None:
+    store = DatasetStore(base_dir=tmp_path)
+    monkeypatch.setattr(data_quality, "get_dataset_store", lambda: store)
+    cache = DataQualityCache()
+    monkeypatch.setattr(data_quality, "_quality_cache_instance", cache)
+
+    store.write_rows("ds1", [{"a": 1}, {"a": 1}, {"a": None}])
+    first = await get_dataset_quality("ds1")
+    again = await get_dataset_quality("ds1", columns=["a"])
+
+    assert again is first
+    assert first.duplicate_rows == 1
+    assert cache.get_stats()["hits"] == 1
+
+    store.write_rows("ds1", [{"a": 1}, {"a": 2}])
+    stat = os.stat(store.path_for("ds1"))
+    os.utime(store.path_for("ds1"), ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    refreshed = await get_dataset_quality("ds1")
+    assert refreshed is not first
+    assert refreshed.duplicate_rows == 0
+    assert await get_dataset_quality("missing") is None
@@ -0,0 +1,106 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from src.db import schema_cache as schema_cache_module
+from src.db.schema_cache import SchemaCache
+from src.services import dataset_loader
+
+
+class _Result:
+    def __init__(self, rows, keys=()):
+        self._rows = rows
+        self._keys = list(keys)
+
+    def fetchall(self):
+        return self._rows
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return [dict(zip(self._keys, row)) for row in self._rows]
+
+
+class _FakeSession:
+    """Answers catalog probes and dataset selects; records every statement"""
+
+    def __init__(self, dataset_columns, dataset_rows=()):
+        self.dataset_columns = dataset_columns
+        self.dataset_rows = list(dataset_rows)
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append((sql, params))
+        if "information_schema" in sql:
+            await asyncio.sleep(0.01)
+            return _Result([("datasets", column) for column in self.dataset_columns])
+        keys = ["id"] + [c for c in dataset_loader.DATASET_PAYLOAD_COLUMNS if f'AS "{c}"' in sql]
+        return _Result([tuple(row.get(key) for key in keys) for row in self.dataset_rows], keys)
+
+    def catalog_queries(self):
+        return [sql for sql, _ in self.statements if "information_schema" in sql]
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    session = _FakeSession(
+        dataset_columns=["id", "user_id", "schema", "preview", "ingestion_metadata", "created_at"],
+        dataset_rows=[{
+            "id": "ds1",
+            "schema": '{"revenue": {"type": "number"}}',
+            "preview": [{"revenue": 1}],
+            "ingestion_metadata": {"transformedData": [{"revenue": 2}]},
+        }],
+    )
+
+    @asynccontextmanager
+    async def _context():
+        yield session
+
+    monkeypatch.setattr(dataset_loader, "get_db_context", _context)
+    monkeypatch.setattr(schema_cache_module, "_schema_cache_instance", SchemaCache(ttl_seconds=60))
+    return session
+
+
+@pytest.mark.asyncio
+async def test_schema_cache_single_flight_and_invalidate():
+    cache = SchemaCache(ttl_seconds=60)
+    session = _FakeSession(dataset_columns=["id", "preview"])
+
+    results = await asyncio.gather(*(cache.get_columns("datasets", session) for _ in range(5)))
+
+    assert all(columns == frozenset({"id", "preview"}) for columns in results)
+    assert len(session.catalog_queries()) == 1
+    assert cache.get_stats()["misses"] == 1
+
+    cache.invalidate("datasets")
+    await cache.get_columns("datasets", session)
+    assert len(session.catalog_queries()) == 2
+
+
+@pytest.mark.asyncio
+async def test_load_primary_dataset_uses_cached_schema(fake_db):
+    first = await dataset_loader.load_primary_dataset("p1", ["ds1"])
+    second = await dataset_loader.load_primary_dataset("p1", ["ds1"])
+
+    assert len(fake_db.catalog_queries()) == 1
+    assert first == second
+    assert first.id == "ds1"
+    assert first.schema == {"revenue": {"type": "number"}}
+    assert first.transformed_payloads() == [[{"revenue": 2}], None]
+
+    dataset_sql, params = fake_db.statements[-1]
+    assert "project_datasets" in dataset_sql
+    # No legacy datasets.project_id column in this schema, and no missing JSON columns selected
+    assert "OR d.project_id" not in dataset_sql
+    assert '"metadata"' not in dataset_sql
+    assert params == {"project_id": "p1", "dataset_ids": ["ds1"], "limit": 1}
+
+
+@pytest.mark.asyncio
+async def test_load_project_dataset_ids_skips_payload_columns(fake_db):
+    assert await dataset_loader.load_project_dataset_ids("p1") == ["ds1"]
+    assert '"preview"' not in fake_db.statements[-1][0]
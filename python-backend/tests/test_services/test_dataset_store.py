@@ -0,0 +1,89 @@
+import pytest
+
+from src.services import dataset_store as dataset_store_module
+from src.services.dataset_store import DatasetStore, rows_to_table
+
+
+def _rows(count: int) -> list:
+    return [
+        {"id": i, "region": "north" if i % 2 else "south", "revenue": float(i) * 1.5}
+        for i in range(count)
+    ]
+
+
+def test_write_and_read_round_trip(tmp_path) -> None:
+    store = DatasetStore(base_dir=tmp_path)
+    pointer = store.write_rows("ds-1", _rows(25))
+
+    assert pointer.row_count == 25
+    assert pointer.columns == ["id", "region", "revenue"]
+    assert store.exists("ds-1")
+    assert store.columns("ds-1") == ["id", "region", "revenue"]
+    assert store.row_count("ds-1") == 25
+
+    frame = store.read("ds-1")
+    assert len(frame) == 25
+    assert frame["revenue"].iloc[4] == pytest.approx(6.0)
+
+
+def test_read_prunes_columns_and_ignores_unknown(tmp_path) -> None:
+    store = DatasetStore(base_dir=tmp_path)
+    store.write_rows("ds-cols", _rows(10))
+
+    table = store.read_table("ds-cols", columns=["revenue", "missing"])
+    assert table.column_names == ["revenue"]
+
+
+def test_row_range_spans_row_groups(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(dataset_store_module, "DATASET_STORE_ROW_GROUP_SIZE", 4)
+    store = DatasetStore(base_dir=tmp_path)
+    store.write_rows("ds-range", _rows(20))
+
+    table = store.read_table("ds-range", columns=["id"], row_range=(6, 13))
+    assert table.column("id").to_pylist() == list(range(6, 13))
+
+    empty = store.read_table("ds-range", row_range=(50, 60))
+    assert empty.num_rows == 0
+
+
+def test_mixed_type_column_falls_back_to_string() -> None:
+    table = rows_to_table([{"value": 1}, {"value": "n/a"}, {"value": None}, {"value": {"a": 1}}])
+    assert table.column("value").to_pylist() == ["1", "n/a", None, '{"a": 1}']
+
+
+@pytest.mark.asyncio
+async def test_load_rows_preserves_nulls(tmp_path) -> None:
+    store = DatasetStore(base_dir=tmp_path)
+    store.write_rows("ds-null", [{"a": 1, "b": None}, {"a": None, "b": "x"}])
+
+    rows = await store.load_rows("ds-null")
+    assert rows == [{"a": 1, "b": None}, {"a": None, "b": "x"}]
+
+
+@pytest.mark.asyncio
+async def test_load_missing_dataset_without_database_is_empty(tmp_path) -> None:
+    store = DatasetStore(base_dir=tmp_path)
+
+    frame = await store.load("does-not-exist")
+    assert frame.empty
+    assert await store.load_rows("does-not-exist") == []
+
+
+def test_concurrent_writers_use_their_own_temp_files(tmp_path, monkeypatch) -> None:
+    store = DatasetStore(base_dir=tmp_path)
+    upload = store.open_writer("ds-race")
+    backfill = store.open_writer("ds-race")
+    upload.write_rows(_rows(30))
+    backfill.write_rows(_rows(10))
+
+    assert backfill.close().row_count == 10
+    assert upload.close().row_count == 30
+    assert store.row_count("ds-race") == 30
+
+    def _fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(dataset_store_module.os, "replace", _fail)
+    with pytest.raises(OSError):
+        store.write_rows("ds-race", _rows(5))
+    assert [p.name for p in tmp_path.iterdir()] == ["ds-race.parquet"]
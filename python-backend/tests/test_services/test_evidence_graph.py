@@ -0,0 +1,218 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from src.db import schema_cache as schema_cache_module
+from src.db.schema_cache import SchemaCache
+from src.models.schemas import EvidenceLink, LinkType
+from src.services import evidence_graph
+from src.services.evidence_graph import EVIDENCE_LINK_COLUMNS, EVIDENCE_REVISION_COLUMN, EvidenceGraph
+
+
+def _link(project_id, source, target, link_type, link_id=None):
+    source_type, source_id = source
+    target_type, target_id = target
+    return EvidenceLink(
+        id=link_id or f"{project_id}:{source_id}->{target_id}",
+        project_id=project_id,
+        source_type=source_type,
+        source_id=source_id,
+        target_type=target_type,
+        target_id=target_id,
+        link_type=link_type,
+        confidence=0.9,
+    )
+
+
+def _chain(project_id, question_id, elements=3):
+    links = []
+    for e in range(elements):
+        element = ("element", f"{question_id}_col{e}")
+        links.append(_link(project_id, ("question", question_id), element, LinkType.QUESTION_ELEMENT))
+        links.append(_link(project_id, element, ("transformation", f"{question_id}_t"), LinkType.ELEMENT_TRANSFORMATION))
+    links.append(_link(project_id, ("transformation", f"{question_id}_t"), ("insight", f"{question_id}_i"),
+                       LinkType.TRANSFORMATION_INSIGHT))
+    return links
+
+
+def test_traverse_follows_only_the_question_chain() -> None:
+    graph = EvidenceGraph(persist=False)
+    for q in range(2000):
+        graph.add_links(_chain("p1", f"q{q}"))
+    graph.add_links(_chain("p2", "q7"))
+
+    chain = graph.traverse("p1", "question", "q7")
+    assert len(chain) == 7
+    assert [link.link_type for link in chain[:3]] == [LinkType.QUESTION_ELEMENT] * 3
+    assert chain[-1].target_id == "q7_i"
+    assert all(link.project_id == "p1" for link in chain)
+
+    upstream = graph.traverse("p1", "insight", "q7_i", direction="upstream")
+    assert {link.source_id for link in upstream} >= {"q7", "q7_t"}
+
+    only_elements = graph.traverse("p1", "question", "q7", link_types=[LinkType.QUESTION_ELEMENT])
+    assert len(only_elements) == 3
+
+    # Rebuilding a chain replaces links with the same IDs
+    graph.add_links(_chain("p1", "q7"))
+    assert len(graph.links_for_project("p1")) == 2000 * 7
+    assert len(graph.outgoing("p1", "question", "q7")) == 3
+
+
+class _Result:
+    def __init__(self, rows=(), keys=()):
+        self._rows = list(rows)
+        self._keys = list(keys)
+
+    def fetchall(self):
+        return self._rows
+
+    def first(self):
+        return self._rows[0] if self._rows else None
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return [dict(zip(self._keys, row)) for row in self._rows]
+
+
+class _FakeEvidenceTable:
+    """evidence_links backed by a dict; records every statement"""
+
+    def __init__(self):
+        self.rows = {}
+        self.inserts = 0
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        if "information_schema" in sql:
+            columns = (*EVIDENCE_LINK_COLUMNS, EVIDENCE_REVISION_COLUMN)
+            return _Result([("evidence_links", column) for column in columns])
+        if sql.startswith("INSERT"):
+            self.inserts += 1
+            for row in params:
+                previous = self.rows.get(row["id"])
+                revision = previous[EVIDENCE_REVISION_COLUMN] + 1 if previous else 1
+                self.rows[row["id"]] = {**row, EVIDENCE_REVISION_COLUMN: revision}
+            return _Result()
+        rows = [r for r in self.rows.values() if r["project_id"] == params["project_id"]]
+        if "COUNT(*)" in sql:
+            return _Result([(len(rows), sum(r[EVIDENCE_REVISION_COLUMN] for r in rows))])
+        return _Result([tuple(r[c] for c in EVIDENCE_LINK_COLUMNS) for r in rows], EVIDENCE_LINK_COLUMNS)
+
+    async def commit(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_links_are_written_behind_in_batches_and_reloaded(monkeypatch) -> None:
+    table = _FakeEvidenceTable()
+
+    @asynccontextmanager
+    async def _context():
+        yield table
+
+    monkeypatch.setattr(evidence_graph, "get_db_context", _context)
+    monkeypatch.setattr(schema_cache_module, "_schema_cache_instance", SchemaCache(ttl_seconds=60))
+
+    writer = EvidenceGraph(flush_interval=0.01)
+    for q in range(5):
+        writer.add_links(_chain("p1", f"q{q}"))
+    assert table.inserts == 0
+
+    await asyncio.sleep(0.05)
+    assert table.inserts == 1
+    assert len(table.rows) == 35
+    assert writer.get_stats()["pending"] == 0
+
+    # A restarted process rebuilds the project's graph from the table
+    reader = EvidenceGraph()
+    await reader.ensure_loaded("p1")
+    assert len(reader.traverse("p1", "question", "q3")) == 7
+    assert reader.get_stats()["loaded"] == 35
+
+    # Nothing changed: no second load
+    await reader.ensure_loaded("p1")
+    assert reader.get_stats()["loaded"] == 35
+
+    # Another worker updates an existing link and adds one; counts alone miss the update
+    version = await reader.persisted_version("p1")
+    updated = writer.get("p1:q0->q0_col0").model_copy(update={"confidence": 0.1})
+    writer.add_links([updated, _link("p1", ("question", "q9"), ("element", "e9"), LinkType.QUESTION_ELEMENT)])
+    await writer.flush()
+    assert await reader.persisted_version("p1") != version
+
+    await reader.ensure_loaded("p1")
+    assert reader.get("p1:q0->q0_col0").confidence == pytest.approx(0.1)
+    assert reader.get("p1:q9->e9") is not None
+    assert reader.get_stats()["loaded"] == 37
+
+
+class _StrictEvidenceTable(_FakeEvidenceTable):
+    """Refuses rows whose source_id does not fit String(64), like the real column"""
+
+    def begin_nested(self):
+        @asynccontextmanager
+        async def _savepoint():
+            yield
+
+        return _savepoint()
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        if sql == "SELECT 1":
+            return _Result([(1,)])
+        if sql.startswith("INSERT"):
+            rows = params if isinstance(params, list) else [params]
+            if any(len(row["source_id"]) > 64 for row in rows):
+                raise ValueError("value too long for type character varying(64)")
+            return await super().execute(statement, rows)
+        return await super().execute(statement, params)
+
+
+@pytest.mark.asyncio
+async def test_one_bad_link_is_quarantined_without_blocking_the_batch(monkeypatch) -> None:
+    table = _StrictEvidenceTable()
+
+    @asynccontextmanager
+    async def _context():
+        yield table
+
+    monkeypatch.setattr(evidence_graph, "get_db_context", _context)
+    monkeypatch.setattr(schema_cache_module, "_schema_cache_instance", SchemaCache(ttl_seconds=60))
+
+    graph = EvidenceGraph(flush_interval=60)
+    graph.add_links(_chain("p1", "q1"))
+    graph.add_link(_link("p1", ("question", "q" * 100), ("element", "e"), LinkType.QUESTION_ELEMENT, "bad"))
+
+    assert await graph.flush() == 7
+    assert len(table.rows) == 7 and "bad" not in table.rows
+    stats = graph.get_stats()
+    assert stats["pending"] == 0 and stats["rejected"] == 1 and stats["flush_errors"] == 0
+    assert graph.get_rejected()[0]["link"].id == "bad"
+    assert graph.get("bad") is not None  # still served from memory
+
+
+@pytest.mark.asyncio
+async def test_unreachable_database_backs_off_and_bounds_the_queue(monkeypatch) -> None:
+    attempts = []
+
+    @asynccontextmanager
+    async def _context():
+        attempts.append(asyncio.get_running_loop().time())
+        raise ConnectionError("database unavailable")
+        yield
+
+    monkeypatch.setattr(evidence_graph, "get_db_context", _context)
+
+    graph = EvidenceGraph(flush_interval=0.01, max_pending=10, max_backoff=0.05)
+    graph.add_links(_chain("p1", "q1") + _chain("p1", "q2"))
+    assert graph.get_stats()["dropped_pending"] == 4
+
+    await asyncio.sleep(0.2)
+    stats = graph.get_stats()
+    # Retried on its own, without another write, and never beyond the bound
+    assert stats["flush_errors"] >= 2 and stats["pending"] == 10
+    await graph.close()
@@ -0,0 +1,137 @@
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+
+from src.db import schema_cache as schema_cache_module
+from src.db.schema_cache import SchemaCache
+from src.repositories import project_repository as project_repository_module
+from src.services.journey_state import (
+    JourneyVersionConflict,
+    build_journey_patch,
+    patch_journey_progress,
+    update_journey_key,
+)
+
+
+def test_patch_carries_only_the_changed_keys() -> None:
+    expression, params = build_journey_patch(
+        set_values={"currentStep": "results"},
+        merge={"payment": {"isPaid": True}},
+        append={"checkpoints": [{"id": "c1"}]},
+        remove=["executionResults"],
+    )
+
+    assert " - CAST(:jp_remove_0 AS text)" in expression
+    assert expression.count("||") == 5  # set, merge + its base, append + its base
+    assert json.loads(params["jp_set"]) == {"currentStep": "results"}
+    assert (params["jp_merge_key_0"], json.loads(params["jp_merge_0"])) == ("payment", {"isPaid": True})
+    assert json.loads(params["jp_append_0"]) == [{"id": "c1"}]
+    assert params["jp_remove_0"] == "executionResults"
+
+
+class _Result:
+    def __init__(self, rows=()):
+        self._rows = list(rows)
+
+    def fetchall(self):
+        return self._rows
+
+    def first(self):
+        return self._rows[0] if self._rows else None
+
+
+class _FakeProjects:
+    """One projects row; a concurrent writer bumps the version before the first write"""
+
+    def __init__(self, journey, concurrent_writes=0):
+        self.journey = journey
+        self.version = 0
+        self.concurrent_writes = concurrent_writes
+        self.writes = []
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        if "information_schema" in sql:
+            return _Result([("projects", c) for c in ("id", "journey_progress", "journey_progress_version")])
+        if sql.startswith("SELECT 1"):
+            return _Result([(1,)])
+        if sql.startswith("SELECT"):
+            value = self.journey.get(params["jp_key_0"])
+            return _Result([(self.version, None if value is None else json.dumps(value))])
+
+        self.writes.append(params)
+        if self.concurrent_writes:
+            self.concurrent_writes -= 1
+            self.version += 1
+        if params.get("jp_expected_version", self.version) != self.version:
+            return _Result()
+        self.journey.update(json.loads(params["jp_set"]))
+        self.version += 1
+        return _Result([(params["jp_project_id"], self.version)])
+
+    async def commit(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def _schema_cache(monkeypatch):
+    monkeypatch.setattr(schema_cache_module, "_schema_cache_instance", SchemaCache(ttl_seconds=60))
+
+
+@pytest.mark.asyncio
+async def test_conditional_update_retries_against_the_fresh_value() -> None:
+    table = _FakeProjects(
+        {"checkpoints": [{"id": "c1"}, {"id": "c2"}], "analysisResults": {"rows": "x" * 1000}},
+        concurrent_writes=1,
+    )
+    seen = []
+
+    def approve(checkpoints):
+        seen.append(len(checkpoints))
+        checkpoints[1]["status"] = "approved"
+        return checkpoints
+
+    result = await update_journey_key(table, "p1", "checkpoints", approve)
+
+    assert seen == [2, 2]  # re-run after the conflicting write
+    assert result.applied and result.version == 2
+    assert table.journey["checkpoints"][1]["status"] == "approved"
+    # Each attempt wrote the checkpoints only, never the rest of the document
+    assert [set(json.loads(w["jp_set"])) for w in table.writes] == [{"checkpoints"}] * 2
+
+    skipped = await update_journey_key(table, "p1", "checkpoints", lambda checkpoints: None)
+    assert not skipped.applied and len(table.writes) == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_version_raises_conflict() -> None:
+    table = _FakeProjects({}, concurrent_writes=10)
+
+    with pytest.raises(JourneyVersionConflict):
+        await patch_journey_progress(table, "p1", set_values={"currentStep": "results"}, expected_version=0)
+    with pytest.raises(JourneyVersionConflict):
+        await update_journey_key(table, "p1", "payment", lambda payment: {"isPaid": True}, max_retries=3)
+    assert len(table.writes) == 4
+
+
+@pytest.mark.asyncio
+async def test_repository_merge_is_a_versioned_patch(monkeypatch) -> None:
+    table = _FakeProjects({"checkpoints": [{"id": "c1"}], "currentStep": "data"})
+
+    @asynccontextmanager
+    async def _context():
+        yield table
+
+    async def _find_by_id(self, project_id):
+        return project_id
+
+    monkeypatch.setattr(project_repository_module, "get_db_context", _context)
+    monkeypatch.setattr(project_repository_module.ProjectRepository, "find_by_id", _find_by_id)
+
+    result = await project_repository_module.ProjectRepository().update_journey_progress("p1", {"currentStep": "results"})
+
+    assert result == "p1"
+    assert table.version == 1
+    assert json.loads(table.writes[0]["jp_set"]) == {"currentStep": "results"}
+    assert table.journey["checkpoints"] == [{"id": "c1"}]
@@ -0,0 +1,87 @@
+import pytest
+
+from src.services.knowledge_graph import KnowledgeAdjacencyCache
+from src.services.knowledge_service import KnowledgeService
+
+
+class _FakeEdgeRepo:
+    """knowledge_edges as a list; counts queries"""
+
+    def __init__(self, edges):
+        self.edges = edges
+        self.queries = 0
+
+    async def find_all(self, limit=None):
+        self.queries += 1
+        return list(self.edges[:limit] if limit is not None else self.edges)
+
+    async def find_by_from_nodes(self, from_node_ids, relationships=None, min_weight=None):
+        self.queries += 1
+        wanted = set(from_node_ids)
+        return [
+            e for e in self.edges
+            if e["from_node_id"] in wanted
+            and (relationships is None or e["relationship"] in relationships)
+            and (min_weight is None or e["weight"] >= min_weight)
+        ]
+
+
+def _tree_edges(fanout=6, depth=3):
+    edges, level = [], ["root"]
+    for d in range(depth):
+        next_level = []
+        for parent in level:
+            for i in range(fanout):
+                child = f"{parent}.{i}"
+                edges.append({
+                    "id": f"e{len(edges)}", "from_node_id": parent, "to_node_id": child,
+                    "relationship": "supports" if i % 2 == 0 else "relates_to", "weight": 0.5 if i else 1.0,
+                })
+                next_level.append(child)
+        level = next_level
+    # Cycle back to the root must not be revisited
+    edges.append({"id": "cycle", "from_node_id": "root.0.0", "to_node_id": "root",
+                  "relationship": "supports", "weight": 1.0})
+    return edges
+
+
+def _service(repo, cache):
+    return KnowledgeService(node_repo=object(), edge_repo=repo, pattern_repo=object(),
+                            feedback_repo=object(), adjacency_cache=cache)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cache_enabled", [True, False])
+async def test_related_nodes_expand_one_frontier_per_query(cache_enabled) -> None:
+    repo = _FakeEdgeRepo(_tree_edges())
+    service = _service(repo, KnowledgeAdjacencyCache(enabled=cache_enabled))
+
+    nodes = await service.get_related_nodes("root", max_depth=3)
+    assert len(nodes) == 6 + 36 + 216
+    assert [n["distance"] for n in nodes] == sorted(n["distance"] for n in nodes)
+    assert "root" not in {n["id"] for n in nodes}
+    assert repo.queries == (1 if cache_enabled else 3)
+
+    by_id = {n["id"]: n for n in nodes}
+    assert by_id["root.1.0"]["path_weight"] == pytest.approx(0.5)
+    assert by_id["root.1.1.1"]["path_weight"] == pytest.approx(0.125)
+
+    supports = await service.get_related_nodes("root", max_depth=3, relationships=["supports"], min_weight=0.75)
+    assert [n["id"] for n in supports] == ["root.0", "root.0.0", "root.0.0.0"]
+
+
+@pytest.mark.asyncio
+async def test_adjacency_cache_sees_new_edges_and_respects_budget() -> None:
+    repo = _FakeEdgeRepo(_tree_edges(fanout=2, depth=1))
+    cache = KnowledgeAdjacencyCache()
+    service = _service(repo, cache)
+    assert len(await service.get_related_nodes("root.1")) == 0
+
+    cache.add_edge({"id": "new", "from_node_id": "root.1", "to_node_id": "x",
+                    "relationship": "recommends", "weight": 1.0})
+    assert [n["id"] for n in await service.get_related_nodes("root.1")] == ["x"]
+    assert repo.queries == 1
+
+    small = KnowledgeAdjacencyCache(max_edges=1)
+    assert not await small.ensure_loaded(repo)
+    assert small.get_stats()["too_large"] == 1
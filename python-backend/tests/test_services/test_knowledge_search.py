@@ -0,0 +1,138 @@
+from contextlib import asynccontextmanager
+
+import pytest
+
+from src.db import schema_cache as schema_cache_module
+from src.db.schema_cache import SchemaCache
+from src.repositories import knowledge_node_repository as repo_module
+from src.repositories.knowledge_node_repository import KnowledgeNodeRepository
+from src.services.knowledge_search import BM25Index, KnowledgeSearchIndex
+from src.services.knowledge_service import KnowledgeService
+
+
+def test_bm25_ranks_and_filters_types_before_limit() -> None:
+    index = BM25Index()
+    index.add("churn", "Churn Analysis identify drivers of churn churn_rate", "analysis_type")
+    index.add("retention", "Retention KPI track retained customers churn", "kpi")
+    for i in range(50):
+        index.add(f"filler{i}", f"Revenue report {i} quarterly revenue", "report")
+
+    assert [doc for doc, _ in index.search("churn drivers")] == ["churn", "retention"]
+    # The single KPI match is returned even though better non-KPI matches exist
+    assert [doc for doc, _ in index.search("churn", limit=1, doc_types=["KPI"])] == ["retention"]
+    assert index.search("nothing matches") == []
+
+    index.add("churn", "Pricing elasticity", "analysis_type")
+    assert [doc for doc, _ in index.search("churn")] == ["retention"]
+    assert index.remove("retention") and index.search("churn") == []
+
+
+class _OfflineNodeRepo:
+    """No database: every query fails"""
+
+    async def search_ranked(self, *args, **kwargs):
+        raise ConnectionError("database unavailable")
+
+    async def content_version(self):
+        raise ConnectionError("database unavailable")
+
+    async def find_all(self, limit=None):
+        raise ConnectionError("database unavailable")
+
+
+class _PatternRepo:
+    async def create(self, model):
+        model.id = "pattern-1"
+        return model
+
+
+@pytest.mark.asyncio
+async def test_search_falls_back_to_in_process_index() -> None:
+    search_index = KnowledgeSearchIndex()
+    search_index.add_node({"id": "n1", "type": "kpi", "title": "Retention KPI",
+                           "content": {"description": "Track retained entities over time."}, "confidence": 0.9})
+    service = KnowledgeService(node_repo=_OfflineNodeRepo(), edge_repo=object(), pattern_repo=_PatternRepo(),
+                               feedback_repo=object(), search_index=search_index)
+
+    await service.learn_from_analysis({"name": "retention_cohorts", "analysis_type": "time_series", "success": True})
+
+    results = await service.search_knowledge("retention", limit=5)
+    assert {r["id"] for r in results} == {"n1", "pattern-1"}
+    assert 0 < results[1]["relevance"] <= results[0]["relevance"] < 1
+    assert [r["id"] for r in await service.search_knowledge("retention", node_types=["analysis_pattern"])] == ["pattern-1"]
+
+
+class _TableRepo:
+    """knowledge_nodes rows written by other processes"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.loads = 0
+
+    async def content_version(self):
+        return len(self.rows), max((r["updated_at"] for r in self.rows), default=None)
+
+    async def find_all(self, limit=None):
+        self.loads += 1
+        return list(self.rows)
+
+
+@pytest.mark.asyncio
+async def test_index_reloads_when_the_table_version_changes() -> None:
+    repo = _TableRepo([{"id": "n1", "type": "kpi", "title": "Retention KPI", "updated_at": 1}])
+    search_index = KnowledgeSearchIndex(refresh_seconds=0)
+    search_index.add_node({"id": "pattern-1", "type": "analysis_pattern", "title": "Retention cohorts"})
+
+    await search_index.ensure_loaded(repo)
+    await search_index.ensure_loaded(repo)
+    assert repo.loads == 1  # unchanged version: no reload
+
+    repo.rows = [{"id": "n2", "type": "kpi", "title": "Retention rate", "updated_at": 2}]
+    await search_index.ensure_loaded(repo)
+    hits = {node["id"] for node, _ in search_index.search("retention")}
+    # The node deleted elsewhere is gone; in-process adds are kept
+    assert hits == {"n2", "pattern-1"}
+    assert search_index.get_stats()["reloads"] == 1
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchall(self):
+        return self._rows
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+
+@pytest.mark.asyncio
+async def test_repository_reads_the_drizzle_columns(monkeypatch) -> None:
+    statements = []
+
+    class _Session:
+        async def execute(self, statement, params=None):
+            sql = str(statement)
+            if "information_schema" in sql:
+                return _Result([("knowledge_nodes", c) for c in (
+                    "id", "type", "label", "summary", "attributes", "search_vector", "created_at", "updated_at",
+                )])
+            statements.append(sql)
+            return _Result([{"id": "n1", "type": "kpi", "title": "Retention", "content": {}, "rank": 0.5}])
+
+    @asynccontextmanager
+    async def _context():
+        yield _Session()
+
+    monkeypatch.setattr(repo_module, "get_db_context", _context)
+    monkeypatch.setattr(schema_cache_module, "_schema_cache_instance", SchemaCache(ttl_seconds=60))
+
+    repo = KnowledgeNodeRepository()
+    assert (await repo.search_ranked("retention"))[0]["title"] == "Retention"
+    assert (await repo.find_all(limit=10))[0]["id"] == "n1"
+    for sql in statements:
+        assert "label AS title" in sql and "NULL AS confidence" in sql
+        assert "NULL AS source" in sql and "jsonb_build_object('summary', summary" in sql
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from src.services.llm_gateway import GatewayProvider, GeminiProvider, LLMGateway, ResponseCache, StubProvider
+
+
+class _TrackingProvider(GatewayProvider):
+    name = "tracking"
+
+    def __init__(self, fail: bool = False):
+        super().__init__("tracking-model")
+        self.fail = fail
+        self.active = 0
+        self.peak = 0
+
+    async def generate(self, prompt, temperature, max_tokens):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.02)
+            if self.fail:
+                raise RuntimeError("provider down")
+            return f"answer:{prompt}"
+        finally:
+            self.active -= 1
+
+
+@pytest.mark.asyncio
+async def test_identical_prompts_share_one_call_and_then_hit_the_cache():
+    stub = StubProvider(latency_ms=20)
+    gateway = LLMGateway(providers=[stub])
+
+    results = await asyncio.gather(*(gateway.generate("suggest questions") for _ in range(10)))
+    again = await gateway.generate("suggest questions")
+
+    assert len(set(results)) == 1 and again == results[0]
+    assert stub.calls == 1
+    stats = gateway.get_stats()
+    assert stats["coalesced"] == 9
+    assert stats["cache_hits"] == 1
+
+    # A different temperature is a different cache entry
+    await gateway.generate("suggest questions", temperature=0.2)
+    assert stub.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_provider_concurrency_limit_and_fallback():
+    failing = _TrackingProvider(fail=True)
+    failing.name = "failing"
+    healthy = _TrackingProvider()
+    gateway = LLMGateway(providers=[failing, healthy], max_concurrency=10, provider_concurrency=3)
+
+    results = await asyncio.gather(*(gateway.generate(f"prompt {i}") for i in range(12)))
+
+    assert results == [f"answer:prompt {i}" for i in range(12)]
+    assert healthy.peak <= 3
+    assert gateway.get_stats()["provider_failures"]["failing"] == 12
+
+
+@pytest.mark.asyncio
+async def test_cache_entries_expire_and_evict():
+    cache = ResponseCache(max_entries=2, ttl_seconds=60)
+    cache.put(("p", "m", "a", 0.7, 10), "A")
+    cache.put(("p", "m", "b", 0.7, 10), "B")
+    cache.get(("p", "m", "a", 0.7, 10))
+    cache.put(("p", "m", "c", 0.7, 10), "C")
+
+    assert cache.get(("p", "m", "b", 0.7, 10)) is None
+    assert cache.get(("p", "m", "a", 0.7, 10)) == "A"
+
+    expired = ResponseCache(max_entries=2, ttl_seconds=0.01)
+    expired.put(("p", "m", "a", 0.7, 10), "A")
+    await asyncio.sleep(0.02)
+    assert expired.get(("p", "m", "a", 0.7, 10)) is None
+
+
+class _FakeGeminiModel:
+    def __init__(self):
+        self.calls = []
+
+    async def generate_content_async(self, prompt, **kwargs):
+        self.calls.append(kwargs)
+        return type("Response", (), {"text": f"gemini:{prompt}"})()
+
+
+@pytest.mark.asyncio
+async def test_gemini_keeps_model_defaults_unless_the_caller_chooses():
+    gemini = GeminiProvider()
+    gemini._model = _FakeGeminiModel()
+    gateway = LLMGateway(providers=[gemini])
+
+    assert await gateway.generate("summarize") == "gemini:summarize"
+    await gateway.generate("summarize", max_tokens=256)
+
+    assert gemini._model.calls == [{}, {"generation_config": {"max_output_tokens": 256}}]
+    with pytest.raises(TypeError):
+        GatewayProvider("abstract")
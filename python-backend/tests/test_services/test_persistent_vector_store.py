@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from src.services.persistent_vector_store import PersistentVectorStore
+
+
+def test_collections_persist_and_are_memory_mapped(tmp_path) -> None:
+    writer = PersistentVectorStore(base_dir=tmp_path)
+    writer.upsert("columns_ds1", ["a", "b"], [[1.0, 0.0], [0.0, 1.0]], [{"column_name": "a"}, {"column_name": "b"}])
+    writer.upsert("columns_ds1", ["b", "c"], [[0.0, 2.0], [1.0, 1.0]], [{"column_name": "b2"}, {"column_name": "c"}])
+
+    # A fresh instance stands in for a restarted or second worker
+    reader = PersistentVectorStore(base_dir=tmp_path)
+    entry = reader.get("columns_ds1")
+    assert isinstance(entry.matrix, np.memmap)
+    assert not entry.matrix.flags.writeable
+    assert sorted(entry.ids) == ["a", "b", "c"]
+
+    hits = reader.search(["columns_ds1", "columns_missing"], [0.0, 1.0], k=2)
+    assert [hit.payload["column_name"] for hit in hits] == ["b2", "c"]
+    assert hits[0].score == pytest.approx(1.0)
+
+    # Rewrites by another process are picked up on the next access
+    writer.replace("columns_ds1", ["z"], [[0.0, 1.0]], [{"column_name": "z"}])
+    assert [hit.id for hit in reader.search(["columns_ds1"], [0.0, 1.0], k=5)] == ["z"]
+
+    assert reader.delete("columns_ds1")
+    assert reader.search(["columns_ds1"], [0.0, 1.0]) == []
+
+
+def test_previous_generation_survives_one_write_and_loads_retry(tmp_path, monkeypatch) -> None:
+    store = PersistentVectorStore(base_dir=tmp_path)
+    for name in ("one", "two", "three"):
+        store.replace("docs", [name], [[1.0, 0.0]])
+    files = sorted(p.name for p in store.path_for("docs").iterdir() if p.name.startswith("vectors-"))
+    assert len(files) == 2  # current and previous generation
+
+    # A concurrent writer removes the files between the manifest read and the load
+    real_load = np.load
+    calls = []
+
+    def _flaky_load(*args, **kwargs):
+        calls.append(args[0])
+        if len(calls) == 1:
+            raise FileNotFoundError(args[0])
+        return real_load(*args, **kwargs)
+
+    monkeypatch.setattr(np, "load", _flaky_load)
+    reader = PersistentVectorStore(base_dir=tmp_path)
+    assert reader.get("docs").ids == ["three"]
+    assert len(calls) == 2
+
+
+def test_search_keeps_every_collection_under_a_small_budget(tmp_path) -> None:
+    writer = PersistentVectorStore(base_dir=tmp_path)
+    names = ["c0", "c1", "c2"]
+    for row, name in enumerate(names):
+        writer.replace(name, [name], [np.eye(3)[row]])
+
+    reader = PersistentVectorStore(base_dir=tmp_path, max_bytes=12)
+    hits = reader.search_many(names, np.eye(3), k=1)
+    assert [h[0].collection for h in hits] == names
+    assert reader.get_stats()["bytes"] <= 12
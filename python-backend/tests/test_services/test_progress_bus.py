@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from src.services.analysis_orchestrator import AnalysisOrchestrator, AnalysisProgress
+from src.services.progress_bus import ProgressBus
+
+
+class _Sink:
+    def __init__(self):
+        self.messages = []
+
+    async def __call__(self, message):
+        self.messages.append(message)
+
+
+@pytest.mark.asyncio
+async def test_bursts_coalesce_per_step_and_terminal_events_keep_final_state() -> None:
+    bus = ProgressBus(frame_interval_ms=50)
+    sink = _Sink()
+
+    for progress in range(1, 100):
+        await bus.publish(("s1", "execution"), {"step": "execution", "progress": progress}, sink)
+        await bus.publish(("s1", "mapping"), {"step": "mapping", "progress": progress}, sink)
+    await bus.publish(("s1", "execution"), {"step": "execution", "progress": 100}, sink, terminal=True)
+    await bus.publish(("s1", "mapping"), {"type": "error", "step": "mapping"}, sink, terminal=True)
+
+    # Leading update per step, then the pending mapping update flushed ahead
+    # of the execution terminal event, then both terminal events
+    assert sink.messages == [
+        {"step": "execution", "progress": 1},
+        {"step": "mapping", "progress": 1},
+        {"step": "mapping", "progress": 99},
+        {"step": "execution", "progress": 100},
+        {"type": "error", "step": "mapping"},
+    ]
+    stats = bus.get_stats()
+    assert stats["published"] == 200
+    assert stats["delivered"] == 5
+    assert stats["reduction"] > 0.9
+    assert stats["pending"] == 0
+
+    # The next run of a finished step starts a fresh frame
+    await bus.publish(("s1", "execution"), {"step": "execution", "progress": 5}, sink)
+    assert sink.messages[-1] == {"step": "execution", "progress": 5}
+
+
+@pytest.mark.asyncio
+async def test_pending_update_is_delivered_when_frame_closes() -> None:
+    bus = ProgressBus(frame_interval_ms=20)
+    sink = _Sink()
+
+    for progress in (10, 20, 30):
+        await bus.publish(("s1", "upload"), {"progress": progress}, sink)
+    assert [m["progress"] for m in sink.messages] == [10]
+
+    await asyncio.sleep(0.05)
+    assert [m["progress"] for m in sink.messages] == [10, 30]
+    assert bus.get_stats()["tasks_in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_listener_notifications_are_tracked_and_coalesced(monkeypatch) -> None:
+    bus = ProgressBus(frame_interval_ms=1000)
+    orchestrator = AnalysisOrchestrator()
+    received = []
+
+    async def listener(progress):
+        received.append(progress.percentage)
+
+    async def failing_listener(progress):
+        raise RuntimeError("listener down")
+
+    orchestrator.add_progress_listener(failing_listener)
+    orchestrator.add_progress_listener(listener)
+
+    monkeypatch.setattr("src.services.analysis_orchestrator.get_progress_bus", lambda: bus)
+    for percentage in (0.0, 25.0, 50.0, 75.0, 100.0):
+        orchestrator._notify_progress(AnalysisProgress(
+            session_id="p1", step="correlation", percentage=percentage,
+            message="", timestamp=datetime.utcnow()
+        ))
+    await bus.flush()
+
+    assert received == [0.0, 100.0]
+    assert bus.get_stats()["tasks_in_flight"] == 0
+    assert bus.get_stats()["coalesced"] == 3
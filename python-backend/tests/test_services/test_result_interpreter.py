@@ -0,0 +1,101 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.models.schemas import AnalysisResult, AnalysisType, QuestionElementMapping
+from src.services.result_interpreter import ResultInterpreter
+
+
+class _FakeLLM:
+    """Answers after a delay that shrinks with the question number; tracks concurrency"""
+
+    def __init__(self, batch_reply=None):
+        self.batch_reply = batch_reply
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if "Question ID:" in prompt and self.batch_reply is not None:
+                return SimpleNamespace(content=self.batch_reply(prompt))
+            number = int(prompt.split("Question: question ")[1].split("?")[0])
+            await asyncio.sleep(0.002 * (10 - number))
+            return SimpleNamespace(content=f"Answer {number}. We recommend acting on it.")
+        finally:
+            self.in_flight -= 1
+
+
+def _questions(count):
+    return [
+        QuestionElementMapping(
+            question_id=f"q{i}", question_text=f"question {i}?", related_elements=["el_1"],
+            relevance_scores=[0.9], recommended_analyses=["descriptive_stats"], confidence=0.5,
+        )
+        for i in range(count)
+    ]
+
+
+_RESULTS = {
+    "descriptive_stats": AnalysisResult(
+        success=True, analysis_type=AnalysisType.DESCRIPTIVE_STATS, data={"summary": {"rows": 10}},
+    )
+}
+
+
+@pytest.mark.asyncio
+async def test_answers_run_concurrently_and_stream_as_they_finish() -> None:
+    llm = _FakeLLM()
+    interpreter = ResultInterpreter(llm=llm, max_concurrency=3)
+    streamed = []
+
+    async def _on_answer(answer):
+        streamed.append(answer["question_id"])
+
+    answers = await interpreter.generate_answers(_questions(8), _RESULTS, on_answer=_on_answer)
+
+    assert [a["question_id"] for a in answers] == [f"q{i}" for i in range(8)]
+    assert answers[3]["answer"].startswith("Answer 3")
+    assert answers[0]["evidence_summary"] == ["descriptive_stats: {'rows': 10}"]
+    assert llm.calls == 8 and llm.max_in_flight == 3
+    assert sorted(streamed) == sorted(a["question_id"] for a in answers)
+    assert streamed != [a["question_id"] for a in answers]  # completion order, not question order
+
+
+@pytest.mark.asyncio
+async def test_batched_answers_fall_back_per_question() -> None:
+    def _reply(prompt):
+        ids = [line.split(": ")[1] for line in prompt.splitlines() if line.startswith("Question ID:")]
+        # The model drops the last question of every batch
+        return json.dumps([{"question_id": qid, "answer": f"Batched {qid}"} for qid in ids[:-1]])
+
+    llm = _FakeLLM(batch_reply=_reply)
+    interpreter = ResultInterpreter(llm=llm, batch_size=3)
+    answers = await interpreter.generate_answers(_questions(6), _RESULTS)
+
+    assert [a["answer"].split(".")[0] for a in answers] == [
+        "Batched q0", "Batched q1", "Answer 2", "Batched q3", "Batched q4", "Answer 5",
+    ]
+    assert llm.calls == 4
+
+
+@pytest.mark.asyncio
+async def test_evidence_reflects_results_updated_in_place() -> None:
+    interpreter = ResultInterpreter(llm=_FakeLLM())
+    results = {
+        "descriptive_stats": AnalysisResult(
+            success=True, analysis_type=AnalysisType.DESCRIPTIVE_STATS, data={"summary": {"rows": 10}},
+        )
+    }
+
+    first = await interpreter.generate_answers(_questions(1), results)
+    results["descriptive_stats"].data["summary"]["rows"] = 25
+    again = await interpreter.generate_answers(_questions(1), results)
+
+    assert first[0]["evidence_summary"] == ["descriptive_stats: {'rows': 10}"]
+    assert again[0]["evidence_summary"] == ["descriptive_stats: {'rows': 25}"]
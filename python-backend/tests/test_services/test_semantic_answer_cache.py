@@ -0,0 +1,128 @@
+import hashlib
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.db import schema_cache as schema_cache_module
+from src.db.schema_cache import SchemaCache
+from src.models.schemas import EvidenceLink, LinkType
+from src.services import evidence_graph as evidence_graph_module
+from src.services.persistent_vector_store import PersistentVectorStore
+from src.services.rag_evidence_chain import EvidenceChainStore, EvidenceDocument, RAGAnswerGenerator
+
+
+class _FakeEmbeddings:
+    """Bag-of-words hashing embeddings; question case and punctuation are ignored"""
+
+    def __init__(self):
+        self.query_calls = 0
+
+    def _embed(self, text):
+        vector = np.zeros(64)
+        for word in "".join(c if c.isalnum() else " " for c in text.lower()).split():
+            vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % 64] += 1.0
+        return vector.tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    async def aembed_query(self, text):
+        self.query_calls += 1
+        return self._embed(text)
+
+
+class _FakeLLM:
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        return SimpleNamespace(content=f"answer #{self.calls}")
+
+
+@pytest.mark.asyncio
+async def test_near_identical_questions_reuse_answer_until_evidence_changes(tmp_path) -> None:
+    store = EvidenceChainStore(embedding_model=_FakeEmbeddings())
+    store.vector_stores = PersistentVectorStore(base_dir=tmp_path)
+    store.graph.persist = False
+    store.add_document("p1", EvidenceDocument("d1", "insight", "revenue grew in the west region"))
+    llm = _FakeLLM()
+    generator = RAGAnswerGenerator(store, llm=llm)
+
+    first = await generator.generate_answer("p1", "How did revenue grow in the west region?")
+    again = await generator.generate_answer("p1", "how did revenue grow in the West region", include_context=False)
+    assert llm.calls == 1
+    assert again["answer"] == first["answer"] and again["cache"]["hit"] is True
+    assert again["context"] == [] and first["context"]
+
+    # A different question, another project, or a different top_k is a miss
+    for project_id, question, top_k in [
+        ("p1", "Which products churned most?", 10),
+        ("p2", "How did revenue grow in the west region?", 10),
+        ("p1", "How did revenue grow in the west region?", 3),
+    ]:
+        assert "cache" not in await generator.generate_answer(project_id, question, top_k=top_k)
+    assert llm.calls == 2
+
+    # New links (or documents) invalidate the project's cached answers
+    store.add_link(EvidenceLink(id="l1", project_id="p1", source_type="question", source_id="q1",
+                                target_type="insight", target_id="d1", link_type=LinkType.QUESTION_ELEMENT))
+    refreshed = await generator.generate_answer("p1", "How did revenue grow in the west region?")
+    assert "cache" not in refreshed and llm.calls == 3
+
+    stats = generator.cache.get_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 5
+    assert stats["hit_rate"] == pytest.approx(1 / 6, abs=1e-4)
+
+
+class _Result:
+    def __init__(self, rows=()):
+        self._rows = list(rows)
+
+    def fetchall(self):
+        return self._rows
+
+    def first(self):
+        return self._rows[0] if self._rows else None
+
+
+class _SharedLinks:
+    """evidence_links as every worker sees it"""
+
+    def __init__(self):
+        self.rows = []
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        if "information_schema" in sql:
+            return _Result([("evidence_links", c) for c in ("id", "project_id", "created_at")])
+        rows = [r for r in self.rows if r[0] == params["project_id"]]
+        return _Result([(len(rows), max((r[1] for r in rows), default=None))])
+
+
+@pytest.mark.asyncio
+async def test_links_written_by_another_worker_invalidate_cached_answers(tmp_path, monkeypatch) -> None:
+    table = _SharedLinks()
+
+    @asynccontextmanager
+    async def _context():
+        yield table
+
+    monkeypatch.setattr(evidence_graph_module, "get_db_context", _context)
+    monkeypatch.setattr(schema_cache_module, "_schema_cache_instance", SchemaCache(ttl_seconds=60))
+
+    store = EvidenceChainStore(embedding_model=_FakeEmbeddings())
+    store.vector_stores = PersistentVectorStore(base_dir=tmp_path)
+    store.add_document("p1", EvidenceDocument("d1", "insight", "revenue grew in the west region"))
+    llm = _FakeLLM()
+    generator = RAGAnswerGenerator(store, llm=llm)
+
+    await generator.generate_answer("p1", "How did revenue grow in the west region?")
+    assert (await generator.generate_answer("p1", "How did revenue grow in the west region?"))["cache"]["hit"]
+
+    # Another process flushed a link; this process's own counter never moved
+    table.rows.append(("p1", "2026-01-01T00:00:00"))
+    refreshed = await generator.generate_answer("p1", "How did revenue grow in the west region?")
+    assert "cache" not in refreshed and llm.calls == 2
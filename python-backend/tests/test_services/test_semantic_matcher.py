@@ -0,0 +1,88 @@
+import pytest
+
+from src.services import semantic_matching
+from src.services.persistent_vector_store import PersistentVectorStore
+from src.services.semantic_matching import SemanticMatcher, column_collection
+
+
+class _FakeEmbeddings:
+    """Revenue questions point along x, everything else along y"""
+
+    def __init__(self):
+        self.document_calls = 0
+        self.query_calls = 0
+
+    async def aembed_documents(self, texts):
+        self.document_calls += 1
+        return [self._vector(text) for text in texts]
+
+    async def aembed_query(self, text):
+        self.query_calls += 1
+        return self._vector(text)
+
+    @staticmethod
+    def _vector(text):
+        return [1.0, 0.1] if "revenue" in text else [0.0, 1.0]
+
+
+class _FakeRepository:
+    def __init__(self):
+        self.calls = 0
+
+    async def search_similar_columns(self, query_embedding, dataset_id=None, limit=10):
+        self.calls += 1
+        return [{"column_name": f"{dataset_id}_remote", "similarity": 0.75}]
+
+    async def search_similar_columns_many(self, query_embeddings, dataset_id=None, limit=10):
+        self.calls += 1
+        return [[{"column_name": f"{dataset_id}_remote", "similarity": 0.75}] for _ in query_embeddings]
+
+
+@pytest.fixture
+def matcher(tmp_path, monkeypatch):
+    store = PersistentVectorStore(base_dir=tmp_path)
+    for dataset_id in ("ds1", "ds2", "ds3"):
+        store.replace(
+            column_collection(dataset_id),
+            [f"{dataset_id}_revenue", f"{dataset_id}_region"],
+            [[1.0, 0.0], [0.0, 1.0]],
+            [{"column_name": f"{dataset_id}_revenue"}, {"column_name": f"{dataset_id}_region"}],
+        )
+    # A restarted worker: fresh store instance over the same directory
+    monkeypatch.setattr(semantic_matching, "get_vector_store", lambda: PersistentVectorStore(base_dir=tmp_path))
+
+    embeddings = _FakeEmbeddings()
+    matcher = SemanticMatcher(embedding_model=embeddings)
+    matcher.column_generator._repository = _FakeRepository()
+    return matcher
+
+
+@pytest.mark.asyncio
+async def test_matcher_maps_questions_from_persisted_store(matcher) -> None:
+    mapping = await matcher._map_question_to_elements(
+        question="What drives revenue growth?", datasets=["ds1"], user_goals=[], top_k=5
+    )
+
+    assert mapping.related_columns == ["ds1_revenue"]
+    assert mapping.relevance_scores[0] > 0.99
+
+
+@pytest.mark.asyncio
+async def test_mappings_embed_each_question_once_as_a_query(matcher) -> None:
+    questions = [f"How did revenue change in week {i}?" for i in range(10)]
+    questions += [f"Which region leads segment {i}?" for i in range(10)]
+    questions += questions[:5]
+    datasets = ["ds1", "ds2", "ds3", "remote1", "remote2"]
+
+    mappings = await matcher.get_question_element_mappings(questions, datasets, user_goals=["growth"], top_k=3)
+
+    embeddings = matcher.embedding_model
+    assert embeddings.document_calls == 0
+    assert embeddings.query_calls == 20  # duplicates embedded once
+    # Only datasets without a local collection hit the database, once per dataset
+    assert matcher.column_generator.repository.calls == 2
+
+    assert [m.question_text for m in mappings] == questions
+    assert mappings[0].related_columns == ["ds1_revenue", "ds2_revenue", "ds3_revenue"]
+    assert set(mappings[19].related_columns) == {"ds1_region", "ds2_region", "ds3_region"}
+    assert mappings[-1].related_columns == mappings[4].related_columns
@@ -0,0 +1,125 @@
+import io
+import json
+
+import pytest
+
+from src.services import streaming_ingestion as streaming_module
+from src.services.dataset_store import DatasetStore
+from src.services.streaming_ingestion import (
+    StreamingIngestor,
+    iter_csv_records,
+    iter_json_records,
+)
+
+
+def _csv_bytes(count: int) -> bytes:
+    lines = ["id,region,revenue"]
+    for i in range(count):
+        lines.append(f"{i},{'north' if i % 2 else 'south'},{'' if i == 3 else i * 2}")
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def test_csv_ingestion_is_not_capped_and_writes_in_chunks(tmp_path) -> None:
+    store = DatasetStore(base_dir=tmp_path)
+    headers, records = iter_csv_records(io.BytesIO(_csv_bytes(25)))
+    ingestor = StreamingIngestor("ds-csv", columns=headers, store=store, chunk_rows=4, preview_rows=3)
+
+    result = ingestor.consume(records)
+
+    assert headers == ["id", "region", "revenue"]
+    assert result.row_count == 25
+    assert store.row_count("ds-csv") == 25
+    assert len(result.preview) == 3
+    assert result.preview[0] == {"id": "0", "region": "south", "revenue": "0"}
+
+    revenue = result.stats_metadata()["columnStats"]["revenue"]
+    assert revenue["nullCount"] == 1
+    assert revenue["numericCount"] == 24
+    assert revenue["min"] == 0
+    assert revenue["max"] == 48
+
+
+def test_json_array_streams_across_read_boundaries(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(streaming_module, "STREAM_READ_SIZE", 7)
+    rows = [{"id": i, "score": i * 1.5, "tag": f"t{i}"} for i in range(30)]
+    raw = json.dumps(rows).encode("utf-8")
+
+    headers, records = iter_json_records(io.BytesIO(raw))
+    assert headers == ["id", "score", "tag"]
+    assert list(records) == rows
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        b'{"a": 1}\n{"a": 2}\n{"a": 3}\n',
+        b'{"data": [{"a": 1}, {"a": 2}, {"a": 3}]}',
+        b'[{"a": 1}, 5, {"a": 2}, {"a": 3}]',
+    ],
+)
+def test_json_layouts(payload) -> None:
+    headers, records = iter_json_records(io.BytesIO(payload))
+    assert headers == ["a"]
+    assert [r["a"] for r in records] == [1, 2, 3]
+
+
+def test_malformed_json_raises_during_iteration() -> None:
+    headers, records = iter_json_records(io.BytesIO(b'[{"a": 1}, {"a": '))
+    assert headers == ["a"]
+    with pytest.raises(ValueError):
+        list(records)
+
+
+def test_later_chunks_promote_the_schema_instead_of_nulling(tmp_path) -> None:
+    store = DatasetStore(base_dir=tmp_path)
+    ingestor = StreamingIngestor("ds-mixed", store=store, chunk_rows=2)
+
+    result = ingestor.consume(iter([
+        {"n": 1, "price": 10, "extra": None},
+        {"n": 2, "price": 11, "extra": None},
+        {"n": "three", "price": 11.25, "extra": 7},
+        {"n": 4, "price": 12, "extra": None, "late": True},
+    ]))
+
+    table = store.read_table("ds-mixed")
+    assert result.row_count == 4
+    assert table.column("price").to_pylist() == [10.0, 11.0, 11.25, 12.0]
+    assert table.column("n").to_pylist() == ["1", "2", "three", "4"]
+    assert table.column("extra").to_pylist() == [None, None, 7, None]
+    assert result.promoted_columns == {"n": "string", "price": "double"}
+    assert result.stats_metadata()["promotedColumns"] == result.promoted_columns
+    assert result.type_conflicts == {}
+    assert result.dropped_columns == {"late": 1}
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["ds-mixed.parquet"]
+
+
+def test_failed_ingestion_leaves_no_file(tmp_path) -> None:
+    store = DatasetStore(base_dir=tmp_path)
+    ingestor = StreamingIngestor("ds-fail", store=store, chunk_rows=2)
+
+    def _records():
+        yield {"a": 1}
+        yield {"a": 2}
+        raise ValueError("bad row")
+
+    with pytest.raises(ValueError):
+        ingestor.consume(_records())
+
+    assert not store.exists("ds-fail")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_latin1_byte_after_the_first_block_switches_the_whole_file(monkeypatch) -> None:
+    monkeypatch.setattr(streaming_module, "STREAM_READ_SIZE", 16)
+    payload = ("city\n" + "Paris\n" * 20 + "Zürich\n").encode("latin-1")
+
+    headers, records = iter_csv_records(io.BytesIO(payload))
+
+    assert headers == ["city"]
+    assert [r["city"] for r in records][-1] == "Zürich"
+
+
+def test_utf8_split_across_blocks_stays_utf8(monkeypatch) -> None:
+    monkeypatch.setattr(streaming_module, "STREAM_READ_SIZE", 3)
+    headers, records = iter_csv_records(io.BytesIO("name\nJosé\nZoë\n".encode("utf-8")))
+    assert [r["name"] for r in records] == ["José", "Zoë"]
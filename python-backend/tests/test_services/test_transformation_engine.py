@@ -0,0 +1,58 @@
+import pytest
+
+from src.constants import DATASET_PREVIEW_ROWS
+from src.services import transformation_engine as transformation_engine_module
+from src.services.dataset_loader import DatasetRecord
+from src.services.dataset_store import DatasetStore
+from src.services.transformation_engine import (
+    compile_and_execute_transformation_plan,
+    transformed_dataset_id_for,
+)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = DatasetStore(base_dir=tmp_path)
+    store.write_rows("ds-1", [{"id": i, "revenue": float(i)} for i in range(1500)])
+
+    async def _load_primary_dataset(project_id, dataset_ids):
+        return DatasetRecord(id="ds-1")
+
+    monkeypatch.setattr(transformation_engine_module, "get_dataset_store", lambda: store)
+    monkeypatch.setattr(transformation_engine_module, "load_primary_dataset", _load_primary_dataset)
+    return store
+
+
+@pytest.mark.asyncio
+async def test_transformed_rows_go_to_the_store_and_results_keep_a_preview(store) -> None:
+    result = await compile_and_execute_transformation_plan(
+        "p1", ["ds-1"], [{"operation": "rename", "source_columns": ["revenue"], "target_column": "sales"}]
+    )
+
+    assert result["success"] and result["row_count"] == 1500
+    assert result["transformed_dataset_id"] == transformed_dataset_id_for("ds-1")
+    preview = result["transformed_data"]
+    assert len(preview["data"]) == len(result["preview_data"]) == DATASET_PREVIEW_ROWS
+    assert preview["row_count"] == 1500 and preview["columnarStore"]["rowCount"] == 1500
+
+    stored = store.read(result["transformed_dataset_id"])
+    assert list(stored.columns) == preview["columns"] and len(stored) == 1500
+    assert store.row_count("ds-1") == 1500  # source dataset untouched
+
+
+@pytest.mark.asyncio
+async def test_plan_without_steps_reads_only_the_preview_window(store, monkeypatch) -> None:
+    windows = []
+    load = store.load
+
+    async def _load(dataset_id, columns=None, row_range=None):
+        windows.append(row_range)
+        return await load(dataset_id, columns=columns, row_range=row_range)
+
+    monkeypatch.setattr(store, "load", _load)
+
+    result = await compile_and_execute_transformation_plan("p1", ["ds-1"], [])
+
+    assert windows == [(0, DATASET_PREVIEW_ROWS)]
+    assert result["transformed_dataset_id"] == "ds-1" and result["row_count"] == 1500
+    assert len(result["transformed_data"]["data"]) == DATASET_PREVIEW_ROWS
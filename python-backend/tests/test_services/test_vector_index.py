@@ -0,0 +1,244 @@
+import json
+from contextlib import asynccontextmanager
+
+import numpy as np
+import pytest
+
+import src.db as db_module
+from src.db import schema_cache as schema_cache_module
+from src.db.schema_cache import SchemaCache
+from src.repositories import column_embedding_repository as repo_module
+from src.repositories.column_embedding_repository import ColumnEmbeddingRepository
+from src.services.vector_index import VectorIndex
+
+
+def test_search_matches_brute_force_across_collections() -> None:
+    rng = np.random.default_rng(0)
+    matrix = rng.standard_normal((500, 32)).astype(np.float32)
+    query = rng.standard_normal(32)
+
+    index = VectorIndex()
+    index.replace("a", list(range(300)), matrix[:300])
+    index.replace("b", list(range(300, 500)), matrix[300:])
+
+    normalized = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+    scores = normalized @ (query / np.linalg.norm(query))
+    expected = list(np.argsort(-scores)[:10])
+
+    hits = index.search(query, k=10)
+    assert [hit.id for hit in hits] == expected
+    assert hits[0].score == pytest.approx(float(scores[expected[0]]), rel=1e-5)
+    assert index.search(np.ones(8), k=5) == []
+
+
+def test_memory_budget_evicts_least_recently_searched() -> None:
+    index = VectorIndex(max_bytes=2 * 10 * 4 * 4)
+    for name in ("a", "b"):
+        index.replace(name, list(range(10)), np.ones((10, 4)))
+    index.search(np.ones(4), collections=["a"])
+    index.replace("c", list(range(10)), np.ones((10, 4)))
+
+    assert sorted(index.collections()) == ["a", "c"]
+    assert index.get_stats()["bytes"] == 2 * 10 * 4 * 4
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchall(self):
+        return self._rows
+
+
+class _FakeSession:
+    """column_embeddings table without a pgvector column"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append(sql)
+        if "information_schema" in sql:
+            return _Result([("column_embeddings", c) for c in ("id", "dataset_id", "column_name", "embedding")])
+        scoped = [r for r in self.rows if not (params or {}).get("dataset_id") or r["dataset_id"] == params["dataset_id"]]
+        if "GROUP BY dataset_id" in sql:
+            counts = {}
+            for r in scoped:
+                counts[r["dataset_id"]] = counts.get(r["dataset_id"], 0) + 1
+            return _Result([(ds, n, "2026-10-16") for ds, n in counts.items()])
+        wanted = set(params["dataset_ids"])
+        return _Result([
+            (r["id"], r["dataset_id"], r["column_name"], json.dumps(r["embedding"]))
+            for r in self.rows if r["dataset_id"] in wanted
+        ])
+
+
+@pytest.mark.asyncio
+async def test_repository_searches_whole_dataset_in_process(monkeypatch):
+    rows = [
+        {"id": i, "dataset_id": "ds1", "column_name": f"col_{i}", "embedding": [1.0, i / 100.0]}
+        for i in range(100)
+    ] + [{"id": 100, "dataset_id": "ds2", "column_name": "other", "embedding": [0.0, 1.0]}]
+    session = _FakeSession(rows)
+
+    @asynccontextmanager
+    async def _context():
+        yield session
+
+    monkeypatch.setattr(db_module, "get_db_context", _context)
+    monkeypatch.setattr(schema_cache_module, "_schema_cache_instance", SchemaCache(ttl_seconds=60))
+    monkeypatch.setattr(repo_module, "_column_vector_index", None)
+    monkeypatch.setattr(repo_module, "_indexed_datasets", {})
+
+    repo = ColumnEmbeddingRepository()
+    # The best match is the last row, which a LIMIT limit*10 slice would have missed
+    results = await repo.search_similar_columns([1.0, 1.0], dataset_id="ds1", limit=3)
+    assert [r["column_name"] for r in results] == ["col_99", "col_98", "col_97"]
+    assert results[0]["similarity"] > results[1]["similarity"]
+
+    loads = len([sql for sql in session.statements if "ANY(:dataset_ids)" in sql])
+    await repo.search_similar_columns([1.0, 0.5], dataset_id="ds1", limit=3)
+    assert len([sql for sql in session.statements if "ANY(:dataset_ids)" in sql]) == loads
+
+    everywhere = await repo.search_similar_columns([0.0, 1.0], limit=1)
+    assert everywhere[0]["dataset_id"] == "ds2"
+
+
+def test_pinned_collections_survive_loads_beyond_the_budget() -> None:
+    index = VectorIndex(max_bytes=10 * 4 * 4)
+    names = ["a", "b", "c"]
+    with index.pinned(names):
+        for row, name in enumerate(names):
+            vectors = np.zeros((10, 4))
+            vectors[:, row] = 1.0
+            index.replace(name, [f"{name}{i}" for i in range(10)], vectors)
+        assert sorted(index.collections()) == names
+        hits = index.search_many(np.eye(4)[:3], k=1, collections=names)
+        assert [h[0].collection for h in hits] == names
+
+    # Back within the budget once the search is done
+    assert index.get_stats()["bytes"] <= index.max_bytes
+    assert index.get_stats()["pinned"] == 0
+
+
+@pytest.mark.asyncio
+async def test_global_search_covers_every_dataset_under_a_small_budget(monkeypatch):
+    rows = [
+        {"id": f"{ds}-{i}", "dataset_id": ds, "column_name": f"{ds}_{i}", "embedding": [1.0, float(n), float(i)]}
+        for n, ds in enumerate(("ds1", "ds2", "ds3"))
+        for i in range(4)
+    ]
+    session = _FakeSession(rows)
+
+    @asynccontextmanager
+    async def _context():
+        yield session
+
+    monkeypatch.setattr(db_module, "get_db_context", _context)
+    monkeypatch.setattr(schema_cache_module, "_schema_cache_instance", SchemaCache(ttl_seconds=60))
+    # Room for a single dataset's matrix
+    monkeypatch.setattr(repo_module, "_column_vector_index", VectorIndex(max_bytes=4 * 3 * 4))
+    monkeypatch.setattr(repo_module, "_indexed_datasets", {})
+
+    results = await ColumnEmbeddingRepository().search_similar_columns([1.0, 2.0, 0.0], limit=12)
+    assert {r["dataset_id"] for r in results} == {"ds1", "ds2", "ds3"}
+    assert results[0]["dataset_id"] == "ds3"
+
+
+@pytest.mark.asyncio
+async def test_batched_search_loads_the_dataset_once_for_every_query(monkeypatch):
+    rows = [
+        {"id": i, "dataset_id": "ds1", "column_name": f"col_{i}", "embedding": [1.0, i / 10.0]}
+        for i in range(10)
+    ]
+    session = _FakeSession(rows)
+
+    @asynccontextmanager
+    async def _context():
+        yield session
+
+    monkeypatch.setattr(db_module, "get_db_context", _context)
+    monkeypatch.setattr(schema_cache_module, "_schema_cache_instance", SchemaCache(ttl_seconds=60))
+    monkeypatch.setattr(repo_module, "_column_vector_index", None)
+    monkeypatch.setattr(repo_module, "_indexed_datasets", {})
+
+    repo = ColumnEmbeddingRepository()
+    queries = [[1.0, 1.0], [1.0, 0.0], [1.0, 0.5]]
+    batched = await repo.search_similar_columns_many(queries, dataset_id="ds1", limit=2)
+
+    assert [[r["column_name"] for r in hits] for hits in batched] == [
+        [r["column_name"] for r in await repo.search_similar_columns(query, dataset_id="ds1", limit=2)]
+        for query in queries
+    ]
+    assert batched[0][0]["column_name"] == "col_9"
+    assert len([sql for sql in session.statements if "ANY(:dataset_ids)" in sql]) == 1
+
+
+class _FakePgvectorSession:
+    """column_embeddings with an HNSW-indexed vector column
+
+    Unless the dataset's rows are materialized first, ranking goes through
+    the approximate index: its ef_search nearest rows across every dataset,
+    with the dataset filter applied afterwards.
+    """
+
+    ef_search = 100
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        if "information_schema" in sql:
+            return _Result([("column_embeddings", c) for c in ("id", "dataset_id", "column_name", "embedding_vector")])
+        if sql.startswith("SET LOCAL"):
+            return _Result([])
+
+        def _similarity(row, query):
+            a, b = np.asarray(row["embedding"]), np.asarray(query)
+            return float(a @ b / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+        queries = params["queries"] if "queries" in params else [params["query"]]
+        matches = []
+        for position, query in enumerate(json.loads(q) for q in queries):
+            ranked = sorted(self.rows, key=lambda row: -_similarity(row, query))
+            if "MATERIALIZED" not in sql:
+                ranked = ranked[:self.ef_search]
+            ranked = [r for r in ranked if not params.get("dataset_id") or r["dataset_id"] == params["dataset_id"]]
+            matches.extend(
+                (position + 1, r["id"], r["dataset_id"], r["column_name"], _similarity(r, query))
+                for r in ranked[:params["limit"]]
+            )
+        if "queries" not in params:
+            return _Result([match[1:] for match in matches])
+        return _Result(matches)
+
+
+@pytest.mark.asyncio
+async def test_pgvector_search_returns_k_matches_for_a_small_dataset_in_a_large_table(monkeypatch):
+    # 2,000 columns of other datasets sit closer to the query than the small dataset's 5
+    rows = [
+        {"id": i, "dataset_id": f"big{i % 20}", "column_name": f"col_{i}", "embedding": [1.0, 0.01 * (i % 7)]}
+        for i in range(2000)
+    ] + [
+        {"id": 5000 + i, "dataset_id": "small", "column_name": f"small_{i}", "embedding": [0.2 * i, 1.0]}
+        for i in range(5)
+    ]
+
+    @asynccontextmanager
+    async def _context():
+        yield _FakePgvectorSession(rows)
+
+    monkeypatch.setattr(db_module, "get_db_context", _context)
+    monkeypatch.setattr(schema_cache_module, "_schema_cache_instance", SchemaCache(ttl_seconds=60))
+    monkeypatch.setattr(repo_module, "PGVECTOR_DIMENSIONS", 2)
+
+    repo = ColumnEmbeddingRepository()
+    single = await repo.search_similar_columns([1.0, 0.0], dataset_id="small", limit=3)
+    batched = await repo.search_similar_columns_many([[1.0, 0.0], [0.0, 1.0]], dataset_id="small", limit=3)
+
+    assert [r["column_name"] for r in single] == ["small_4", "small_3", "small_2"]
+    assert [len(hits) for hits in batched] == [3, 3]
+    assert {r["dataset_id"] for hits in batched for r in hits} == {"small"}
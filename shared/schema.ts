@@ -44,6 +44,11 @@ const vector = customType<{ data: number[] }>({
   },
 });
 
+// Postgres full-text search vector
+const tsvector = customType<{ data: string }>({
+  dataType: () => "tsvector",
+});
+
 // User role and permission types
 export const UserRoleEnum = z.enum(["non-tech", "business", "technical", "consultation", "custom"]);
 export type UserRole = z.infer<typeof UserRoleEnum>;
@@ -737,6 +742,7 @@ export const projects = pgTable("projects", {
   journeyStartedAt: timestamp("journey_started_at"), // When user first started the journey
   journeyCompletedAt: timestamp("journey_completed_at"), // When user completed all steps
   journeyProgress: jsonb("journey_progress").default('{}'),
+  journeyProgressVersion: integer("journey_progress_version").notNull().default(0), // Bumped by every journey_progress patch (optimistic concurrency)
   executionState: jsonb("execution_state").default('{}'), // JO-1 FIX: Persist execution state across restarts
   artifactGenerationStatus: jsonb("artifact_generation_status").default('{}'), // EX-2 FIX: Track artifact generation status
 
@@ -866,6 +872,27 @@ export const insights = pgTable("insights", {
   generatedByIdx: index("insights_generated_by_idx").on(table.generatedBy),
 }));
 
+// Evidence chain links (question -> element -> transformation -> insight -> answer),
+// written behind in batches by the Python evidence graph; mirrors the Alembic table
+export const evidenceLinks = pgTable("evidence_links", {
+  id: varchar("id", { length: 36 }).primaryKey(),
+  projectId: varchar("project_id", { length: 36 }).notNull().references(() => projects.id),
+  sourceType: varchar("source_type", { length: 20 }), // question, element, transformation, insight, answer
+  sourceId: varchar("source_id", { length: 64 }),
+  targetType: varchar("target_type", { length: 20 }),
+  targetId: varchar("target_id", { length: 64 }),
+  linkType: varchar("link_type", { length: 50 }),
+  confidence: doublePrecision("confidence"),
+  metadata: jsonb("metadata"),
+  createdAt: timestamp("created_at").defaultNow(),
+  revision: integer("revision").notNull().default(1), // Bumped by every upsert so other workers notice updates
+}, (table) => ({
+  projectIdIdx: index("ix_evidence_links_project_id").on(table.projectId),
+}));
+
+export type EvidenceLink = typeof evidenceLinks.$inferSelect;
+export type InsertEvidenceLink = typeof evidenceLinks.$inferInsert;
+
 // Data Engineer PII Detections - tracks PII columns and anonymization
 export const dePiiDetections = pgTable("de_pii_detections", {
   id: varchar("id").primaryKey().notNull(),
@@ -2186,11 +2213,16 @@ export const knowledgeNodes = pgTable("knowledge_nodes", {
   label: varchar("label", { length: 200 }).notNull(),
   summary: text("summary"),
   attributes: jsonb("attributes").notNull().default(sql`'{}'::jsonb`),
+  // Ranked knowledge search (websearch_to_tsquery / ts_rank_cd)
+  searchVector: tsvector("search_vector").generatedAlwaysAs(
+    sql`setweight(to_tsvector('english', coalesce(label, '')), 'A') || setweight(to_tsvector('english', coalesce(summary, '')), 'B') || setweight(to_tsvector('english', coalesce(attributes::text, '')), 'C')`
+  ),
   createdAt: timestamp("created_at").defaultNow().notNull(),
   updatedAt: timestamp("updated_at").defaultNow().notNull(),
 }, (table) => ({
   typeLabelIdx: index("knowledge_nodes_type_label_idx").on(table.type, table.label),
   typeLabelUnique: uniqueIndex("knowledge_nodes_type_label_unique").on(table.type, table.label),
+  searchVectorIdx: index("knowledge_nodes_search_vector_idx").using("gin", table.searchVector),
 }));
 
 export const knowledgeEdges = pgTable("knowledge_edges", {
@@ -2727,6 +2759,27 @@ export const agentExecutions = pgTable(
 export type AgentExecution = typeof agentExecutions.$inferSelect;
 export type InsertAgentExecution = typeof agentExecutions.$inferInsert;
 
+// Agent activity log, written behind in batches by the Python activity log
+// service (mirrors Alembic migration 2026_10_16_03_00_agent_activities).
+// No foreign key: batches may name projects not yet visible to the flush.
+export const agentActivities = pgTable(
+  "agent_activities",
+  {
+    id: varchar("id", { length: 36 }).primaryKey(),
+    projectId: varchar("project_id", { length: 36 }).notNull(),
+    agent: varchar("agent", { length: 64 }).notNull(),
+    action: varchar("action", { length: 100 }).notNull(),
+    detail: text("detail"),
+    createdAt: timestamp("created_at").defaultNow().notNull(),
+  },
+  (table) => ({
+    projectCreatedIdx: index("ix_agent_activities_project_created").on(table.projectId, table.createdAt, table.id),
+  })
+);
+
+export type AgentActivity = typeof agentActivities.$inferSelect;
+export type InsertAgentActivity = typeof agentActivities.$inferInsert;
+
 // ML/LLM Usage Log Table
 export const mlUsageLog = pgTable(
   "ml_llm_usage_log",
@@ -3407,10 +3460,14 @@ export const columnEmbeddings = pgTable("column_embeddings", {
   sampleValues: jsonb("sample_values"),
   metadata: jsonb("metadata"),
   configVersion: integer("config_version").default(0),  // Tracks which embedding config generated this
+  contentHash: varchar("content_hash"),                 // sha256 of model + embedded text, for reuse
+  embeddingVector: vector("embedding_vector").$type<number[] | null>(), // pgvector copy of 1536-dim embeddings
   createdAt: timestamp("created_at").defaultNow().notNull(),
 }, (table) => ({
   datasetIdIdx: index("column_embeddings_dataset_id_idx").on(table.datasetId),
   projectIdIdx: index("column_embeddings_project_id_idx").on(table.projectId),
+  modelContentHashIdx: index("column_embeddings_model_content_hash_idx").on(table.embeddingModel, table.contentHash),
+  embeddingVectorIdx: index("column_embeddings_vector_hnsw_idx").using("hnsw", table.embeddingVector.op("vector_cosine_ops")),
 }));
 
 export const insertColumnEmbeddingsSchema = createInsertSchema(columnEmbeddings).omit({